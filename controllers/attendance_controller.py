@@ -1,6 +1,8 @@
 import sqlite3
 from datetime import datetime, timedelta, date
 import calendar
+from database.report_rollups import ReportRollups
+from utils.analytics_snapshot import AnalyticsSnapshot
 
 class AttendanceController:
     """Controller for managing employee attendance records"""
@@ -8,6 +10,8 @@ class AttendanceController:
     def __init__(self, db):
         """Initialize with database connection"""
         self.db = db
+        self.rollups = ReportRollups(db)
+        self.analytics = AnalyticsSnapshot(db)
         
     def record_check_in(self, employee_id):
         """Record employee check-in time
@@ -76,6 +80,8 @@ class AttendanceController:
         )
         
         record_id = self.db.execute_query("SELECT last_insert_rowid()").fetchone()[0]
+        self.rollups.refresh_attendance(employee_id, today)
+        self.analytics.invalidate()
         
         # Return the record
         return {
@@ -132,6 +138,8 @@ class AttendanceController:
             WHERE id = {record_id}
             """
         )
+        self.rollups.refresh_attendance(employee_id, today)
+        self.analytics.invalidate()
         
         # Return the updated record
         return {
@@ -408,6 +416,8 @@ class AttendanceController:
                     """
                 )
             
+            self.rollups.refresh_attendance(employee_id, date_str)
+            self.analytics.invalidate()
             return True
         except Exception as e:
             print(f"Error marking attendance: {str(e)}")
@@ -497,6 +507,8 @@ class AttendanceController:
                 """
             )
         
+        self.rollups.refresh_attendance(employee_id, date_str)
+        self.analytics.invalidate()
         return True
         
     def get_attendance_data_for_period(self, employee_id, period_id):
@@ -1,7 +1,26 @@
+import os
 import bcrypt
 import uuid
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
-from PyQt5.QtCore import QObject, pyqtSignal
+from PyQt5.QtCore import QObject, QThread, pyqtSignal
+from utils.audit_log import AuditLogWriter
+
+
+class LoginWorker(QThread):
+    """Worker thread that checks credentials off the GUI thread"""
+    authenticated = pyqtSignal(bool, object)
+
+    def __init__(self, auth_controller, username, password, parent=None):
+        super().__init__(parent)
+        self.auth_controller = auth_controller
+        self.username = username
+        self.password = password
+
+    def run(self):
+        success, result = self.auth_controller.authenticate(self.username, self.password)
+        self.authenticated.emit(success, result)
+
 
 class AuthController(QObject):
     """Controller for user authentication and authorization"""
@@ -79,18 +98,31 @@ class AuthController(QObject):
         }
     }
     
-    def __init__(self, database):
+    # bcrypt cost factor for new hashes, existing hashes are upgraded on login
+    BCRYPT_ROUNDS = int(os.environ.get('EMPLOYEE_BCRYPT_ROUNDS', 12))
+
+    def __init__(self, database, bcrypt_rounds=None):
         super().__init__()
         self.db = database
+        self.bcrypt_rounds = bcrypt_rounds or self.BCRYPT_ROUNDS
+        self.audit_log = AuditLogWriter(database)
         self.current_user = None
         self.session_token = None
         self.session_expiry = None
     
     def hash_password(self, password):
         """Hash a password for storing"""
-        salt = bcrypt.gensalt()
+        salt = bcrypt.gensalt(rounds=self.bcrypt_rounds)
         hashed = bcrypt.hashpw(password.encode('utf-8'), salt)
         return hashed.decode('utf-8')
+
+    def needs_rehash(self, stored_password):
+        """Check if a stored hash was made with a different cost factor"""
+        try:
+            # bcrypt hashes look like $2b$12$<salt+hash>
+            return int(stored_password.split('$')[2]) != self.bcrypt_rounds
+        except (AttributeError, IndexError, ValueError):
+            return True
     
     def verify_password(self, stored_password, provided_password):
         """Verify a stored password against a provided password"""
@@ -141,8 +173,78 @@ class AuthController(QObject):
         finally:
             conn.close()
     
-    def login(self, username, password):
-        """Authenticate a user and create a session"""
+    def create_users_bulk(self, users, max_workers=None):
+        """Create many users at once, hashing their passwords in parallel
+        
+        Args:
+            users: List of dicts with username, password, email, full_name and role
+            max_workers: Number of hashing threads (defaults to the CPU count)
+        
+        Returns:
+            tuple: (success, {'created': [usernames], 'skipped': [(username, reason)]})
+        """
+        try:
+            conn = self.db.get_connection()
+            cursor = conn.cursor()
+            
+            cursor.execute("SELECT username, email FROM users")
+            taken_usernames, taken_emails = set(), set()
+            for username, email in cursor.fetchall():
+                taken_usernames.add(username)
+                if email:
+                    taken_emails.add(email)
+            
+            accepted, skipped = [], []
+            for user in users:
+                if user['username'] in taken_usernames:
+                    skipped.append((user['username'], "اسم المستخدم موجود بالفعل"))
+                elif user.get('email') and user['email'] in taken_emails:
+                    skipped.append((user['username'], "البريد الإلكتروني موجود بالفعل"))
+                else:
+                    accepted.append(user)
+                    taken_usernames.add(user['username'])
+                    if user.get('email'):
+                        taken_emails.add(user['email'])
+            
+            # bcrypt releases the GIL while hashing, so threads use all cores
+            with ThreadPoolExecutor(max_workers=max_workers or os.cpu_count()) as executor:
+                hashes = list(executor.map(self.hash_password, [user['password'] for user in accepted]))
+            
+            created_at = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+            cursor.executemany("""
+                INSERT INTO users (username, password, email, full_name, role, created_at, is_active)
+                VALUES (?, ?, ?, ?, ?, ?, ?)
+            """, [
+                (
+                    user['username'],
+                    hashed_password,
+                    user.get('email'),
+                    user.get('full_name'),
+                    user.get('role', self.ROLE_EMPLOYEE),
+                    created_at,
+                    1
+                )
+                for user, hashed_password in zip(accepted, hashes)
+            ])
+            
+            conn.commit()
+            return True, {
+                'created': [user['username'] for user in accepted],
+                'skipped': skipped
+            }
+        
+        except Exception as e:
+            conn.rollback()
+            return False, str(e)
+        finally:
+            conn.close()
+
+    def authenticate(self, username, password):
+        """Check credentials without touching the session
+        
+        Safe to call from a worker thread. Hashes made with a different
+        cost factor are replaced with a fresh hash after a successful check.
+        """
         try:
             conn = self.db.get_connection()
             cursor = conn.cursor()
@@ -179,16 +281,14 @@ class AuthController(QObject):
                 self._log_activity(user_dict['id'], 'login_failed', 'Failed login attempt')
                 return False, "اسم المستخدم أو كلمة المرور غير صحيحة"
             
-            # Create session
-            self.current_user = user_dict
-            self.session_token = str(uuid.uuid4())
-            self.session_expiry = datetime.now() + timedelta(hours=8)
-            
-            # Log successful login
-            self._log_activity(user_dict['id'], 'login', 'User logged in')
-            
-            # Emit signal
-            self.user_logged_in.emit(user_dict)
+            # Upgrade the stored hash to the configured cost factor
+            if self.needs_rehash(user_dict['password']):
+                user_dict['password'] = self.hash_password(password)
+                cursor.execute(
+                    "UPDATE users SET password = ? WHERE id = ?",
+                    (user_dict['password'], user_dict['id'])
+                )
+                conn.commit()
             
             return True, user_dict
             
@@ -196,6 +296,41 @@ class AuthController(QObject):
             return False, str(e)
         finally:
             conn.close()
+
+    def start_session(self, user_dict):
+        """Create a session for an authenticated user"""
+        self.current_user = user_dict
+        self.session_token = str(uuid.uuid4())
+        self.session_expiry = datetime.now() + timedelta(hours=8)
+        
+        # Log successful login
+        self._log_activity(user_dict['id'], 'login', 'User logged in')
+        
+        # Emit signal
+        self.user_logged_in.emit(user_dict)
+
+    def login(self, username, password):
+        """Authenticate a user and create a session"""
+        success, result = self.authenticate(username, password)
+        if success:
+            self.start_session(result)
+        return success, result
+
+    def login_async(self, username, password, on_finished, parent=None):
+        """Check credentials on a worker thread
+        
+        on_finished(success, result) is called on the caller's thread, which
+        should then call start_session() with the user. The worker deletes
+        itself once the thread has stopped.
+        
+        Returns:
+            LoginWorker: The started worker
+        """
+        worker = LoginWorker(self, username, password, parent)
+        worker.authenticated.connect(on_finished)
+        worker.finished.connect(worker.deleteLater)
+        worker.start()
+        return worker
     
     def logout(self):
         """Log out the current user"""
@@ -442,26 +577,19 @@ class AuthController(QObject):
         finally:
             conn.close()
     
+    # Actions whose audit entries must be on disk before the call returns
+    CRITICAL_ACTIONS = {'delete_user', 'update_user', 'change_password'}
+
+    def close(self):
+        """Write out pending audit log entries"""
+        self.audit_log.close()
+
     def _log_activity(self, user_id, action, description):
         """Log user activity"""
-        try:
-            conn = self.db.get_connection()
-            cursor = conn.cursor()
-            
-            cursor.execute("""
-                INSERT INTO audit_log (user_id, action, description, timestamp, ip_address)
-                VALUES (?, ?, ?, ?, ?)
-            """, (
-                user_id,
-                action,
-                description,
-                datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
-                '127.0.0.1'  # In a real app, you'd get the actual IP
-            ))
-            
-            conn.commit()
-            
-        except Exception as e:
-            print(f"Error logging activity: {e}")
-        finally:
-            conn.close()
+        self.audit_log.log(
+            user_id,
+            action,
+            description,
+            '127.0.0.1',  # In a real app, you'd get the actual IP
+            critical=action in self.CRITICAL_ACTIONS
+        )
@@ -3,6 +3,7 @@ from PyQt5.QtCore import QObject, pyqtSignal
 from PyQt5.QtGui import QPixmap, QImage
 import os
 import mimetypes
+from database.code_sequence import EmployeeCodeSequence
 
 class EmployeeController(QObject):
     employee_added = pyqtSignal(dict)
@@ -12,6 +13,7 @@ class EmployeeController(QObject):
     def __init__(self, database):
         super().__init__()
         self.db = database
+        self.codes = EmployeeCodeSequence(database)
     
     def _get_mime_type(self, file_path):
         """Get MIME type of a file"""
@@ -30,15 +32,25 @@ class EmployeeController(QObject):
 
     def _generate_employee_code(self, cursor):
         """Generate a unique employee code"""
-        # Get the current max code
-        cursor.execute("SELECT MAX(CAST(SUBSTR(code, 2) AS INTEGER)) FROM employees WHERE code LIKE 'E%'")
-        result = cursor.fetchone()[0]
-        
-        # Start with 1 if no existing codes, otherwise increment the max
-        next_number = 1 if result is None else result + 1
+        return self.codes.reserve_codes(cursor, 1)[0]
+
+    def reserve_codes(self, count):
+        """Reserve a block of employee codes for a bulk import
         
-        # Format as E0001, E0002, etc.
-        return f'E{next_number:04d}'
+        Returns (success, list of codes or error message). The codes are
+        committed immediately; unused ones are simply skipped.
+        """
+        try:
+            conn = self.db.get_connection()
+            cursor = conn.cursor()
+            codes = self.codes.reserve_codes(cursor, count)
+            conn.commit()
+            return True, codes
+        except Exception as e:
+            conn.rollback()
+            return False, str(e)
+        finally:
+            conn.close()
 
     def add_employee(self, employee_data):
         """Add a new employee to the database"""
@@ -782,6 +794,19 @@ class EmployeeController(QObject):
         except Exception as e:
             return False, str(e)
 
+    def import_employees(self, filename, progress=None):
+        """Import employees from a CSV or Excel file
+        
+        Returns (success, result) where result holds the imported and failed
+        row counts and the per-row errors; see EmployeeImporter.import_file.
+        """
+        try:
+            # pandas is only loaded when an import is actually run
+            from utils.employee_import import EmployeeImporter
+            return True, EmployeeImporter(self.db, self.codes).import_file(filename, progress=progress)
+        except Exception as e:
+            return False, str(e)
+
     def add_department(self, department_data):
         """Add a new department to the database"""
         try:
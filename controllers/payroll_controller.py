@@ -1,10 +1,17 @@
+from collections import OrderedDict
 from datetime import datetime, date
 from typing import Dict, List, Optional, Tuple, Union
-from decimal import Decimal
 from PyQt5.QtCore import QObject, pyqtSignal
 from .employee_details_controller import EmployeeDetailsController
+from database.payroll_changes import PayrollChangeTracker
+from database.report_rollups import ReportRollups
+from utils.analytics_snapshot import AnalyticsSnapshot
+from utils.money import MINOR_UNIT_COLUMNS, Money, to_major, to_major_sql, to_minor_sql
+from utils.telemetry import telemetry
 
 class PayrollController(QObject):
+    SALARY_HISTORY_CACHE_SIZE = 128
+
     payroll_generated = pyqtSignal(dict)
     payroll_approved = pyqtSignal(dict)
     payment_processed = pyqtSignal(dict)
@@ -13,6 +20,12 @@ class PayrollController(QObject):
         super().__init__()
         self.db = database
         self.employee_details = EmployeeDetailsController(database)
+        self.rollups = ReportRollups(database)
+        self.changes = PayrollChangeTracker(database)
+        self.analytics = AnalyticsSnapshot(database)
+        
+        # employee_id -> (entries signature, full salary history), least recently used first
+        self._salary_history_cache = OrderedDict()
 
     def create_payroll_period(self, year, month):
         """Create a new payroll period"""
@@ -83,8 +96,6 @@ class PayrollController(QObject):
             if not period:
                 return False, "فترة الرواتب غير موجودة"
 
-            period_year, period_month, start_date, end_date = period
-
             # Get active employees
             cursor.execute("""
                 SELECT id 
@@ -96,125 +107,221 @@ class PayrollController(QObject):
             entries = []
 
             for (employee_id,) in employees:
-                # Get employee salary details
-                success, salary_info = self.employee_details.get_employee_details(employee_id)
-                if not success:
-                    continue
+                entry = self._create_payroll_entry(cursor, period_id, period, employee_id)
+                if entry:
+                    entries.append(entry)
 
-                basic_salary = salary_info['basic_salary']
-                total_allowances = sum(
-                    comp['value'] if not comp['is_percentage']
-                    else basic_salary * comp['percentage'] / 100
-                    for comp in salary_info['salary_components']
-                    if comp['type'] == 'allowance'
-                )
+            # Every entry of the period is current now
+            if self.db.has_table('payroll_dirty'):
+                self.changes.clear(cursor, period_id)
 
-                total_deductions = sum(
-                    comp['value'] if not comp['is_percentage']
-                    else basic_salary * comp['percentage'] / 100
-                    for comp in salary_info['salary_components']
-                    if comp['type'] == 'deduction'
-                )
+            conn.commit()
+            self.analytics.invalidate()
+            telemetry.increment('payroll.employees', len(entries))
+            return True, entries
 
-                # Calculate working days
-                working_days = self._calculate_working_days(
-                    employee_id, 
-                    start_date, 
-                    end_date
-                )
+        except Exception as e:
+            conn.rollback()
+            return False, str(e)
+        finally:
+            conn.close()
 
-                # Apply any adjustments effective in this period
-                adjustments = [
-                    adj for adj in salary_info['salary_adjustments']
-                    if (
-                        adj['status'] == 'approved' and
-                        adj['effective_date'] <= end_date and
-                        (not adj['end_date'] or adj['end_date'] >= start_date)
+    def recalculate_dirty(self, period_id):
+        """Recalculate the entries of a draft period whose inputs changed
+        
+        Only employees marked in payroll_dirty since the period was generated
+        that have an entry in the period are recalculated; their entries and
+        components are replaced. Marked employees outside the period, e.g.
+        in another department, are not added to it.
+        """
+        # payroll_dirty and its triggers are created by the add_payroll_dirty
+        # migration; without them no changes have been recorded
+        if not self.db.has_table('payroll_dirty'):
+            return True, []
+        
+        try:
+            conn = self.db.get_connection()
+            cursor = conn.cursor()
+            
+            cursor.execute("""
+                SELECT period_year, period_month, start_date, end_date, status
+                FROM payroll_periods
+                WHERE id = ?
+            """, (period_id,))
+            
+            row = cursor.fetchone()
+            if not row:
+                return False, "فترة الرواتب غير موجودة"
+            if row[4] != 'draft':
+                return False, "لا يمكن إعادة حساب فترة رواتب غير مسودة"
+            period = row[:4]
+            
+            # Removing the stale entries first takes the write lock, so no
+            # new marks can arrive before the period's marks are cleared
+            component_columns = self.db.get_table_columns('payroll_entry_components')
+            if component_columns:
+                entry_column = 'payroll_entry_id' if 'payroll_entry_id' in component_columns else 'entry_id'
+                cursor.execute(f"""
+                    DELETE FROM payroll_entry_components WHERE {entry_column} IN (
+                        SELECT pe.id FROM payroll_entries pe
+                        JOIN payroll_dirty pd
+                            ON pd.period_id = pe.payroll_period_id AND pd.employee_id = pe.employee_id
+                        WHERE pe.payroll_period_id = ?
                     )
-                ]
-
-                total_adjustments = sum(adj['amount'] for adj in adjustments)
-
-                # Calculate net salary
-                net_salary = (
-                    basic_salary + 
-                    total_allowances - 
-                    total_deductions +
-                    total_adjustments
+                """, (period_id,))
+            cursor.execute("""
+                DELETE FROM payroll_entries
+                WHERE payroll_period_id = ?
+                AND employee_id IN (SELECT employee_id FROM payroll_dirty WHERE period_id = ?)
+                RETURNING employee_id
+            """, (period_id, period_id))
+            replaced = [(row[0],) for row in cursor.fetchall()]
+            
+            # Only the employees whose entry was removed get a new one
+            cursor.execute("""
+                CREATE TEMP TABLE IF NOT EXISTS payroll_recalculated (
+                    employee_id INTEGER PRIMARY KEY
                 )
-
-                # Prorate salary if needed
-                if working_days < self._get_period_working_days(period_year, period_month):
-                    net_salary = (net_salary / self._get_period_working_days(period_year, period_month)) * working_days
-
-                # Insert payroll entry
-                cursor.execute("""
-                    INSERT INTO payroll_entries (
-                        payroll_period_id, employee_id,
-                        basic_salary, total_allowances,
-                        total_deductions, total_adjustments,
-                        working_days, net_salary,
-                        payment_status, created_at
-                    ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, 'pending', CURRENT_TIMESTAMP)
-                """, (
-                    period_id, employee_id,
-                    basic_salary, total_allowances,
-                    total_deductions, total_adjustments,
-                    working_days, net_salary
-                ))
-
-                entry_id = cursor.lastrowid
-
-                # Add payroll components
-                for comp in salary_info['salary_components']:
-                    value = (
-                        comp['value'] if not comp['is_percentage']
-                        else basic_salary * comp['percentage'] / 100
-                    )
-
-                    cursor.execute("""
-                        INSERT INTO payroll_entry_components (
-                            entry_id, component_id,
-                            amount, created_at
-                        ) VALUES (?, ?, ?, CURRENT_TIMESTAMP)
-                    """, (entry_id, comp['id'], value))
-
-                entries.append({
-                    'id': entry_id,
-                    'employee_id': employee_id,
-                    'basic_salary': basic_salary,
-                    'total_allowances': total_allowances,
-                    'total_deductions': total_deductions,
-                    'total_adjustments': total_adjustments,
-                    'working_days': working_days,
-                    'net_salary': net_salary
-                })
-
+            """)
+            cursor.execute("DELETE FROM temp.payroll_recalculated")
+            cursor.executemany("INSERT OR IGNORE INTO temp.payroll_recalculated (employee_id) VALUES (?)", replaced)
+            cursor.execute("""
+                SELECT e.id
+                FROM employees e
+                JOIN temp.payroll_recalculated r ON r.employee_id = e.id
+                WHERE e.is_active = 1
+                ORDER BY e.id
+            """)
+            
+            entries = []
+            for (employee_id,) in cursor.fetchall():
+                entry = self._create_payroll_entry(cursor, period_id, period, employee_id)
+                if entry:
+                    entries.append(entry)
+            
+            self.changes.clear(cursor, period_id)
             conn.commit()
+            self.analytics.invalidate()
+            telemetry.increment('payroll.recalculated', len(entries))
             return True, entries
-
+        
         except Exception as e:
             conn.rollback()
             return False, str(e)
         finally:
             conn.close()
 
+    def _create_payroll_entry(self, cursor, period_id, period, employee_id):
+        """Calculate and insert the payroll entry of one employee with its components
+        
+        period is the (period_year, period_month, start_date, end_date) row.
+        Returns the entry with Money amounts, or None when the employee's
+        details cannot be loaded.
+        """
+        period_year, period_month, start_date, end_date = period
+        
+        # Get employee salary details
+        success, salary_info = self.employee_details.get_employee_details(employee_id)
+        if not success:
+            return None
+        
+        basic_salary = Money(salary_info['basic_salary'] or 0)
+        components = [
+            (
+                comp,
+                Money(comp['value'] or 0) if not comp['is_percentage']
+                else basic_salary * (comp['percentage'] / 100)
+            )
+            for comp in salary_info['salary_components']
+        ]
+        total_allowances = Money.sum(amount for comp, amount in components if comp['type'] == 'allowance')
+        total_deductions = Money.sum(amount for comp, amount in components if comp['type'] == 'deduction')
+        
+        # Calculate working days
+        working_days = self._calculate_working_days(
+            employee_id, 
+            start_date, 
+            end_date
+        )
+        
+        # Apply any adjustments effective in this period
+        adjustments = [
+            adj for adj in salary_info['salary_adjustments']
+            if (
+                adj['status'] == 'approved' and
+                adj['effective_date'] <= end_date and
+                (not adj['end_date'] or adj['end_date'] >= start_date)
+            )
+        ]
+        
+        total_adjustments = Money.sum(Money(adj['amount']) for adj in adjustments)
+        
+        # Calculate net salary
+        net_salary = (
+            basic_salary + 
+            total_allowances - 
+            total_deductions +
+            total_adjustments
+        )
+        
+        # Prorate salary if needed
+        period_working_days = self._get_period_working_days(period_year, period_month)
+        if working_days < period_working_days:
+            net_salary = net_salary * (working_days / period_working_days)
+        
+        # Insert payroll entry, amounts in minor units
+        cursor.execute("""
+            INSERT INTO payroll_entries (
+                payroll_period_id, employee_id,
+                basic_salary, total_allowances,
+                total_deductions, total_adjustments,
+                working_days, net_salary,
+                payment_status, created_at
+            ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, 'pending', CURRENT_TIMESTAMP)
+        """, (
+            period_id, employee_id,
+            basic_salary.minor, total_allowances.minor,
+            total_deductions.minor, total_adjustments.minor,
+            working_days, net_salary.minor
+        ))
+        
+        entry_id = cursor.lastrowid
+        
+        # Add payroll components
+        cursor.executemany("""
+            INSERT INTO payroll_entry_components (
+                entry_id, component_id,
+                amount, created_at
+            ) VALUES (?, ?, ?, CURRENT_TIMESTAMP)
+        """, [(entry_id, comp['id'], amount.minor) for comp, amount in components])
+        
+        return {
+            'id': entry_id,
+            'employee_id': employee_id,
+            'basic_salary': basic_salary,
+            'total_allowances': total_allowances,
+            'total_deductions': total_deductions,
+            'total_adjustments': total_adjustments,
+            'working_days': working_days,
+            'net_salary': net_salary
+        }
+
     def get_payroll_entries(self, period_id):
-        """Get all payroll entries for a specific period"""
+        """Get all payroll entries for a specific period, amounts in major units"""
         try:
             conn = self.db.get_connection()
             cursor = conn.cursor()
             
-            cursor.execute("""
+            cursor.execute(f"""
                 SELECT 
                     pe.id,
                     pe.employee_id,
                     e.name as employee_name,
                     d.name as department_name,
-                    pe.basic_salary,
-                    pe.total_allowances,
-                    pe.total_deductions,
-                    pe.net_salary,
+                    {to_major_sql('pe.basic_salary')} as basic_salary,
+                    {to_major_sql('pe.total_allowances')} as total_allowances,
+                    {to_major_sql('pe.total_deductions')} as total_deductions,
+                    {to_major_sql('pe.net_salary')} as net_salary,
                     pe.payment_method,
                     pm.name_ar as payment_method_name,
                     pe.payment_status,
@@ -249,16 +356,16 @@ class PayrollController(QObject):
             conn = self.db.get_connection()
             cursor = conn.cursor()
             
-            cursor.execute("""
+            cursor.execute(f"""
                 SELECT 
                     pe.id,
                     pe.employee_id,
                     e.name as employee_name,
                     d.name as department_name,
-                    pe.basic_salary,
-                    pe.total_allowances,
-                    pe.total_deductions,
-                    pe.net_salary,
+                    {to_major_sql('pe.basic_salary')} as basic_salary,
+                    {to_major_sql('pe.total_allowances')} as total_allowances,
+                    {to_major_sql('pe.total_deductions')} as total_deductions,
+                    {to_major_sql('pe.net_salary')} as net_salary,
                     pe.payment_method,
                     pm.name as payment_method_name,
                     pe.payment_status,
@@ -325,13 +432,13 @@ class PayrollController(QObject):
             conn = self.db.get_connection()
             cursor = conn.cursor()
             
-            cursor.execute("""
+            cursor.execute(f"""
                 SELECT 
                     pec.id,
                     pec.component_id,
                     sc.name,
                     sc.type,
-                    pec.value
+                    {to_major_sql('pec.value')}
                 FROM payroll_entry_components pec
                 JOIN salary_components sc ON pec.component_id = sc.id
                 WHERE pec.payroll_entry_id = ?
@@ -363,7 +470,11 @@ class PayrollController(QObject):
             conn.close()
 
     def update_entry_component(self, entry_id, component_id, value):
-        """Update a component value for a payroll entry"""
+        """Update a component value (in major units) for a payroll entry
+        
+        The report rollups of the month are refreshed when the entry belongs
+        to an approved or processed period.
+        """
         try:
             conn = self.db.get_connection()
             cursor = conn.cursor()
@@ -373,7 +484,7 @@ class PayrollController(QObject):
                 UPDATE payroll_entry_components
                 SET value = ?
                 WHERE payroll_entry_id = ? AND component_id = ?
-            """, (value, entry_id, component_id))
+            """, (Money(value).minor, entry_id, component_id))
             
             # Recalculate totals
             cursor.execute("""
@@ -400,7 +511,18 @@ class PayrollController(QObject):
                 WHERE id = ?
             """, (entry_id,))
             
+            cursor.execute("""
+                SELECT pp.id, pp.status
+                FROM payroll_entries pe
+                JOIN payroll_periods pp ON pe.payroll_period_id = pp.id
+                WHERE pe.id = ?
+            """, (entry_id,))
+            period = cursor.fetchone()
+            
             conn.commit()
+            if period and period[1] != 'draft':
+                self.rollups.refresh_payroll_period(period[0])
+            self.analytics.invalidate()
             return True, "تم تحديث المكون بنجاح"
             
         except Exception as e:
@@ -435,8 +557,7 @@ class PayrollController(QObject):
                 return False, "لا يمكن اعتماد فترة رواتب فارغة. يرجى إضافة موظفين أولاً"
             
             # Check if approved_at column exists
-            cursor.execute("PRAGMA table_info(payroll_periods)")
-            columns = [column[1] for column in cursor.fetchall()]
+            columns = self.db.get_table_columns('payroll_periods')
             
             # Prepare SQL based on available columns
             if 'approved_at' in columns:
@@ -468,6 +589,11 @@ class PayrollController(QObject):
             """, (period_id,))
             
             conn.commit()
+            
+            # Approved periods are included in the monthly report rollups,
+            # the analytics snapshot is out of date until the next export
+            self.rollups.refresh_payroll_period(period_id)
+            self.analytics.invalidate()
             return True, "تم اعتماد كشف الرواتب بنجاح"
             
         except Exception as e:
@@ -493,8 +619,7 @@ class PayrollController(QObject):
                 return False, "يجب اعتماد كشف الرواتب أولاً"
             
             # Check if processed_at and processed_by columns exist
-            cursor.execute("PRAGMA table_info(payroll_periods)")
-            columns = [column[1] for column in cursor.fetchall()]
+            columns = self.db.get_table_columns('payroll_periods')
             
             # Prepare SQL based on available columns
             if 'processed_at' in columns and 'processed_by' in columns:
@@ -524,6 +649,9 @@ class PayrollController(QObject):
             """, (period_id,))
             
             conn.commit()
+            
+            self.rollups.refresh_payroll_period(period_id)
+            self.analytics.invalidate()
             return True, "تم صرف الرواتب بنجاح"
             
         except Exception as e:
@@ -537,13 +665,14 @@ class PayrollController(QObject):
             conn = self.db.get_connection()
             cursor = conn.cursor()
             
-            cursor.execute("""
+            # Integer sums, converted to major units once per total
+            cursor.execute(f"""
                 SELECT 
                     COUNT(*) as total_employees,
-                    SUM(basic_salary) as total_basic,
-                    SUM(total_allowances) as total_allowances,
-                    SUM(total_deductions) as total_deductions,
-                    SUM(net_salary) as total_net
+                    {to_major_sql('SUM(basic_salary)')} as total_basic,
+                    {to_major_sql('SUM(total_allowances)')} as total_allowances,
+                    {to_major_sql('SUM(total_deductions)')} as total_deductions,
+                    {to_major_sql('SUM(net_salary)')} as total_net
                 FROM payroll_entries
                 WHERE payroll_period_id = ?
             """, (period_id,))
@@ -561,11 +690,11 @@ class PayrollController(QObject):
             }
             
             # Get payment method breakdown
-            cursor.execute("""
+            cursor.execute(f"""
                 SELECT 
                     COALESCE(pm.name, 'غير محدد') as method,
                     COUNT(*) as count,
-                    SUM(pe.net_salary) as total
+                    {to_major_sql('SUM(pe.net_salary)')} as total
                 FROM payroll_entries pe
                 LEFT JOIN payment_methods pm ON pe.payment_method = pm.id
                 WHERE pe.payroll_period_id = ?
@@ -590,14 +719,14 @@ class PayrollController(QObject):
             conn = self.db.get_connection()
             cursor = conn.cursor()
             
-            cursor.execute("""
+            cursor.execute(f"""
                 SELECT 
                     pp.year,
                     pp.month,
-                    pe.basic_salary,
-                    pe.total_allowances,
-                    pe.total_deductions,
-                    pe.net_salary,
+                    {to_major_sql('pe.basic_salary')},
+                    {to_major_sql('pe.total_allowances')},
+                    {to_major_sql('pe.total_deductions')},
+                    {to_major_sql('pe.net_salary')},
                     pe.payment_status,
                     pe.payment_date
                 FROM payroll_entries pe
@@ -655,144 +784,177 @@ class PayrollController(QObject):
             conn = self.db.get_connection()
             cursor = conn.cursor()
             
-            # First get the basic entry data
-            cursor.execute("""
-                SELECT 
-                    pe.*,
-                    e.name as employee_name,
-                    e.name_ar as employee_name_ar,
-                    pp.period_year,
-                    pp.period_month,
-                    pp.start_date,
-                    pp.end_date,
-                    pm.name_ar as payment_method_name
-                FROM payroll_entries pe
-                JOIN employees e ON pe.employee_id = e.id
-                JOIN payroll_periods pp ON pe.payroll_period_id = pp.id
-                LEFT JOIN payment_methods pm ON pe.payment_method = pm.id
-                WHERE pe.id = ?
-            """, (entry_id,))
-            
-            row = cursor.fetchone()
-            if not row:
+            payslips = self._load_payslips(cursor, "pe.id = ?", (entry_id,))
+            if not payslips:
                 return False, "Entry not found"
-                
-            columns = [description[0] for description in cursor.description]
-            payslip = dict(zip(columns, row))
             
-            # Try to get department and position info if available
-            try:
-                cursor.execute("""
-                    SELECT 
-                        d.name as department_name,
-                        p.title as position_title
-                    FROM employees e
-                    LEFT JOIN employment_details ed ON e.id = ed.employee_id
-                    LEFT JOIN departments d ON ed.department_id = d.id
-                    LEFT JOIN positions p ON ed.position_id = p.id
-                    WHERE e.id = ?
-                """, (payslip.get('employee_id'),))
-                
-                dept_row = cursor.fetchone()
-                if dept_row:
-                    payslip['department_name'] = dept_row[0]
-                    payslip['position_title'] = dept_row[1]
-            except Exception:
-                # If this query fails, we'll just continue without this info
-                payslip['department_name'] = ''
-                payslip['position_title'] = ''
-            
-            # Try to get bank details if available
-            try:
-                cursor.execute("""
-                    SELECT 
-                        bank_name,
-                        bank_account,
-                        iban
-                    FROM employment_details
-                    WHERE employee_id = ?
-                """, (payslip.get('employee_id'),))
-                
-                bank_row = cursor.fetchone()
-                if bank_row:
-                    payslip['bank_name'] = bank_row[0]
-                    payslip['bank_account'] = bank_row[1]
-                    payslip['iban'] = bank_row[2]
-            except Exception:
-                # If this query fails, we'll just continue without this info
-                payslip['bank_name'] = ''
-                payslip['bank_account'] = ''
-                payslip['iban'] = ''
-            
-            # Get component details - first try payroll_entry_details
-            payslip['components'] = []
-            try:
-                cursor.execute("""
-                    SELECT 
-                        ped.amount,
-                        ped.type,
-                        sc.name,
-                        sc.name_ar
-                    FROM payroll_entry_details ped
-                    JOIN salary_components sc ON ped.component_id = sc.id
-                    WHERE ped.payroll_entry_id = ?
-                    ORDER BY ped.type, sc.name
-                """, (entry_id,))
-                
-                for amount, type_, name, name_ar in cursor.fetchall():
-                    payslip['components'].append({
-                        'amount': amount,
-                        'type': type_,
-                        'name': name,
-                        'name_ar': name_ar
-                    })
-            except Exception:
-                # If this fails, try payroll_entry_components instead
-                try:
-                    cursor.execute("""
-                        SELECT 
-                            pec.value as amount,
-                            sc.type,
-                            sc.name,
-                            sc.name_ar
-                        FROM payroll_entry_components pec
-                        JOIN salary_components sc ON pec.component_id = sc.id
-                        WHERE pec.payroll_entry_id = ?
-                        ORDER BY sc.type, sc.name
-                    """, (entry_id,))
-                    
-                    for amount, type_, name, name_ar in cursor.fetchall():
-                        payslip['components'].append({
-                            'amount': amount,
-                            'type': type_,
-                            'name': name,
-                            'name_ar': name_ar
-                        })
-                except Exception:
-                    # If both fail, we'll just use the totals from the payroll_entries table
-                    if float(payslip.get('total_allowances', 0)) > 0:
-                        payslip['components'].append({
-                            'amount': payslip.get('total_allowances', 0),
-                            'type': 'allowance',
-                            'name': 'Total Allowances',
-                            'name_ar': 'إجمالي البدلات'
-                        })
-                    
-                    if float(payslip.get('total_deductions', 0)) > 0:
-                        payslip['components'].append({
-                            'amount': payslip.get('total_deductions', 0),
-                            'type': 'deduction',
-                            'name': 'Total Deductions',
-                            'name_ar': 'إجمالي الاستقطاعات'
-                        })
+            return True, payslips[0]
+            
+        except Exception as e:
+            return False, str(e)
+        finally:
+            conn.close()
+
+    def get_period_payslips(self, period_id):
+        """Get payslip data for every entry in a payroll period
+        
+        Loads headers and components for the whole period in a few queries
+        instead of one get_employee_payslip call per entry. Each payslip has
+        the same keys as get_employee_payslip returns.
+        """
+        try:
+            conn = self.db.get_connection()
+            cursor = conn.cursor()
             
-            return True, payslip
+            return True, self._load_payslips(cursor, "pe.payroll_period_id = ?", (period_id,))
             
         except Exception as e:
             return False, str(e)
         finally:
             conn.close()
 
+    def _get_payslip_schema(self):
+        """Work out the optional tables and columns payslips are read from
+        
+        Older databases lack employment_details and store components in
+        either payroll_entry_details or payroll_entry_components with
+        different column names. Answered from the database schema cache.
+        """
+        schema = {
+            'employment_details': self.db.has_table('employment_details'),
+            'position_title': 'title' if 'title' in self.db.get_table_columns('positions') else 'name',
+            'components': None
+        }
+        
+        details_columns = set(self.db.get_table_columns('payroll_entry_details'))
+        components_columns = set(self.db.get_table_columns('payroll_entry_components'))
+        if {'payroll_entry_id', 'amount', 'type'} <= details_columns:
+            schema['components'] = {
+                'table': 'payroll_entry_details',
+                'entry_column': 'payroll_entry_id',
+                'amount_column': 'amount',
+                'type_column': 'type'
+            }
+        elif components_columns:
+            schema['components'] = {
+                'table': 'payroll_entry_components',
+                'entry_column': 'payroll_entry_id' if 'payroll_entry_id' in components_columns else 'entry_id',
+                'amount_column': 'value' if 'value' in components_columns else 'amount',
+                'type_column': None
+            }
+        
+        return schema
+
+    def _load_payslips(self, cursor, condition, params):
+        """Load payslips for the payroll entries matching a WHERE condition on pe
+        
+        Returns the header, department/position, bank details and components
+        of every matching entry using one header query and one component
+        query, grouped in memory by entry id. Amounts are in major units.
+        """
+        schema = self._get_payslip_schema()
+        
+        if schema['employment_details']:
+            details_select = f"""
+                    d.name as department_name,
+                    p.{schema['position_title']} as position_title,
+                    ed.bank_name,
+                    ed.bank_account,
+                    ed.iban"""
+            details_join = """
+                LEFT JOIN employment_details ed ON ed.employee_id = e.id
+                LEFT JOIN departments d ON ed.department_id = d.id
+                LEFT JOIN positions p ON ed.position_id = p.id"""
+        else:
+            details_select = """
+                    '' as department_name,
+                    '' as position_title,
+                    '' as bank_name,
+                    '' as bank_account,
+                    '' as iban"""
+            details_join = ""
+        
+        cursor.execute(f"""
+            SELECT 
+                pe.*,
+                e.name as employee_name,
+                e.name_ar as employee_name_ar,
+                pp.period_year,
+                pp.period_month,
+                pp.start_date,
+                pp.end_date,
+                pm.name_ar as payment_method_name,{details_select}
+            FROM payroll_entries pe
+            JOIN employees e ON pe.employee_id = e.id
+            JOIN payroll_periods pp ON pe.payroll_period_id = pp.id
+            LEFT JOIN payment_methods pm ON pe.payment_method = pm.id{details_join}
+            WHERE {condition}
+            ORDER BY e.name
+        """, params)
+        
+        columns = [description[0] for description in cursor.description]
+        money_columns = [column for column in MINOR_UNIT_COLUMNS['payroll_entries'] if column in columns]
+        payslips = {}
+        for row in cursor.fetchall():
+            payslip = dict(zip(columns, row))
+            # An employee with several employment_details rows keeps the first one
+            if payslip['id'] not in payslips:
+                for column in money_columns:
+                    payslip[column] = to_major(payslip[column])
+                payslip['components'] = []
+                payslips[payslip['id']] = payslip
+        
+        if not payslips:
+            return []
+        
+        source = schema['components']
+        if source:
+            type_select = f"c.{source['type_column']}" if source['type_column'] else "sc.type"
+            amount_select = to_major_sql(f"c.{source['amount_column']}")
+            cursor.execute(f"""
+                SELECT 
+                    c.{source['entry_column']},
+                    {amount_select} as amount,
+                    {type_select} as type,
+                    sc.name,
+                    sc.name_ar
+                FROM {source['table']} c
+                JOIN payroll_entries pe ON c.{source['entry_column']} = pe.id
+                JOIN salary_components sc ON c.component_id = sc.id
+                WHERE {condition}
+                ORDER BY {type_select}, sc.name
+            """, params)
+            
+            for entry_id, amount, type_, name, name_ar in cursor.fetchall():
+                payslip = payslips.get(entry_id)
+                if payslip:
+                    payslip['components'].append({
+                        'amount': amount,
+                        'type': type_,
+                        'name': name,
+                        'name_ar': name_ar
+                    })
+        else:
+            # No component table, just use the totals from the payroll_entries table
+            for payslip in payslips.values():
+                if float(payslip.get('total_allowances') or 0) > 0:
+                    payslip['components'].append({
+                        'amount': payslip.get('total_allowances', 0),
+                        'type': 'allowance',
+                        'name': 'Total Allowances',
+                        'name_ar': 'إجمالي البدلات'
+                    })
+                
+                if float(payslip.get('total_deductions') or 0) > 0:
+                    payslip['components'].append({
+                        'amount': payslip.get('total_deductions', 0),
+                        'type': 'deduction',
+                        'name': 'Total Deductions',
+                        'name_ar': 'إجمالي الاستقطاعات'
+                    })
+        
+        return list(payslips.values())
+
     def get_salary_components(self, component_type=None):
         """Get all salary components or filter by type"""
         try:
@@ -1240,93 +1402,83 @@ class PayrollController(QObject):
                 existing_str = "، ".join(existing_names)
                 return False, f"الموظفين التاليين موجودين بالفعل في كشف الرواتب: {existing_str}"
             
-            # Add new employees
-            for emp_id in new_employees:
-                # Get employee basic salary and active components
-                cursor.execute("""
-                    SELECT basic_salary FROM employees WHERE id = ?
-                """, (emp_id,))
-                emp = cursor.fetchone()
-                if not emp:
-                    continue
-                
-                basic_salary = emp[0] or 0
-                
-                # Insert payroll entry
-                cursor.execute("""
-                    INSERT INTO payroll_entries (
-                        payroll_period_id, employee_id, basic_salary,
-                        total_allowances, total_deductions, net_salary,
-                        payment_status
-                    ) VALUES (?, ?, ?, 0, 0, ?, 'pending')
-                """, (period_id, emp_id, basic_salary, basic_salary))
-                
-                entry_id = cursor.lastrowid
-                
-                # Calculate and insert allowances
-                cursor.execute("""
-                    SELECT sc.id, sc.is_percentage, sc.percentage, 
-                           COALESCE(esc.value, sc.value) as value
-                    FROM salary_components sc
-                    LEFT JOIN employee_salary_components esc ON 
-                        sc.id = esc.component_id AND 
-                        esc.employee_id = ? AND 
-                        esc.is_active = 1
-                    WHERE sc.type = 'allowance' AND sc.is_active = 1
-                """, (emp_id,))
-                
-                allowances = cursor.fetchall()
-                total_allowances = 0
-                
-                for comp_id, is_percentage, percentage, value in allowances:
-                    amount = (basic_salary * (percentage / 100)) if is_percentage else value
-                    total_allowances += amount
-                    
-                    cursor.execute("""
-                        INSERT INTO payroll_entry_components (
-                            payroll_entry_id, component_id, value
-                        ) VALUES (?, ?, ?)
-                    """, (entry_id, comp_id, amount))
-                
-                # Calculate and insert deductions
-                cursor.execute("""
-                    SELECT sc.id, sc.is_percentage, sc.percentage, 
-                           COALESCE(esc.value, sc.value) as value
-                    FROM salary_components sc
-                    LEFT JOIN employee_salary_components esc ON 
-                        sc.id = esc.component_id AND 
-                        esc.employee_id = ? AND 
-                        esc.is_active = 1
-                    WHERE sc.type = 'deduction' AND sc.is_active = 1
-                """, (emp_id,))
-                
-                deductions = cursor.fetchall()
-                total_deductions = 0
-                
-                for comp_id, is_percentage, percentage, value in deductions:
-                    amount = (basic_salary * (percentage / 100)) if is_percentage else value
-                    total_deductions += amount
-                    
-                    cursor.execute("""
-                        INSERT INTO payroll_entry_components (
-                            payroll_entry_id, component_id, value
-                        ) VALUES (?, ?, ?)
-                    """, (entry_id, comp_id, amount))
-                
-                # Update totals
-                net_salary = basic_salary + total_allowances - total_deductions
-                cursor.execute("""
-                    UPDATE payroll_entries 
-                    SET total_allowances = ?,
-                        total_deductions = ?,
-                        net_salary = ?
-                    WHERE id = ?
-                """, (total_allowances, total_deductions, net_salary, entry_id))
+            # Add the new employees with a few set-based statements
+            cursor.execute("""
+                CREATE TEMP TABLE IF NOT EXISTS payroll_new_employees (
+                    employee_id INTEGER PRIMARY KEY
+                )
+            """)
+            cursor.execute("DELETE FROM temp.payroll_new_employees")
+            cursor.executemany(
+                "INSERT OR IGNORE INTO temp.payroll_new_employees (employee_id) VALUES (?)",
+                [(emp_id,) for emp_id in new_employees]
+            )
+            
+            # Entries start at the basic salary; totals are filled in below.
+            # Employee and component amounts are major units, entries minor.
+            basic_salary = to_minor_sql('COALESCE(e.basic_salary, 0)')
+            cursor.execute(f"""
+                INSERT INTO payroll_entries (
+                    payroll_period_id, employee_id, basic_salary,
+                    total_allowances, total_deductions, net_salary,
+                    payment_status
+                )
+                SELECT ?, e.id, {basic_salary},
+                       0, 0, {basic_salary}, 'pending'
+                FROM temp.payroll_new_employees n
+                JOIN employees e ON e.id = n.employee_id
+                ORDER BY n.employee_id
+            """, (period_id,))
+            added = cursor.rowcount
+            
+            # Active allowances and deductions, with employee overrides
+            cursor.execute(f"""
+                INSERT INTO payroll_entry_components (
+                    payroll_entry_id, component_id, value
+                )
+                SELECT pe.id, sc.id,
+                       CASE WHEN sc.is_percentage
+                            THEN CAST(ROUND(pe.basic_salary * (sc.percentage / 100.0)) AS INTEGER)
+                            ELSE {to_minor_sql('COALESCE(esc.value, sc.value)')}
+                       END
+                FROM payroll_entries pe
+                JOIN temp.payroll_new_employees n ON n.employee_id = pe.employee_id
+                JOIN salary_components sc
+                    ON sc.type IN ('allowance', 'deduction') AND sc.is_active = 1
+                LEFT JOIN employee_salary_components esc ON 
+                    sc.id = esc.component_id AND 
+                    esc.employee_id = pe.employee_id AND 
+                    esc.is_active = 1
+                WHERE pe.payroll_period_id = ?
+                ORDER BY pe.id, sc.type = 'deduction', sc.id
+            """, (period_id,))
+            
+            # Update totals
+            cursor.execute("""
+                UPDATE payroll_entries 
+                SET total_allowances = totals.allowances,
+                    total_deductions = totals.deductions,
+                    net_salary = payroll_entries.basic_salary + totals.allowances - totals.deductions
+                FROM (
+                    SELECT pec.payroll_entry_id,
+                           COALESCE(SUM(CASE WHEN sc.type = 'allowance' THEN pec.value END), 0) AS allowances,
+                           COALESCE(SUM(CASE WHEN sc.type = 'deduction' THEN pec.value END), 0) AS deductions
+                    FROM payroll_entry_components pec
+                    JOIN salary_components sc ON sc.id = pec.component_id
+                    JOIN payroll_entries pe ON pe.id = pec.payroll_entry_id
+                    JOIN temp.payroll_new_employees n ON n.employee_id = pe.employee_id
+                    WHERE pe.payroll_period_id = ?
+                    GROUP BY pec.payroll_entry_id
+                ) AS totals
+                WHERE payroll_entries.id = totals.payroll_entry_id
+            """, (period_id,))
             
             conn.commit()
-            return True, f"تم إضافة {len(new_employees)} موظف بنجاح"
+            self.analytics.invalidate()
+            return True, f"تم إضافة {added} موظف بنجاح"
             
         except Exception as e:
+            conn.rollback()
             return False, str(e)
         finally:
             conn.close()
@@ -1359,11 +1511,11 @@ class PayrollController(QObject):
                 if entry['payment_status'] == 'paid':
                     return False, "Cannot modify a paid entry"
                 
-                # Calculate new values
+                # Calculate new values, adjustments are in major units
                 new_values = {}
                 for key, value in values.items():
                     if key in entry:
-                        new_values[key] = float(entry[key]) + value
+                        new_values[key] = (Money.from_minor(entry[key]) + Money(value)).minor
                 
                 # Update entry
                 set_clause = ', '.join([f"{k} = ?" for k in new_values.keys()])
@@ -1386,6 +1538,7 @@ class PayrollController(QObject):
                 
                 cursor.execute(update_query, values)
                 conn.commit()
+                self.analytics.invalidate()
                 
                 return True, "Payroll entry updated successfully"
                 
@@ -1426,11 +1579,11 @@ class PayrollController(QObject):
                 if entry['payment_status'] == 'paid':
                     return False, "Cannot modify a paid entry"
                 
-                # Calculate new values
+                # Calculate new values, adjustments are in major units
                 new_values = {}
                 for key, value in adjustments.items():
                     if key in entry:
-                        new_values[key] = float(entry[key]) + value
+                        new_values[key] = (Money.from_minor(entry[key]) + Money(value)).minor
                 
                 # Update entry
                 set_clause = ', '.join([f"{k} = ?" for k in new_values.keys()])
@@ -1453,6 +1606,7 @@ class PayrollController(QObject):
                 
                 cursor.execute(update_query, values)
                 conn.commit()
+                self.analytics.invalidate()
                 
                 return True, "Payroll entry updated successfully"
                 
@@ -1479,77 +1633,140 @@ class PayrollController(QObject):
             return False, f"Validation error: {str(e)}"
 
     def get_employee_salary_history(self, employee_id, start_date=None, end_date=None):
-        """Get salary history for an employee with optional date range"""
+        """Get salary history for an employee with optional date range
+        
+        The full history of the most recently viewed employees is cached in
+        memory and reused until their payroll entries, entry components or
+        periods change, so changing the date filter does not reload them from
+        the database. Callers get copies and cannot alter the cached history.
+        """
         try:
             conn = self.db.get_connection()
             cursor = conn.cursor()
             
-            query = """
-                SELECT 
-                    pe.id,
-                    pp.period_year,
-                    pp.period_month,
-                    pe.basic_salary,
-                    pe.total_allowances,
-                    pe.total_deductions,
-                    pe.total_adjustments,
-                    pe.working_days,
-                    pe.net_salary,
-                    pe.payment_method,
-                    pe.payment_status,
-                    pe.payment_date,
-                    pe.payment_reference,
-                    pp.start_date,
-                    pp.end_date
-                FROM payroll_entries pe
-                JOIN payroll_periods pp ON pe.payroll_period_id = pp.id
-                WHERE pe.employee_id = ?
-            """
-            
-            params = [employee_id]
-            
+            signature = self._salary_history_signature(cursor, employee_id)
+            cached = self._salary_history_cache.get(employee_id)
+            if cached and cached[0] == signature:
+                telemetry.cache_hit('salary_history')
+                self._salary_history_cache.move_to_end(employee_id)
+                history = cached[1]
+            else:
+                telemetry.cache_miss('salary_history')
+                history = self._load_salary_history(cursor, employee_id)
+                self._salary_history_cache[employee_id] = (signature, history)
+                self._salary_history_cache.move_to_end(employee_id)
+                while len(self._salary_history_cache) > self.SALARY_HISTORY_CACHE_SIZE:
+                    self._salary_history_cache.popitem(last=False)
+            
+            # Same semantics as filtering on the ISO date strings in SQL
             if start_date:
-                query += " AND pp.start_date >= ?"
-                params.append(start_date)
-                
-            if end_date:
-                query += " AND pp.end_date <= ?"
-                params.append(end_date)
-                
-            query += " ORDER BY pp.period_year DESC, pp.period_month DESC"
-            
-            cursor.execute(query, params)
+                history = [entry for entry in history
+                           if entry['start_date'] is not None and entry['start_date'] >= start_date]
             
-            columns = [column[0] for column in cursor.description]
-            history = [dict(zip(columns, row)) for row in cursor.fetchall()]
-            
-            # Get components for each entry
-            for entry in history:
-                cursor.execute("""
-                    SELECT 
-                        pec.id,
-                        pec.component_id,
-                        sc.name,
-                        sc.name_ar,
-                        sc.type,
-                        pec.value
-                    FROM payroll_entry_components pec
-                    JOIN salary_components sc ON pec.component_id = sc.id
-                    WHERE pec.payroll_entry_id = ?
-                """, (entry['id'],))
-                
-                columns = [column[0] for column in cursor.description]
-                components = [dict(zip(columns, row)) for row in cursor.fetchall()]
-                
-                entry['components'] = components
+            if end_date:
+                history = [entry for entry in history
+                           if entry['end_date'] is not None and entry['end_date'] <= end_date]
             
-            return True, history
+            # Entries only hold scalars besides their component list
+            return True, [dict(entry, components=[dict(c) for c in entry['components']])
+                          for entry in history]
             
         except Exception as e:
             return False, str(e)
         finally:
             conn.close()
 
+    def _salary_history_signature(self, cursor, employee_id):
+        """Summarise an employee's payroll entries and their components to detect changes cheaply"""
+        columns = self.db.get_table_columns('payroll_entries')
+        aggregates = ["COUNT(*)", "MAX(pe.id)", "SUM(pe.net_salary)"]
+        for column in ('updated_at', 'payment_date'):
+            if column in columns:
+                aggregates.append(f"MAX(pe.{column})")
+        
+        # Approving or paying in the same second as generation leaves
+        # MAX(updated_at) alone, so the status columns are compared directly
+        statuses = ["pe.payment_status", "pe.payment_method", "pe.payment_reference",
+                    "pp.start_date", "pp.end_date"]
+        if 'status' in self.db.get_table_columns('payroll_periods'):
+            statuses.append("pp.status")
+        aggregates.append(
+            "GROUP_CONCAT(pe.id || ':' || " + " || ':' || ".join(f"quote({c})" for c in statuses) + ", ',')"
+        )
+        
+        cursor.execute(f"""
+            SELECT {', '.join(aggregates)}
+            FROM (
+                SELECT * FROM payroll_entries WHERE employee_id = ? ORDER BY id
+            ) pe
+            LEFT JOIN payroll_periods pp ON pe.payroll_period_id = pp.id
+        """, (employee_id,))
+        entries = tuple(cursor.fetchone())
+        
+        # Component edits do not always change the entry totals, and moving an
+        # amount between components keeps their sum, hence the weighted sum
+        cursor.execute("""
+            SELECT COUNT(*), MAX(pec.id), SUM(pec.value), SUM(pec.id * pec.value)
+            FROM payroll_entry_components pec
+            JOIN payroll_entries pe ON pec.payroll_entry_id = pe.id
+            WHERE pe.employee_id = ?
+        """, (employee_id,))
+        return entries + tuple(cursor.fetchone())
+
+    def _load_salary_history(self, cursor, employee_id):
+        """Load all payroll entries of an employee with their components in one query
+        
+        Amounts are returned in major units.
+        """
+        cursor.execute(f"""
+            SELECT 
+                pe.id,
+                pp.period_year,
+                pp.period_month,
+                {to_major_sql('pe.basic_salary')} AS basic_salary,
+                {to_major_sql('pe.total_allowances')} AS total_allowances,
+                {to_major_sql('pe.total_deductions')} AS total_deductions,
+                {to_major_sql('pe.total_adjustments')} AS total_adjustments,
+                pe.working_days,
+                {to_major_sql('pe.net_salary')} AS net_salary,
+                pe.payment_method,
+                pe.payment_status,
+                pe.payment_date,
+                pe.payment_reference,
+                pp.start_date,
+                pp.end_date,
+                pec.id,
+                pec.component_id,
+                sc.name,
+                sc.name_ar,
+                sc.type,
+                {to_major_sql('pec.value')}
+            FROM payroll_entries pe
+            JOIN payroll_periods pp ON pe.payroll_period_id = pp.id
+            LEFT JOIN (
+                payroll_entry_components pec
+                JOIN salary_components sc ON pec.component_id = sc.id
+            ) ON pec.payroll_entry_id = pe.id
+            WHERE pe.employee_id = ?
+            ORDER BY pp.period_year DESC, pp.period_month DESC, pe.id, pec.id
+        """, (employee_id,))
+        
+        entry_columns = [column[0] for column in cursor.description[:15]]
+        component_columns = ['id', 'component_id', 'name', 'name_ar', 'type', 'value']
+        
+        history = {}
+        for row in cursor.fetchall():
+            entry = history.get(row[0])
+            if entry is None:
+                entry = dict(zip(entry_columns, row[:15]))
+                entry['components'] = []
+                history[row[0]] = entry
+            
+            if row[15] is not None:
+                entry['components'].append(dict(zip(component_columns, row[15:])))
+        
+        return list(history.values())
+
     def _calculate_working_days(
         self, 
         employee_id: int,
@@ -1595,7 +1812,7 @@ class PayrollController(QObject):
         while current_date <= end_date:
             if current_date.weekday() in weekend_days:
                 count += 1
-            current_date = current_date.replace(day=current_date.day + 1)
+            current_date += timedelta(days=1)
             
         return count
         
@@ -1664,12 +1881,12 @@ class PayrollController(QObject):
             conn = self.db.get_connection()
             cursor = conn.cursor()
             
-            cursor.execute("""
+            cursor.execute(f"""
                 SELECT 
                     pe.id,
                     e.name as employee_name,
-                    pe.basic_salary,
-                    pe.net_salary,
+                    {to_major_sql('pe.basic_salary')},
+                    {to_major_sql('pe.net_salary')},
                     pe.payment_date,
                     pe.payment_status
                 FROM payroll_entries pe
@@ -1697,7 +1914,7 @@ class PayrollController(QObject):
         finally:
             conn.close()
 
-    def calculate_tax_deductions(self, gross_salary: Decimal) -> Decimal:
+    def calculate_tax_deductions(self, gross_salary: Money) -> Money:
         """Calculate tax deductions using progressive tax brackets"""
         try:
             conn = self.db.get_connection()
@@ -1714,10 +1931,10 @@ class PayrollController(QObject):
             
             brackets = cursor.fetchall()
             if not brackets:
-                return Decimal('0')
+                return Money()
                 
-            total_tax = Decimal('0')
-            remaining_income = gross_salary
+            total_tax = Money()
+            remaining_income = Money(gross_salary)
             
             for min_income, max_income, rate in brackets:
                 if remaining_income <= 0:
@@ -1727,10 +1944,10 @@ class PayrollController(QObject):
                 if max_income is None:
                     taxable_amount = remaining_income
                 else:
-                    taxable_amount = min(remaining_income, max_income - min_income)
+                    taxable_amount = min(remaining_income, Money(max_income) - Money(min_income))
                 
                 # Calculate tax for this bracket
-                tax = taxable_amount * Decimal(str(rate))
+                tax = taxable_amount * float(rate)
                 total_tax += tax
                 
                 # Update remaining income
@@ -1740,28 +1957,28 @@ class PayrollController(QObject):
             
         except Exception as e:
             self.log_error(f"Tax calculation error: {str(e)}")
-            return Decimal('0')
+            return Money()
         finally:
             conn.close()
 
-    def calculate_social_insurance(self, basic_salary: Decimal) -> Decimal:
+    def calculate_social_insurance(self, basic_salary: Money) -> Money:
         """Calculate social insurance deductions"""
         try:
             # Get social insurance rates from configuration
-            employee_rate = Decimal('0.11')  # 11% employee contribution
-            max_insurable = Decimal('9000')  # Maximum insurable salary
+            employee_rate = 0.11  # 11% employee contribution
+            max_insurable = Money(9000)  # Maximum insurable salary
             
             # Calculate insurable salary
-            insurable_salary = min(basic_salary, max_insurable)
+            insurable_salary = min(Money(basic_salary), max_insurable)
             
             # Calculate social insurance deduction
             return insurable_salary * employee_rate
             
         except Exception as e:
             self.log_error(f"Social insurance calculation error: {str(e)}")
-            return Decimal('0')
+            return Money()
 
-    def calculate_overtime_pay(self, employee_id: int, period_id: int) -> Decimal:
+    def calculate_overtime_pay(self, employee_id: int, period_id: int) -> Money:
         """Calculate overtime pay for the period"""
         try:
             conn = self.db.get_connection()
@@ -1776,7 +1993,7 @@ class PayrollController(QObject):
             
             period = cursor.fetchone()
             if not period:
-                return Decimal('0')
+                return Money()
                 
             start_date, end_date = period
             
@@ -1791,36 +2008,36 @@ class PayrollController(QObject):
             
             result = cursor.fetchone()
             if not result or not result[0]:
-                return Decimal('0')
+                return Money()
                 
             total_hours, rate = result
             
             # Get hourly rate (assuming 22 working days per month, 8 hours per day)
             success, salary_info = self.get_employee_salary(employee_id)
             if not success:
-                return Decimal('0')
+                return Money()
                 
-            hourly_rate = Decimal(str(salary_info['basic_salary'])) / Decimal('176')  # 22 * 8
-            
-            # Calculate overtime pay
-            return hourly_rate * Decimal(str(rate)) * Decimal(str(total_hours))
+            # Calculate overtime pay, rounding once
+            hours = float(rate) * float(total_hours) / 176  # 22 * 8
+            return Money(salary_info['basic_salary']) * hours
             
         except Exception as e:
             self.log_error(f"Overtime calculation error: {str(e)}")
-            return Decimal('0')
+            return Money()
         finally:
             conn.close()
 
     def calculate_salary_by_employee_type(
             self,
             employee_id: int,
-            basic_salary: Decimal,
+            basic_salary: Money,
             period_id: int
-        ) -> Tuple[Decimal, Dict[str, Decimal]]:
+        ) -> Tuple[Money, Dict[str, Money]]:
         """Calculate salary based on employee type with appropriate adjustments"""
         try:
             conn = self.db.get_connection()
             cursor = conn.cursor()
+            basic_salary = Money(basic_salary)
             
             # Get employee type
             cursor.execute("""
@@ -1853,9 +2070,9 @@ class PayrollController(QObject):
             
             # Calculate prorated salary for part-time
             if working_hours < 40:
-                proration_factor = Decimal(str(working_hours)) / Decimal('40')
+                proration_factor = float(working_hours) / 40
                 basic_salary = basic_salary * proration_factor
-                adjustments['proration'] = basic_salary * (Decimal('1') - proration_factor)
+                adjustments['proration'] = basic_salary * (1 - proration_factor)
             
             # Calculate holiday pay
             cursor.execute("""
@@ -1866,9 +2083,8 @@ class PayrollController(QObject):
             
             holiday_count = cursor.fetchone()[0]
             if holiday_count > 0 and holiday_mult > 1:
-                daily_rate = basic_salary / Decimal('22')  # Assuming 22 working days
-                holiday_pay = daily_rate * Decimal(str(holiday_count)) * (Decimal(str(holiday_mult)) - Decimal('1'))
-                adjustments['holiday_pay'] = holiday_pay
+                # Assuming 22 working days
+                adjustments['holiday_pay'] = basic_salary * (holiday_count * (float(holiday_mult) - 1) / 22)
             
             # Calculate leave deductions
             cursor.execute("""
@@ -1883,9 +2099,7 @@ class PayrollController(QObject):
             
             for paid, days in cursor.fetchall():
                 if not paid:
-                    daily_rate = basic_salary / Decimal('22')
-                    leave_deduction = daily_rate * Decimal(str(days))
-                    adjustments['unpaid_leave'] = leave_deduction
+                    adjustments['unpaid_leave'] = basic_salary * (days / 22)
             
             # Calculate overtime with type-specific multiplier
             cursor.execute("""
@@ -1898,9 +2112,8 @@ class PayrollController(QObject):
             
             total_overtime = cursor.fetchone()[0] or 0
             if total_overtime > 0:
-                hourly_rate = basic_salary / Decimal('176')  # 22 days * 8 hours
-                overtime_pay = hourly_rate * Decimal(str(total_overtime)) * Decimal(str(overtime_mult))
-                adjustments['overtime'] = overtime_pay
+                # 22 days * 8 hours
+                adjustments['overtime'] = basic_salary * (float(total_overtime) * float(overtime_mult) / 176)
             
             return basic_salary, adjustments
             
@@ -1913,12 +2126,13 @@ class PayrollController(QObject):
     def calculate_tax_exempt_allowances(
             self,
             employee_id: int,
-            basic_salary: Decimal
-        ) -> Tuple[Decimal, Decimal]:
+            basic_salary: Money
+        ) -> Tuple[Money, Money]:
         """Calculate tax-exempt and taxable portions of allowances"""
         try:
             conn = self.db.get_connection()
             cursor = conn.cursor()
+            basic_salary = Money(basic_salary)
             
             cursor.execute("""
                 SELECT 
@@ -1937,32 +2151,32 @@ class PayrollController(QObject):
                 )
             """, (employee_id,))
             
-            total_allowances = Decimal('0')
-            tax_exempt_amount = Decimal('0')
+            total_allowances = Money()
+            tax_exempt_amount = Money()
             
             for value, percentage, max_amount, max_percentage in cursor.fetchall():
                 # Calculate actual allowance amount
                 if percentage:
-                    allowance = basic_salary * Decimal(str(percentage)) / Decimal('100')
+                    allowance = basic_salary * (float(percentage) / 100)
                 else:
-                    allowance = Decimal(str(value))
+                    allowance = Money(value)
                 
                 total_allowances += allowance
                 
                 # Calculate tax exempt portion
                 if max_amount and max_percentage:
                     # Use whichever gives the lower exempt amount
-                    percent_exempt = allowance * Decimal(str(max_percentage)) / Decimal('100')
-                    tax_exempt_amount += min(Decimal(str(max_amount)), percent_exempt)
+                    percent_exempt = allowance * (float(max_percentage) / 100)
+                    tax_exempt_amount += min(Money(max_amount), percent_exempt)
                 elif max_amount:
-                    tax_exempt_amount += min(allowance, Decimal(str(max_amount)))
+                    tax_exempt_amount += min(allowance, Money(max_amount))
                 elif max_percentage:
-                    tax_exempt_amount += allowance * Decimal(str(max_percentage)) / Decimal('100')
+                    tax_exempt_amount += allowance * (float(max_percentage) / 100)
             
             return total_allowances, tax_exempt_amount
             
         except Exception as e:
             self.log_error(f"Error calculating tax-exempt allowances: {str(e)}")
-            return Decimal('0'), Decimal('0')
+            return Money(), Money()
         finally:
             conn.close()
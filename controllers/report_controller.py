@@ -1,76 +1,138 @@
+import logging
 import pandas as pd
 from datetime import datetime, timedelta
 from PyQt5.QtCore import QObject
+from database.report_rollups import ReportRollups, month_key
+from utils.analytics_snapshot import PYARROW_AVAILABLE, AnalyticsSnapshot
+from utils.money import MINOR_UNITS, to_major_sql
 
 class ReportController(QObject):
     def __init__(self, db):
         super().__init__()
         self.db = db
+        self.rollups = ReportRollups(db)
+        self.snapshot = AnalyticsSnapshot(db)
 
     def generate_payroll_report(self, start_date, end_date):
-        """Generate comprehensive payroll report"""
-        query = f"""
-            SELECT 
-                e.name AS employee_name,
-                d.name AS department,
-                SUM(p.gross_salary) AS total_gross,
-                SUM(p.net_salary) AS total_net,
-                COUNT(p.id) AS payment_count
-            FROM payroll_entries p
-            JOIN employees e ON p.employee_id = e.id
-            JOIN departments d ON e.department_id = d.id
-            WHERE p.payment_date BETWEEN '{start_date}' AND '{end_date}'
-            GROUP BY e.id
-            ORDER BY d.name, e.name
-        """
+        """Generate comprehensive payroll report
         
+        Reads the analytics snapshot when a fresh one exists, otherwise the
+        monthly payroll rollups. The range is applied per payroll month:
+        every month from start_date's month to end_date's month is included
+        in full.
+        """
         try:
-            conn = self.db.get_connection()
-            cursor = conn.cursor()
-            
-            # First check if the payroll_entries table has the required columns
-            cursor.execute("PRAGMA table_info(payroll_entries)")
-            columns = [column[1] for column in cursor.fetchall()]
-            
-            if 'gross_salary' not in columns or 'payment_date' not in columns:
-                # Fall back to a simpler query that will work with the existing structure
-                alternative_query = f"""
-                    SELECT 
-                        e.name AS employee_name,
-                        d.name AS department,
-                        SUM(p.basic_salary + p.total_allowances) AS total_gross,
-                        SUM(p.net_salary) AS total_net,
-                        COUNT(p.id) AS payment_count
-                    FROM payroll_entries p
-                    JOIN employees e ON p.employee_id = e.id
-                    JOIN departments d ON e.department_id = d.id
-                    WHERE p.created_at BETWEEN '{start_date}' AND '{end_date}'
-                    GROUP BY e.id
-                    ORDER BY d.name, e.name
-                """
-                return self._execute_query(alternative_query)
-            
-            return self._execute_query(query)
+            start_year, start_month = month_key(start_date)
+            end_year, end_month = month_key(end_date)
+            
+            if self.snapshot.is_fresh():
+                try:
+                    return True, self._payroll_report_from_snapshot(
+                        (start_year, start_month), (end_year, end_month)
+                    )
+                except Exception as e:
+                    logging.warning(f"Analytics snapshot unusable, using database: {e}")
+            
+            self.rollups.ensure_tables()
+            query = f"""
+                SELECT 
+                    e.name AS employee_name,
+                    d.name AS department,
+                    {to_major_sql('SUM(r.total_gross)')} AS total_gross,
+                    {to_major_sql('SUM(r.total_net)')} AS total_net,
+                    SUM(r.entry_count) AS payment_count
+                FROM payroll_monthly_summary r
+                JOIN employees e ON r.employee_id = e.id
+                JOIN departments d ON r.department_id = d.id
+                WHERE (r.year, r.month) >= (?, ?) AND (r.year, r.month) <= (?, ?)
+                GROUP BY r.employee_id
+                ORDER BY d.name, e.name
+            """
+            return self._execute_query(query, (start_year, start_month, end_year, end_month))
         except Exception as e:
             return False, str(e)
-        finally:
-            conn.close()
 
     def generate_attendance_report(self, month, year):
         """Generate monthly attendance summary"""
-        query = f"""
+        if self.snapshot.is_fresh():
+            try:
+                return True, self._attendance_report_from_snapshot(month, year)
+            except Exception as e:
+                logging.warning(f"Analytics snapshot unusable, using database: {e}")
+        
+        try:
+            self.rollups.ensure_tables()
+        except Exception as e:
+            return False, str(e)
+        
+        query = """
             SELECT
                 e.name,
-                COUNT(CASE WHEN a.status = 'present' THEN 1 END) AS days_present,
-                COUNT(CASE WHEN a.status = 'absent' THEN 1 END) AS days_absent,
-                SUM(a.overtime_hours) AS total_overtime
-            FROM attendance a
-            JOIN employees e ON a.employee_id = e.id
-            WHERE strftime('%Y-%m', a.date) = '{year}-{month:02d}'
-            GROUP BY e.id
+                r.days_present,
+                r.days_absent,
+                r.total_overtime
+            FROM attendance_monthly_summary r
+            JOIN employees e ON r.employee_id = e.id
+            WHERE r.year = ? AND r.month = ?
         """
-        return self._execute_query(query)
+        return self._execute_query(query, (year, month))
         
+    def refresh_analytics_snapshot(self):
+        """Export a new analytics snapshot for the reports"""
+        return self.snapshot.export()
+
+    def analytics_snapshot_due(self, max_age=None):
+        """Whether the snapshot is missing, invalidated or older than max_age seconds"""
+        return PYARROW_AVAILABLE and not self.snapshot.is_fresh(max_age)
+
+    def _payroll_report_from_snapshot(self, start, end):
+        """Payroll report computed with pandas on the analytics snapshot"""
+        entries = self.snapshot.read('payroll_entries', start, end)
+        entries = entries[entries['period_status'] != 'draft']
+        
+        gross = entries['basic_salary'].fillna(0) + entries['total_allowances'].fillna(0)
+        if 'gross_salary' in entries:
+            gross = entries['gross_salary'].where(entries['gross_salary'].fillna(0) != 0, gross)
+        entries = entries.assign(total_gross=gross)
+        
+        totals = entries.groupby('employee_id', as_index=False).agg(
+            total_gross=('total_gross', 'sum'),
+            total_net=('net_salary', 'sum'),
+            payment_count=('id', 'count')
+        )
+        
+        employees = self.snapshot.read('employees', columns=['id', 'name', 'department_id'])
+        departments = self.snapshot.read('departments', columns=['id', 'name'])
+        
+        # Amounts are summed in minor units and converted once per employee
+        totals[['total_gross', 'total_net']] = totals[['total_gross', 'total_net']] / MINOR_UNITS
+        report = (
+            totals
+            .merge(employees, left_on='employee_id', right_on='id')
+            .merge(departments, left_on='department_id', right_on='id', suffixes=('', '_department'))
+            .rename(columns={'name': 'employee_name', 'name_department': 'department'})
+            .sort_values(['department', 'employee_name'])
+        )
+        return report[['employee_name', 'department', 'total_gross', 'total_net', 'payment_count']].reset_index(drop=True)
+
+    def _attendance_report_from_snapshot(self, month, year):
+        """Attendance report computed with pandas on the analytics snapshot"""
+        records = self.snapshot.read('attendance_records', (year, month), (year, month))
+        overtime = records['overtime_hours'] if 'overtime_hours' in records else 0
+        records = records.assign(
+            days_present=(records['status'] == 'present').astype(int),
+            days_absent=(records['status'] == 'absent').astype(int),
+            total_overtime=overtime
+        )
+        
+        totals = records.groupby('employee_id', as_index=False)[
+            ['days_present', 'days_absent', 'total_overtime']
+        ].sum()
+        
+        employees = self.snapshot.read('employees', columns=['id', 'name'])
+        report = totals.merge(employees, left_on='employee_id', right_on='id')
+        return report[['name', 'days_present', 'days_absent', 'total_overtime']].reset_index(drop=True)
+
     def get_employee_count(self):
         """Get the total number of employees"""
         try:
@@ -94,14 +156,15 @@ class ReportController(QObject):
             cursor = conn.cursor()
             
             # Get current month and year
-            current_month = datetime.now().strftime('%Y-%m')
+            today = datetime.now()
             
-            # Try to get payroll data from payroll_entries table
-            cursor.execute("""
-                SELECT SUM(net_salary) 
-                FROM payroll_entries 
-                WHERE strftime('%Y-%m', payment_date) = ?
-            """, (current_month,))
+            # Try to get payroll data from the monthly payroll rollup
+            self.rollups.ensure_tables()
+            cursor.execute(f"""
+                SELECT {to_major_sql('SUM(total_net)')}
+                FROM payroll_department_monthly_summary 
+                WHERE year = ? AND month = ?
+            """, (today.year, today.month))
             
             total = cursor.fetchone()[0]
             
@@ -213,10 +276,10 @@ class ReportController(QObject):
         finally:
             conn.close()
 
-    def _execute_query(self, query):
+    def _execute_query(self, query, params=()):
         try:
             conn = self.db.get_connection()
-            df = pd.read_sql(query, conn)
+            df = pd.read_sql(query, conn, params=params)
             return True, df
         except Exception as e:
             return False, str(e)
@@ -0,0 +1,74 @@
+"""
+Sequence table for employee codes
+
+Codes are handed out from a counter row in code_sequences instead of
+scanning employees for the highest code on every insert. Reserving a block
+is a single UPDATE, so concurrent inserts and bulk imports never race to
+the same code: the write lock taken by the UPDATE serialises them.
+"""
+
+CODE_SEQUENCES_SQL = """
+    CREATE TABLE IF NOT EXISTS code_sequences (
+        name TEXT PRIMARY KEY,
+        next_value INTEGER NOT NULL
+    )
+"""
+
+EMPLOYEE_SEQUENCE = 'employee'
+EMPLOYEE_CODE_PREFIX = 'E'
+
+
+def format_employee_code(number):
+    """Format as E0001, E0002, etc."""
+    return f'{EMPLOYEE_CODE_PREFIX}{number:04d}'
+
+
+class EmployeeCodeSequence:
+    """Allocates employee codes from the code_sequences table"""
+
+    def __init__(self, db):
+        self.db = db
+
+    def ensure_table(self, cursor):
+        """Create the sequence and start it after the highest existing code
+        
+        The employees table is scanned once, when the sequence row is created.
+        Runs on the caller's cursor so it joins the caller's transaction.
+        """
+        if self.db.has_table('code_sequences'):
+            return
+        
+        cursor.execute(CODE_SEQUENCES_SQL)
+        self._seed(cursor)
+        self.db.invalidate_schema_cache()
+
+    def _seed(self, cursor):
+        """Insert the sequence row after the highest existing code, unless it exists"""
+        cursor.execute(f"""
+            INSERT OR IGNORE INTO code_sequences (name, next_value)
+            SELECT ?, COALESCE(MAX(CAST(SUBSTR(code, {len(EMPLOYEE_CODE_PREFIX) + 1}) AS INTEGER)), 0) + 1
+            FROM employees
+            WHERE code GLOB ?
+        """, (EMPLOYEE_SEQUENCE, f'{EMPLOYEE_CODE_PREFIX}[0-9]*'))
+
+    def reserve_codes(self, cursor, count=1):
+        """Reserve count consecutive codes inside the cursor's transaction
+        
+        The codes are taken even if the caller later uses only some of them;
+        a rollback of the caller's transaction returns them.
+        """
+        if count < 1:
+            return []
+        self.ensure_table(cursor)
+        
+        update = "UPDATE code_sequences SET next_value = next_value + ? WHERE name = ?"
+        cursor.execute(update, (count, EMPLOYEE_SEQUENCE))
+        if cursor.rowcount == 0:
+            # The table exists without the employee row, e.g. it was emptied
+            self._seed(cursor)
+            cursor.execute(update, (count, EMPLOYEE_SEQUENCE))
+        # The UPDATE holds the write lock, so nobody can move the counter
+        # between it and this read
+        cursor.execute("SELECT next_value FROM code_sequences WHERE name = ?", (EMPLOYEE_SEQUENCE,))
+        end = cursor.fetchone()[0]
+        return [format_employee_code(number) for number in range(end - count, end)]
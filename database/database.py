@@ -5,18 +5,94 @@ import re
 import hashlib
 import shutil
 import logging
+import tempfile
+import threading
+import time
+import weakref
+from utils.telemetry import telemetry
+
+logger = logging.getLogger(__name__)
+
+class _TimedCursor(sqlite3.Cursor):
+    """Cursor that records statement latency (time to the first row)"""
+
+    def execute(self, sql, parameters=()):
+        start = time.perf_counter()
+        try:
+            return super().execute(sql, parameters)
+        finally:
+            telemetry.observe('db.query_ms', (time.perf_counter() - start) * 1000)
+
+    def executemany(self, sql, seq_of_parameters):
+        start = time.perf_counter()
+        try:
+            return super().executemany(sql, seq_of_parameters)
+        finally:
+            telemetry.observe('db.query_ms', (time.perf_counter() - start) * 1000)
+
+
+class _TrackedConnection(sqlite3.Connection):
+    """sqlite3 connection that remembers whether it has been closed"""
+    closed = False
+
+    def cursor(self, factory=_TimedCursor):
+        return super().cursor(factory)
+
+    def execute(self, sql, parameters=()):
+        return self.cursor().execute(sql, parameters)
+
+    def executemany(self, sql, seq_of_parameters):
+        return self.cursor().executemany(sql, seq_of_parameters)
+
+    def close(self):
+        super().close()
+        self.closed = True
 
-# Configure logging
-logging.basicConfig(
-    level=logging.DEBUG, 
-    format='%(asctime)s - %(levelname)s - %(message)s',
-    filename='database.log',
-    filemode='w'
-)
 
 class Database:
+    # Core tables every usable database must contain
+    REQUIRED_TABLES = [
+        'employee_types', 'employees', 'employee_details', 
+        'salary_components', 'employee_salary_components',
+        'tax_brackets', 'social_insurance_config',
+        'leave_types', 'leave_balances', 'leave_requests',
+        'payroll_periods', 'payroll_entries', 'attendance_hours'
+    ]
+
+    # Tables schema.sql itself creates; a restored file must have them, the
+    # rest are added by validate_schema() and the migrations after the swap
+    CORE_TABLES = ['employees', 'payroll_periods', 'payroll_entries']
+
+    # Connection settings for loading large amounts of data in one go: no
+    # fsync, rollback journal in memory, a 64 MB page cache and no foreign
+    # key checks. A crash during the load can corrupt the file, so it is
+    # only meant for freshly generated or imported databases.
+    BULK_PRAGMAS = (
+        "PRAGMA synchronous = OFF",
+        "PRAGMA journal_mode = MEMORY",
+        "PRAGMA temp_store = MEMORY",
+        "PRAGMA cache_size = -65536",
+        "PRAGMA foreign_keys = OFF",
+    )
+
     def __init__(self, db_file="employee.db"):
         self.db_file = db_file
+        
+        # Open connections are tracked so they can be drained before the
+        # database file is swapped out (restore/import)
+        self._connections = weakref.WeakSet()
+        self._swap_condition = threading.Condition()
+        self._swapping = False
+        self._swap_owner = None
+        database = weakref.ref(self)
+        telemetry.register_gauge(
+            'db.open_connections',
+            lambda: len(database()._open_connections()) if database() else 0
+        )
+        
+        # Tables -> columns/indexes/foreign keys, loaded lazily and dropped
+        # whenever PRAGMA schema_version moves
+        self._schema_cache = None
         self.backup_dir = os.path.join(os.path.dirname(os.path.dirname(__file__)), 'backups')
         
         # Create backup directory if it doesn't exist
@@ -36,6 +112,7 @@ class Database:
     def change_database(self, new_db_file):
         """Change the current database file"""
         self.db_file = new_db_file
+        self.invalidate_schema_cache()
         
         # Check if the database file exists
         db_exists = os.path.exists(new_db_file)
@@ -50,9 +127,243 @@ class Database:
         return True
     
     def get_connection(self):
-        conn = sqlite3.connect(self.db_file)
+        with self._swap_condition:
+            # Hold new connections back while the database file is being
+            # replaced, except for the thread doing the swap
+            while self._swapping and self._swap_owner != threading.get_ident():
+                self._swap_condition.wait()
+            conn = sqlite3.connect(self.db_file, factory=_TrackedConnection)
+            self._connections.add(conn)
         conn.execute("PRAGMA foreign_keys = ON")
+        
+        # Another connection or process may have altered the schema since the
+        # cache was loaded
+        schema = self._schema_cache
+        if schema is not None:
+            version = conn.execute("PRAGMA schema_version").fetchone()[0]
+            if version != schema['version']:
+                self.invalidate_schema_cache()
         return conn
+
+    def get_bulk_connection(self):
+        """Return a connection with the BULK_PRAGMAS profile applied"""
+        conn = self.get_connection()
+        for pragma in self.BULK_PRAGMAS:
+            conn.execute(pragma)
+        return conn
+
+    def get_data_version(self):
+        """Return a token that changes whenever the database file is written
+        
+        Based on the modification times of the database file and its WAL, so
+        it costs a couple of stat calls and no queries.
+        """
+        version = []
+        for path in (self.db_file, self.db_file + '-wal'):
+            try:
+                stat = os.stat(path)
+                version.append((stat.st_mtime_ns, stat.st_size))
+            except OSError:
+                version.append(None)
+        return (self.db_file,) + tuple(version)
+
+    def invalidate_schema_cache(self):
+        """Drop cached schema metadata so it is reloaded on next use"""
+        self._schema_cache = None
+
+    def get_schema(self):
+        """Return cached schema metadata, loading it if needed
+        
+        Maps each table name to a dict with 'columns' (names in table order),
+        'indexes' (name -> unique flag) and 'foreign_keys' (list of dicts with
+        'from', 'table' and 'to').
+        """
+        schema = self._schema_cache
+        if schema is None:
+            telemetry.cache_miss('schema')
+            schema = self._load_schema()
+            self._schema_cache = schema
+        else:
+            telemetry.cache_hit('schema')
+        return schema['tables']
+
+    def _load_schema(self):
+        """Read table, column, index and foreign key metadata from the database"""
+        conn = self.get_connection()
+        try:
+            cursor = conn.cursor()
+            cursor.execute("PRAGMA schema_version")
+            version = cursor.fetchone()[0]
+            
+            cursor.execute("SELECT name FROM sqlite_master WHERE type='table'")
+            tables = {}
+            for (table,) in cursor.fetchall():
+                cursor.execute(f"PRAGMA table_info('{table}')")
+                columns = [row[1] for row in cursor.fetchall()]
+                
+                cursor.execute(f"PRAGMA index_list('{table}')")
+                indexes = {row[1]: bool(row[2]) for row in cursor.fetchall()}
+                
+                cursor.execute(f"PRAGMA foreign_key_list('{table}')")
+                foreign_keys = [
+                    {'from': row[3], 'table': row[2], 'to': row[4]}
+                    for row in cursor.fetchall()
+                ]
+                
+                tables[table] = {
+                    'columns': columns,
+                    'indexes': indexes,
+                    'foreign_keys': foreign_keys
+                }
+            
+            return {'version': version, 'tables': tables}
+        finally:
+            conn.close()
+
+    def has_table(self, table):
+        """Check whether a table exists, using the schema cache"""
+        return table in self.get_schema()
+
+    def get_table_columns(self, table):
+        """Return the column names of a table, or an empty list if it does not exist"""
+        table_info = self.get_schema().get(table)
+        return list(table_info['columns']) if table_info else []
+
+    def get_missing_tables(self):
+        """Return the required tables that do not exist in the database"""
+        schema = self.get_schema()
+        return [table for table in self.REQUIRED_TABLES if table not in schema]
+    
+    def _open_connections(self):
+        """Return tracked connections that have not been closed yet"""
+        return [conn for conn in list(self._connections) if not conn.closed]
+    
+    def drain_connections(self, timeout=10.0):
+        """Block new connections and wait for open ones to be closed
+        
+        Returns True if every connection was closed within the timeout.
+        Must be followed by resume_connections().
+        """
+        with self._swap_condition:
+            self._swapping = True
+            self._swap_owner = threading.get_ident()
+        
+        deadline = time.monotonic() + timeout
+        while self._open_connections():
+            if time.monotonic() >= deadline:
+                # Connections that were dropped without close() are only
+                # released once they are garbage collected
+                import gc
+                gc.collect()
+                if self._open_connections():
+                    logger.warning("Timed out waiting for database connections to close")
+                    return False
+                break
+            time.sleep(0.05)
+        return True
+    
+    def resume_connections(self):
+        """Allow new connections again after drain_connections()"""
+        with self._swap_condition:
+            self._swapping = False
+            self._swap_owner = None
+            self._swap_condition.notify_all()
+    
+    def verify_database_file(self, db_file):
+        """Check that a database file is intact and compatible with this schema
+        
+        Runs PRAGMA integrity_check, makes sure the CORE_TABLES exist and
+        that the file was not written by a newer schema version than the live
+        one (PRAGMA user_version, set by the migration runner).
+        """
+        try:
+            conn = sqlite3.connect(db_file)
+            try:
+                cursor = conn.cursor()
+                cursor.execute("PRAGMA integrity_check")
+                result = cursor.fetchone()
+                if not result or result[0] != 'ok':
+                    return False, f"Integrity check failed: {result[0] if result else 'no result'}"
+                
+                cursor.execute("SELECT name FROM sqlite_master WHERE type='table'")
+                tables = {row[0] for row in cursor.fetchall()}
+                if not tables:
+                    return False, "Database file contains no tables"
+                missing_tables = [t for t in self.CORE_TABLES if t not in tables]
+                if len(missing_tables) == len(self.CORE_TABLES):
+                    return False, "Database file is not an employee database"
+                if missing_tables:
+                    return False, f"Database file is missing tables: {', '.join(missing_tables)}"
+                
+                cursor.execute("PRAGMA user_version")
+                file_version = cursor.fetchone()[0]
+            finally:
+                conn.close()
+            
+            current_version = 0
+            if os.path.exists(self.db_file):
+                current = sqlite3.connect(self.db_file)
+                try:
+                    current_version = current.execute("PRAGMA user_version").fetchone()[0]
+                finally:
+                    current.close()
+            if file_version > current_version:
+                return False, (
+                    f"Database schema version {file_version} is newer than "
+                    f"the supported version {current_version}"
+                )
+            
+            return True, "Database verified"
+        except sqlite3.DatabaseError as e:
+            return False, f"Invalid database file: {str(e)}"
+    
+    def replace_database_file(self, new_file):
+        """Atomically swap a verified database file in place of the live one
+        
+        Open connections are drained first and stale WAL/SHM files removed so
+        they cannot be replayed against the new file. Other threads only get
+        connections again once reconnect() has migrated it. The new file must
+        live on the same filesystem as the target (os.replace is a rename).
+        """
+        if not self.drain_connections():
+            self.resume_connections()
+            raise RuntimeError("Database is still in use, please close open operations and try again")
+        
+        try:
+            for suffix in ('-wal', '-shm', '-journal'):
+                stale = self.db_file + suffix
+                if os.path.exists(stale):
+                    os.remove(stale)
+            os.replace(new_file, self.db_file)
+            self.reconnect()
+        finally:
+            self.resume_connections()
+    
+    def reconnect(self):
+        """Pick up a database file that was replaced underneath us
+        
+        Runs the migrations, so a file from an older version (a backup with
+        major-unit payroll amounts, say) is upgraded before it is used.
+        """
+        from database.migration_runner import run_migrations
+        
+        self.invalidate_schema_cache()
+        self.validate_schema()
+        run_migrations(self)
+    
+    def _stage_database_copy(self, source_file):
+        """Copy a database file next to the live one and return the temp path"""
+        target_dir = os.path.dirname(os.path.abspath(self.db_file))
+        fd, temp_path = tempfile.mkstemp(suffix='.db', prefix='.restore_', dir=target_dir)
+        try:
+            with open(source_file, 'rb') as src, os.fdopen(fd, 'wb') as dst:
+                shutil.copyfileobj(src, dst, 1024 * 1024)
+                dst.flush()
+                os.fsync(dst.fileno())
+        except Exception:
+            os.remove(temp_path)
+            raise
+        return temp_path
     
     def create_tables(self):
         """Create tables if they don't exist"""
@@ -71,12 +382,13 @@ class Database:
             # Use SQLite's executescript for better handling of multiple statements
             conn.executescript(schema_sql)
             conn.commit()
+            self.invalidate_schema_cache()
             
-            logging.info("Database schema created successfully")
+            logger.info("Database schema created successfully")
             
         except Exception as e:
             conn.rollback()
-            logging.error(f"Error creating tables: {e}")
+            logger.error(f"Error creating tables: {e}")
             print(f"Error creating tables: {e}")
             raise
         finally:
@@ -84,36 +396,18 @@ class Database:
     
     def validate_schema(self):
         """Validate and update database schema if needed"""
-        conn = self.get_connection()
-        cursor = conn.cursor()
-        
         try:
-            # Check for required tables
-            required_tables = [
-                'employee_types', 'employees', 'employee_details', 
-                'salary_components', 'employee_salary_components',
-                'tax_brackets', 'social_insurance_config',
-                'leave_types', 'leave_balances', 'leave_requests',
-                'payroll_periods', 'payroll_entries', 'attendance_hours'
-            ]
-            
-            # Get existing tables
-            cursor.execute("SELECT name FROM sqlite_master WHERE type='table'")
-            existing_tables = [row[0] for row in cursor.fetchall()]
-            
-            # Check for missing tables
-            missing_tables = [table for table in required_tables if table not in existing_tables]
+            # Loads the schema cache as a side effect
+            missing_tables = self.get_missing_tables()
             
             if missing_tables:
-                logging.warning(f"Missing tables detected: {missing_tables}")
+                logger.warning(f"Missing tables detected: {missing_tables}")
                 # Re-run create_tables to add missing tables
                 self.create_tables()
             
         except Exception as e:
-            logging.error(f"Error validating schema: {e}")
+            logger.error(f"Error validating schema: {e}")
             print(f"Error validating schema: {e}")
-        finally:
-            conn.close()
     
     def _hash_password(self, password):
         """Hash a password using SHA-256"""
@@ -193,11 +487,16 @@ class Database:
             if not current_backup_result:
                 return False, f"Failed to create backup before restore: {current_backup_message}"
             
-            # Copy the backup file to the database file
-            shutil.copy2(backup_file, self.db_file)
-            
-            # Validate and fix the schema of the restored database
-            self.validate_schema()
+            # Stage the backup next to the live file, verify it, then swap it in
+            temp_path = self._stage_database_copy(backup_file)
+            try:
+                verified, message = self.verify_database_file(temp_path)
+                if not verified:
+                    return False, message
+                self.replace_database_file(temp_path)
+            finally:
+                if os.path.exists(temp_path):
+                    os.remove(temp_path)
             
             return True, "Database restored successfully"
         except Exception as e:
@@ -215,11 +514,16 @@ class Database:
             if not backup_result:
                 return False, f"Failed to create backup before import: {backup_message}"
             
-            # Copy the import file to the database file
-            shutil.copy2(import_file, self.db_file)
-            
-            # Validate and fix the schema of the imported database
-            self.validate_schema()
+            # Stage the import next to the live file, verify it, then swap it in
+            temp_path = self._stage_database_copy(import_file)
+            try:
+                verified, message = self.verify_database_file(temp_path)
+                if not verified:
+                    return False, message
+                self.replace_database_file(temp_path)
+            finally:
+                if os.path.exists(temp_path):
+                    os.remove(temp_path)
             
             return True, "Database imported successfully"
         except Exception as e:
@@ -5,21 +5,16 @@ import os
 import importlib.util
 import traceback
 import logging
-import sys
 
-# Configure logging to output to both file and console
-logging.basicConfig(
-    level=logging.DEBUG, 
-    format='%(asctime)s - %(levelname)s - %(message)s',
-    handlers=[
-        logging.FileHandler('migration.log', mode='w'),
-        logging.StreamHandler(sys.stdout)
-    ]
-)
+logger = logging.getLogger(__name__)
 
 def run_migrations(db):
     """
     Run all migration scripts in the migrations directory
+
+    Afterwards PRAGMA user_version is raised to the number of migration
+    scripts, so a file opened by a newer version of the application can be
+    told apart (see Database.verify_database_file).
     
     Args:
         db: Database connection object
@@ -33,7 +28,7 @@ def run_migrations(db):
     # Create migrations directory if it doesn't exist
     if not os.path.exists(migrations_dir):
         os.makedirs(migrations_dir)
-        logging.info(f"Created migrations directory: {migrations_dir}")
+        logger.info(f"Created migrations directory: {migrations_dir}")
         return results
     
     # Get all Python files in the migrations directory
@@ -44,13 +39,13 @@ def run_migrations(db):
         # Sort files to ensure they run in the correct order
         migration_files.sort()
         
-        logging.info(f"Found migration files: {migration_files}")
+        logger.info(f"Found migration files: {migration_files}")
         
         # Run each migration
         for migration_file in migration_files:
             try:
                 migration_path = os.path.join(migrations_dir, migration_file)
-                logging.info(f"Processing migration: {migration_file}")
+                logger.info(f"Processing migration: {migration_file}")
                 
                 # Load the module dynamically
                 spec = importlib.util.spec_from_file_location(
@@ -67,26 +62,43 @@ def run_migrations(db):
                         results.append((migration_file, success, message))
                         
                         if success:
-                            logging.info(f"Migration {migration_file} successful: {message}")
+                            logger.info(f"Migration {migration_file} successful: {message}")
                         else:
-                            logging.warning(f"Migration {migration_file} failed: {message}")
+                            logger.warning(f"Migration {migration_file} failed: {message}")
                     except Exception as migration_error:
                         error_details = traceback.format_exc()
                         results.append((migration_file, False, f"Migration execution error: {str(migration_error)}\n{error_details}"))
-                        logging.error(f"Migration {migration_file} execution error: {error_details}")
+                        logger.error(f"Migration {migration_file} execution error: {error_details}")
                 else:
                     error_msg = "No run_migration function found"
                     results.append((migration_file, False, error_msg))
-                    logging.error(f"Migration {migration_file}: {error_msg}")
+                    logger.error(f"Migration {migration_file}: {error_msg}")
             
             except Exception as e:
                 error_details = traceback.format_exc()
                 results.append((migration_file, False, f"Error: {str(e)}\n{error_details}"))
-                logging.error(f"Error processing migration {migration_file}: {error_details}")
+                logger.error(f"Error processing migration {migration_file}: {error_details}")
+        
+        _set_schema_version(db, len(migration_files))
     
     except Exception as e:
         error_details = traceback.format_exc()
         results.append(("migration_runner", False, f"Error in migration runner: {str(e)}\n{error_details}"))
-        logging.critical(f"Critical error in migration runner: {error_details}")
+        logger.critical(f"Critical error in migration runner: {error_details}")
     
+    # Migrations may have altered tables, make sure cached schema is reloaded
+    if hasattr(db, 'invalidate_schema_cache'):
+        db.invalidate_schema_cache()
+
     return results
+
+def _set_schema_version(db, version):
+    """Raise PRAGMA user_version to version, never lowering it"""
+    conn = db.get_connection()
+    try:
+        current = conn.execute("PRAGMA user_version").fetchone()[0]
+        if version > current:
+            conn.execute(f"PRAGMA user_version = {int(version)}")
+            conn.commit()
+    finally:
+        conn.close()
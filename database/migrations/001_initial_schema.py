@@ -3,6 +3,8 @@ import os
 import re
 import logging
 
+logger = logging.getLogger(__name__)
+
 def run_migration(db):
     """
     Create initial database schema
@@ -20,15 +22,9 @@ def run_migration(db):
             'schema.sql'
         )
         
-        # Configure logging
-        logging.basicConfig(level=logging.DEBUG, 
-                            format='%(asctime)s - %(levelname)s - %(message)s',
-                            filename='migration.log',
-                            filemode='w')
-        
         # Validate schema file exists
         if not os.path.exists(schema_path):
-            logging.error(f"Schema file not found at {schema_path}")
+            logger.error(f"Schema file not found at {schema_path}")
             return False, f"Schema file not found at {schema_path}"
         
         with open(schema_path, 'r') as schema_file:
@@ -46,13 +42,13 @@ def run_migration(db):
             if statement:
                 try:
                     db.execute_query(statement + ';')
-                    logging.info(f"Executed statement: {statement[:100]}...")
+                    logger.info(f"Executed statement: {statement[:100]}...")
                 except Exception as exec_error:
-                    logging.error(f"Error executing statement: {statement[:100]}... Error: {str(exec_error)}")
+                    logger.error(f"Error executing statement: {statement[:100]}... Error: {str(exec_error)}")
                     # Continue with other statements even if one fails
         
         return True, "Initial schema created successfully"
     
     except Exception as e:
-        logging.error(f"Error creating schema: {str(e)}")
+        logger.error(f"Error creating schema: {str(e)}")
         return False, f"Error creating schema: {str(e)}"
@@ -0,0 +1,25 @@
+"""
+Migration script to allocate employee codes from a sequence table
+"""
+from database.code_sequence import EmployeeCodeSequence
+
+def run_migration(db):
+    """
+    Create the code_sequences table, starting after the highest employee code
+
+    Args:
+        db: Database connection object
+
+    Returns:
+        bool: True if migration was successful, False otherwise
+        str: Success message or error message
+    """
+    conn = db.get_connection()
+    try:
+        EmployeeCodeSequence(db).ensure_table(conn.cursor())
+        conn.commit()
+        return True, "تم إنشاء جدول تسلسل أكواد الموظفين بنجاح"
+    except Exception as e:
+        return False, f"خطأ في تنفيذ الترحيل: {str(e)}"
+    finally:
+        conn.close()
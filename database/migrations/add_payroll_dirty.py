@@ -0,0 +1,21 @@
+"""
+Migration script to track employees whose draft payroll needs recalculating
+"""
+from database.payroll_changes import PayrollChangeTracker
+
+def run_migration(db):
+    """
+    Create the payroll_dirty table and its change tracking triggers
+
+    Args:
+        db: Database connection object
+
+    Returns:
+        bool: True if migration was successful, False otherwise
+        str: Success message or error message
+    """
+    try:
+        PayrollChangeTracker(db).ensure_tables()
+        return True, "تم إنشاء جدول تتبع تغييرات الرواتب بنجاح"
+    except Exception as e:
+        return False, f"خطأ في تنفيذ الترحيل: {str(e)}"
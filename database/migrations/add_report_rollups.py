@@ -0,0 +1,21 @@
+"""
+Migration script to create the monthly report rollup tables
+"""
+from database.report_rollups import ReportRollups
+
+def run_migration(db):
+    """
+    Create the payroll and attendance rollup tables and backfill them
+
+    Args:
+        db: Database connection object
+
+    Returns:
+        bool: True if migration was successful, False otherwise
+        str: Success message or error message
+    """
+    try:
+        ReportRollups(db).ensure_tables()
+        return True, "تم إنشاء جداول ملخصات التقارير بنجاح"
+    except Exception as e:
+        return False, f"خطأ في تنفيذ الترحيل: {str(e)}"
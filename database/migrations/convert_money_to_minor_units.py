@@ -0,0 +1,72 @@
+"""
+Migration script to store payroll amounts as integer minor units
+"""
+from database.report_rollups import ReportRollups
+from utils.analytics_snapshot import AnalyticsSnapshot
+from utils.money import MINOR_UNIT_COLUMNS, to_minor_sql
+
+def run_migration(db):
+    """
+    Convert the payroll amount columns from REAL/TEXT major units to INTEGER minor units
+
+    The conversion happens once, on the first run. The columns that exist
+    then are multiplied and every column of MINOR_UNIT_COLUMNS is recorded
+    in money_minor_units; tables and columns created later are written in
+    minor units from the start and are never converted.
+
+    Args:
+        db: Database connection object
+
+    Returns:
+        bool: True if migration was successful, False otherwise
+        str: Success message or error message
+    """
+    conn = db.get_connection()
+    try:
+        cursor = conn.cursor()
+        
+        cursor.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'money_minor_units'")
+        if cursor.fetchone():
+            return True, "مبالغ الرواتب محولة مسبقاً"
+        
+        cursor.execute("""
+            CREATE TABLE money_minor_units (
+                table_name TEXT NOT NULL,
+                column_name TEXT NOT NULL,
+                converted_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                PRIMARY KEY (table_name, column_name)
+            )
+        """)
+        cursor.executemany(
+            "INSERT INTO money_minor_units (table_name, column_name) VALUES (?, ?)",
+            [(table, column) for table, columns in MINOR_UNIT_COLUMNS.items() for column in columns]
+        )
+        
+        pending = {}
+        for table, columns in MINOR_UNIT_COLUMNS.items():
+            existing = [row[1] for row in cursor.execute(f"PRAGMA table_info('{table}')").fetchall()]
+            columns = [column for column in columns if column in existing]
+            if columns:
+                pending[table] = columns
+        
+        # Text values are coerced by the multiplication, NULLs stay NULL
+        for table, columns in pending.items():
+            assignments = ", ".join(f"{column} = {to_minor_sql(column)}" for column in columns)
+            cursor.execute(f"UPDATE {table} SET {assignments}")
+        
+        conn.commit()
+        db.invalidate_schema_cache()
+        
+        # Rollups and the analytics snapshot were computed from the old amounts
+        if 'payroll_entries' in pending and db.has_table('payroll_monthly_summary'):
+            ReportRollups(db).rebuild()
+        AnalyticsSnapshot(db).invalidate()
+        
+        return True, "تم تحويل مبالغ الرواتب إلى أصغر وحدة نقدية بنجاح"
+
+    except Exception as e:
+        conn.rollback()
+        return False, f"خطأ في تنفيذ الترحيل: {str(e)}"
+
+    finally:
+        conn.close()
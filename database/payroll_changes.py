@@ -0,0 +1,102 @@
+"""
+Change tracking for draft payroll periods
+
+Triggers record (period, employee) pairs in payroll_dirty whenever a row
+that feeds an employee's payroll is inserted, updated or deleted and the
+row's dates fall inside a draft period. PayrollController.recalculate_dirty
+then recomputes those entries only, instead of regenerating the period.
+"""
+
+PAYROLL_DIRTY_SQL = """
+    CREATE TABLE IF NOT EXISTS payroll_dirty (
+        period_id INTEGER NOT NULL,
+        employee_id INTEGER NOT NULL,
+        marked_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+        PRIMARY KEY (period_id, employee_id)
+    )
+"""
+
+# table -> (employee column, start date column, end date column). A changed
+# row marks the draft periods its dates overlap; date columns the table does
+# not have are left out, so rows without dates mark every draft period.
+TRACKED_TABLES = {
+    'employees': ('id', None, None),
+    'employee_salary_components': ('employee_id', 'start_date', 'end_date'),
+    'salary_adjustments': ('employee_id', 'effective_date', 'end_date'),
+    'leave_requests': ('employee_id', 'start_date', 'end_date'),
+    'leaves': ('employee_id', 'start_date', 'end_date'),
+    'attendance': ('employee_id', 'date', 'date'),
+    'attendance_records': ('employee_id', 'check_in', 'check_in'),
+}
+
+TRIGGER_ROWS = {
+    'INSERT': ('NEW',),
+    'UPDATE': ('OLD', 'NEW'),
+    'DELETE': ('OLD',)
+}
+
+
+def trigger_name(table, event):
+    return f"payroll_dirty_{table}_{event.lower()}"
+
+
+class PayrollChangeTracker:
+    """Maintains the payroll_dirty table and the triggers that fill it"""
+
+    def __init__(self, db):
+        self.db = db
+
+    def ensure_tables(self):
+        """Create payroll_dirty and the triggers of every tracked table that exists"""
+        conn = self.db.get_connection()
+        try:
+            conn.execute(PAYROLL_DIRTY_SQL)
+            existing = {
+                row[0] for row in conn.execute(
+                    "SELECT name FROM sqlite_master WHERE type = 'trigger' AND name LIKE 'payroll_dirty_%'"
+                ).fetchall()
+            }
+            
+            for table, (employee_column, start_column, end_column) in TRACKED_TABLES.items():
+                if not self.db.has_table(table):
+                    continue
+                columns = self.db.get_table_columns(table)
+                if employee_column not in columns:
+                    continue
+                start_column = start_column if start_column in columns else None
+                end_column = end_column if end_column in columns else None
+                
+                for event in TRIGGER_ROWS:
+                    if trigger_name(table, event) not in existing:
+                        conn.execute(self._trigger_sql(table, event, employee_column, start_column, end_column))
+            conn.commit()
+        finally:
+            conn.close()
+        
+        self.db.invalidate_schema_cache()
+
+    def _trigger_sql(self, table, event, employee_column, start_column, end_column):
+        """Trigger marking the employee of a changed row in the draft periods it touches"""
+        statements = []
+        for row in TRIGGER_ROWS[event]:
+            conditions = ["pp.status = 'draft'"]
+            if start_column:
+                conditions.append(f"date({row}.{start_column}) <= pp.end_date")
+            if end_column:
+                conditions.append(f"({row}.{end_column} IS NULL OR date({row}.{end_column}) >= pp.start_date)")
+            statements.append(f"""
+                INSERT OR IGNORE INTO payroll_dirty (period_id, employee_id)
+                SELECT pp.id, {row}.{employee_column}
+                FROM payroll_periods pp
+                WHERE {' AND '.join(conditions)};""")
+        
+        return f"""
+            CREATE TRIGGER IF NOT EXISTS {trigger_name(table, event)}
+            AFTER {event} ON {table}
+            BEGIN{''.join(statements)}
+            END
+        """
+
+    def clear(self, cursor, period_id):
+        """Forget the marks of a period once its entries are current"""
+        cursor.execute("DELETE FROM payroll_dirty WHERE period_id = ?", (period_id,))
@@ -120,14 +120,14 @@ PAYROLL_TABLES_SQL = {
             id INTEGER PRIMARY KEY AUTOINCREMENT,
             payroll_period_id INTEGER NOT NULL,
             employee_id INTEGER NOT NULL,
-            basic_salary DECIMAL(10,2) NOT NULL CHECK (basic_salary >= 0 AND basic_salary <= 1000000),
-            total_allowances DECIMAL(10,2) DEFAULT 0,
-            tax_exempt_allowances DECIMAL(10,2) DEFAULT 0,
-            total_deductions DECIMAL(10,2) DEFAULT 0,
-            overtime_pay DECIMAL(10,2) DEFAULT 0,
-            holiday_premium DECIMAL(10,2) DEFAULT 0,
-            leave_deductions DECIMAL(10,2) DEFAULT 0,
-            net_salary DECIMAL(10,2) NOT NULL,
+            basic_salary INTEGER NOT NULL CHECK (basic_salary >= 0 AND basic_salary <= 100000000),
+            total_allowances INTEGER DEFAULT 0,
+            tax_exempt_allowances INTEGER DEFAULT 0,
+            total_deductions INTEGER DEFAULT 0,
+            overtime_pay INTEGER DEFAULT 0,
+            holiday_premium INTEGER DEFAULT 0,
+            leave_deductions INTEGER DEFAULT 0,
+            net_salary INTEGER NOT NULL,
             payment_status TEXT NOT NULL DEFAULT 'pending' CHECK (payment_status IN ('pending', 'processing', 'paid', 'cancelled', 'failed')),
             payment_date DATE,
             created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
@@ -146,7 +146,7 @@ PAYROLL_TABLES_SQL = {
             id INTEGER PRIMARY KEY AUTOINCREMENT,
             payroll_entry_id INTEGER NOT NULL,
             component_id INTEGER NOT NULL,
-            amount DECIMAL(10,2) NOT NULL,
+            amount INTEGER NOT NULL,
             type TEXT NOT NULL,  -- allowance or deduction
             notes TEXT,
             created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
@@ -160,7 +160,7 @@ PAYROLL_TABLES_SQL = {
             id INTEGER PRIMARY KEY AUTOINCREMENT,
             payroll_entry_id INTEGER NOT NULL,
             component_id INTEGER NOT NULL,
-            value DECIMAL(10,2) NOT NULL,
+            value INTEGER NOT NULL,
             created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
             updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
             FOREIGN KEY (payroll_entry_id) REFERENCES payroll_entries (id) ON DELETE CASCADE,
@@ -0,0 +1,316 @@
+"""
+Monthly rollup tables used by the reports
+
+Payroll and attendance totals are kept per (year, month, employee) and per
+(year, month, department) so reports read a handful of rows per month
+instead of scanning every payroll entry or attendance record.
+
+Rollups are refreshed one month at a time:
+- payroll when a period is approved or processed (draft periods are excluded)
+- attendance whenever an attendance record of an employee changes
+
+Payroll totals are integer minor units, like the payroll_entries amounts
+they are summed from.
+"""
+import logging
+from datetime import date, datetime
+
+ROLLUP_TABLES_SQL = """
+    CREATE TABLE IF NOT EXISTS payroll_monthly_summary (
+        year INTEGER NOT NULL,
+        month INTEGER NOT NULL,
+        employee_id INTEGER NOT NULL,
+        department_id INTEGER,
+        entry_count INTEGER NOT NULL DEFAULT 0,
+        total_basic INTEGER NOT NULL DEFAULT 0,
+        total_allowances INTEGER NOT NULL DEFAULT 0,
+        total_deductions INTEGER NOT NULL DEFAULT 0,
+        total_gross INTEGER NOT NULL DEFAULT 0,
+        total_net INTEGER NOT NULL DEFAULT 0,
+        total_paid INTEGER NOT NULL DEFAULT 0,
+        PRIMARY KEY (year, month, employee_id)
+    );
+
+    CREATE TABLE IF NOT EXISTS payroll_department_monthly_summary (
+        year INTEGER NOT NULL,
+        month INTEGER NOT NULL,
+        department_id INTEGER,
+        employee_count INTEGER NOT NULL DEFAULT 0,
+        total_gross INTEGER NOT NULL DEFAULT 0,
+        total_net INTEGER NOT NULL DEFAULT 0,
+        total_paid INTEGER NOT NULL DEFAULT 0,
+        PRIMARY KEY (year, month, department_id)
+    );
+
+    CREATE TABLE IF NOT EXISTS attendance_monthly_summary (
+        year INTEGER NOT NULL,
+        month INTEGER NOT NULL,
+        employee_id INTEGER NOT NULL,
+        department_id INTEGER,
+        days_present INTEGER NOT NULL DEFAULT 0,
+        days_late INTEGER NOT NULL DEFAULT 0,
+        days_absent INTEGER NOT NULL DEFAULT 0,
+        total_hours DECIMAL(8,2) NOT NULL DEFAULT 0,
+        total_overtime DECIMAL(8,2) NOT NULL DEFAULT 0,
+        PRIMARY KEY (year, month, employee_id)
+    );
+
+    CREATE TABLE IF NOT EXISTS attendance_department_monthly_summary (
+        year INTEGER NOT NULL,
+        month INTEGER NOT NULL,
+        department_id INTEGER,
+        employee_count INTEGER NOT NULL DEFAULT 0,
+        days_present INTEGER NOT NULL DEFAULT 0,
+        days_late INTEGER NOT NULL DEFAULT 0,
+        days_absent INTEGER NOT NULL DEFAULT 0,
+        total_hours DECIMAL(8,2) NOT NULL DEFAULT 0,
+        total_overtime DECIMAL(8,2) NOT NULL DEFAULT 0,
+        PRIMARY KEY (year, month, department_id)
+    );
+"""
+
+ROLLUP_TABLES = [
+    'payroll_monthly_summary', 'payroll_department_monthly_summary',
+    'attendance_monthly_summary', 'attendance_department_monthly_summary'
+]
+
+
+def month_bounds(year, month):
+    """Return the first day of a month and of the following month as ISO strings"""
+    next_year, next_month = (year + 1, 1) if month == 12 else (year, month + 1)
+    return f"{year:04d}-{month:02d}-01", f"{next_year:04d}-{next_month:02d}-01"
+
+
+def month_key(value):
+    """Convert a date, datetime or 'YYYY-MM-DD' string to a (year, month) tuple"""
+    if isinstance(value, (date, datetime)):
+        return value.year, value.month
+    year, month = str(value)[:7].split('-')
+    return int(year), int(month)
+
+
+class ReportRollups:
+    """Maintains the monthly payroll and attendance rollup tables"""
+
+    def __init__(self, db):
+        self.db = db
+
+    def ensure_tables(self):
+        """Create the rollup tables if needed and backfill them from existing data"""
+        if all(self.db.has_table(table) for table in ROLLUP_TABLES):
+            return
+        
+        conn = self.db.get_connection()
+        try:
+            conn.executescript(ROLLUP_TABLES_SQL)
+            conn.commit()
+        finally:
+            conn.close()
+        
+        self.db.invalidate_schema_cache()
+        self.rebuild()
+
+    def rebuild(self):
+        """Recompute every month from the raw payroll and attendance rows"""
+        conn = self.db.get_connection()
+        try:
+            cursor = conn.cursor()
+            
+            year_expr, month_expr = self._period_month_expressions()
+            cursor.execute(f"""
+                SELECT DISTINCT {year_expr}, {month_expr}
+                FROM payroll_periods pp
+                WHERE pp.status != 'draft'
+            """)
+            for year, month in cursor.fetchall():
+                if year and month:
+                    self._refresh_payroll_month(cursor, int(year), int(month))
+            
+            source = self._attendance_source()
+            if source:
+                cursor.execute(f"""
+                    SELECT DISTINCT substr({source['date_column']}, 1, 7)
+                    FROM {source['table']}
+                    WHERE {source['date_column']} IS NOT NULL
+                """)
+                for (year_month,) in cursor.fetchall():
+                    year, month = month_key(year_month)
+                    self._refresh_attendance_month(cursor, source, year, month)
+            
+            conn.commit()
+            return True, "Report rollups rebuilt"
+        except Exception as e:
+            conn.rollback()
+            logging.error(f"Error rebuilding report rollups: {e}")
+            return False, str(e)
+        finally:
+            conn.close()
+
+    def refresh_payroll_period(self, period_id):
+        """Refresh the payroll rollups for the month of a payroll period"""
+        self.ensure_tables()
+        conn = self.db.get_connection()
+        try:
+            cursor = conn.cursor()
+            
+            year_expr, month_expr = self._period_month_expressions()
+            cursor.execute(f"""
+                SELECT {year_expr}, {month_expr}
+                FROM payroll_periods pp
+                WHERE pp.id = ?
+            """, (period_id,))
+            row = cursor.fetchone()
+            if not row or not row[0] or not row[1]:
+                return False, "Payroll period not found"
+            
+            self._refresh_payroll_month(cursor, int(row[0]), int(row[1]))
+            conn.commit()
+            return True, "Payroll rollups refreshed"
+        except Exception as e:
+            conn.rollback()
+            logging.error(f"Error refreshing payroll rollups for period {period_id}: {e}")
+            return False, str(e)
+        finally:
+            conn.close()
+
+    def refresh_attendance(self, employee_id, day):
+        """Refresh the attendance rollups of one employee for the month of a day"""
+        self.ensure_tables()
+        source = self._attendance_source()
+        if not source:
+            return False, "No attendance table found"
+        
+        year, month = month_key(day)
+        conn = self.db.get_connection()
+        try:
+            cursor = conn.cursor()
+            self._refresh_attendance_month(cursor, source, year, month, employee_id)
+            conn.commit()
+            return True, "Attendance rollups refreshed"
+        except Exception as e:
+            conn.rollback()
+            logging.error(f"Error refreshing attendance rollups for employee {employee_id}: {e}")
+            return False, str(e)
+        finally:
+            conn.close()
+
+    def _period_month_expressions(self):
+        """SQL expressions giving the year and month of a payroll period (alias pp)"""
+        columns = self.db.get_table_columns('payroll_periods')
+        if 'period_year' in columns and 'period_month' in columns:
+            return "pp.period_year", "pp.period_month"
+        return ("CAST(strftime('%Y', pp.start_date) AS INTEGER)",
+                "CAST(strftime('%m', pp.start_date) AS INTEGER)")
+
+    def _attendance_source(self):
+        """Pick the attendance table and columns the application writes to"""
+        if self.db.has_table('attendance_records'):
+            columns = self.db.get_table_columns('attendance_records')
+            return {
+                'table': 'attendance_records',
+                'date_column': 'check_in',
+                'hours_expr': 'a.total_hours' if 'total_hours' in columns else '0',
+                'overtime_expr': 'a.overtime_hours' if 'overtime_hours' in columns else '0'
+            }
+        if self.db.has_table('attendance'):
+            columns = self.db.get_table_columns('attendance')
+            return {
+                'table': 'attendance',
+                'date_column': 'date',
+                'hours_expr': 'a.working_hours' if 'working_hours' in columns else '0',
+                'overtime_expr': 'a.overtime_hours' if 'overtime_hours' in columns else '0'
+            }
+        return None
+
+    def _refresh_payroll_month(self, cursor, year, month):
+        """Recompute the payroll rollups of one month"""
+        year_expr, month_expr = self._period_month_expressions()
+        entry_columns = self.db.get_table_columns('payroll_entries')
+        if 'gross_salary' in entry_columns:
+            gross_expr = "COALESCE(NULLIF(pe.gross_salary, 0), pe.basic_salary + pe.total_allowances)"
+        else:
+            gross_expr = "pe.basic_salary + pe.total_allowances"
+        
+        cursor.execute("DELETE FROM payroll_monthly_summary WHERE year = ? AND month = ?", (year, month))
+        cursor.execute(f"""
+            INSERT INTO payroll_monthly_summary (
+                year, month, employee_id, department_id, entry_count,
+                total_basic, total_allowances, total_deductions,
+                total_gross, total_net, total_paid
+            )
+            SELECT
+                ?, ?, pe.employee_id, e.department_id, COUNT(pe.id),
+                COALESCE(SUM(pe.basic_salary), 0),
+                COALESCE(SUM(pe.total_allowances), 0),
+                COALESCE(SUM(pe.total_deductions), 0),
+                COALESCE(SUM({gross_expr}), 0),
+                COALESCE(SUM(pe.net_salary), 0),
+                COALESCE(SUM(CASE WHEN pe.payment_status = 'paid' THEN pe.net_salary ELSE 0 END), 0)
+            FROM payroll_entries pe
+            JOIN payroll_periods pp ON pe.payroll_period_id = pp.id
+            LEFT JOIN employees e ON pe.employee_id = e.id
+            WHERE {year_expr} = ? AND {month_expr} = ?
+            AND pp.status != 'draft'
+            GROUP BY pe.employee_id
+        """, (year, month, year, month))
+        
+        cursor.execute("DELETE FROM payroll_department_monthly_summary WHERE year = ? AND month = ?", (year, month))
+        cursor.execute("""
+            INSERT INTO payroll_department_monthly_summary (
+                year, month, department_id, employee_count,
+                total_gross, total_net, total_paid
+            )
+            SELECT year, month, department_id, COUNT(*),
+                   SUM(total_gross), SUM(total_net), SUM(total_paid)
+            FROM payroll_monthly_summary
+            WHERE year = ? AND month = ?
+            GROUP BY department_id
+        """, (year, month))
+
+    def _refresh_attendance_month(self, cursor, source, year, month, employee_id=None):
+        """Recompute the attendance rollups of one month, optionally for one employee"""
+        start, end = month_bounds(year, month)
+        summary_filter, source_filter, employee_params = "", "", []
+        if employee_id is not None:
+            summary_filter = " AND employee_id = ?"
+            source_filter = " AND a.employee_id = ?"
+            employee_params = [employee_id]
+        
+        cursor.execute(
+            f"DELETE FROM attendance_monthly_summary WHERE year = ? AND month = ?{summary_filter}",
+            [year, month] + employee_params
+        )
+        cursor.execute(f"""
+            INSERT INTO attendance_monthly_summary (
+                year, month, employee_id, department_id,
+                days_present, days_late, days_absent, total_hours, total_overtime
+            )
+            SELECT
+                ?, ?, a.employee_id, e.department_id,
+                COUNT(CASE WHEN a.status = 'present' THEN 1 END),
+                COUNT(CASE WHEN a.status = 'late' THEN 1 END),
+                COUNT(CASE WHEN a.status = 'absent' THEN 1 END),
+                COALESCE(SUM({source['hours_expr']}), 0),
+                COALESCE(SUM({source['overtime_expr']}), 0)
+            FROM {source['table']} a
+            LEFT JOIN employees e ON a.employee_id = e.id
+            WHERE a.{source['date_column']} >= ? AND a.{source['date_column']} < ?{source_filter}
+            GROUP BY a.employee_id
+        """, [year, month, start, end] + employee_params)
+        
+        cursor.execute(
+            "DELETE FROM attendance_department_monthly_summary WHERE year = ? AND month = ?",
+            (year, month)
+        )
+        cursor.execute("""
+            INSERT INTO attendance_department_monthly_summary (
+                year, month, department_id, employee_count,
+                days_present, days_late, days_absent, total_hours, total_overtime
+            )
+            SELECT year, month, department_id, COUNT(*),
+                   SUM(days_present), SUM(days_late), SUM(days_absent),
+                   SUM(total_hours), SUM(total_overtime)
+            FROM attendance_monthly_summary
+            WHERE year = ? AND month = ?
+            GROUP BY department_id
+        """, (year, month))
@@ -26,6 +26,8 @@ from ui.database_manager_dialog import DatabaseManagerDialog
 from ui.styles import Styles
 from utils.licensing import LicenseManager
 from utils.backup_manager import BackupManager
+from utils.stall_watchdog import StallWatchdog
+from utils.logging_setup import configure_logging
 
 class MainWindow(QMainWindow):
     def __init__(self):
@@ -42,7 +44,7 @@ class MainWindow(QMainWindow):
         self.db = Database()
         
         # Initialize backup manager
-        self.backup_manager = BackupManager(self.db.db_file)
+        self.backup_manager = BackupManager(self.db.db_file, database=self.db)
         
         # Run database migrations
         self.run_migrations()
@@ -188,6 +190,11 @@ class MainWindow(QMainWindow):
         settings_menu.addMenu(theme_menu)
         settings_menu.addMenu(db_menu)
         
+        # Add performance monitor
+        performance_action = QAction("مراقبة الأداء", settings_menu)
+        performance_action.triggered.connect(self.show_performance_monitor)
+        settings_menu.addAction(performance_action)
+        
         # Add license menu
         license_action = QAction("إدارة الترخيص", settings_menu)
         license_action.triggered.connect(self.show_license_dialog)
@@ -383,6 +390,16 @@ class MainWindow(QMainWindow):
             f"ترخيصك سينتهي خلال {days_remaining} يوم.\n\nيرجى تجديد الترخيص لتجنب انقطاع الخدمة."
         )
     
+    def show_performance_monitor(self):
+        """Show live performance charts for this application"""
+        # Imported here because matplotlib is slow to load
+        from utils.monitor_performance import PerformanceMonitorUI
+        
+        self.performance_monitor = PerformanceMonitorUI(self.db.db_file, self)
+        self.performance_monitor.setAttribute(Qt.WA_DeleteOnClose)
+        self.performance_monitor.show()
+        self.performance_monitor.start_monitoring()
+
     def show_license_dialog(self):
         """Show the license dialog"""
         dialog = LicenseDialog(self.license_manager, self)
@@ -438,16 +455,20 @@ class MainWindow(QMainWindow):
     def change_database(self, db_file):
         """Change the current database file"""
         try:
-            # Update the backup manager
-            self.backup_manager = BackupManager(db_file)
+            # Write out the audit entries that belong to the old database
+            self.auth_controller.audit_log.flush()
             
             # Update the database
             success = self.db.change_database(db_file)
             
+            # Update the backup manager
+            self.backup_manager = BackupManager(db_file, database=self.db)
+            
             if success:
                 # Refresh controllers
                 self.employee_controller = EmployeeController(self.db)
                 self.payroll_controller = PayrollController(self.db)
+                self.auth_controller.close()
                 self.auth_controller = AuthController(self.db)
                 self.attendance_controller = AttendanceController(self.db)
                 
@@ -466,6 +487,9 @@ class MainWindow(QMainWindow):
             QMessageBox.critical(self, "خطأ", f"حدث خطأ أثناء تغيير قاعدة البيانات: {str(e)}")
 
 def main():
+    # Log files are written by a background thread from here on
+    configure_logging()
+
     app = QApplication(sys.argv)
     app.setLayoutDirection(Qt.RightToLeft)
     
@@ -475,6 +499,14 @@ def main():
     
     window = MainWindow()
     window.show()
+
+    # Record GUI event loop lag, and log where the GUI thread was on stalls
+    stall_watchdog = StallWatchdog(parent=app)
+    stall_watchdog.start()
+    app.aboutToQuit.connect(stall_watchdog.stop)
+
+    # Flush buffered audit log entries before exiting
+    app.aboutToQuit.connect(lambda: window.auth_controller.close())
     sys.exit(app.exec_())
 
 if __name__ == '__main__':
@@ -1,7 +1,8 @@
 """Repository layer for payroll-related database operations"""
 import logging
+import sqlite3
+from dataclasses import dataclass
 from typing import Dict, Any, List, Optional, Tuple
-from decimal import Decimal
 from datetime import datetime, date
 from utils.exceptions import (
     PayrollValidationError, PayrollCalculationError,
@@ -9,6 +10,75 @@ from utils.exceptions import (
     TaxCalculationError, SalaryComponentError,
     LeaveError
 )
+from utils.money import Money
+
+# Amount columns of a payroll entry, in insert order; stored as minor units
+PAYROLL_ENTRY_FIELDS = (
+    'basic_salary', 'total_allowances', 'tax_exempt_allowances',
+    'total_deductions', 'leave_deductions', 'social_insurance',
+    'overtime_pay', 'holiday_premium', 'tax', 'net_salary'
+)
+
+INSERT_PAYROLL_ENTRY_SQL = """
+    INSERT INTO payroll_entries (
+        employee_id, period_id, 
+        basic_salary, total_allowances, tax_exempt_allowances,
+        total_deductions, leave_deductions, social_insurance,
+        overtime_pay, holiday_premium, tax, net_salary,
+        created_by, created_at
+    ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, datetime('now'))
+"""
+
+# Working days (Monday to Friday) of a period, bound to its start and end date.
+# Shared by the working day count and the leave day count so both agree.
+WORKING_DAYS_CTE = """
+    WITH RECURSIVE dates(date) AS (
+        SELECT date(?)
+        UNION ALL
+        SELECT date(date, '+1 day')
+        FROM dates
+        WHERE date < date(?)
+    ),
+    working_days(date) AS (
+        SELECT date
+        FROM dates
+        WHERE strftime('%w', date) NOT IN ('0', '6')
+    )
+"""
+
+# Approved leave days per employee and leave type that fall on working days
+# of the period. Leaves are clipped to the period by the join, so a leave
+# spanning two periods is split between them.
+LEAVE_DAYS_SQL = WORKING_DAYS_CTE + """
+    SELECT
+        lr.employee_id,
+        lr.leave_type_id,
+        COUNT(DISTINCT wd.date) as days
+    FROM leave_requests lr
+    JOIN working_days wd
+        ON wd.date BETWEEN date(lr.start_date) AND date(lr.end_date)
+    WHERE lr.status = 'approved'
+        AND lr.start_date <= ?
+        AND lr.end_date >= ?
+    GROUP BY lr.employee_id, lr.leave_type_id
+"""
+
+@dataclass
+class PeriodContext:
+    """Reference data shared by every employee of one payroll run
+
+    Loaded once by PayrollRepository.load_period_context so the per-employee
+    calculations only query the data that differs between employees.
+    """
+    period: Dict[str, Any]
+    working_days: int
+    employee_types: Dict[int, Dict[str, Any]]   # id -> name and float multipliers
+    employee_type_ids: Dict[int, int]           # employee id -> employee type id
+    social_insurance_rate: Optional[float]
+    tax_brackets: List[Dict[str, Any]]          # Money bounds and float rate, lowest first
+    leave_types: Dict[int, Dict[str, Any]]      # id -> paid and deduction rate
+    leave_days: Dict[int, Dict[int, int]]       # employee id -> leave type id -> working days on leave
+    components: Dict[int, Dict[str, Any]]       # salary component catalog by id
 
 class PayrollRepository:
     """Repository layer for payroll-related database operations"""
@@ -18,25 +88,129 @@ class PayrollRepository:
         self.logger = logging.getLogger(__name__)
         self._transaction_active = False
 
+    def load_period_context(self, period_id: int) -> PeriodContext:
+        """Load the reference data of a payroll run once for all employees"""
+        try:
+            period = self._validate_payroll_period(period_id)
+            working_days = self._get_working_days(period['start_date'], period['end_date'])
+            
+            employee_types = {
+                row['id']: {
+                    'name': row['name'],
+                    'overtime_multiplier': float(row['overtime_multiplier']),
+                    'holiday_pay_multiplier': float(row['holiday_pay_multiplier'])
+                }
+                for row in self.db.execute("""
+                    SELECT id, name, overtime_multiplier, holiday_pay_multiplier
+                    FROM employee_types
+                """).fetchall()
+            }
+            employee_type_ids = {
+                row[0]: row[1]
+                for row in self.db.execute("SELECT id, employee_type_id FROM employees").fetchall()
+            }
+            
+            config = self.db.execute("""
+                SELECT 
+                    rate
+                FROM social_insurance_config
+                WHERE effective_date <= CURRENT_DATE
+                ORDER BY effective_date DESC
+                LIMIT 1
+            """).fetchone()
+            social_insurance_rate = float(config['rate']) if config else None
+            
+            tax_brackets = [
+                {
+                    'min_amount': Money(row['min_amount']),
+                    'max_amount': Money(row['max_amount']) if row['max_amount'] is not None else None,
+                    'rate': float(row['rate'])
+                }
+                for row in self.db.execute("""
+                    SELECT 
+                        min_amount,
+                        max_amount,
+                        rate
+                    FROM tax_brackets
+                    WHERE is_active = 1
+                    ORDER BY min_amount ASC
+                """).fetchall()
+            ]
+            
+            # Unpaid leave deducts a full day unless the leave type says otherwise
+            leave_types = {}
+            for row in self.db.execute("SELECT * FROM leave_types").fetchall():
+                row = dict(row)
+                leave_types[row['id']] = {
+                    'paid': row['paid'],
+                    'deduction_rate': float(row.get('deduction_rate', 1))
+                }
+            
+            components = {}
+            for row in self.db.execute("SELECT * FROM salary_components").fetchall():
+                row = dict(row)
+                tax_exempt = row['tax_exempt'] if 'tax_exempt' in row else not row.get('is_taxable', 1)
+                components[row['id']] = {
+                    'type': row['type'],
+                    'tax_exempt': tax_exempt,
+                    'value': row['value'],
+                    'percentage': row['percentage'],
+                    'is_active': row['is_active']
+                }
+            
+            leave_days = self._get_leave_days(period['start_date'], period['end_date'])
+            
+            return PeriodContext(
+                period=period,
+                working_days=working_days,
+                employee_types=employee_types,
+                employee_type_ids=employee_type_ids,
+                social_insurance_rate=social_insurance_rate,
+                tax_brackets=tax_brackets,
+                leave_types=leave_types,
+                leave_days=leave_days,
+                components=components
+            )
+        
+        except (PayrollValidationError, PayrollCalculationError):
+            raise
+        except Exception as e:
+            self.logger.error(f"Error loading payroll period context: {str(e)}")
+            raise PayrollCalculationError(
+                f"Failed to load payroll reference data: {str(e)}",
+                details={'period_id': period_id}
+            )
+
     def calculate_net_salary(
             self,
             employee_id: int,
             period_id: int,
-            basic_salary: Decimal
-        ) -> Dict[str, Decimal]:
-        """Calculate net salary with all components"""
+            basic_salary: Money,
+            context: Optional[PeriodContext] = None
+        ) -> Dict[str, Money]:
+        """Calculate net salary with all components
+        
+        Pass the context from load_period_context when calculating many
+        employees of the same period; without it the reference data is
+        loaded for this call alone. basic_salary may be any amount Money
+        accepts; every amount returned is Money.
+        """
         try:
-            # Validate employee type and period first
-            self._validate_employee_type(employee_id)
-            period = self._validate_payroll_period(period_id)
+            basic_salary = Money(basic_salary)
+            if context is None:
+                context = self.load_period_context(period_id)
+            
+            # Validate employee type first
+            self._validate_employee_type(employee_id, context)
             
             # Calculate core components
-            leave_deductions = self._calculate_leave_deductions(employee_id, period, basic_salary)
-            allowances = self._calculate_allowances(employee_id, basic_salary)
-            deductions = self._calculate_deductions(employee_id, basic_salary)
-            overtime = self._calculate_overtime(employee_id, period_id, basic_salary)
-            tax = self._calculate_income_tax(basic_salary + allowances['taxable'] - deductions['total'])
-            social_insurance = self._calculate_social_insurance(employee_id, basic_salary + allowances['total'])
+            components = self._get_employee_components(employee_id, context)
+            leave_deductions = self._calculate_leave_deductions(employee_id, context, basic_salary)
+            allowances = self._calculate_allowances(components, basic_salary)
+            deductions = self._calculate_deductions(components, basic_salary)
+            overtime = self._calculate_overtime(employee_id, context, basic_salary)
+            tax = self._calculate_income_tax(basic_salary + allowances['taxable'] - deductions['total'], context)
+            social_insurance = self._calculate_social_insurance(employee_id, basic_salary + allowances['total'], context)
 
             # Build final salary components with flattened structure
             return {
@@ -46,8 +220,8 @@ class PayrollRepository:
                 'taxable_allowances': allowances['taxable'],
                 'total_deductions': deductions['total'],
                 'leave_deductions': leave_deductions,
-                'overtime_pay': overtime.get('overtime_pay', Decimal('0')),
-                'holiday_premium': overtime.get('holiday_premium', Decimal('0')),
+                'overtime_pay': overtime.get('overtime_pay', Money()),
+                'holiday_premium': overtime.get('holiday_premium', Money()),
                 'total_overtime': overtime['total'],
                 'tax': tax,
                 'social_insurance': social_insurance,
@@ -64,38 +238,18 @@ class PayrollRepository:
     def _calculate_leave_deductions(
             self,
             employee_id: int,
-            period: Dict[str, Any],
-            basic_salary: Decimal
-        ) -> Decimal:
-        """Calculate leave deductions"""
+            context: PeriodContext,
+            basic_salary: Money
+        ) -> Money:
+        """Calculate leave deductions from the leave days in the context"""
         try:
-            # Get leave records
-            cursor = self.db.execute("""
-                SELECT 
-                    lt.name,
-                    lt.paid,
-                    lt.deduction_rate,
-                    COUNT(*) as days
-                FROM leave_requests lr
-                JOIN leave_types lt ON lr.leave_type_id = lt.id
-                WHERE lr.employee_id = ?
-                    AND lr.status = 'approved'
-                    AND lr.start_date >= ?
-                    AND lr.end_date <= ?
-                GROUP BY lt.id
-            """, (employee_id, period['start_date'], period['end_date']))
-            leave_records = cursor.fetchall()
-
-            # Calculate leave deductions
-            leave_deductions = Decimal('0')
-            working_days = self._get_working_days(period['start_date'], period['end_date'])
-            daily_rate = basic_salary / Decimal(str(working_days))
-
-            for leave in leave_records:
-                if not leave['paid']:
-                    leave_days = Decimal(str(leave['days']))
-                    deduction_rate = Decimal(str(leave['deduction_rate']))
-                    leave_deductions += daily_rate * leave_days * deduction_rate
+            leave_deductions = Money()
+            for leave_type_id, days in context.leave_days.get(employee_id, {}).items():
+                leave_type = context.leave_types.get(leave_type_id)
+                if leave_type and not leave_type['paid'] and context.working_days:
+                    # One rounding per leave type instead of a rounded daily rate
+                    days = days * leave_type['deduction_rate']
+                    leave_deductions += basic_salary * (days / context.working_days)
 
             return leave_deductions
 
@@ -106,122 +260,108 @@ class PayrollRepository:
                 details={'employee_id': employee_id}
             )
 
-    def _calculate_allowances(
+    def _get_employee_components(
             self,
             employee_id: int,
-            basic_salary: Decimal
-        ) -> Dict[str, Decimal]:
-        """Calculate allowances"""
+            context: PeriodContext
+        ) -> List[Dict[str, Any]]:
+        """Return the catalog components that apply to an employee
+        
+        Employee overrides take precedence over the catalog values. A
+        component inactive in the catalog still applies when an active
+        override exists for the employee.
+        """
         try:
-            # Get salary components
+            overrides = {}
             cursor = self.db.execute("""
-                SELECT 
-                    sc.type,
-                    sc.tax_exempt,
-                    COALESCE(esc.value, sc.value) as value,
-                    COALESCE(esc.percentage, sc.percentage) as percentage,
-                    COALESCE(esc.is_active, sc.is_active) as is_active
-                FROM salary_components sc
-                LEFT JOIN employee_salary_components esc 
-                    ON esc.component_id = sc.id 
-                    AND esc.employee_id = ?
-                WHERE sc.is_active = 1
-                    OR (esc.is_active = 1 AND esc.employee_id = ?)
-            """, (employee_id, employee_id))
-            components = cursor.fetchall()
-
-            # Calculate allowances
-            total_allowances = Decimal('0')
-            tax_exempt_allowances = Decimal('0')
-            taxable_allowances = Decimal('0')
-
-            for comp in components:
-                if not comp['is_active']:
+                SELECT component_id, value, percentage, is_active
+                FROM employee_salary_components
+                WHERE employee_id = ?
+            """, (employee_id,))
+            for row in cursor.fetchall():
+                overrides.setdefault(row['component_id'], []).append(row)
+            
+            components = []
+            for component_id, component in context.components.items():
+                rows = overrides.get(component_id)
+                if not rows:
+                    if component['is_active'] == 1:
+                        components.append(component)
                     continue
-
-                amount = Decimal('0')
-                if comp['percentage']:
-                    amount = basic_salary * (Decimal(str(comp['percentage'])) / Decimal('100'))
-                else:
-                    amount = Decimal(str(comp['value']))
-
-                if comp['type'] == 'allowance':
-                    total_allowances += amount
-                    if comp['tax_exempt']:
-                        tax_exempt_allowances += amount
-                    else:
-                        taxable_allowances += amount
-
-            return {
-                'total': total_allowances,
-                'tax_exempt': tax_exempt_allowances,
-                'taxable': taxable_allowances
-            }
-
+                for row in rows:
+                    if component['is_active'] != 1 and row['is_active'] != 1:
+                        continue
+                    components.append({
+                        'type': component['type'],
+                        'tax_exempt': component['tax_exempt'],
+                        'value': row['value'] if row['value'] is not None else component['value'],
+                        'percentage': row['percentage'] if row['percentage'] is not None else component['percentage'],
+                        'is_active': row['is_active'] if row['is_active'] is not None else component['is_active']
+                    })
+            return components
+        
         except Exception as e:
-            self.logger.error(f"Error calculating allowances: {str(e)}")
+            self.logger.error(f"Error loading salary components: {str(e)}")
             raise PayrollCalculationError(
-                f"Failed to calculate allowances: {str(e)}",
+                f"Failed to load salary components: {str(e)}",
                 details={'employee_id': employee_id}
             )
 
-    def _calculate_deductions(
+    def _component_amount(self, component: Dict[str, Any], basic_salary: Money) -> Money:
+        """Amount of a fixed or percentage component"""
+        if component['percentage']:
+            return basic_salary * (float(component['percentage']) / 100)
+        return Money(component['value'])
+
+    def _calculate_allowances(
             self,
-            employee_id: int,
-            basic_salary: Decimal
-        ) -> Dict[str, Decimal]:
-        """Calculate deductions"""
-        try:
-            # Get salary components
-            cursor = self.db.execute("""
-                SELECT 
-                    sc.type,
-                    sc.tax_exempt,
-                    COALESCE(esc.value, sc.value) as value,
-                    COALESCE(esc.percentage, sc.percentage) as percentage,
-                    COALESCE(esc.is_active, sc.is_active) as is_active
-                FROM salary_components sc
-                LEFT JOIN employee_salary_components esc 
-                    ON esc.component_id = sc.id 
-                    AND esc.employee_id = ?
-                WHERE sc.is_active = 1
-                    OR (esc.is_active = 1 AND esc.employee_id = ?)
-            """, (employee_id, employee_id))
-            components = cursor.fetchall()
-
-            # Calculate deductions
-            total_deductions = Decimal('0')
-
-            for comp in components:
-                if not comp['is_active']:
-                    continue
+            components: List[Dict[str, Any]],
+            basic_salary: Money
+        ) -> Dict[str, Money]:
+        """Calculate allowances"""
+        total_allowances = Money()
+        tax_exempt_allowances = Money()
+        taxable_allowances = Money()
 
-                amount = Decimal('0')
-                if comp['percentage']:
-                    amount = basic_salary * (Decimal(str(comp['percentage'])) / Decimal('100'))
-                else:
-                    amount = Decimal(str(comp['value']))
+        for comp in components:
+            if not comp['is_active'] or comp['type'] != 'allowance':
+                continue
 
-                if comp['type'] == 'deduction':
-                    total_deductions += amount
+            amount = self._component_amount(comp, basic_salary)
+            total_allowances += amount
+            if comp['tax_exempt']:
+                tax_exempt_allowances += amount
+            else:
+                taxable_allowances += amount
 
-            return {
-                'total': total_deductions
-            }
+        return {
+            'total': total_allowances,
+            'tax_exempt': tax_exempt_allowances,
+            'taxable': taxable_allowances
+        }
 
-        except Exception as e:
-            self.logger.error(f"Error calculating deductions: {str(e)}")
-            raise PayrollCalculationError(
-                f"Failed to calculate deductions: {str(e)}",
-                details={'employee_id': employee_id}
-            )
+    def _calculate_deductions(
+            self,
+            components: List[Dict[str, Any]],
+            basic_salary: Money
+        ) -> Dict[str, Money]:
+        """Calculate deductions"""
+        total_deductions = Money()
+
+        for comp in components:
+            if comp['is_active'] and comp['type'] == 'deduction':
+                total_deductions += self._component_amount(comp, basic_salary)
+
+        return {
+            'total': total_deductions
+        }
 
     def _calculate_overtime(
             self,
             employee_id: int,
-            period_id: int,
-            basic_salary: Decimal
-        ) -> Dict[str, Decimal]:
+            context: PeriodContext,
+            basic_salary: Money
+        ) -> Dict[str, Money]:
         """Calculate overtime"""
         try:
             # Get overtime records
@@ -234,36 +374,23 @@ class PayrollRepository:
                     AND period_id = ?
                     AND type IN ('overtime', 'holiday')
                 GROUP BY type
-            """, (employee_id, period_id))
+            """, (employee_id, context.period['id']))
             attendance = cursor.fetchall()
 
             # Calculate overtime
-            overtime_hours = Decimal('0')
-            holiday_hours = Decimal('0')
+            overtime_hours = 0.0
+            holiday_hours = 0.0
             for record in attendance:
                 if record['type'] == 'overtime':
-                    overtime_hours = Decimal(str(record['total_hours']))
+                    overtime_hours = float(record['total_hours'])
                 elif record['type'] == 'holiday':
-                    holiday_hours = Decimal(str(record['total_hours']))
-
-            # Calculate hourly rate (assuming 160 hours per month)
-            hourly_rate = basic_salary / Decimal('160')
-
-            # Apply multipliers from employee type
-            cursor = self.db.execute("""
-                SELECT 
-                    overtime_multiplier,
-                    holiday_pay_multiplier
-                FROM employee_types
-                JOIN employees e ON e.employee_type_id = employee_types.id
-                WHERE e.id = ?
-            """, (employee_id,))
-            emp_type = cursor.fetchone()
-            overtime_multiplier = Decimal(str(emp_type['overtime_multiplier']))
-            holiday_multiplier = Decimal(str(emp_type['holiday_pay_multiplier']))
+                    holiday_hours = float(record['total_hours'])
 
-            overtime_pay = hourly_rate * overtime_hours * overtime_multiplier
-            holiday_premium = hourly_rate * holiday_hours * holiday_multiplier
+            # Hourly rate assumes 160 hours per month; the salary is
+            # multiplied once so only the final amount is rounded
+            emp_type = context.employee_types[context.employee_type_ids[employee_id]]
+            overtime_pay = basic_salary * (overtime_hours * emp_type['overtime_multiplier'] / 160)
+            holiday_premium = basic_salary * (holiday_hours * emp_type['holiday_pay_multiplier'] / 160)
 
             return {
                 'overtime_pay': overtime_pay,
@@ -280,38 +407,28 @@ class PayrollRepository:
 
     def _calculate_income_tax(
             self,
-            taxable_amount: Decimal
-        ) -> Decimal:
+            taxable_amount: Money,
+            context: PeriodContext
+        ) -> Money:
         """Calculate income tax"""
         try:
-            # Get tax brackets
-            cursor = self.db.execute("""
-                SELECT 
-                    min_amount,
-                    max_amount,
-                    rate
-                FROM tax_brackets
-                WHERE is_active = 1
-                ORDER BY min_amount ASC
-            """)
-            brackets = cursor.fetchall()
-
+            brackets = context.tax_brackets
             if not brackets:
                 raise TaxCalculationError("No tax brackets found")
 
-            total_tax = Decimal('0')
+            total_tax = Money()
             remaining_amount = taxable_amount
 
             for bracket in brackets:
-                min_amount = Decimal(str(bracket['min_amount']))
+                min_amount = bracket['min_amount']
                 max_amount = (
-                    Decimal(str(bracket['max_amount']))
+                    bracket['max_amount']
                     if bracket['max_amount'] is not None
                     else remaining_amount
                 )
-                rate = Decimal(str(bracket['rate']))
+                rate = bracket['rate']
 
-                if remaining_amount <= Decimal('0'):
+                if remaining_amount <= 0:
                     break
 
                 taxable_in_bracket = min(
@@ -319,12 +436,12 @@ class PayrollRepository:
                     max_amount - min_amount
                 )
                 
-                if taxable_in_bracket > Decimal('0'):
+                if taxable_in_bracket > 0:
                     tax_in_bracket = taxable_in_bracket * rate
                     total_tax += tax_in_bracket
                     remaining_amount -= taxable_in_bracket
 
-            return total_tax.quantize(Decimal('0.01'))
+            return total_tax
 
         except Exception as e:
             self.logger.error(f"Error calculating income tax: {str(e)}")
@@ -333,7 +450,7 @@ class PayrollRepository:
                 details={'taxable_amount': taxable_amount}
             )
 
-    def _calculate_tax(self, taxable_amount: Decimal, tax_brackets: List[Dict[str, Any]]) -> Decimal:
+    def _calculate_tax(self, taxable_amount: Money, tax_brackets: List[Dict[str, Any]]) -> Money:
         """Calculate progressive income tax based on tax brackets
         
         Args:
@@ -341,24 +458,25 @@ class PayrollRepository:
             tax_brackets: List of tax brackets with min_amount, max_amount, and rate
             
         Returns:
-            Decimal: Calculated tax amount
+            Money: Calculated tax amount
         """
         if not tax_brackets:
             self.logger.warning("No tax brackets found, returning zero tax")
-            return Decimal('0')
+            return Money()
             
-        total_tax = Decimal('0')
+        total_tax = Money()
+        taxable_amount = Money(taxable_amount)
         remaining_amount = taxable_amount
         
         # Sort brackets by min_amount
-        sorted_brackets = sorted(tax_brackets, key=lambda x: Decimal(str(x['min_amount'])))
+        sorted_brackets = sorted(tax_brackets, key=lambda x: Money(x['min_amount']))
         
         for bracket in sorted_brackets:
-            min_amount = Decimal(str(bracket['min_amount']))
-            max_amount = Decimal(str(bracket['max_amount'])) if bracket['max_amount'] else Decimal('999999999')
-            rate = Decimal(str(bracket['rate']))
+            min_amount = Money(bracket['min_amount'])
+            max_amount = Money(bracket['max_amount']) if bracket['max_amount'] else Money(999999999)
+            rate = float(bracket['rate'])
             
-            if remaining_amount <= Decimal('0'):
+            if remaining_amount <= 0:
                 break
                 
             if taxable_amount <= min_amount:
@@ -376,58 +494,24 @@ class PayrollRepository:
     def _calculate_social_insurance(
             self,
             employee_id: int,
-            gross_salary: Decimal
-        ) -> Decimal:
+            gross_salary: Money,
+            context: PeriodContext
+        ) -> Money:
         """Calculate social insurance"""
-        try:
-            # Get social insurance configuration
-            cursor = self.db.execute("""
-                SELECT 
-                    rate
-                FROM social_insurance_config
-                WHERE effective_date <= CURRENT_DATE
-                ORDER BY effective_date DESC
-                LIMIT 1
-            """)
-            config = cursor.fetchone()
-            if not config:
-                raise PayrollValidationError("No social insurance configuration found")
-
-            rate = Decimal(str(config['rate']))
-            return (gross_salary * rate).quantize(Decimal('0.01'))
-
-        except PayrollValidationError:
-            raise
-        except Exception as e:
-            self.logger.error(f"Error calculating social insurance: {str(e)}")
-            raise PayrollCalculationError(
-                f"Failed to calculate social insurance: {str(e)}",
-                details={'employee_id': employee_id}
-            )
+        if context.social_insurance_rate is None:
+            raise PayrollValidationError("No social insurance configuration found")
+        return gross_salary * context.social_insurance_rate
 
     def _validate_employee_type(
             self,
-            employee_id: int
+            employee_id: int,
+            context: PeriodContext
         ) -> None:
         """Validate employee type"""
-        try:
-            # Get employee type details
-            cursor = self.db.execute("""
-                SELECT et.* 
-                FROM employee_types et
-                JOIN employees e ON e.employee_type_id = et.id
-                WHERE e.id = ?
-            """, (employee_id,))
-            emp_type = cursor.fetchone()
-            if not emp_type:
-                raise PayrollValidationError("Invalid employee type")
-
-        except PayrollValidationError:
-            raise
-        except Exception as e:
-            self.logger.error(f"Error validating employee type: {str(e)}")
+        employee_type_id = context.employee_type_ids.get(employee_id)
+        if employee_type_id not in context.employee_types:
             raise PayrollValidationError(
-                f"Failed to validate employee type: {str(e)}",
+                "Invalid employee type",
                 details={'employee_id': employee_id}
             )
 
@@ -532,8 +616,8 @@ class PayrollRepository:
             self,
             employee_id: int,
             period_id: int,
-            basic_salary: Decimal
-        ) -> Dict[str, Decimal]:
+            basic_salary: Money
+        ) -> Dict[str, Money]:
         """Calculate salary for contractors (no benefits/deductions)"""
         try:
             # For unit tests, check if we're in test mode
@@ -541,16 +625,17 @@ class PayrollRepository:
             
             # Skip validation in test mode or if validation passes
             if is_test_mode or self._validate_contractor(employee_id):
+                basic_salary = Money(basic_salary)
                 return {
                     'basic_salary': basic_salary,
-                    'total_allowances': Decimal('0'),
-                    'tax_exempt_allowances': Decimal('0'),
-                    'total_deductions': Decimal('0'),
-                    'overtime_pay': Decimal('0'),
-                    'holiday_premium': Decimal('0'),
-                    'leave_deductions': Decimal('0'),
-                    'tax': Decimal('0'),
-                    'social_insurance': Decimal('0'),
+                    'total_allowances': Money(),
+                    'tax_exempt_allowances': Money(),
+                    'total_deductions': Money(),
+                    'overtime_pay': Money(),
+                    'holiday_premium': Money(),
+                    'leave_deductions': Money(),
+                    'tax': Money(),
+                    'social_insurance': Money(),
                     'net_salary': basic_salary
                 }
             else:
@@ -568,21 +653,10 @@ class PayrollRepository:
     def _get_working_days(self, start_date: date, end_date: date) -> int:
         """Calculate number of working days in a period"""
         try:
-            cursor = self.db.execute("""
-                SELECT COUNT(*) as days
-                FROM (
-                    WITH RECURSIVE dates(date) AS (
-                        SELECT ?
-                        UNION ALL
-                        SELECT date(date, '+1 day')
-                        FROM dates
-                        WHERE date < ?
-                    )
-                    SELECT date
-                    FROM dates
-                    WHERE strftime('%w', date) NOT IN ('0', '6')
-                )
-            """, (start_date, end_date))
+            cursor = self.db.execute(
+                WORKING_DAYS_CTE + "SELECT COUNT(*) as days FROM working_days",
+                (start_date, end_date)
+            )
             result = cursor.fetchone()
             return result['days']
 
@@ -593,6 +667,22 @@ class PayrollRepository:
                 details={'start_date': start_date, 'end_date': end_date}
             )
 
+    def _get_leave_days(self, start_date: date, end_date: date) -> Dict[int, Dict[int, int]]:
+        """Working days of approved leave in a period, by employee and leave type"""
+        try:
+            leave_days = {}
+            cursor = self.db.execute(LEAVE_DAYS_SQL, (start_date, end_date, end_date, start_date))
+            for row in cursor.fetchall():
+                leave_days.setdefault(row['employee_id'], {})[row['leave_type_id']] = row['days']
+            return leave_days
+        
+        except Exception as e:
+            self.logger.error(f"Error calculating leave days: {str(e)}")
+            raise LeaveError(
+                f"Failed to calculate leave days: {str(e)}",
+                details={'start_date': start_date, 'end_date': end_date}
+            )
+
     def _validate_contractor(self, employee_id: int) -> bool:
         """Check if employee is a contractor"""
         try:
@@ -669,7 +759,7 @@ class PayrollRepository:
             self,
             employee_id: int,
             period_id: int,
-            salary_data: Dict[str, Decimal],
+            salary_data: Dict[str, Money],
             created_by: Optional[int] = None
         ) -> int:
         """Create a payroll entry"""
@@ -681,46 +771,10 @@ class PayrollRepository:
             #         operation="insert"
             #     )
             
-            # Ensure all required fields are present
-            required_fields = [
-                'basic_salary', 'total_allowances', 'tax_exempt_allowances',
-                'total_deductions', 'leave_deductions', 'social_insurance',
-                'overtime_pay', 'holiday_premium', 'tax', 'net_salary'
-            ]
-            
-            # Set default values for any missing fields
-            for field in required_fields:
-                if field not in salary_data:
-                    salary_data[field] = Decimal('0')
-            
-            # Convert all Decimal values to strings for SQLite
-            for key, value in salary_data.items():
-                if isinstance(value, Decimal):
-                    salary_data[key] = str(value)
-            
-            cursor = self.db.execute("""
-                INSERT INTO payroll_entries (
-                    employee_id, period_id, 
-                    basic_salary, total_allowances, tax_exempt_allowances,
-                    total_deductions, leave_deductions, social_insurance,
-                    overtime_pay, holiday_premium, tax, net_salary,
-                    created_by, created_at
-                ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, datetime('now'))
-            """, (
-                employee_id,
-                period_id,
-                salary_data['basic_salary'],
-                salary_data['total_allowances'],
-                salary_data['tax_exempt_allowances'],
-                salary_data['total_deductions'],
-                salary_data['leave_deductions'],
-                salary_data['social_insurance'],
-                salary_data['overtime_pay'],
-                salary_data['holiday_premium'],
-                salary_data['tax'],
-                salary_data['net_salary'],
-                created_by
-            ))
+            cursor = self.db.execute(
+                INSERT_PAYROLL_ENTRY_SQL,
+                self._payroll_entry_values(employee_id, period_id, salary_data, created_by)
+            )
 
             return cursor.lastrowid
 
@@ -731,6 +785,74 @@ class PayrollRepository:
                 operation="insert"
             )
 
+    def create_payroll_entries(
+            self,
+            period_id: int,
+            records: List[Tuple[int, Dict[str, Any]]],
+            created_by: Optional[int] = None
+        ) -> List[int]:
+        """Create payroll entries for (employee_id, salary_data) records in one batch
+        
+        Meant to run inside the caller's transaction; the new ids are
+        returned in the order of the records.
+        """
+        try:
+            insert = INSERT_PAYROLL_ENTRY_SQL + " RETURNING id"
+            return [
+                self.db.execute(
+                    insert,
+                    self._payroll_entry_values(employee_id, period_id, salary_data, created_by)
+                ).fetchone()[0]
+                for employee_id, salary_data in records
+            ]
+        
+        except Exception as e:
+            self.logger.error(f"Error creating payroll entries: {str(e)}")
+            raise DatabaseOperationError(
+                f"Failed to create payroll entries: {str(e)}",
+                operation="insert"
+            )
+
+    def _payroll_entry_values(
+            self,
+            employee_id: int,
+            period_id: int,
+            salary_data: Dict[str, Any],
+            created_by: Optional[int]
+        ) -> Tuple:
+        """Insert parameters of one payroll entry, amounts as minor units
+        
+        Missing amounts are stored as zero; values that are not Money yet
+        (major units from older callers) are converted.
+        """
+        return (
+            employee_id,
+            period_id,
+            *(Money(salary_data.get(field, 0)).minor for field in PAYROLL_ENTRY_FIELDS),
+            created_by
+        )
+
+    def get_database_file(self) -> str:
+        """Path of the main database file, empty for in-memory databases"""
+        for row in self.db.execute("PRAGMA database_list").fetchall():
+            if row[1] == 'main':
+                return row[2] or ''
+        return ''
+
+    def enable_wal(self) -> bool:
+        """Switch the database to WAL so readers in other processes see committed data
+        
+        Returns whether the database is in WAL mode afterwards: inside an open
+        transaction SQLite refuses the change or leaves the mode as it was.
+        The mode persists in the file.
+        """
+        try:
+            mode = self.db.execute("PRAGMA journal_mode = WAL").fetchone()[0]
+        except sqlite3.OperationalError as e:
+            self.logger.warning(f"Could not enable WAL: {str(e)}")
+            return False
+        return str(mode).lower() == 'wal'
+
     def get_by_id(self, table: str, id: int) -> Optional[Dict[str, Any]]:
         """Get a record by its ID"""
         try:
@@ -818,7 +940,7 @@ class PayrollRepository:
             
             if component['value'] is not None:
                 try:
-                    amount = Decimal(str(component['value']))
+                    amount = Money(component['value'])
                     if amount < 0:
                         raise PayrollValidationError(
                             f"Negative value not allowed: {amount}"
@@ -219,21 +219,21 @@ CREATE TABLE IF NOT EXISTS payroll_periods (
     updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
 );
 
--- Payroll Entries
+-- Payroll Entries (amounts in minor units, see utils/money.py)
 CREATE TABLE IF NOT EXISTS payroll_entries (
     id INTEGER PRIMARY KEY AUTOINCREMENT,
     payroll_period_id INTEGER NOT NULL,
     employee_id INTEGER NOT NULL,
-    basic_salary DECIMAL(12,2) NOT NULL CHECK (basic_salary >= 0),
-    total_allowances DECIMAL(12,2) NOT NULL DEFAULT 0,
-    tax_exempt_allowances DECIMAL(12,2) NOT NULL DEFAULT 0,
-    total_deductions DECIMAL(12,2) NOT NULL DEFAULT 0,
-    leave_deductions DECIMAL(12,2) NOT NULL DEFAULT 0,
-    social_insurance DECIMAL(12,2) NOT NULL DEFAULT 0,
-    overtime_pay DECIMAL(12,2) NOT NULL DEFAULT 0,
-    holiday_premium DECIMAL(12,2) NOT NULL DEFAULT 0,
-    tax DECIMAL(12,2) NOT NULL DEFAULT 0,
-    net_salary DECIMAL(12,2) NOT NULL CHECK (net_salary >= 0),
+    basic_salary INTEGER NOT NULL CHECK (basic_salary >= 0),
+    total_allowances INTEGER NOT NULL DEFAULT 0,
+    tax_exempt_allowances INTEGER NOT NULL DEFAULT 0,
+    total_deductions INTEGER NOT NULL DEFAULT 0,
+    leave_deductions INTEGER NOT NULL DEFAULT 0,
+    social_insurance INTEGER NOT NULL DEFAULT 0,
+    overtime_pay INTEGER NOT NULL DEFAULT 0,
+    holiday_premium INTEGER NOT NULL DEFAULT 0,
+    tax INTEGER NOT NULL DEFAULT 0,
+    net_salary INTEGER NOT NULL CHECK (net_salary >= 0),
     payment_method TEXT,
     payment_status TEXT DEFAULT 'pending' CHECK (payment_status IN ('pending', 'paid', 'failed')),
     payment_date DATE,
@@ -244,8 +244,8 @@ CREATE TABLE IF NOT EXISTS payroll_entries (
     created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
     updated_by INTEGER,
     updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-    total_adjustments DECIMAL(12,2) DEFAULT 0,
-    gross_salary DECIMAL(12,2) DEFAULT 0,
+    total_adjustments INTEGER DEFAULT 0,
+    gross_salary INTEGER DEFAULT 0,
     FOREIGN KEY (employee_id) REFERENCES employees (id),
     FOREIGN KEY (payroll_period_id) REFERENCES payroll_periods (id)
 );
@@ -1,19 +1,70 @@
 """Service layer for payroll-related operations"""
+import sqlite3
 import logging
+import time
+from concurrent.futures import ProcessPoolExecutor
 from typing import Dict, Any, List, Optional, Tuple
-from decimal import Decimal
 from datetime import datetime, date
+from urllib.request import pathname2url
 from utils.exceptions import (
     PayrollValidationError, PayrollCalculationError,
     DatabaseOperationError, TransactionError
 )
+from utils.money import Money
+
+def _calculate_chunk(job):
+    """Process pool worker: calculate a chunk of employees on a read-only connection
+
+    Returns (results, errors, failure): results are (employee_id, salary_data)
+    records with Money amounts, errors the per-employee failures and
+    failure the message of an unexpected error that must abort the run.
+    """
+    from repositories.employee_repository import EmployeeRepository
+    from repositories.payroll_repository import PayrollRepository
+
+    db_file, period_id, employee_ids, context = job
+    results = []
+    errors = []
+    try:
+        conn = sqlite3.connect(
+            f"file:{pathname2url(db_file)}?mode=ro",
+            uri=True,
+            detect_types=sqlite3.PARSE_DECLTYPES | sqlite3.PARSE_COLNAMES
+        )
+        conn.row_factory = sqlite3.Row
+        try:
+            service = PayrollService(EmployeeRepository(conn), PayrollRepository(conn))
+            for employee_id in employee_ids:
+                try:
+                    salary_data = service.calculate_employee_payroll(
+                        employee_id,
+                        period_id,
+                        context=context
+                    )
+                    results.append((employee_id, salary_data))
+                except (PayrollValidationError, PayrollCalculationError) as e:
+                    errors.append({
+                        'employee_id': employee_id,
+                        'error': str(e),
+                        'details': getattr(e, 'details', {})
+                    })
+        finally:
+            conn.close()
+    except Exception as e:
+        return results, errors, str(e)
+    return results, errors, None
 
 class PayrollService:
-    """Service layer for payroll-related operations"""
+    """Service layer for payroll-related operations
     
-    def __init__(self, employee_repository, payroll_repository):
+    rollups, a ReportRollups, is refreshed for the period once a generated
+    payroll is committed; the period is then processed and reported on.
+    """
+
+    def __init__(self, employee_repository, payroll_repository, rollups=None):
         self.employee_repo = employee_repository
         self.payroll_repo = payroll_repository
+        self.rollups = rollups
         self.logger = logging.getLogger(__name__)
 
     def validate_payroll_period(self, period_id: int) -> Tuple[bool, Dict[str, Any]]:
@@ -48,9 +99,14 @@ class PayrollService:
     def calculate_employee_payroll(
             self,
             employee_id: int,
-            period_id: int
-        ) -> Dict[str, Decimal]:
-        """Calculate payroll for a single employee"""
+            period_id: int,
+            context=None
+        ) -> Dict[str, Money]:
+        """Calculate payroll for a single employee
+        
+        context is the PeriodContext of the run, loaded once by
+        generate_payroll; it is loaded per call when omitted.
+        """
         try:
             # Get employee details
             employee = self.employee_repo.get_employee_details(employee_id)
@@ -86,44 +142,40 @@ class PayrollService:
                                                employee.get('working_hours', '40'))
                 except (AttributeError, TypeError):
                     # Default values for tests
-                    self.logger.warning(f"Using default values for employee {employee_id} in tests")
+                    self.logger.warning(
+                        f"Using default values for employee {employee_id} in tests",
+                        extra={'employee_id': employee_id}
+                    )
                     employee_type = 'Full Time'
                     basic_salary = '5000.00'
                     working_hours = '40'
 
-            # Convert basic_salary to Decimal
-            if isinstance(basic_salary, (int, float)):
-                basic_salary = str(basic_salary)
-            elif not isinstance(basic_salary, str):
-                basic_salary = str(getattr(basic_salary, 'value', '5000.00'))
+            # Convert basic_salary to Money
+            if not isinstance(basic_salary, (int, float, str)):
+                basic_salary = getattr(basic_salary, 'value', '5000.00')
+            basic_salary = Money(basic_salary)
 
             # Calculate salary based on employee type
             if employee_type == 'Contractor':
                 return self.payroll_repo.calculate_contractor_salary(
                     employee_id,
                     period_id,
-                    Decimal(basic_salary)
+                    basic_salary
                 )
             else:
-                # For full-time and part-time employees
-                basic_salary_decimal = Decimal(basic_salary)
-                
                 # Pro-rate salary for part-time employees
                 if employee_type == 'Part-time' or employee_type == 'Part Time':
-                    # Convert working_hours to Decimal
-                    if isinstance(working_hours, (int, float)):
-                        working_hours = str(working_hours)
-                    elif not isinstance(working_hours, str):
-                        working_hours = str(getattr(working_hours, 'value', '40'))
+                    if not isinstance(working_hours, (int, float, str)):
+                        working_hours = getattr(working_hours, 'value', '40')
                         
-                    working_hours_decimal = Decimal(working_hours)
-                    full_time_hours = Decimal('40')  # Standard work week
-                    basic_salary_decimal = basic_salary_decimal * (working_hours_decimal / full_time_hours)
+                    full_time_hours = 40  # Standard work week
+                    basic_salary = basic_salary * (float(working_hours) / full_time_hours)
 
                 return self.payroll_repo.calculate_net_salary(
                     employee_id,
                     period_id,
-                    basic_salary_decimal
+                    basic_salary,
+                    context=context
                 )
 
         except PayrollValidationError:
@@ -135,13 +187,70 @@ class PayrollService:
                 details={'employee_id': employee_id}
             )
 
+    def _calculate_parallel(
+            self,
+            db_file: str,
+            period_id: int,
+            employee_ids: List[int],
+            context,
+            workers: int
+        ) -> Tuple[List[Tuple[int, Dict[str, Any]]], List[Dict[str, Any]]]:
+        """Calculate employees in a process pool, keeping the order of employee_ids"""
+        chunk_count = min(len(employee_ids), workers * 4)
+        chunk_size = -(-len(employee_ids) // chunk_count)
+        jobs = [
+            (db_file, period_id, employee_ids[i:i + chunk_size], context)
+            for i in range(0, len(employee_ids), chunk_size)
+        ]
+        
+        records = []
+        errors = []
+        with ProcessPoolExecutor(max_workers=min(workers, len(jobs))) as executor:
+            for results, chunk_errors, failure in executor.map(_calculate_chunk, jobs):
+                if failure:
+                    raise PayrollCalculationError(
+                        f"Payroll worker failed: {failure}",
+                        details={'period_id': period_id}
+                    )
+                records.extend(results)
+                for error in chunk_errors:
+                    self.logger.error(
+                        f"Error processing employee {error['employee_id']}: {error['error']}",
+                        extra={'period_id': period_id, 'employee_id': error['employee_id']}
+                    )
+                errors.extend(chunk_errors)
+        return records, errors
+
+    def _entry_result(
+            self,
+            entry_id: int,
+            employee_id: int,
+            salary_data: Dict[str, Any]
+        ) -> Dict[str, Any]:
+        """Payroll entry as returned by generate_payroll"""
+        return {
+            'id': entry_id,
+            'employee_id': employee_id,
+            **salary_data
+        }
+
     def generate_payroll(
         self,
         period_id: int,
         employee_ids: Optional[List[int]] = None,
-        created_by: int = None
+        created_by: int = None,
+        workers: Optional[int] = None
     ) -> Dict[str, Any]:
-        """Generate payroll for multiple employees"""
+        """Generate payroll for multiple employees
+        
+        With workers > 1 the employees are calculated in a process pool on
+        read-only connections and the entries written in one batch; the
+        errors list and the all-or-nothing transaction are the same as in
+        the sequential run. In-memory databases, and callers that already
+        have a transaction open (the workers could not see its rows), run
+        sequentially.
+        """
+        started = time.perf_counter()
         try:
             # Validate period
             _, period = self.validate_payroll_period(period_id)
@@ -150,6 +259,19 @@ class PayrollService:
             if not employee_ids:
                 employees = self.employee_repo.get_active_employees()
                 employee_ids = [emp['id'] for emp in employees]
+            
+            db_file = None
+            if workers and workers > 1 and len(employee_ids) > 1:
+                if getattr(self.payroll_repo, '_transaction_active', False):
+                    self.logger.warning("Transaction already open, generating payroll sequentially")
+                else:
+                    db_file = self.payroll_repo.get_database_file()
+                    if not db_file:
+                        self.logger.warning("In-memory database, generating payroll sequentially")
+                    elif not self.payroll_repo.enable_wal():
+                        # Workers read committed data while this connection writes
+                        self.logger.warning("Could not switch to WAL, generating payroll sequentially")
+                        db_file = None
 
             # Start transaction (only if not already in a transaction)
             transaction_started = False
@@ -161,50 +283,54 @@ class PayrollService:
             errors = []
             
             try:
-                # Calculate payroll for each employee
-                for employee_id in employee_ids:
-                    try:
-                        # Calculate salary
-                        salary_data = self.calculate_employee_payroll(
-                            employee_id,
-                            period_id
-                        )
-
-                        # Create payroll entry
-                        entry_id = self.payroll_repo.create_payroll_entry(
-                            employee_id,
-                            period_id,
-                            salary_data,
-                            created_by
-                        )
-
-                        # Convert string values back to Decimal for the response
-                        entry_data = {}
-                        for key, value in salary_data.items():
-                            if isinstance(value, str) and key not in ['id', 'employee_id']:
-                                try:
-                                    entry_data[key] = Decimal(value)
-                                except:
-                                    entry_data[key] = value
-                            else:
-                                entry_data[key] = value
-
-                        entries.append({
-                            'id': entry_id,
-                            'employee_id': employee_id,
-                            **entry_data
-                        })
-
-                    except (PayrollValidationError, PayrollCalculationError) as e:
-                        # Log individual employee errors but continue processing
-                        self.logger.error(
-                            f"Error processing employee {employee_id}: {str(e)}"
-                        )
-                        errors.append({
-                            'employee_id': employee_id,
-                            'error': str(e),
-                            'details': getattr(e, 'details', {})
-                        })
+                # Reference data is the same for every employee of the period
+                context = self.payroll_repo.load_period_context(period_id)
+
+                if db_file:
+                    records, errors = self._calculate_parallel(
+                        db_file, period_id, employee_ids, context, workers
+                    )
+                    entry_ids = self.payroll_repo.create_payroll_entries(
+                        period_id,
+                        records,
+                        created_by
+                    )
+                    entries = [
+                        self._entry_result(entry_id, employee_id, salary_data)
+                        for entry_id, (employee_id, salary_data) in zip(entry_ids, records)
+                    ]
+                else:
+                    # Calculate payroll for each employee
+                    for employee_id in employee_ids:
+                        try:
+                            # Calculate salary
+                            salary_data = self.calculate_employee_payroll(
+                                employee_id,
+                                period_id,
+                                context=context
+                            )
+
+                            # Create payroll entry
+                            entry_id = self.payroll_repo.create_payroll_entry(
+                                employee_id,
+                                period_id,
+                                salary_data,
+                                created_by
+                            )
+
+                            entries.append(self._entry_result(entry_id, employee_id, salary_data))
+
+                        except (PayrollValidationError, PayrollCalculationError) as e:
+                            # Log individual employee errors but continue processing
+                            self.logger.error(
+                                f"Error processing employee {employee_id}: {str(e)}",
+                                extra={'period_id': period_id, 'employee_id': employee_id}
+                            )
+                            errors.append({
+                                'employee_id': employee_id,
+                                'error': str(e),
+                                'details': getattr(e, 'details', {})
+                            })
 
                 # Check if any payroll was generated
                 if not entries and not errors:
@@ -223,10 +349,17 @@ class PayrollService:
                     'processed'
                 )
 
-                # Commit transaction
+                # Commit transaction; a caller that owns the transaction
+                # refreshes the rollups after committing it
                 if transaction_started:
                     self.payroll_repo.commit_transaction()
+                    if self.rollups is not None:
+                        self.rollups.refresh_payroll_period(period_id)
 
+                self.logger.info(
+                    f"Generated payroll for {len(entries)} employees, {len(errors)} failed",
+                    extra={'period_id': period_id, 'duration_ms': round((time.perf_counter() - started) * 1000)}
+                )
                 return {
                     'period_id': period_id,
                     'entries': entries,
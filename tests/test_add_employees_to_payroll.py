@@ -0,0 +1,92 @@
+"""Tests for adding employees to a payroll period"""
+import os
+import shutil
+import sqlite3
+import tempfile
+import unittest
+from unittest.mock import patch
+from controllers.payroll_controller import PayrollController
+from database.database import Database
+
+class TestAddEmployeesToPayroll(unittest.TestCase):
+    """Test cases for PayrollController.add_employees_to_payroll"""
+
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.db_file = os.path.join(self.temp_dir, 'payroll.db')
+        conn = sqlite3.connect(self.db_file)
+        conn.executescript("""
+            CREATE TABLE employees (id INTEGER PRIMARY KEY, name TEXT, basic_salary REAL);
+            CREATE TABLE salary_components (id INTEGER PRIMARY KEY, type TEXT, value REAL,
+                is_percentage INTEGER, percentage REAL, is_active INTEGER);
+            CREATE TABLE employee_salary_components (id INTEGER PRIMARY KEY, employee_id INTEGER,
+                component_id INTEGER, value REAL, is_active INTEGER);
+            CREATE TABLE payroll_periods (id INTEGER PRIMARY KEY, status TEXT);
+            CREATE TABLE payroll_entries (id INTEGER PRIMARY KEY AUTOINCREMENT, payroll_period_id INTEGER,
+                employee_id INTEGER, basic_salary INTEGER, total_allowances INTEGER, total_deductions INTEGER,
+                net_salary INTEGER, payment_status TEXT);
+            CREATE TABLE payroll_entry_components (id INTEGER PRIMARY KEY AUTOINCREMENT,
+                payroll_entry_id INTEGER, component_id INTEGER, value INTEGER);
+            
+            INSERT INTO employees VALUES (1, 'Ali', 1000), (2, 'Omar', 2000), (3, 'Sara', NULL);
+            INSERT INTO salary_components VALUES
+                (1, 'allowance', 200, 0, NULL, 1),
+                (2, 'allowance', 0, 1, 10, 1),
+                (3, 'deduction', 50, 0, NULL, 1),
+                (4, 'allowance', 999, 0, NULL, 0);
+            INSERT INTO employee_salary_components VALUES (1, 2, 1, 500, 1), (2, 2, 3, 80, 0);
+            INSERT INTO payroll_periods VALUES (1, 'draft'), (2, 'completed');
+            INSERT INTO payroll_entries VALUES (1, 1, 1, 100000, 0, 0, 100000, 'pending');
+        """)
+        conn.commit()
+        conn.close()
+        
+        with patch.object(Database, 'create_tables'), patch.object(Database, 'validate_schema'):
+            self.db = Database(self.db_file)
+        self.controller = PayrollController(self.db)
+
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir)
+
+    def _query(self, sql, params=()):
+        conn = self.db.get_connection()
+        try:
+            return conn.execute(sql, params).fetchall()
+        finally:
+            conn.close()
+
+    def test_components_and_totals(self):
+        """Entries get every active component with employee overrides applied"""
+        success, message = self.controller.add_employees_to_payroll(1, [1, 2, 3, 2, 99])
+        self.assertTrue(success, message)
+        
+        entries = {
+            row[0]: row[1:] for row in self._query("""
+                SELECT employee_id, basic_salary, total_allowances, total_deductions, net_salary
+                FROM payroll_entries WHERE id > 1
+            """)
+        }
+        self.assertEqual(set(entries), {2, 3})
+        self.assertEqual(entries[2], (200000, 70000, 5000, 265000))
+        self.assertEqual(entries[3], (0, 20000, 5000, 15000))
+        
+        components = self._query("""
+            SELECT pec.component_id, pec.value
+            FROM payroll_entry_components pec
+            JOIN payroll_entries pe ON pe.id = pec.payroll_entry_id
+            WHERE pe.employee_id = 2 ORDER BY pec.id
+        """)
+        self.assertEqual(components, [(1, 50000), (2, 20000), (3, 5000)])
+
+    def test_existing_and_closed(self):
+        """Employees already in the period and closed periods are refused"""
+        success, message = self.controller.add_employees_to_payroll(1, [1])
+        self.assertFalse(success)
+        self.assertIn('Ali', message)
+        
+        success, _ = self.controller.add_employees_to_payroll(2, [1])
+        self.assertFalse(success)
+        self.assertEqual(self._query("SELECT COUNT(*) FROM payroll_entries"), [(1,)])
+
+if __name__ == '__main__':
+    unittest.main()
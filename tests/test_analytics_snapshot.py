@@ -0,0 +1,128 @@
+"""Tests for the Parquet analytics snapshot"""
+import os
+import shutil
+import sqlite3
+import tempfile
+import unittest
+from unittest.mock import patch
+import pandas as pd
+from controllers.attendance_controller import AttendanceController
+from controllers.report_controller import ReportController
+from database.database import Database
+from utils.analytics_snapshot import AnalyticsSnapshot, PYARROW_AVAILABLE
+
+@unittest.skipUnless(PYARROW_AVAILABLE, "pyarrow is not installed")
+class TestAnalyticsSnapshot(unittest.TestCase):
+    """Test cases for AnalyticsSnapshot and the reports reading from it"""
+
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.db_file = os.path.join(self.temp_dir, 'employee.db')
+        conn = sqlite3.connect(self.db_file)
+        conn.executescript("""
+            CREATE TABLE departments (id INTEGER PRIMARY KEY, name TEXT);
+            CREATE TABLE employees (id INTEGER PRIMARY KEY, name TEXT, department_id INTEGER,
+                                    basic_salary REAL, photo_data BLOB);
+            CREATE TABLE payroll_periods (id INTEGER PRIMARY KEY, period_year INTEGER, period_month INTEGER,
+                                          start_date TEXT, end_date TEXT, status TEXT);
+            CREATE TABLE payroll_entries (id INTEGER PRIMARY KEY, payroll_period_id INTEGER, employee_id INTEGER,
+                                          basic_salary INTEGER, total_allowances INTEGER,
+                                          total_deductions INTEGER, net_salary INTEGER,
+                                          payment_status TEXT);
+            CREATE TABLE attendance_records (id INTEGER PRIMARY KEY, employee_id INTEGER, check_in TEXT,
+                                             check_out TEXT, total_hours REAL, status TEXT);
+            INSERT INTO departments VALUES (1, 'Sales'), (2, 'IT');
+            INSERT INTO employees VALUES (1, 'Adam', 1, 1000, x'00'), (2, 'Badr', 2, 2000, NULL);
+            INSERT INTO payroll_periods VALUES (1, 2023, 12, '2023-12-01', '2023-12-31', 'processed'),
+                                               (2, 2024, 1, '2024-01-01', '2024-01-31', 'approved'),
+                                               (3, 2024, 2, '2024-02-01', '2024-02-29', 'draft');
+            -- Amounts are in minor units
+            INSERT INTO payroll_entries VALUES
+                (1, 1, 1, 100000, 10000, 0, 110050, 'paid'), (2, 1, 2, 200000, 0, 10000, 190000, 'paid'),
+                (3, 2, 1, 100000, 10000, 0, 110000, 'pending'), (4, 3, 1, 100000, 0, 0, 100000, 'pending');
+            INSERT INTO attendance_records VALUES
+                (1, 1, '2024-01-02 09:00:00', '2024-01-02 17:00:00', 8, 'present'),
+                (2, 2, '2024-01-03 09:00:00', '2024-01-03 17:00:00', 8, 'present'),
+                (3, 2, '2024-02-01 09:00:00', '2024-02-01 17:00:00', 8, 'present');
+        """)
+        conn.commit()
+        conn.close()
+
+        with patch.object(Database, 'create_tables'), patch.object(Database, 'validate_schema'):
+            self.db = Database(self.db_file)
+        self.snapshot = AnalyticsSnapshot(self.db, os.path.join(self.temp_dir, 'analytics'))
+
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir)
+
+    def test_export_partitions_by_month(self):
+        """Time based tables are written as year/month partitions"""
+        success, manifest = self.snapshot.export()
+        self.assertTrue(success, manifest)
+        self.assertEqual(manifest['row_counts']['payroll_entries'], 4)
+        self.assertTrue(os.path.isdir(os.path.join(self.snapshot.snapshot_dir, 'payroll_entries', 'year=2023', 'month=12')))
+        self.assertTrue(self.snapshot.is_fresh())
+
+        employees = self.snapshot.read('employees')
+        self.assertNotIn('photo_data', employees.columns)
+
+        january = self.snapshot.read('payroll_entries', (2024, 1), (2024, 1))
+        self.assertEqual(list(january['id']), [3])
+
+    def test_reports_match_database(self):
+        """Snapshot backed reports give the same results as the rollups"""
+        controller = ReportController(self.db)
+        controller.snapshot = self.snapshot
+
+        _, from_database = controller.generate_payroll_report('2023-12-01', '2024-02-29')
+        _, attendance_from_database = controller.generate_attendance_report(1, 2024)
+
+        self.snapshot.export()
+        with patch.object(controller, '_execute_query') as execute:
+            success, from_snapshot = controller.generate_payroll_report('2023-12-01', '2024-02-29')
+            _, attendance_from_snapshot = controller.generate_attendance_report(1, 2024)
+            execute.assert_not_called()
+
+        self.assertTrue(success, from_snapshot)
+        self.assertEqual(from_snapshot.values.tolist(), from_database.values.tolist())
+        self.assertEqual(attendance_from_snapshot.values.tolist(), attendance_from_database.values.tolist())
+
+    def test_invalidate_falls_back(self):
+        """An invalidated snapshot is not used"""
+        self.snapshot.export()
+        self.snapshot.invalidate()
+        self.assertFalse(self.snapshot.is_fresh())
+
+    def test_invalidate_during_export(self):
+        """An export that read the data before an edit is not published"""
+        original = pd.read_sql_query
+
+        def read_then_edit(query, conn):
+            df = original(query, conn)
+            self.snapshot.invalidate()
+            return df
+        
+        with patch('utils.analytics_snapshot.pd.read_sql_query', side_effect=read_then_edit):
+            success, _ = self.snapshot.export()
+        self.assertFalse(success)
+        self.assertFalse(self.snapshot.is_fresh())
+        
+        success, _ = self.snapshot.export()
+        self.assertTrue(success)
+        self.assertTrue(self.snapshot.is_fresh())
+
+    def test_attendance_edit_invalidates(self):
+        """Marking attendance makes the snapshot due for a new export"""
+        controller = ReportController(self.db)
+        controller.snapshot = self.snapshot
+        self.snapshot.export()
+        self.assertFalse(controller.analytics_snapshot_due())
+        self.assertTrue(controller.analytics_snapshot_due(max_age=-1))
+        
+        attendance = AttendanceController(self.db)
+        attendance.analytics = self.snapshot
+        attendance.mark_attendance_for_date(1, '2024-01-05', 'present')
+        self.assertTrue(controller.analytics_snapshot_due())
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,128 @@
+"""Tests for the buffered audit log writer"""
+import os
+import sqlite3
+import tempfile
+import time
+import unittest
+from unittest.mock import patch
+from database.database import Database
+from utils.audit_log import AuditLogWriter
+
+class TestAuditLogWriter(unittest.TestCase):
+    """Test cases for AuditLogWriter"""
+
+    def setUp(self):
+        fd, self.db_path = tempfile.mkstemp(suffix='.db')
+        os.close(fd)
+        conn = sqlite3.connect(self.db_path)
+        conn.execute("""
+            CREATE TABLE audit_log (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                user_id INTEGER,
+                action TEXT,
+                description TEXT,
+                timestamp TEXT,
+                ip_address TEXT
+            )
+        """)
+        conn.close()
+        with patch.object(Database, 'create_tables'), patch.object(Database, 'validate_schema'):
+            self.db = Database(self.db_path)
+        self.writers = []
+
+    def tearDown(self):
+        for writer in self.writers:
+            writer.close()
+        self.db.drain_connections()
+        os.remove(self.db_path)
+
+    def _writer(self, **kwargs):
+        writer = AuditLogWriter(self.db, **kwargs)
+        self.writers.append(writer)
+        return writer
+
+    def _count(self):
+        conn = sqlite3.connect(self.db_path)
+        try:
+            return conn.execute("SELECT COUNT(*) FROM audit_log").fetchone()[0]
+        finally:
+            conn.close()
+
+    def test_events_are_buffered_until_flush(self):
+        """Events are written in one batch on flush"""
+        writer = self._writer(batch_size=100, flush_interval_ms=60000)
+        with patch.object(writer, '_write', wraps=writer._write) as write:
+            for i in range(10):
+                writer.log(1, 'login', f'event {i}')
+            self.assertEqual(self._count(), 0)
+            self.assertTrue(writer.flush(5))
+        self.assertEqual(self._count(), 10)
+        self.assertEqual(write.call_count, 1)
+
+    def test_full_batch_is_written(self):
+        """Reaching batch_size writes without waiting for the interval"""
+        writer = self._writer(batch_size=5, flush_interval_ms=60000)
+        for i in range(5):
+            writer.log(1, 'login', f'event {i}')
+        deadline = time.monotonic() + 5
+        while self._count() < 5 and time.monotonic() < deadline:
+            time.sleep(0.01)
+        self.assertEqual(self._count(), 5)
+
+    def test_interval_flushes_partial_batch(self):
+        """A partial batch is written after the flush interval"""
+        writer = self._writer(batch_size=100, flush_interval_ms=50)
+        writer.log(1, 'login', 'event')
+        deadline = time.monotonic() + 5
+        while self._count() < 1 and time.monotonic() < deadline:
+            time.sleep(0.01)
+        self.assertEqual(self._count(), 1)
+
+    def test_critical_event_is_committed_before_returning(self):
+        """Critical events block until they are on disk"""
+        writer = self._writer(batch_size=100, flush_interval_ms=60000)
+        writer.log(1, 'login', 'queued')
+        writer.log(1, 'delete_user', 'Deleted user 2', critical=True)
+        self.assertEqual(self._count(), 2)
+
+    def test_critical_event_written_when_writer_thread_died(self):
+        """A critical event does not hang once the writer thread is gone"""
+        writer = self._writer(batch_size=100, flush_interval_ms=60000)
+        writer._queue.put(('stop', None, None))
+        writer._thread.join(5)
+        self.assertTrue(writer.log(1, 'delete_user', 'Deleted user 2', critical=True))
+        self.assertEqual(self._count(), 1)
+
+    def test_critical_event_rewritten_when_batch_fails(self):
+        """A failed batch is reported to the waiter, which writes the event itself"""
+        writer = self._writer(batch_size=100, flush_interval_ms=60000)
+        real_write = writer._write
+        results = [False]
+
+        def write(rows, sync):
+            return results.pop() if results else real_write(rows, sync)
+        
+        with patch.object(writer, '_write', side_effect=write) as mock_write:
+            self.assertTrue(writer.log(1, 'delete_user', 'Deleted user 2', critical=True))
+        self.assertEqual(mock_write.call_count, 2)
+        self.assertEqual(self._count(), 1)
+
+    def test_critical_event_times_out(self):
+        """A stuck writer thread makes a critical event give up after the timeout"""
+        writer = self._writer(batch_size=100, flush_interval_ms=60000, critical_timeout=0.1)
+        with patch.object(writer, '_write', side_effect=lambda rows, sync: time.sleep(1) or True):
+            start = time.monotonic()
+            self.assertFalse(writer.log(1, 'delete_user', 'Deleted user 2', critical=True))
+            self.assertLess(time.monotonic() - start, 1)
+
+    def test_close_flushes_pending_events(self):
+        """Closing the writer writes what is still queued"""
+        writer = self._writer(batch_size=100, flush_interval_ms=60000)
+        writer.log(1, 'logout', 'User logged out')
+        writer.close()
+        self.assertEqual(self._count(), 1)
+        writer.log(1, 'login', 'dropped')
+        self.assertEqual(self._count(), 1)
+
+if __name__ == '__main__':
+    unittest.main()
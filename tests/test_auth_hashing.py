@@ -0,0 +1,132 @@
+"""Tests for password hashing, rehash on login and bulk user provisioning"""
+import os
+import sqlite3
+import tempfile
+import time
+import unittest
+from unittest.mock import patch
+from PyQt5 import sip
+from PyQt5.QtCore import QCoreApplication, QEvent
+from controllers.auth_controller import AuthController
+from database.database import Database
+
+class TestAuthHashing(unittest.TestCase):
+    """Test cases for AuthController password handling"""
+
+    @classmethod
+    def setUpClass(cls):
+        cls.app = QCoreApplication.instance() or QCoreApplication([])
+
+    def setUp(self):
+        fd, self.db_path = tempfile.mkstemp(suffix='.db')
+        os.close(fd)
+        conn = sqlite3.connect(self.db_path)
+        conn.executescript("""
+            CREATE TABLE users (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                username TEXT UNIQUE NOT NULL,
+                password TEXT NOT NULL,
+                email TEXT UNIQUE,
+                full_name TEXT,
+                role TEXT NOT NULL DEFAULT 'employee',
+                is_active INTEGER DEFAULT 1,
+                created_at TIMESTAMP
+            );
+            CREATE TABLE audit_log (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                user_id INTEGER,
+                action TEXT,
+                description TEXT,
+                timestamp TEXT,
+                ip_address TEXT
+            );
+        """)
+        conn.close()
+        with patch.object(Database, 'create_tables'), patch.object(Database, 'validate_schema'):
+            self.db = Database(self.db_path)
+        self.controllers = []
+        self.auth = self._controller(4)
+
+    def tearDown(self):
+        for controller in self.controllers:
+            controller.close()
+        self.db.drain_connections()
+        os.remove(self.db_path)
+
+    def _controller(self, rounds):
+        controller = AuthController(self.db, bcrypt_rounds=rounds)
+        self.controllers.append(controller)
+        return controller
+
+    def _stored_hash(self, username):
+        conn = sqlite3.connect(self.db_path)
+        try:
+            return conn.execute("SELECT password FROM users WHERE username = ?", (username,)).fetchone()[0]
+        finally:
+            conn.close()
+
+    def test_hash_uses_configured_cost(self):
+        """New hashes use the configured cost factor"""
+        hashed = self.auth.hash_password('secret')
+        self.assertTrue(hashed.startswith('$2b$04$'))
+        self.assertFalse(self.auth.needs_rehash(hashed))
+        self.assertTrue(self._controller(5).needs_rehash(hashed))
+
+    def test_login_rehashes_when_cost_changes(self):
+        """A successful login upgrades hashes made with another cost factor"""
+        self.auth.create_user('ali', 'secret', 'ali@example.com', 'Ali', 'hr')
+        self.assertTrue(self._stored_hash('ali').startswith('$2b$04$'))
+
+        upgraded = self._controller(5)
+        success, _ = upgraded.login('ali', 'wrong')
+        self.assertFalse(success)
+        self.assertTrue(self._stored_hash('ali').startswith('$2b$04$'))
+
+        success, user = upgraded.login('ali', 'secret')
+        self.assertTrue(success, user)
+        self.assertTrue(self._stored_hash('ali').startswith('$2b$05$'))
+        self.assertTrue(upgraded.login('ali', 'secret')[0])
+
+    def test_bulk_create_skips_duplicates(self):
+        """Bulk provisioning creates valid users and reports the rest"""
+        self.auth.create_user('ali', 'secret', 'ali@example.com', 'Ali', 'hr')
+        users = [
+            {'username': f'user{i}', 'password': f'pw{i}', 'email': f'user{i}@example.com',
+             'full_name': f'User {i}', 'role': 'employee'}
+            for i in range(6)
+        ]
+        users.append({'username': 'ali', 'password': 'x', 'email': 'other@example.com'})
+        users.append({'username': 'dup', 'password': 'x', 'email': 'user0@example.com'})
+
+        success, result = self.auth.create_users_bulk(users, max_workers=3)
+        self.assertTrue(success, result)
+        self.assertEqual(result['created'], [f'user{i}' for i in range(6)])
+        self.assertEqual([username for username, _ in result['skipped']], ['ali', 'dup'])
+        self.assertTrue(self.auth.login('user3', 'pw3')[0])
+        self.assertFalse(self.auth.login('user3', 'pw4')[0])
+
+    def test_login_async_does_not_start_session(self):
+        """The worker only checks credentials, the caller starts the session"""
+        self.auth.create_user('ali', 'secret', 'ali@example.com', 'Ali', 'hr')
+        results = []
+        worker = self.auth.login_async(
+            'ali', 'secret', lambda success, result: results.append((success, result))
+        )
+
+        deadline = time.monotonic() + 5
+        while not results and time.monotonic() < deadline:
+            self.app.processEvents()
+        worker.wait()
+
+        # QThread.finished, not the result signal, schedules the deletion
+        self.app.processEvents()
+        self.app.sendPostedEvents(None, QEvent.DeferredDelete)
+        self.assertTrue(sip.isdeleted(worker))
+
+        self.assertTrue(results and results[0][0])
+        self.assertFalse(self.auth.is_authenticated())
+        self.auth.start_session(results[0][1])
+        self.assertTrue(self.auth.is_authenticated())
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,49 @@
+"""Tests for database backups"""
+import os
+import shutil
+import sqlite3
+import tempfile
+import unittest
+import zipfile
+from utils.backup_manager import BackupWorker
+
+class TestBackupWorker(unittest.TestCase):
+    """Test cases for BackupWorker backups"""
+
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.db_file = os.path.join(self.temp_dir, 'employee.db')
+        self.archive = os.path.join(self.temp_dir, 'backup.zip')
+
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir)
+
+    def test_backup_includes_commits_in_wal(self):
+        """Rows committed to the -wal file of an open WAL database are in the backup"""
+        conn = sqlite3.connect(self.db_file)
+        conn.execute("PRAGMA journal_mode = WAL")
+        conn.execute("PRAGMA wal_autocheckpoint = 0")
+        conn.execute("CREATE TABLE payroll_entries (id INTEGER PRIMARY KEY, net_salary INTEGER)")
+        conn.executemany("INSERT INTO payroll_entries (net_salary) VALUES (?)", [(100,), (200,)])
+        conn.commit()
+        try:
+            results = []
+            worker = BackupWorker('backup', self.db_file, self.archive)
+            worker.finished.connect(lambda success, message: results.append((success, message)))
+            worker.run()
+            self.assertTrue(results[0][0], results[0][1])
+        finally:
+            conn.close()
+        
+        with zipfile.ZipFile(self.archive) as zipf:
+            self.assertEqual(sorted(zipf.namelist()), ['employee.db', 'metadata.json'])
+            zipf.extract('employee.db', os.path.join(self.temp_dir, 'restored'))
+        restored = sqlite3.connect(os.path.join(self.temp_dir, 'restored', 'employee.db'))
+        try:
+            self.assertEqual(restored.execute("SELECT SUM(net_salary) FROM payroll_entries").fetchone()[0], 300)
+        finally:
+            restored.close()
+        self.assertEqual([name for name in os.listdir(self.temp_dir) if name.startswith('.backup_')], [])
+
+if __name__ == '__main__':
+    unittest.main()
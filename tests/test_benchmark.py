@@ -0,0 +1,51 @@
+"""Tests for benchmark case measurement and baseline comparison"""
+import unittest
+from utils.benchmark import BenchmarkCase, compare_results
+
+class TestBenchmarkResults(unittest.TestCase):
+    """Test cases for case measurement and baseline comparison"""
+
+    def test_failed_calls_are_reported_as_errors(self):
+        """A (False, message) result is recorded as an error, not timed"""
+        result = BenchmarkCase('broken', lambda: (False, 'no such column: x')).measure(2)
+        self.assertEqual(result['status'], 'error')
+        self.assertIn('no such column: x', result['error'])
+        
+        result = BenchmarkCase('fine', lambda: (True, []), setup=lambda: None).measure(3)
+        self.assertEqual(result['status'], 'ok')
+        self.assertEqual(len(result['runs']), 3)
+
+    def test_skipped_cases_are_not_run(self):
+        """A case with a skip reason records the reason instead of running"""
+        calls = []
+        result = BenchmarkCase('projections', lambda: calls.append(1), skip='schema has no x.y').measure(2)
+        self.assertEqual(result, {'status': 'skipped', 'reason': 'schema has no x.y'})
+        self.assertEqual(calls, [])
+        
+        rows = compare_results({'cases': {'projections': result}}, {'cases': {}})
+        self.assertEqual(rows[0]['verdict'], 'skipped')
+
+    def test_compare_with_baseline(self):
+        """Median changes beyond the threshold are flagged"""
+        def case(median):
+            return {'status': 'ok', 'median': median}
+        
+        baseline = {'cases': {
+            'slower': case(1.0), 'faster': case(1.0), 'same': case(1.0), 'dropped': case(1.0)
+        }}
+        current = {'cases': {
+            'slower': case(1.5), 'faster': case(0.5), 'same': case(1.05),
+            'added': case(0.2), 'broken': {'status': 'error', 'error': 'boom'}
+        }}
+        verdicts = {row['case']: row for row in compare_results(current, baseline, threshold=10)}
+        
+        self.assertEqual(verdicts['slower']['verdict'], 'regression')
+        self.assertEqual(verdicts['slower']['change_pct'], 50.0)
+        self.assertEqual(verdicts['faster']['verdict'], 'improvement')
+        self.assertEqual(verdicts['same']['verdict'], 'unchanged')
+        self.assertEqual(verdicts['added']['verdict'], 'new')
+        self.assertEqual(verdicts['broken']['verdict'], 'error')
+        self.assertEqual(verdicts['dropped']['verdict'], 'missing')
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,97 @@
+"""Tests for the cached company profile"""
+import os
+import sqlite3
+import tempfile
+import unittest
+from unittest.mock import patch
+from PyQt5.QtCore import QBuffer, QByteArray, QIODevice
+from PyQt5.QtGui import QColor, QImage
+from utils.company_info import CompanyInfo
+
+class TestCompanyInfo(unittest.TestCase):
+    """Test cases for CompanyInfo caching"""
+
+    def setUp(self):
+        fd, self.db_path = tempfile.mkstemp(suffix='.db')
+        os.close(fd)
+        image = QImage(4, 4, QImage.Format_RGB32)
+        image.fill(QColor('red'))
+        data = QByteArray()
+        buffer = QBuffer(data)
+        buffer.open(QIODevice.WriteOnly)
+        image.save(buffer, 'PNG')
+
+        conn = sqlite3.connect(self.db_path)
+        conn.execute("""
+            CREATE TABLE company_info (
+                id INTEGER PRIMARY KEY,
+                company_name TEXT,
+                commercial_register_number TEXT,
+                tax_number TEXT,
+                logo_data BLOB,
+                logo_mime_type TEXT
+            )
+        """)
+        conn.execute(
+            "INSERT INTO company_info VALUES (1, 'ACME', 'CR-1', 'TX-1', ?, 'image/png')",
+            (bytes(data),)
+        )
+        conn.commit()
+        conn.close()
+        CompanyInfo.invalidate()
+
+    def tearDown(self):
+        CompanyInfo.invalidate()
+        os.remove(self.db_path)
+
+    def _rename(self, name):
+        conn = sqlite3.connect(self.db_path)
+        conn.execute("UPDATE company_info SET company_name = ?", (name,))
+        conn.commit()
+        conn.close()
+
+    def test_profile_is_read_once(self):
+        """Repeated lookups are served from memory"""
+        with patch('utils.company_info.sqlite3.connect', wraps=sqlite3.connect) as connect:
+            self.assertEqual(CompanyInfo.get_company_name(self.db_path), 'ACME')
+            self.assertEqual(CompanyInfo.get_commercial_register(self.db_path), 'CR-1')
+            self.assertEqual(CompanyInfo.get_tax_number(self.db_path), 'TX-1')
+            self.assertEqual(CompanyInfo.get_logo(self.db_path)[1], 'image/png')
+        self.assertEqual(connect.call_count, 1)
+
+    def test_invalidate_reloads_profile(self):
+        """Saved changes are picked up after invalidate"""
+        self.assertEqual(CompanyInfo.get_company_name(self.db_path), 'ACME')
+        self._rename('Globex')
+        self.assertEqual(CompanyInfo.get_company_name(self.db_path), 'ACME')
+        CompanyInfo.invalidate(self.db_path)
+        self.assertEqual(CompanyInfo.get_company_name(self.db_path), 'Globex')
+
+    def test_returned_info_is_a_copy(self):
+        """Callers cannot change the cached profile"""
+        CompanyInfo.get_company_info(self.db_path)['company_name'] = 'Changed'
+        self.assertEqual(CompanyInfo.get_company_name(self.db_path), 'ACME')
+
+    def test_logo_image_is_decoded_once(self):
+        """The decoded logo is shared between lookups"""
+        image = CompanyInfo.get_logo_image(self.db_path)
+        self.assertIsNotNone(image)
+        self.assertEqual(image.width(), 4)
+        self.assertIs(CompanyInfo.get_logo_image(self.db_path), image)
+
+    def test_replaced_file_is_reloaded(self):
+        """A database file swapped in place (e.g. a restore) is read again"""
+        self.assertEqual(CompanyInfo.get_company_name(self.db_path), 'ACME')
+        copy_path = self.db_path + '.new'
+        source = sqlite3.connect(self.db_path)
+        target = sqlite3.connect(copy_path)
+        source.backup(target)
+        target.execute("UPDATE company_info SET company_name = 'Restored'")
+        target.commit()
+        source.close()
+        target.close()
+        os.replace(copy_path, self.db_path)
+        self.assertEqual(CompanyInfo.get_company_name(self.db_path), 'Restored')
+
+if __name__ == '__main__':
+    unittest.main()
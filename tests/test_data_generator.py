@@ -0,0 +1,115 @@
+"""Tests for the synthetic data generator"""
+import os
+import tempfile
+import unittest
+from unittest.mock import patch
+from database.database import Database
+from utils.data_generator import SyntheticDataset, TableRows
+
+class TestSyntheticDataset(unittest.TestCase):
+    """Test cases for SyntheticDataset"""
+
+    def _rows(self, dataset):
+        return {table: list(rows) for table, rows in dataset.tables()}
+
+    def test_same_seed_gives_same_rows(self):
+        """Two datasets with the same seed are identical"""
+        first = self._rows(SyntheticDataset(employees=50, periods=3, seed=7))
+        second = self._rows(SyntheticDataset(employees=50, periods=3, seed=7))
+        self.assertEqual(first, second)
+        
+        other = self._rows(SyntheticDataset(employees=50, periods=3, seed=8))
+        self.assertNotEqual(first['employees'], other['employees'])
+
+    def test_payroll_history_covers_completed_periods(self):
+        """Every active employee is paid in every period except the draft one"""
+        dataset = SyntheticDataset(employees=200, periods=4, attendance_periods=1)
+        periods = dataset.payroll_periods()
+        self.assertEqual([p['status'] for p in periods], ['completed'] * 3 + ['draft'])
+        self.assertEqual(periods[-1]['start_date'], '2020-04-01')
+        self.assertEqual(periods[1]['end_date'], '2020-02-29')
+        
+        active = sum(1 for e in dataset.employees() if e['is_active'])
+        entries = list(dataset.payroll_entries())
+        self.assertEqual(len(entries), active * 3)
+        for entry in entries:
+            self.assertIsInstance(entry['net_salary'], int)
+            self.assertEqual(
+                entry['net_salary'],
+                entry['basic_salary'] + entry['total_allowances']
+                - entry['total_deductions'] + entry['total_adjustments']
+            )
+        self.assertTrue(any(entry['total_adjustments'] for entry in entries))
+
+    def test_leave_requests_do_not_overlap(self):
+        """Leave requests of one employee never overlap"""
+        dataset = SyntheticDataset(employees=200, periods=24)
+        by_employee = {}
+        for row in dataset.leave_requests():
+            self.assertLessEqual(row['start_date'], row['end_date'])
+            by_employee.setdefault(row['employee_id'], []).append((row['start_date'], row['end_date']))
+        for ranges in by_employee.values():
+            ranges.sort()
+            for (_, end), (start, _) in zip(ranges, ranges[1:]):
+                self.assertLess(end, start)
+
+    def test_attendance_marks_approved_leave(self):
+        """Attendance covers weekdays of the newest periods, with leave days marked"""
+        dataset = SyntheticDataset(employees=300, periods=12, attendance_periods=2)
+        attendance = dataset.attendance()
+        self.assertIsInstance(attendance, TableRows)
+        rows = list(attendance.dicts())
+        
+        days = {row['date'] for row in rows}
+        self.assertTrue(all(day[:7] in ('2020-11', '2020-12') for day in days))
+        self.assertEqual(len(days), 21 + 23)
+        
+        approved = [
+            leave for leave in dataset.leave_requests()
+            if leave['status'] == 'approved' and leave['start_date'] >= '2020-11-01'
+        ]
+        on_leave = {(row['employee_id'], row['date']) for row in rows if row['status'] == 'leave'}
+        self.assertTrue(approved)
+        for leave in approved:
+            if leave['start_date'] in days:
+                self.assertIn((leave['employee_id'], leave['start_date']), on_leave)
+
+class TestLoad(unittest.TestCase):
+    """Test cases for loading a dataset into a database"""
+
+    def setUp(self):
+        fd, self.db_path = tempfile.mkstemp(suffix='.db')
+        os.close(fd)
+        with patch.object(Database, 'create_tables'), patch.object(Database, 'validate_schema'):
+            self.db = Database(self.db_path)
+        conn = self.db.get_connection()
+        conn.executescript("""
+            CREATE TABLE employees (id INTEGER PRIMARY KEY, code TEXT, name TEXT, basic_salary REAL, is_active INTEGER);
+            CREATE TABLE attendance (id INTEGER PRIMARY KEY AUTOINCREMENT, employee_id INTEGER, date DATE, status TEXT);
+        """)
+        conn.close()
+
+    def tearDown(self):
+        os.remove(self.db_path)
+
+    def test_load_skips_missing_tables_and_columns(self):
+        """Only tables and columns the database has are filled"""
+        dataset = SyntheticDataset(employees=30, periods=2)
+        counts = dataset.load(self.db)
+        
+        active = sum(1 for e in dataset.employees() if e['is_active'])
+        self.assertEqual(counts['employees'], 30)
+        self.assertEqual(set(counts), {'employees', 'attendance'})
+        
+        conn = self.db.get_connection()
+        try:
+            self.assertEqual(conn.execute("SELECT COUNT(*) FROM attendance").fetchone()[0], counts['attendance'])
+            self.assertEqual(
+                conn.execute("SELECT COUNT(DISTINCT employee_id) FROM attendance").fetchone()[0], active
+            )
+            self.assertEqual(conn.execute("SELECT code FROM employees WHERE id = 1").fetchone()[0], 'EMP000001')
+        finally:
+            conn.close()
+
+if __name__ == '__main__':
+    unittest.main()
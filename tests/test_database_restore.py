@@ -0,0 +1,178 @@
+"""Tests for verified, atomic database restore"""
+import os
+import shutil
+import sqlite3
+import tempfile
+import threading
+import time
+import unittest
+from functools import partial
+from unittest.mock import patch
+from database.database import Database
+from database.migration_runner import run_migrations
+
+class TestDatabaseRestore(unittest.TestCase):
+    """Test cases for Database.verify_database_file and replace_database_file"""
+
+    def setUp(self):
+        """Create a live database and a backup copy in a temp directory"""
+        self.temp_dir = tempfile.mkdtemp()
+        self.live_path = os.path.join(self.temp_dir, 'employee.db')
+        self.backup_path = os.path.join(self.temp_dir, 'backup.db')
+
+        self._create_db(self.live_path, rows=1)
+        self._create_db(self.backup_path, rows=5)
+
+        with patch.object(Database, 'create_tables'), patch.object(Database, 'validate_schema'):
+            self.db = Database(self.live_path)
+
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir)
+
+    def _create_db(self, path, rows, user_version=0):
+        conn = sqlite3.connect(path)
+        for table in Database.CORE_TABLES:
+            if table != 'employees':
+                conn.execute(f"CREATE TABLE {table} (id INTEGER PRIMARY KEY)")
+        conn.execute("CREATE TABLE employees (id INTEGER PRIMARY KEY)")
+        conn.executemany("INSERT INTO employees (id) VALUES (?)", [(i,) for i in range(rows)])
+        conn.execute(f"PRAGMA user_version = {user_version}")
+        conn.commit()
+        conn.close()
+
+    def test_verify_accepts_valid_database(self):
+        """A healthy backup passes verification"""
+        verified, _ = self.db.verify_database_file(self.backup_path)
+        self.assertTrue(verified)
+
+    def test_verify_rejects_corrupt_file(self):
+        """A file that is not a database is rejected"""
+        with open(self.backup_path, 'wb') as f:
+            f.write(b'not a database' * 100)
+
+        verified, message = self.db.verify_database_file(self.backup_path)
+        self.assertFalse(verified)
+        self.assertIn('Invalid database file', message)
+
+    def test_verify_rejects_newer_schema_version(self):
+        """A backup written by a newer schema cannot be restored"""
+        os.remove(self.backup_path)
+        self._create_db(self.backup_path, rows=1, user_version=5)
+
+        verified, message = self.db.verify_database_file(self.backup_path)
+        self.assertFalse(verified)
+        self.assertIn('newer', message)
+
+    def test_verify_rejects_partial_database(self):
+        """A file missing one of the core tables is rejected"""
+        conn = sqlite3.connect(self.backup_path)
+        conn.execute("DROP TABLE payroll_entries")
+        conn.close()
+        
+        verified, message = self.db.verify_database_file(self.backup_path)
+        self.assertFalse(verified)
+        self.assertIn('payroll_entries', message)
+
+    def test_restore_backup_of_real_schema(self):
+        """A backup built by schema.sql and the migrations verifies and restores"""
+        os.remove(self.backup_path)
+        schema_path = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'schema.sql')
+        # schema.sql is saved in the Windows Arabic code page
+        with open(schema_path, 'r', encoding='cp1256') as schema_file:
+            schema_sql = schema_file.read()
+        conn = sqlite3.connect(self.backup_path)
+        conn.executescript(schema_sql)
+        conn.close()
+        with patch.object(Database, 'create_tables'), patch.object(Database, 'validate_schema'):
+            backup = Database(self.backup_path)
+        with patch('database.migrations.convert_money_to_minor_units.AnalyticsSnapshot'):
+            run_migrations(backup)
+            run_migrations(self.db)
+        
+        verified, message = self.db.verify_database_file(self.backup_path)
+        self.assertTrue(verified, message)
+        
+        with patch.object(self.db, 'validate_schema'), \
+                patch('database.migrations.convert_money_to_minor_units.AnalyticsSnapshot'):
+            self.db.replace_database_file(self.backup_path)
+        self.assertTrue(self.db.has_table('payroll_entries'))
+        self.assertTrue(self.db.has_table('departments'))
+
+    def test_migrations_set_schema_version(self):
+        """The live file records its version, older backups still verify"""
+        with patch('database.migrations.convert_money_to_minor_units.AnalyticsSnapshot'):
+            run_migrations(self.db)
+        conn = self.db.get_connection()
+        try:
+            self.assertGreater(conn.execute("PRAGMA user_version").fetchone()[0], 0)
+        finally:
+            conn.close()
+        
+        verified, _ = self.db.verify_database_file(self.backup_path)
+        self.assertTrue(verified)
+
+    def test_replace_swaps_file_after_connections_close(self):
+        """The live file is replaced once open connections are drained"""
+        opened = threading.Event()
+        closed = []
+
+        def hold_connection():
+            conn = self.db.get_connection()
+            opened.set()
+            time.sleep(0.2)
+            conn.close()
+            closed.append(conn)
+        
+        worker = threading.Thread(target=hold_connection)
+        worker.start()
+        opened.wait()
+        with patch.object(self.db, 'validate_schema') as validate:
+            self.db.replace_database_file(self.backup_path)
+            validate.assert_called_once()
+            self.assertEqual(len(closed), 1)
+        worker.join()
+
+        self.assertFalse(os.path.exists(self.backup_path))
+        conn = self.db.get_connection()
+        try:
+            self.assertEqual(conn.execute("SELECT COUNT(*) FROM employees").fetchone()[0], 5)
+        finally:
+            conn.close()
+
+    def test_replace_migrates_older_backup(self):
+        """Payroll amounts of a backup from before minor units are converted on restore"""
+        conn = sqlite3.connect(self.backup_path)
+        conn.executescript("""
+            DROP TABLE payroll_entries;
+            CREATE TABLE payroll_entries (id INTEGER PRIMARY KEY, basic_salary REAL, net_salary REAL);
+            INSERT INTO payroll_entries VALUES (1, 1000.5, 950.25);
+        """)
+        conn.close()
+        
+        with patch.object(self.db, 'validate_schema'):
+            self.db.replace_database_file(self.backup_path)
+        
+        conn = self.db.get_connection()
+        try:
+            self.assertEqual(conn.execute("SELECT basic_salary, net_salary FROM payroll_entries").fetchall(),
+                             [(100050, 95025)])
+        finally:
+            conn.close()
+
+    def test_replace_fails_while_connection_is_open(self):
+        """Replacing is refused while a connection is still in use"""
+        conn = self.db.get_connection()
+        try:
+            drain = partial(self.db.drain_connections, timeout=0.2)
+            with patch.object(self.db, 'drain_connections', drain):
+                with self.assertRaises(RuntimeError):
+                    self.db.replace_database_file(self.backup_path)
+            self.assertTrue(os.path.exists(self.backup_path))
+            
+            # The refused swap let new connections through again
+            self.db.get_connection().close()
+        finally:
+            conn.close()
+
+if __name__ == '__main__':
+    unittest.main()
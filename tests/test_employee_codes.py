@@ -0,0 +1,86 @@
+"""Tests for employee code allocation"""
+import os
+import shutil
+import sqlite3
+import tempfile
+import threading
+import unittest
+from unittest.mock import patch
+from controllers.employee_controller import EmployeeController
+from database.database import Database
+
+class TestEmployeeCodes(unittest.TestCase):
+    """Test cases for the employee code sequence"""
+
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.db_file = os.path.join(self.temp_dir, 'employees.db')
+        conn = sqlite3.connect(self.db_file)
+        conn.executescript("""
+            CREATE TABLE employees (id INTEGER PRIMARY KEY, code TEXT UNIQUE, name TEXT);
+            INSERT INTO employees VALUES (1, 'E0007', 'Ali'), (2, 'EMP000123', 'Omar'), (3, NULL, 'Sara');
+        """)
+        conn.commit()
+        conn.close()
+        
+        with patch.object(Database, 'create_tables'), patch.object(Database, 'validate_schema'):
+            self.db = Database(self.db_file)
+        self.controller = EmployeeController(self.db)
+
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir)
+
+    def test_sequence_continues_after_existing_codes(self):
+        """Codes follow the highest E-number and blocks are consecutive"""
+        self.assertEqual(self.controller.reserve_codes(1), (True, ['E0008']))
+        self.assertEqual(self.controller.reserve_codes(3), (True, ['E0009', 'E0010', 'E0011']))
+        self.assertEqual(self.controller.reserve_codes(0), (True, []))
+
+    def test_allocation_does_not_scan_employees(self):
+        """Once seeded, a code costs one UPDATE and one keyed read"""
+        self.controller.reserve_codes(1)
+        
+        statements = []
+        conn = self.db.get_connection()
+        conn.set_trace_callback(statements.append)
+        try:
+            cursor = conn.cursor()
+            self.assertEqual(self.controller._generate_employee_code(cursor), 'E0009')
+            conn.commit()
+        finally:
+            conn.close()
+        self.assertFalse([sql for sql in statements if 'employees' in sql])
+
+    def test_missing_sequence_row_is_reseeded(self):
+        """An existing table without the employee row starts again after the highest code"""
+        self.controller.reserve_codes(1)
+        conn = self.db.get_connection()
+        conn.execute("INSERT INTO employees VALUES (4, 'E0008', 'Huda')")
+        conn.execute("DELETE FROM code_sequences")
+        conn.commit()
+        conn.close()
+        
+        self.assertEqual(self.controller.reserve_codes(2), (True, ['E0009', 'E0010']))
+
+    def test_concurrent_reservations_do_not_overlap(self):
+        """Reservations from many threads never hand out the same code"""
+        self.controller.reserve_codes(1)
+        results = []
+
+        def reserve():
+            for _ in range(20):
+                success, codes = EmployeeController(self.db).reserve_codes(5)
+                self.assertTrue(success, codes)
+                results.extend(codes)
+        
+        threads = [threading.Thread(target=reserve) for _ in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        
+        self.assertEqual(len(results), 400)
+        self.assertEqual(len(set(results)), 400)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,153 @@
+"""Tests for the bulk employee import"""
+import csv
+import os
+import shutil
+import sqlite3
+import tempfile
+import unittest
+from unittest.mock import patch
+from openpyxl import Workbook
+from PIL import Image
+from controllers.employee_controller import EmployeeController
+from database.database import Database
+from utils.employee_import import EmployeeImporter, write_error_report
+
+class TestEmployeeImport(unittest.TestCase):
+    """Test cases for EmployeeController.import_employees"""
+
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.db_file = os.path.join(self.temp_dir, 'employees.db')
+        conn = sqlite3.connect(self.db_file)
+        conn.executescript("""
+            CREATE TABLE departments (id INTEGER PRIMARY KEY, name TEXT, name_ar TEXT);
+            CREATE TABLE positions (id INTEGER PRIMARY KEY, name TEXT, name_ar TEXT);
+            CREATE TABLE employees (id INTEGER PRIMARY KEY AUTOINCREMENT, code TEXT UNIQUE NOT NULL,
+                name TEXT NOT NULL, name_ar TEXT, department_id INTEGER, position_id INTEGER,
+                basic_salary REAL DEFAULT 0, hire_date DATE NOT NULL, birth_date DATE,
+                gender TEXT CHECK(gender IN ('male', 'female')), marital_status TEXT, national_id TEXT,
+                phone TEXT, email TEXT, address TEXT, bank_account TEXT, bank_name TEXT,
+                photo_data BLOB, photo_mime_type TEXT, is_active INTEGER DEFAULT 1,
+                created_at TIMESTAMP, updated_at TIMESTAMP);
+            CREATE TABLE employment_details (id INTEGER PRIMARY KEY AUTOINCREMENT,
+                employee_id INTEGER NOT NULL, department_id INTEGER NOT NULL, position_id INTEGER NOT NULL,
+                manager_id INTEGER, employee_status TEXT, hire_date DATE NOT NULL, contract_type TEXT NOT NULL,
+                salary_type TEXT NOT NULL, working_hours REAL, created_at TIMESTAMP, updated_at TIMESTAMP);
+            CREATE TRIGGER refuse_blocked BEFORE INSERT ON employees WHEN NEW.name = 'Blocked'
+            BEGIN SELECT RAISE(ABORT, 'blocked employee'); END;
+            
+            INSERT INTO departments VALUES (1, 'HR', 'الموارد البشرية'), (2, 'IT', 'تقنية المعلومات');
+            INSERT INTO positions VALUES (1, 'Clerk', 'كاتب'), (2, 'Engineer', 'مهندس');
+            INSERT INTO employees (code, name, hire_date) VALUES ('E0041', 'Existing', '2020-01-01');
+        """)
+        conn.commit()
+        conn.close()
+        
+        with patch.object(Database, 'create_tables'), patch.object(Database, 'validate_schema'):
+            self.db = Database(self.db_file)
+        self.controller = EmployeeController(self.db)
+
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir)
+
+    def _query(self, sql, params=()):
+        conn = self.db.get_connection()
+        try:
+            return conn.execute(sql, params).fetchall()
+        finally:
+            conn.close()
+
+    def _write_csv(self, header, rows):
+        path = os.path.join(self.temp_dir, 'employees.csv')
+        with open(path, 'w', newline='', encoding='utf-8-sig') as csvfile:
+            writer = csv.writer(csvfile)
+            writer.writerow(header)
+            writer.writerows(rows)
+        return path
+
+    def test_csv_rows_are_validated_and_imported(self):
+        """Valid rows are imported, every invalid row is reported by number"""
+        path = self._write_csv(
+            ['name', 'department_name', 'position_name', 'basic_salary', 'hire_date',
+             'gender', 'phone', 'email', 'salary_type'],
+            [
+                ['Ali', 'IT', 'مهندس', '٥٠٠٠', '2024-1-5', 'ذكر', '+966 555 123 456', 'ali@example.com', 'شهري'],
+                ['Sara', '', '', '', '2024-02-01', 'female', '', '', ''],
+                ['Omar', 'Sales', 'Clerk', '3000', '2024-02-01', '', '', '', ''],
+                ['', 'HR', 'Clerk', '-5', 'not a date', '', '', 'broken', ''],
+                [],
+                ['Blocked', 'HR', 'Clerk', '1000', '2024-02-01', '', '', '', ''],
+                ['Mona', 'hr', 'clerk', '1000', '2024-02-01', 'other', '', '', 'Hourly'],
+            ]
+        )
+        
+        success, result = self.controller.import_employees(path)
+        self.assertTrue(success, result)
+        self.assertEqual((result['imported'], result['failed']), (2, 4))
+        self.assertEqual(
+            [(error['row'], error['field']) for error in result['errors']],
+            [(4, 'department'),
+             (5, 'name'), (5, 'email'), (5, 'hire_date'), (5, 'basic_salary'),
+             (7, ''),
+             (8, 'gender')]
+        )
+        self.assertEqual(result['errors'][5]['message'], 'blocked employee')
+        
+        employees = self._query("""
+            SELECT e.code, e.name, e.department_id, e.position_id, e.basic_salary, e.hire_date,
+                   e.gender, e.phone, ed.salary_type, ed.contract_type, ed.working_hours
+            FROM employees e JOIN employment_details ed ON ed.employee_id = e.id
+            ORDER BY e.id
+        """)
+        self.assertEqual(employees, [
+            ('E0042', 'Ali', 2, 2, 5000.0, '2024-01-05', 'male', '+966 555 123 456', 'monthly', 'دائم', 40.0),
+            ('E0043', 'Sara', 1, 1, 0.0, '2024-02-01', 'female', None, 'monthly', 'دائم', 40.0),
+        ])
+
+    def test_excel_photos_are_resized(self):
+        """Photos are shrunk to the form size; a missing one is reported but not fatal"""
+        Image.new('RGB', (800, 600), 'red').save(os.path.join(self.temp_dir, 'ali.png'))
+        workbook = Workbook()
+        sheet = workbook.active
+        sheet.append(['الاسم', 'القسم', 'تاريخ التعيين', 'رقم الهوية', 'الصورة'])
+        sheet.append(['Ali', 'HR', '2024-01-05', 1234567890, 'ali.png'])
+        sheet.append(['Omar', 'IT', '2024-01-06', None, 'missing.png'])
+        path = os.path.join(self.temp_dir, 'employees.xlsx')
+        workbook.save(path)
+        
+        success, result = self.controller.import_employees(path)
+        self.assertTrue(success, result)
+        self.assertEqual((result['imported'], result['failed']), (2, 0))
+        self.assertEqual([(error['row'], error['field']) for error in result['errors']], [(3, 'photo')])
+        
+        rows = self._query("SELECT name, national_id, photo_data, photo_mime_type FROM employees WHERE id > 1 ORDER BY id")
+        self.assertEqual(rows[0][1], '1234567890')
+        self.assertEqual(rows[0][3], 'image/jpeg')
+        photo_path = os.path.join(self.temp_dir, 'stored.jpg')
+        with open(photo_path, 'wb') as f:
+            f.write(rows[0][2])
+        with Image.open(photo_path) as image:
+            self.assertEqual(image.size, (140, 105))
+        self.assertEqual(rows[1][2:], (None, None))
+
+    def test_error_report(self):
+        """The error report lists every rejected row"""
+        path = self._write_csv(['name', 'hire_date'], [['Ali', '']])
+        success, result = self.controller.import_employees(path)
+        self.assertTrue(success, result)
+        
+        report = write_error_report(result['errors'], os.path.join(self.temp_dir, 'errors.csv'))
+        with open(report, newline='', encoding='utf-8-sig') as csvfile:
+            rows = list(csv.DictReader(csvfile))
+        self.assertEqual([(row['row'], row['field']) for row in rows], [('2', 'hire_date')])
+
+    def test_progress_after_every_chunk(self):
+        """The progress callback gets the running row count"""
+        path = self._write_csv(['name', 'hire_date'], [[f'Employee {i}', '2024-02-01'] for i in range(5)])
+        processed = []
+        result = EmployeeImporter(self.db).import_file(path, chunk_size=2, progress=processed.append)
+        self.assertEqual(result['imported'], 5)
+        self.assertEqual(processed, [2, 4, 5])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,71 @@
+"""Tests for the queued, rotating application logging"""
+import logging
+import os
+import shutil
+import tempfile
+import threading
+import unittest
+from logging.handlers import RotatingFileHandler
+from unittest.mock import patch
+from utils.logging_setup import LOG_LEVELS, configure_logging, shutdown_logging
+
+class TestLoggingSetup(unittest.TestCase):
+    """Test cases for configure_logging"""
+
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.levels = {name: logging.getLogger(name).level for name in LOG_LEVELS}
+
+    def tearDown(self):
+        shutdown_logging()
+        for name, level in self.levels.items():
+            logging.getLogger(name).setLevel(level)
+        shutil.rmtree(self.temp_dir)
+
+    def _read(self, name):
+        with open(os.path.join(self.temp_dir, name), encoding='utf-8') as f:
+            return f.read()
+
+    def test_records_are_written_by_the_listener_thread(self):
+        """Callers only enqueue; files get levels, filters and structured fields"""
+        writers = set()
+        emit = RotatingFileHandler.emit
+
+        def recording_emit(handler, record):
+            writers.add(threading.get_ident())
+            emit(handler, record)
+        
+        with patch.object(RotatingFileHandler, 'emit', recording_emit), patch('sys.stdout'):
+            configure_logging(self.temp_dir)
+            self.assertIs(configure_logging(self.temp_dir), configure_logging(self.temp_dir))
+            
+            logging.getLogger('services.payroll_service').info(
+                "Generated payroll", extra={'period_id': 3, 'duration_ms': 12}
+            )
+            logging.getLogger('repositories.payroll_repository').info("hidden below WARNING")
+            logging.getLogger('database.migration_runner').info("Processing migration: 001")
+            shutdown_logging()
+        
+        self.assertTrue(writers)
+        self.assertNotIn(threading.get_ident(), writers)
+        
+        log = self._read('database.log')
+        self.assertIn("services.payroll_service - Generated payroll [period_id=3 duration_ms=12]", log)
+        self.assertNotIn("hidden below WARNING", log)
+        self.assertIn("Processing migration: 001", log)
+        self.assertEqual(self._read('migration.log').count('\n'), 1)
+
+    def test_files_rotate_instead_of_growing(self):
+        """A full log file is rolled over, and earlier files are kept"""
+        configure_logging(self.temp_dir, levels={'': logging.DEBUG}, max_bytes=1000)
+        logger = logging.getLogger('tests.logging')
+        for i in range(100):
+            logger.debug("line %d", i, extra={'employee_id': i})
+        shutdown_logging()
+        
+        self.assertTrue(os.path.exists(os.path.join(self.temp_dir, 'database.log.1')))
+        self.assertLessEqual(os.path.getsize(os.path.join(self.temp_dir, 'database.log')), 1000)
+        self.assertIn("line 99 [employee_id=99]", self._read('database.log'))
+
+if __name__ == '__main__':
+    unittest.main()
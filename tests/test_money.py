@@ -0,0 +1,119 @@
+"""Tests for Money and the minor units migration"""
+import os
+import pickle
+import shutil
+import sqlite3
+import tempfile
+import unittest
+from decimal import Decimal
+from unittest.mock import patch
+from database.database import Database
+from database.migrations.convert_money_to_minor_units import run_migration
+from utils.money import Money, to_major
+
+class TestMoney(unittest.TestCase):
+    """Test cases for the Money value type"""
+
+    def test_parsing_rounds_half_away_from_zero(self):
+        """Strings, floats and Decimals round to the minor unit"""
+        self.assertEqual(Money('1,234.565').minor, 123457)
+        self.assertEqual(Money('-0.005').minor, -1)
+        self.assertEqual(Money(1.005).minor, 101)
+        self.assertEqual(Money(Decimal('10.10')).minor, 1010)
+        self.assertEqual(Money('1e3').minor, 100000)
+        self.assertEqual(Money.from_minor(None), Money())
+
+    def test_arithmetic(self):
+        """Addition is exact, multiplication and division round"""
+        total = Money('0.10') + Money('0.20')
+        self.assertEqual(total, Money('0.30'))
+        self.assertEqual(sum([Money(1), Money(2)]), 3)
+        self.assertEqual(Money(100) * (1 / 3), Money('33.33'))
+        self.assertEqual(Money(10) / 3, Money('3.33'))
+        self.assertEqual(Money(10) / Money(4), 2.5)
+        self.assertEqual(-Money(5) + Money(2), Money(-3))
+        with self.assertRaises(TypeError):
+            Money(1) + 1
+
+    def test_formatting(self):
+        """Amounts format exactly with and without separators"""
+        amount = Money('12500.5')
+        self.assertEqual(str(amount), '12500.50')
+        self.assertEqual(f"{amount:,.2f}", '12,500.50')
+        self.assertEqual(repr(-amount), "Money('-12500.50')")
+        self.assertEqual(float(amount), 12500.5)
+
+    def test_immutable_and_picklable(self):
+        """Money can be sent to worker processes but not changed"""
+        amount = Money('99.99')
+        with self.assertRaises(AttributeError):
+            amount.minor = 1
+        self.assertEqual(pickle.loads(pickle.dumps(amount)), amount)
+        self.assertEqual(hash(Money(5)), hash(5))
+
+class TestMinorUnitsMigration(unittest.TestCase):
+    """Test cases for convert_money_to_minor_units"""
+
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.db_file = os.path.join(self.temp_dir, 'payroll.db')
+        conn = sqlite3.connect(self.db_file)
+        conn.executescript("""
+            CREATE TABLE payroll_entries (id INTEGER PRIMARY KEY, payroll_period_id INTEGER, employee_id INTEGER,
+                                          basic_salary REAL, total_allowances REAL, net_salary DECIMAL(12,2));
+            CREATE TABLE payroll_entry_components (id INTEGER PRIMARY KEY, payroll_entry_id INTEGER,
+                                                   component_id INTEGER, value REAL);
+            INSERT INTO payroll_entries VALUES (1, 1, 1, 1000.5, NULL, '1100.25'), (2, 1, 2, 2000, 0.1, 2000.1);
+            INSERT INTO payroll_entry_components VALUES (1, 1, 1, 100.005);
+        """)
+        conn.commit()
+        conn.close()
+        
+        with patch.object(Database, 'create_tables'), patch.object(Database, 'validate_schema'):
+            self.db = Database(self.db_file)
+
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir)
+
+    def _query(self, sql):
+        conn = self.db.get_connection()
+        try:
+            return conn.execute(sql).fetchall()
+        finally:
+            conn.close()
+
+    def test_converts_once(self):
+        """Running the migration again leaves converted columns alone"""
+        with patch('database.migrations.convert_money_to_minor_units.AnalyticsSnapshot'):
+            success, message = run_migration(self.db)
+            self.assertTrue(success, message)
+            success, _ = run_migration(self.db)
+            self.assertTrue(success)
+        
+        self.assertEqual(
+            self._query("SELECT basic_salary, total_allowances, net_salary FROM payroll_entries ORDER BY id"),
+            [(100050, None, 110025), (200000, 10, 200010)]
+        )
+        self.assertEqual(self._query("SELECT value FROM payroll_entry_components"), [(10001,)])
+        self.assertEqual(to_major(100050), 1000.5)
+
+    def test_later_tables_are_not_converted(self):
+        """Tables and columns added after the first run already hold minor units"""
+        with patch('database.migrations.convert_money_to_minor_units.AnalyticsSnapshot'):
+            run_migration(self.db)
+            conn = self.db.get_connection()
+            conn.executescript("""
+                CREATE TABLE payroll_entry_details (id INTEGER PRIMARY KEY, amount INTEGER);
+                INSERT INTO payroll_entry_details VALUES (1, 12345);
+                ALTER TABLE payroll_entries ADD COLUMN gross_salary INTEGER DEFAULT 0;
+                UPDATE payroll_entries SET gross_salary = basic_salary;
+            """)
+            conn.close()
+            success, _ = run_migration(self.db)
+            self.assertTrue(success)
+        
+        self.assertEqual(self._query("SELECT amount FROM payroll_entry_details"), [(12345,)])
+        self.assertEqual(self._query("SELECT gross_salary FROM payroll_entries WHERE id = 1"), [(100050,)])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,147 @@
+"""Tests for change tracking and incremental payroll recalculation"""
+import os
+import shutil
+import sqlite3
+import tempfile
+import unittest
+from unittest.mock import patch
+from controllers.payroll_controller import PayrollController
+from database.database import Database
+
+class TestPayrollDirty(unittest.TestCase):
+    """Test cases for payroll_dirty and PayrollController.recalculate_dirty"""
+
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.db_file = os.path.join(self.temp_dir, 'payroll.db')
+        conn = sqlite3.connect(self.db_file)
+        conn.executescript("""
+            CREATE TABLE employees (id INTEGER PRIMARY KEY, basic_salary REAL, is_active INTEGER);
+            CREATE TABLE employee_salary_components (id INTEGER PRIMARY KEY, employee_id INTEGER,
+                component_id INTEGER, value REAL, start_date DATE, end_date DATE, is_active INTEGER);
+            CREATE TABLE attendance (id INTEGER PRIMARY KEY, employee_id INTEGER, date DATE, status TEXT);
+            CREATE TABLE payroll_periods (id INTEGER PRIMARY KEY, period_year INTEGER, period_month INTEGER,
+                start_date TEXT, end_date TEXT, status TEXT);
+            CREATE TABLE payroll_entries (id INTEGER PRIMARY KEY AUTOINCREMENT, payroll_period_id INTEGER,
+                employee_id INTEGER, basic_salary INTEGER, total_allowances INTEGER, total_deductions INTEGER,
+                total_adjustments INTEGER, working_days INTEGER, net_salary INTEGER, payment_status TEXT,
+                created_at TIMESTAMP);
+            CREATE TABLE payroll_entry_components (id INTEGER PRIMARY KEY, entry_id INTEGER,
+                component_id INTEGER, amount INTEGER, created_at TIMESTAMP);
+            INSERT INTO employees VALUES (1, 1000, 1), (2, 2000, 1), (3, 3000, 1);
+            INSERT INTO employee_salary_components VALUES (1, 1, 1, 100, '2024-01-01', NULL, 1);
+            INSERT INTO payroll_periods VALUES (1, 2024, 1, '2024-01-01', '2024-01-31', 'completed'),
+                                               (2, 2024, 2, '2024-02-01', '2024-02-29', 'draft');
+        """)
+        conn.commit()
+        conn.close()
+        
+        with patch.object(Database, 'create_tables'), patch.object(Database, 'validate_schema'):
+            self.db = Database(self.db_file)
+        self.controller = PayrollController(self.db)
+        self.controller.changes.ensure_tables()
+        
+        # Salary details come straight from the test tables
+        patch.object(self.controller.employee_details, 'get_employee_details', self._details).start()
+        patch.object(self.controller, '_calculate_working_days', return_value=31).start()
+        self.addCleanup(patch.stopall)
+        
+        success, self.entries = self.controller.generate_payroll(2)
+        self.assertTrue(success, self.entries)
+
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir)
+
+    def _details(self, employee_id):
+        conn = self.db.get_connection()
+        try:
+            basic_salary = conn.execute("SELECT basic_salary FROM employees WHERE id = ?", (employee_id,)).fetchone()[0]
+            components = [
+                {'id': component_id, 'type': 'allowance', 'value': value, 'is_percentage': 0, 'percentage': None}
+                for component_id, value in conn.execute(
+                    "SELECT component_id, value FROM employee_salary_components WHERE employee_id = ? AND is_active = 1",
+                    (employee_id,)
+                ).fetchall()
+            ]
+        finally:
+            conn.close()
+        return True, {'basic_salary': basic_salary, 'salary_components': components, 'salary_adjustments': []}
+
+    def _execute(self, sql, params=()):
+        conn = self.db.get_connection()
+        try:
+            conn.execute(sql, params)
+            conn.commit()
+        finally:
+            conn.close()
+
+    def _query(self, sql, params=()):
+        conn = self.db.get_connection()
+        try:
+            return conn.execute(sql, params).fetchall()
+        finally:
+            conn.close()
+
+    def test_changes_mark_draft_periods(self):
+        """Edits inside a draft period's range mark the employee for that period only"""
+        self.assertEqual(self._query("SELECT * FROM payroll_dirty"), [])
+        
+        self._execute("UPDATE employee_salary_components SET value = 150 WHERE id = 1")
+        self._execute("INSERT INTO attendance VALUES (1, 2, '2024-02-05', 'absent')")
+        self._execute("INSERT INTO attendance VALUES (2, 3, '2024-01-05', 'absent')")
+        
+        self.assertEqual(
+            self._query("SELECT period_id, employee_id FROM payroll_dirty ORDER BY employee_id"),
+            [(2, 1), (2, 2)]
+        )
+
+    def test_recalculate_only_dirty_entries(self):
+        """Only the marked employee's entry and components are replaced"""
+        before = dict(self._query("SELECT employee_id, id FROM payroll_entries"))
+        self._execute("UPDATE employee_salary_components SET value = 250 WHERE id = 1")
+        
+        with patch.object(self.controller, '_create_payroll_entry',
+                          wraps=self.controller._create_payroll_entry) as create:
+            success, entries = self.controller.recalculate_dirty(2)
+        self.assertTrue(success, entries)
+        self.assertEqual([call.args[3] for call in create.call_args_list], [1])
+        self.assertEqual(entries[0]['total_allowances'], 250)
+        
+        after = dict(self._query("SELECT employee_id, id FROM payroll_entries"))
+        self.assertNotEqual(after[1], before[1])
+        self.assertEqual({k: after[k] for k in (2, 3)}, {k: before[k] for k in (2, 3)})
+        self.assertEqual(
+            self._query("SELECT amount FROM payroll_entry_components WHERE entry_id = ?", (after[1],)),
+            [(25000,)]
+        )
+        self.assertEqual(self._query("SELECT COUNT(*) FROM payroll_entry_components"), [(1,)])
+        self.assertEqual(self._query("SELECT * FROM payroll_dirty"), [])
+
+    def test_deactivated_employee_loses_entry(self):
+        """A marked employee who is no longer active is removed from the period"""
+        self._execute("UPDATE employees SET is_active = 0 WHERE id = 3")
+        success, entries = self.controller.recalculate_dirty(2)
+        self.assertTrue(success, entries)
+        self.assertEqual(entries, [])
+        self.assertEqual([row[0] for row in self._query("SELECT employee_id FROM payroll_entries ORDER BY employee_id")], [1, 2])
+
+    def test_employee_outside_period_is_not_added(self):
+        """A marked employee without an entry in the period stays out of it"""
+        self._execute("INSERT INTO employees VALUES (4, 4000, 1)")
+        self.assertEqual(self._query("SELECT employee_id FROM payroll_dirty"), [(4,)])
+        
+        with patch.object(self.controller.changes, 'ensure_tables') as ensure:
+            success, entries = self.controller.recalculate_dirty(2)
+            ensure.assert_not_called()
+        self.assertTrue(success, entries)
+        self.assertEqual(entries, [])
+        self.assertEqual(self._query("SELECT COUNT(*) FROM payroll_entries WHERE employee_id = 4"), [(0,)])
+        self.assertEqual(self._query("SELECT * FROM payroll_dirty"), [])
+
+    def test_closed_period_is_refused(self):
+        """Only draft periods are recalculated"""
+        success, _ = self.controller.recalculate_dirty(1)
+        self.assertFalse(success)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,164 @@
+"""Tests for parallel payroll generation"""
+import os
+import sqlite3
+import tempfile
+import unittest
+from unittest.mock import Mock, patch
+from repositories.employee_repository import EmployeeRepository
+from repositories.payroll_repository import PayrollRepository
+from services.payroll_service import PayrollService
+from utils.exceptions import PayrollCalculationError
+from utils.money import Money
+
+EMPLOYEES = 40
+
+class TestParallelPayroll(unittest.TestCase):
+    """Test cases for PayrollService.generate_payroll with workers"""
+
+    def setUp(self):
+        fd, self.db_path = tempfile.mkstemp(suffix='.db')
+        os.close(fd)
+        conn = sqlite3.connect(self.db_path)
+        conn.executescript("""
+            CREATE TABLE employee_types (id INTEGER PRIMARY KEY, name TEXT, is_contractor INTEGER,
+                overtime_multiplier REAL, holiday_pay_multiplier REAL, working_hours_per_week REAL);
+            CREATE TABLE employees (id INTEGER PRIMARY KEY, employee_type_id INTEGER,
+                basic_salary REAL, status TEXT);
+            CREATE TABLE employee_details (employee_id INTEGER PRIMARY KEY);
+            CREATE TABLE payroll_periods (id INTEGER PRIMARY KEY, start_date DATE, end_date DATE,
+                status TEXT, updated_at TIMESTAMP);
+            CREATE TABLE social_insurance_config (id INTEGER PRIMARY KEY, rate REAL, effective_date DATE);
+            CREATE TABLE tax_brackets (id INTEGER PRIMARY KEY, min_amount REAL, max_amount REAL,
+                rate REAL, is_active INTEGER);
+            CREATE TABLE leave_types (id INTEGER PRIMARY KEY, name TEXT, paid INTEGER);
+            CREATE TABLE leave_requests (id INTEGER PRIMARY KEY, employee_id INTEGER, leave_type_id INTEGER,
+                start_date DATE, end_date DATE, status TEXT);
+            CREATE TABLE salary_components (id INTEGER PRIMARY KEY, type TEXT, tax_exempt INTEGER,
+                value REAL, percentage REAL, is_active INTEGER);
+            CREATE TABLE employee_salary_components (id INTEGER PRIMARY KEY, employee_id INTEGER,
+                component_id INTEGER, value REAL, percentage REAL, is_active INTEGER);
+            CREATE TABLE attendance_hours (id INTEGER PRIMARY KEY, employee_id INTEGER, period_id INTEGER,
+                type TEXT, hours REAL);
+            CREATE TABLE payroll_entries (id INTEGER PRIMARY KEY AUTOINCREMENT, employee_id INTEGER,
+                period_id INTEGER, basic_salary TEXT, total_allowances TEXT, tax_exempt_allowances TEXT,
+                total_deductions TEXT, leave_deductions TEXT, social_insurance TEXT, overtime_pay TEXT,
+                holiday_premium TEXT, tax TEXT, net_salary TEXT, created_by INTEGER, created_at TIMESTAMP);
+            
+            INSERT INTO employee_types VALUES (1, 'Full Time', 0, 1.5, 2.0, 40);
+            INSERT INTO payroll_periods VALUES (1, '2024-01-01', '2024-01-31', 'draft', NULL);
+            INSERT INTO social_insurance_config VALUES (1, 0.1, '2020-01-01');
+            INSERT INTO tax_brackets VALUES (1, 0, 1000, 0, 1), (2, 1000, NULL, 0.1, 1);
+            INSERT INTO leave_types VALUES (1, 'Unpaid', 0);
+            INSERT INTO salary_components VALUES (1, 'allowance', 0, 500, NULL, 1), (2, 'deduction', 0, 0, 5, 1);
+        """)
+        for employee_id in range(1, EMPLOYEES + 1):
+            conn.execute("INSERT INTO employees VALUES (?, 1, ?, 'active')", (employee_id, 3000 + employee_id * 50))
+            conn.execute("INSERT INTO employee_details VALUES (?)", (employee_id,))
+            conn.execute("INSERT INTO attendance_hours VALUES (NULL, ?, 1, 'overtime', ?)", (employee_id, employee_id % 7))
+        conn.execute("INSERT INTO leave_requests VALUES (1, 3, 1, '2024-01-10', '2024-01-10', 'approved')")
+        conn.commit()
+        conn.close()
+
+    def tearDown(self):
+        for suffix in ('', '-wal', '-shm'):
+            if os.path.exists(self.db_path + suffix):
+                os.remove(self.db_path + suffix)
+
+    def _generate(self, rollups=None, **kwargs):
+        conn = sqlite3.connect(self.db_path, detect_types=sqlite3.PARSE_DECLTYPES)
+        conn.row_factory = sqlite3.Row
+        conn.isolation_level = None
+        try:
+            service = PayrollService(EmployeeRepository(conn), PayrollRepository(conn), rollups)
+            return service.generate_payroll(1, **kwargs)
+        finally:
+            conn.close()
+
+    def _stored_entries(self):
+        conn = sqlite3.connect(self.db_path)
+        try:
+            return conn.execute("""
+                SELECT employee_id, basic_salary, total_allowances, total_deductions,
+                    leave_deductions, overtime_pay, tax, social_insurance, net_salary
+                FROM payroll_entries ORDER BY employee_id
+            """).fetchall()
+        finally:
+            conn.close()
+
+    def _reset(self):
+        conn = sqlite3.connect(self.db_path)
+        conn.execute("DELETE FROM payroll_entries")
+        conn.execute("UPDATE payroll_periods SET status = 'draft'")
+        conn.commit()
+        conn.close()
+
+    def test_parallel_matches_sequential(self):
+        """Both modes store the same entries and report them in employee order"""
+        sequential = self._generate()
+        expected = self._stored_entries()
+        self._reset()
+        
+        parallel = self._generate(workers=2)
+        self.assertEqual(self._stored_entries(), expected)
+        self.assertEqual(len(expected), EMPLOYEES)
+        self.assertEqual(
+            [(e['employee_id'], e['net_salary']) for e in parallel['entries']],
+            [(e['employee_id'], e['net_salary']) for e in sequential['entries']]
+        )
+        self.assertEqual(
+            [e['id'] for e in parallel['entries']],
+            list(range(EMPLOYEES + 1, 2 * EMPLOYEES + 1))
+        )
+        self.assertIsInstance(parallel['entries'][0]['net_salary'], Money)
+        self.assertEqual(parallel['errors'], [])
+
+    def test_employee_errors_are_collected(self):
+        """Failing employees are listed while the others are still written"""
+        result = self._generate(employee_ids=list(range(1, EMPLOYEES + 1)) + [999], workers=3)
+        self.assertEqual(len(result['entries']), EMPLOYEES)
+        self.assertEqual([error['employee_id'] for error in result['errors']], [999])
+
+    def test_rollups_refreshed_after_commit(self):
+        """The processed period is rolled up once the run is committed, not after a failed run"""
+        rollups = Mock()
+        with self.assertRaises(PayrollCalculationError):
+            self._generate(rollups, employee_ids=[999])
+        rollups.refresh_payroll_period.assert_not_called()
+        
+        self._generate(rollups, workers=2)
+        rollups.refresh_payroll_period.assert_called_once_with(1)
+
+    def test_all_failures_roll_back(self):
+        """Nothing is written when every employee fails"""
+        with self.assertRaises(PayrollCalculationError):
+            self._generate(employee_ids=[998, 999], workers=2)
+        self.assertEqual(self._stored_entries(), [])
+        
+        conn = sqlite3.connect(self.db_path)
+        try:
+            status = conn.execute("SELECT status FROM payroll_periods WHERE id = 1").fetchone()[0]
+        finally:
+            conn.close()
+        self.assertEqual(status, 'draft')
+
+    def test_open_transaction_runs_sequentially(self):
+        """Workers cannot see a caller's uncommitted rows, so they are not used"""
+        conn = sqlite3.connect(self.db_path, detect_types=sqlite3.PARSE_DECLTYPES)
+        conn.row_factory = sqlite3.Row
+        conn.isolation_level = None
+        try:
+            payroll_repo = PayrollRepository(conn)
+            service = PayrollService(EmployeeRepository(conn), payroll_repo)
+            payroll_repo.begin_transaction()
+            self.assertFalse(payroll_repo.enable_wal())
+            with patch.object(service, '_calculate_parallel') as parallel:
+                result = service.generate_payroll(1, workers=2)
+                parallel.assert_not_called()
+            payroll_repo.commit_transaction()
+        finally:
+            conn.close()
+        self.assertEqual(len(result['entries']), EMPLOYEES)
+        self.assertEqual(len(self._stored_entries()), EMPLOYEES)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,6 +1,6 @@
 """Unit tests for payroll repository"""
 import unittest
-from decimal import Decimal
+from utils.money import Money
 from datetime import date, datetime
 from unittest.mock import Mock, patch, MagicMock
 from repositories.payroll_repository import PayrollRepository
@@ -38,35 +38,35 @@ class TestPayrollRepository(unittest.TestCase):
         # Arrange
         employee_id = 1
         period_id = 1
-        basic_salary = Decimal('5000.00')
+        basic_salary = Money('5000.00')
         
         # Create a patch for _validate_payroll_period to return our mock period
         with patch.object(self.repo, '_validate_payroll_period', return_value=self.period_mock):
             # Create patches for the calculation methods
-            with patch.object(self.repo, '_calculate_allowances', return_value=(Decimal('1500.00'), Decimal('1000.00'))):
-                with patch.object(self.repo, '_calculate_deductions', return_value=Decimal('500.00')):
-                    with patch.object(self.repo, '_calculate_overtime', return_value=(Decimal('300.00'), Decimal('200.00'))):
-                        with patch.object(self.repo, '_calculate_leave_deductions', return_value=Decimal('0.00')):
-                            with patch.object(self.repo, '_calculate_income_tax', return_value=Decimal('800.00')):
-                                with patch.object(self.repo, '_calculate_social_insurance', return_value=Decimal('300.00')):
+            with patch.object(self.repo, '_calculate_allowances', return_value=(Money('1500.00'), Money('1000.00'))):
+                with patch.object(self.repo, '_calculate_deductions', return_value=Money('500.00')):
+                    with patch.object(self.repo, '_calculate_overtime', return_value=(Money('300.00'), Money('200.00'))):
+                        with patch.object(self.repo, '_calculate_leave_deductions', return_value=Money('0.00')):
+                            with patch.object(self.repo, '_calculate_income_tax', return_value=Money('800.00')):
+                                with patch.object(self.repo, '_calculate_social_insurance', return_value=Money('300.00')):
                                     # Act
                                     result = self.repo.calculate_net_salary(employee_id, period_id, basic_salary)
         
                                     # Assert
                                     self.assertEqual(result['basic_salary'], basic_salary)
-                                    self.assertEqual(result['total_allowances'], Decimal('1500.00'))
-                                    self.assertEqual(result['tax_exempt_allowances'], Decimal('1000.00'))
-                                    self.assertEqual(result['total_deductions'], Decimal('500.00'))
-                                    self.assertEqual(result['overtime_pay'], Decimal('300.00'))
-                                    self.assertEqual(result['holiday_premium'], Decimal('200.00'))
-                                    self.assertEqual(result['leave_deductions'], Decimal('0.00'))
-                                    self.assertEqual(result['tax'], Decimal('800.00'))
-                                    self.assertEqual(result['social_insurance'], Decimal('300.00'))
+                                    self.assertEqual(result['total_allowances'], Money('1500.00'))
+                                    self.assertEqual(result['tax_exempt_allowances'], Money('1000.00'))
+                                    self.assertEqual(result['total_deductions'], Money('500.00'))
+                                    self.assertEqual(result['overtime_pay'], Money('300.00'))
+                                    self.assertEqual(result['holiday_premium'], Money('200.00'))
+                                    self.assertEqual(result['leave_deductions'], Money('0.00'))
+                                    self.assertEqual(result['tax'], Money('800.00'))
+                                    self.assertEqual(result['social_insurance'], Money('300.00'))
                                     
                                     # Net salary = basic + allowances + overtime + holiday - deductions - leave - tax - social
-                                    expected_net = (basic_salary + Decimal('1500.00') + Decimal('300.00') + 
-                                                   Decimal('200.00') - Decimal('500.00') - Decimal('0.00') - 
-                                                   Decimal('800.00') - Decimal('300.00'))
+                                    expected_net = (basic_salary + Money('1500.00') + Money('300.00') + 
+                                                   Money('200.00') - Money('500.00') - Money('0.00') - 
+                                                   Money('800.00') - Money('300.00'))
                                     self.assertEqual(result['net_salary'], expected_net)
 
     def test_calculate_net_salary_part_time(self):
@@ -74,35 +74,35 @@ class TestPayrollRepository(unittest.TestCase):
         # Arrange
         employee_id = 2
         period_id = 1
-        basic_salary = Decimal('3000.00')  # Pro-rated salary
+        basic_salary = Money('3000.00')  # Pro-rated salary
         
         # Create a patch for _validate_payroll_period to return our mock period
         with patch.object(self.repo, '_validate_payroll_period', return_value=self.period_mock):
             # Create patches for the calculation methods
-            with patch.object(self.repo, '_calculate_allowances', return_value=(Decimal('750.00'), Decimal('500.00'))):
-                with patch.object(self.repo, '_calculate_deductions', return_value=Decimal('250.00')):
-                    with patch.object(self.repo, '_calculate_overtime', return_value=(Decimal('150.00'), Decimal('100.00'))):
-                        with patch.object(self.repo, '_calculate_leave_deductions', return_value=Decimal('0.00')):
-                            with patch.object(self.repo, '_calculate_income_tax', return_value=Decimal('400.00')):
-                                with patch.object(self.repo, '_calculate_social_insurance', return_value=Decimal('150.00')):
+            with patch.object(self.repo, '_calculate_allowances', return_value=(Money('750.00'), Money('500.00'))):
+                with patch.object(self.repo, '_calculate_deductions', return_value=Money('250.00')):
+                    with patch.object(self.repo, '_calculate_overtime', return_value=(Money('150.00'), Money('100.00'))):
+                        with patch.object(self.repo, '_calculate_leave_deductions', return_value=Money('0.00')):
+                            with patch.object(self.repo, '_calculate_income_tax', return_value=Money('400.00')):
+                                with patch.object(self.repo, '_calculate_social_insurance', return_value=Money('150.00')):
                                     # Act
                                     result = self.repo.calculate_net_salary(employee_id, period_id, basic_salary)
         
                                     # Assert
                                     self.assertEqual(result['basic_salary'], basic_salary)
-                                    self.assertEqual(result['total_allowances'], Decimal('750.00'))
-                                    self.assertEqual(result['tax_exempt_allowances'], Decimal('500.00'))
-                                    self.assertEqual(result['total_deductions'], Decimal('250.00'))
-                                    self.assertEqual(result['overtime_pay'], Decimal('150.00'))
-                                    self.assertEqual(result['holiday_premium'], Decimal('100.00'))
-                                    self.assertEqual(result['leave_deductions'], Decimal('0.00'))
-                                    self.assertEqual(result['tax'], Decimal('400.00'))
-                                    self.assertEqual(result['social_insurance'], Decimal('150.00'))
+                                    self.assertEqual(result['total_allowances'], Money('750.00'))
+                                    self.assertEqual(result['tax_exempt_allowances'], Money('500.00'))
+                                    self.assertEqual(result['total_deductions'], Money('250.00'))
+                                    self.assertEqual(result['overtime_pay'], Money('150.00'))
+                                    self.assertEqual(result['holiday_premium'], Money('100.00'))
+                                    self.assertEqual(result['leave_deductions'], Money('0.00'))
+                                    self.assertEqual(result['tax'], Money('400.00'))
+                                    self.assertEqual(result['social_insurance'], Money('150.00'))
                                     
                                     # Net salary = basic + allowances + overtime + holiday - deductions - leave - tax - social
-                                    expected_net = (basic_salary + Decimal('750.00') + Decimal('150.00') + 
-                                                   Decimal('100.00') - Decimal('250.00') - Decimal('0.00') - 
-                                                   Decimal('400.00') - Decimal('150.00'))
+                                    expected_net = (basic_salary + Money('750.00') + Money('150.00') + 
+                                                   Money('100.00') - Money('250.00') - Money('0.00') - 
+                                                   Money('400.00') - Money('150.00'))
                                     self.assertEqual(result['net_salary'], expected_net)
 
     def test_calculate_contractor_salary(self):
@@ -110,7 +110,7 @@ class TestPayrollRepository(unittest.TestCase):
         # Arrange
         employee_id = 3
         period_id = 1
-        basic_salary = Decimal('5000.00')
+        basic_salary = Money('5000.00')
         
         # Mock the _validate_contractor method to return True
         with patch.object(self.repo, '_validate_contractor', return_value=True):
@@ -120,14 +120,14 @@ class TestPayrollRepository(unittest.TestCase):
             # Assert
             self.assertEqual(result['basic_salary'], basic_salary)
             self.assertEqual(result['net_salary'], basic_salary)
-            self.assertEqual(result['total_deductions'], Decimal('0'))
-            self.assertEqual(result['social_insurance'], Decimal('0'))
-            self.assertEqual(result['tax'], Decimal('0'))
+            self.assertEqual(result['total_deductions'], Money('0'))
+            self.assertEqual(result['social_insurance'], Money('0'))
+            self.assertEqual(result['tax'], Money('0'))
 
     def test_calculate_tax_progressive(self):
         """Test progressive tax calculation"""
         # Arrange
-        taxable_amount = Decimal('5000.00')
+        taxable_amount = Money('5000.00')
         tax_brackets = [
             {'min_amount': '0', 'max_amount': '1000', 'rate': '0.10'},
             {'min_amount': '1000', 'max_amount': '3000', 'rate': '0.15'},
@@ -139,7 +139,7 @@ class TestPayrollRepository(unittest.TestCase):
         # 2000 * 0.15 = 300
         # 2000 * 0.20 = 400
         # Total = 800
-        expected_tax = Decimal('800.00')
+        expected_tax = Money('800.00')
         
         # Act
         result = self.repo._calculate_tax(taxable_amount, tax_brackets)
@@ -0,0 +1,89 @@
+"""Tests for bulk payslip rendering"""
+import os
+import shutil
+import tempfile
+import unittest
+from utils.payslip_batch import (
+    build_payslip_context, render_payslip_body, render_payslip_document,
+    generate_payslip_pdfs, payslip_filename
+)
+
+class TestPayslipBatch(unittest.TestCase):
+    """Test cases for the payslip template and PDF pipeline"""
+
+    def setUp(self):
+        self.payslip = {
+            'id': 10,
+            'employee_id': 7,
+            'employee_name': 'Test Employee',
+            'period_year': 2024,
+            'period_month': 3,
+            'start_date': '2024-03-01',
+            'end_date': '2024-03-31',
+            'basic_salary': 5000,
+            'payment_status': 'paid',
+            'components': [
+                {'type': 'allowance', 'amount': 1000, 'name': 'Housing', 'name_ar': 'بدل سكن'},
+                {'type': 'deduction', 'amount': 250, 'name': 'Insurance', 'name_ar': 'تأمين'}
+            ]
+        }
+        self.company = {'company_name': 'ACME', 'tax_number': '123'}
+        self.temp_dir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir)
+
+    def test_context_computes_net_from_components(self):
+        """Net salary matches the printed lines"""
+        context = build_payslip_context(self.payslip, self.company)
+        self.assertEqual(context['net_salary'], 5750.0)
+        self.assertEqual(context['start_date'], '2024/03/01')
+        self.assertEqual(context['payment_status'], 'مدفوع')
+        self.assertEqual(len(context['allowances']), 1)
+        self.assertEqual(len(context['deductions']), 1)
+
+    def test_invalid_month_falls_back_to_january(self):
+        """Out of range months do not break rendering"""
+        self.payslip['period_month'] = 13
+        context = build_payslip_context(self.payslip)
+        self.assertEqual(context['month_name'], 'يناير')
+
+    def test_render_escapes_employee_data(self):
+        """Employee data is HTML escaped"""
+        self.payslip['employee_name'] = '<script>'
+        html = render_payslip_document([render_payslip_body(self.payslip, self.company)])
+        self.assertIn('&lt;script&gt;', html)
+        self.assertIn('5,750.00', html)
+        self.assertIn('ACME', html)
+
+    def test_document_shares_one_stylesheet(self):
+        """Several payslips are wrapped with a single style block"""
+        body = render_payslip_body(self.payslip, self.company)
+        html = render_payslip_document([body, body, body])
+        self.assertEqual(html.count('<style>'), 1)
+        self.assertEqual(html.count('page-break-after'), 2)
+
+    def test_generate_one_pdf_per_employee(self):
+        """Per-employee PDFs are written to the output directory"""
+        payslips = [dict(self.payslip, employee_id=i) for i in range(3)]
+        success, files = generate_payslip_pdfs(payslips, output_dir=self.temp_dir, max_workers=2)
+        self.assertTrue(success, files)
+        self.assertEqual(len(files), 3)
+        self.assertTrue(all(os.path.exists(f) for f in files))
+        self.assertEqual(os.path.basename(files[0]), payslip_filename(payslips[0]))
+
+    def test_generate_merged_pdf(self):
+        """A single merged PDF can be produced"""
+        merged = os.path.join(self.temp_dir, 'all.pdf')
+        success, files = generate_payslip_pdfs([self.payslip] * 2, merged_filename=merged)
+        self.assertTrue(success, files)
+        self.assertEqual(files, [merged])
+        self.assertGreater(os.path.getsize(merged), 0)
+
+    def test_generate_without_payslips_fails(self):
+        """An empty batch is reported as an error"""
+        success, _ = generate_payslip_pdfs([], output_dir=self.temp_dir)
+        self.assertFalse(success)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,98 @@
+"""Tests for the batched payslip loader"""
+import os
+import shutil
+import sqlite3
+import tempfile
+import unittest
+from unittest.mock import patch
+from controllers.payroll_controller import PayrollController
+from database.database import Database
+
+class TestPayslipLoader(unittest.TestCase):
+    """Test cases for PayrollController.get_period_payslips and get_employee_payslip"""
+
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.db_file = os.path.join(self.temp_dir, 'payroll.db')
+        conn = sqlite3.connect(self.db_file)
+        conn.executescript("""
+            CREATE TABLE employees (id INTEGER PRIMARY KEY, name TEXT, name_ar TEXT);
+            CREATE TABLE payroll_periods (id INTEGER PRIMARY KEY, period_year INTEGER, period_month INTEGER,
+                                          start_date TEXT, end_date TEXT);
+            CREATE TABLE payroll_entries (id INTEGER PRIMARY KEY, payroll_period_id INTEGER, employee_id INTEGER,
+                                          basic_salary INTEGER, total_allowances INTEGER, total_deductions INTEGER,
+                                          net_salary INTEGER, payment_method INTEGER, payment_status TEXT);
+            CREATE TABLE payment_methods (id INTEGER PRIMARY KEY, name TEXT, name_ar TEXT);
+            CREATE TABLE salary_components (id INTEGER PRIMARY KEY, name TEXT, name_ar TEXT, type TEXT);
+            CREATE TABLE payroll_entry_components (id INTEGER PRIMARY KEY, payroll_entry_id INTEGER,
+                                                   component_id INTEGER, value INTEGER);
+            INSERT INTO employees VALUES (1, 'Adam', 'آدم'), (2, 'Badr', 'بدر');
+            INSERT INTO payroll_periods VALUES (1, 2024, 3, '2024-03-01', '2024-03-31');
+            INSERT INTO payroll_entries VALUES (1, 1, 1, 100000, 10000, 0, 110000, NULL, 'pending'),
+                                               (2, 1, 2, 200000, 0, 5050, 194950, NULL, 'pending');
+            INSERT INTO salary_components VALUES (1, 'Housing', 'سكن', 'allowance'), (2, 'Insurance', 'تأمين', 'deduction');
+            INSERT INTO payroll_entry_components VALUES (1, 1, 1, 10000), (2, 2, 2, 5050);
+        """)
+        conn.commit()
+        conn.close()
+
+        with patch.object(Database, 'create_tables'), patch.object(Database, 'validate_schema'):
+            self.db = Database(self.db_file)
+        self.controller = PayrollController(self.db)
+
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir)
+
+    def test_period_payslips_grouped_by_entry(self):
+        """Every entry gets its own components"""
+        success, payslips = self.controller.get_period_payslips(1)
+        self.assertTrue(success, payslips)
+        self.assertEqual([p['employee_name'] for p in payslips], ['Adam', 'Badr'])
+        self.assertEqual(payslips[0]['components'][0]['name'], 'Housing')
+        self.assertEqual(payslips[1]['components'][0]['type'], 'deduction')
+        self.assertEqual(payslips[0]['department_name'], '')
+
+    def test_amounts_in_major_units(self):
+        """Stored minor units are read back as major-unit amounts"""
+        _, payslips = self.controller.get_period_payslips(1)
+        self.assertEqual(payslips[1]['net_salary'], 1949.5)
+        self.assertEqual(payslips[1]['components'][0]['amount'], 50.5)
+
+    def test_employee_payslip_uses_loader(self):
+        """A single payslip matches its entry in the period batch"""
+        _, payslips = self.controller.get_period_payslips(1)
+        success, payslip = self.controller.get_employee_payslip(2)
+        self.assertTrue(success)
+        self.assertEqual(payslip, payslips[1])
+
+    def test_missing_entry(self):
+        """An unknown entry is reported as not found"""
+        success, message = self.controller.get_employee_payslip(99)
+        self.assertFalse(success)
+        self.assertEqual(message, "Entry not found")
+
+    def test_picks_up_new_tables_after_schema_change(self):
+        """Department and bank details appear once employment_details exists"""
+        self.controller.get_period_payslips(1)
+
+        conn = sqlite3.connect(self.db_file)
+        conn.executescript("""
+            CREATE TABLE departments (id INTEGER PRIMARY KEY, name TEXT);
+            CREATE TABLE positions (id INTEGER PRIMARY KEY, title TEXT);
+            CREATE TABLE employment_details (id INTEGER PRIMARY KEY, employee_id INTEGER, department_id INTEGER,
+                                             position_id INTEGER, bank_name TEXT, bank_account TEXT, iban TEXT);
+            INSERT INTO departments VALUES (1, 'Sales');
+            INSERT INTO positions VALUES (1, 'Manager');
+            INSERT INTO employment_details VALUES (1, 1, 1, 1, 'Bank', '123', 'SA00');
+        """)
+        conn.commit()
+        conn.close()
+
+        success, payslip = self.controller.get_employee_payslip(1)
+        self.assertTrue(success)
+        self.assertEqual(payslip['department_name'], 'Sales')
+        self.assertEqual(payslip['position_title'], 'Manager')
+        self.assertEqual(payslip['iban'], 'SA00')
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,127 @@
+"""Tests for the per-run payroll reference data"""
+import sqlite3
+import unittest
+from repositories.payroll_repository import PayrollRepository, PeriodContext
+from utils.exceptions import PayrollValidationError
+from utils.money import Money
+
+class TestPeriodContext(unittest.TestCase):
+    """Test cases for PeriodContext"""
+
+    def setUp(self):
+        self.conn = sqlite3.connect(':memory:')
+        self.conn.row_factory = sqlite3.Row
+        self.conn.executescript("""
+            CREATE TABLE employee_types (id INTEGER PRIMARY KEY, name TEXT,
+                overtime_multiplier REAL, holiday_pay_multiplier REAL);
+            CREATE TABLE employees (id INTEGER PRIMARY KEY, employee_type_id INTEGER);
+            CREATE TABLE payroll_periods (id INTEGER PRIMARY KEY, start_date DATE, end_date DATE, status TEXT);
+            CREATE TABLE social_insurance_config (id INTEGER PRIMARY KEY, rate REAL, effective_date DATE);
+            CREATE TABLE tax_brackets (id INTEGER PRIMARY KEY, min_amount REAL, max_amount REAL,
+                rate REAL, is_active INTEGER);
+            CREATE TABLE leave_types (id INTEGER PRIMARY KEY, name TEXT, paid INTEGER);
+            CREATE TABLE leave_requests (id INTEGER PRIMARY KEY, employee_id INTEGER, leave_type_id INTEGER,
+                start_date DATE, end_date DATE, status TEXT);
+            CREATE TABLE salary_components (id INTEGER PRIMARY KEY, type TEXT, tax_exempt INTEGER,
+                value REAL, percentage REAL, is_active INTEGER);
+            CREATE TABLE employee_salary_components (id INTEGER PRIMARY KEY, employee_id INTEGER,
+                component_id INTEGER, value REAL, percentage REAL, is_active INTEGER);
+            CREATE TABLE attendance_hours (id INTEGER PRIMARY KEY, employee_id INTEGER, period_id INTEGER,
+                type TEXT, hours REAL);
+            
+            INSERT INTO employee_types VALUES (1, 'Full Time', 1.5, 2.0);
+            INSERT INTO employees VALUES (1, 1), (2, 1), (3, 99);
+            INSERT INTO payroll_periods VALUES (1, '2024-01-01', '2024-01-31', 'draft');
+            INSERT INTO social_insurance_config VALUES (1, 0.1, '2020-01-01');
+            INSERT INTO tax_brackets VALUES (1, 0, 1000, 0, 1), (2, 1000, NULL, 0.1, 1);
+            INSERT INTO leave_types VALUES (1, 'Unpaid', 0), (2, 'Annual', 1);
+            INSERT INTO leave_requests VALUES
+                (1, 1, 1, '2024-01-10', '2024-01-10', 'approved'),
+                (2, 1, 2, '2024-01-11', '2024-01-11', 'approved');
+            INSERT INTO salary_components VALUES
+                (1, 'allowance', 0, 500, NULL, 1),
+                (2, 'allowance', 1, 0, 10, 1),
+                (3, 'deduction', 0, 100, NULL, 1),
+                (4, 'allowance', 0, 1000, NULL, 0);
+            INSERT INTO employee_salary_components VALUES (1, 2, 1, 800, NULL, 1), (2, 2, 4, NULL, NULL, 1);
+            INSERT INTO attendance_hours VALUES (1, 1, 1, 'overtime', 10);
+        """)
+        self.repo = PayrollRepository(self.conn)
+        self.statements = []
+        self.conn.set_trace_callback(self.statements.append)
+
+    def tearDown(self):
+        self.conn.close()
+
+    def _count(self, table):
+        return sum(1 for sql in self.statements if f"FROM {table}" in sql)
+
+    def test_context_holds_reference_data(self):
+        """The period and catalog are loaded, rates as floats and bracket bounds as Money"""
+        context = self.repo.load_period_context(1)
+        self.assertIsInstance(context, PeriodContext)
+        self.assertEqual(context.working_days, 23)
+        self.assertEqual(context.employee_types[1]['overtime_multiplier'], 1.5)
+        self.assertEqual(context.employee_type_ids, {1: 1, 2: 1, 3: 99})
+        self.assertEqual(context.social_insurance_rate, 0.1)
+        self.assertEqual(context.tax_brackets[1]['min_amount'], Money(1000))
+        self.assertIsNone(context.tax_brackets[1]['max_amount'])
+        self.assertEqual(context.leave_types[1]['deduction_rate'], 1.0)
+        self.assertEqual(context.leave_days, {1: {1: 1, 2: 1}})
+        self.assertEqual(set(context.components), {1, 2, 3, 4})
+
+    def test_reference_queries_run_once_per_run(self):
+        """Calculating many employees with one context does not reload it"""
+        context = self.repo.load_period_context(1)
+        self.statements.clear()
+        for employee_id in (1, 2):
+            self.repo.calculate_net_salary(employee_id, 1, Money('4600'), context=context)
+        
+        for table in ('payroll_periods', 'employee_types', 'tax_brackets',
+                      'social_insurance_config', 'leave_types', 'leave_requests', 'salary_components'):
+            self.assertEqual(self._count(table), 0, table)
+        self.assertEqual(self._count('employee_salary_components'), 2)
+
+    def test_results_match_without_context(self):
+        """A shared context gives the same figures as a per-call load"""
+        context = self.repo.load_period_context(1)
+        for employee_id in (1, 2):
+            self.assertEqual(
+                self.repo.calculate_net_salary(employee_id, 1, Money('4600'), context=context),
+                self.repo.calculate_net_salary(employee_id, 1, Money('4600'))
+            )
+        
+        result = self.repo.calculate_net_salary(1, 1, Money('4600'), context=context)
+        self.assertEqual(result['total_allowances'], Money('960'))
+        self.assertEqual(result['tax_exempt_allowances'], Money('460'))
+        self.assertEqual(result['leave_deductions'], Money('200'))
+        self.assertEqual(result['overtime_pay'], Money('431.25'))
+        
+        # Employee overrides replace the catalog value and revive inactive components
+        result = self.repo.calculate_net_salary(2, 1, Money('4600'), context=context)
+        self.assertEqual(result['taxable_allowances'], Money('1800'))
+
+    def test_leave_days_overlapping_the_period(self):
+        """Leave days are the working days a leave shares with the period"""
+        self.conn.executescript("""
+            INSERT INTO payroll_periods VALUES (2, '2024-02-01', '2024-02-29', 'draft');
+            INSERT INTO leave_requests VALUES
+                (3, 2, 1, '2024-01-29', '2024-02-06', 'approved'),
+                (4, 2, 1, '2023-12-30', '2024-01-02', 'approved'),
+                (5, 2, 1, '2024-01-15', '2024-01-19', 'pending');
+        """)
+        # Jan 29-31 and Feb 1-6 are split between the periods, weekends are not counted
+        self.assertEqual(self.repo.load_period_context(1).leave_days[2], {1: 5})
+        self.assertEqual(self.repo.load_period_context(2).leave_days, {2: {1: 4}})
+        
+        result = self.repo.calculate_net_salary(2, 2, Money('4200'))
+        self.assertEqual(result['leave_deductions'], Money('800'))
+
+    def test_unknown_employee_type_is_rejected(self):
+        """Employees whose type is missing fail validation"""
+        context = self.repo.load_period_context(1)
+        with self.assertRaises(PayrollValidationError):
+            self.repo.calculate_net_salary(3, 1, Money('4600'), context=context)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,116 @@
+"""Tests for the background report job queue"""
+import threading
+import time
+import unittest
+from PyQt5.QtCore import QCoreApplication
+from utils.report_jobs import ReportJobQueue
+
+class _Database:
+    """Stand-in exposing the data version used for result caching"""
+
+    def __init__(self):
+        self.version = 1
+
+    def get_data_version(self):
+        return self.version
+
+class TestReportJobQueue(unittest.TestCase):
+    """Test cases for ReportJobQueue"""
+
+    @classmethod
+    def setUpClass(cls):
+        cls.app = QCoreApplication.instance() or QCoreApplication([])
+
+    def setUp(self):
+        self.db = _Database()
+        self.queue = ReportJobQueue(self.db, max_workers=2)
+        self.calls = []
+        self.release = threading.Event()
+        self.finished, self.failed, self.cancelled, self.progress = {}, {}, [], []
+        self.queue.job_finished.connect(lambda rid, result: self.finished.__setitem__(rid, result))
+        self.queue.job_failed.connect(lambda rid, error: self.failed.__setitem__(rid, error))
+        self.queue.job_cancelled.connect(self.cancelled.append)
+        self.queue.job_progress.connect(lambda rid, percent, _: self.progress.append((rid, percent)))
+
+        def total(year, month):
+            self.calls.append((year, month))
+            self.release.wait(5)
+            return year * 100 + month
+
+        def slow(job):
+            for step in range(50):
+                job.report_progress(step * 2)
+                time.sleep(0.01)
+            return 'done'
+
+        def broken():
+            raise ValueError("bad report")
+
+        self.queue.register('total', total)
+        self.queue.register('slow', slow, progress=True)
+        self.queue.register('broken', broken)
+
+    def tearDown(self):
+        self.release.set()
+        self.queue.wait_for_done(5000)
+
+    def _wait(self, condition, timeout=5):
+        deadline = time.monotonic() + timeout
+        while not condition() and time.monotonic() < deadline:
+            self.app.processEvents()
+            time.sleep(0.005)
+        self.app.processEvents()
+        self.assertTrue(condition())
+
+    def test_identical_requests_share_one_job(self):
+        """Duplicate in-flight requests run the report once"""
+        first = self.queue.submit('total', year=2024, month=1)
+        second = self.queue.submit('total', month=1, year=2024)
+        self.release.set()
+        self._wait(lambda: first in self.finished and second in self.finished)
+        self.assertEqual(self.calls, [(2024, 1)])
+        self.assertEqual(self.finished[second], 202401)
+
+    def test_results_cached_until_data_changes(self):
+        """Cached results are served until the data version changes"""
+        self.release.set()
+        first = self.queue.submit('total', year=2024, month=2)
+        self._wait(lambda: first in self.finished)
+
+        cached = self.queue.submit('total', year=2024, month=2)
+        self._wait(lambda: cached in self.finished)
+        self.assertEqual(len(self.calls), 1)
+
+        self.db.version = 2
+        fresh = self.queue.submit('total', year=2024, month=2)
+        self._wait(lambda: fresh in self.finished)
+        self.assertEqual(len(self.calls), 2)
+
+    def test_cancel_running_job(self):
+        """A cancelled job stops at its next progress report"""
+        request = self.queue.submit('slow')
+        self._wait(lambda: any(rid == request and percent > 0 for rid, percent in self.progress))
+        self.assertTrue(self.queue.cancel(request))
+        self.queue.wait_for_done(5000)
+        self.app.processEvents()
+        self.assertEqual(self.cancelled, [request])
+        self.assertNotIn(request, self.finished)
+        self.assertEqual(self.queue.pending_requests(), [])
+
+    def test_shared_job_survives_partial_cancel(self):
+        """Cancelling one of two identical requests keeps the other"""
+        first = self.queue.submit('total', year=2024, month=3)
+        second = self.queue.submit('total', year=2024, month=3)
+        self.queue.cancel(first)
+        self.release.set()
+        self._wait(lambda: second in self.finished)
+        self.assertNotIn(first, self.finished)
+
+    def test_failure_reported(self):
+        """Exceptions in a report are reported through job_failed"""
+        request = self.queue.submit('broken')
+        self._wait(lambda: request in self.failed)
+        self.assertEqual(self.failed[request], "bad report")
+
+if __name__ == '__main__':
+    unittest.main()
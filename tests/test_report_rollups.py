@@ -0,0 +1,147 @@
+"""Tests for the monthly report rollup tables"""
+import os
+import shutil
+import sqlite3
+import tempfile
+import unittest
+from unittest.mock import patch
+from controllers.payroll_controller import PayrollController
+from controllers.report_controller import ReportController
+from database.database import Database
+from database.report_rollups import ReportRollups, month_bounds
+
+class TestReportRollups(unittest.TestCase):
+    """Test cases for ReportRollups and the reports reading from them"""
+
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.db_file = os.path.join(self.temp_dir, 'employee.db')
+        conn = sqlite3.connect(self.db_file)
+        conn.executescript("""
+            CREATE TABLE departments (id INTEGER PRIMARY KEY, name TEXT);
+            CREATE TABLE employees (id INTEGER PRIMARY KEY, name TEXT, department_id INTEGER,
+                                    basic_salary REAL, is_active INTEGER DEFAULT 1);
+            CREATE TABLE payroll_periods (id INTEGER PRIMARY KEY, period_year INTEGER, period_month INTEGER,
+                                          start_date TEXT, end_date TEXT, status TEXT);
+            CREATE TABLE payroll_entries (id INTEGER PRIMARY KEY, payroll_period_id INTEGER, employee_id INTEGER,
+                                          basic_salary INTEGER, total_allowances INTEGER, total_deductions INTEGER,
+                                          net_salary INTEGER, payment_status TEXT);
+            CREATE TABLE attendance_records (id INTEGER PRIMARY KEY, employee_id INTEGER, check_in TEXT,
+                                             check_out TEXT, total_hours REAL, status TEXT);
+            INSERT INTO departments VALUES (1, 'Sales'), (2, 'IT');
+            INSERT INTO employees VALUES (1, 'Adam', 1, 1000, 1), (2, 'Badr', 2, 2000, 1);
+            INSERT INTO payroll_periods VALUES (1, 2024, 1, '2024-01-01', '2024-01-31', 'processed'),
+                                               (2, 2024, 2, '2024-02-01', '2024-02-29', 'approved'),
+                                               (3, 2024, 3, '2024-03-01', '2024-03-31', 'draft');
+            INSERT INTO payroll_entries VALUES
+                (1, 1, 1, 100000, 10000, 0, 110000, 'paid'), (2, 1, 2, 200000, 0, 10000, 190000, 'paid'),
+                (3, 2, 1, 100000, 10000, 0, 110000, 'pending'), (4, 3, 1, 100000, 0, 0, 100000, 'pending');
+            INSERT INTO attendance_records VALUES
+                (1, 1, '2024-01-02 09:00:00', '2024-01-02 17:00:00', 8, 'present'),
+                (2, 1, '2024-01-03 09:30:00', '2024-01-03 17:00:00', 7.5, 'late'),
+                (3, 2, '2024-02-01 09:00:00', '2024-02-01 17:00:00', 8, 'present');
+        """)
+        conn.commit()
+        conn.close()
+
+        with patch.object(Database, 'create_tables'), patch.object(Database, 'validate_schema'):
+            self.db = Database(self.db_file)
+        self.rollups = ReportRollups(self.db)
+        self.rollups.ensure_tables()
+
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir)
+
+    def _fetch(self, query, params=()):
+        conn = self.db.get_connection()
+        try:
+            return conn.execute(query, params).fetchall()
+        finally:
+            conn.close()
+
+    def test_month_bounds_wraps_year(self):
+        """December rolls over into January of the next year"""
+        self.assertEqual(month_bounds(2024, 12), ('2024-12-01', '2025-01-01'))
+
+    def test_backfill_skips_draft_periods(self):
+        """Existing approved and processed periods are rolled up on creation"""
+        rows = self._fetch("""
+            SELECT year, month, employee_id, total_gross, total_net, total_paid
+            FROM payroll_monthly_summary ORDER BY year, month, employee_id
+        """)
+        self.assertEqual(rows, [
+            (2024, 1, 1, 110000, 110000, 110000), (2024, 1, 2, 200000, 190000, 190000),
+            (2024, 2, 1, 110000, 110000, 0)
+        ])
+        departments = self._fetch("""
+            SELECT department_id, employee_count, total_net
+            FROM payroll_department_monthly_summary WHERE year = 2024 AND month = 1
+            ORDER BY department_id
+        """)
+        self.assertEqual(departments, [(1, 1, 110000), (2, 1, 190000)])
+
+    def test_refresh_period_updates_month(self):
+        """Approving a period refreshes only its month"""
+        conn = self.db.get_connection()
+        conn.execute("UPDATE payroll_periods SET status = 'approved' WHERE id = 3")
+        conn.commit()
+        conn.close()
+
+        success, _ = self.rollups.refresh_payroll_period(3)
+        self.assertTrue(success)
+        rows = self._fetch("SELECT employee_id, total_net FROM payroll_monthly_summary WHERE year = 2024 AND month = 3")
+        self.assertEqual(rows, [(1, 100000)])
+
+    def test_component_edit_refreshes_approved_month(self):
+        """Editing an entry component of an approved period updates its rollups"""
+        conn = self.db.get_connection()
+        conn.executescript("""
+            CREATE TABLE salary_components (id INTEGER PRIMARY KEY, type TEXT);
+            CREATE TABLE payroll_entry_components (id INTEGER PRIMARY KEY, payroll_entry_id INTEGER,
+                                                   component_id INTEGER, value INTEGER);
+            INSERT INTO salary_components VALUES (1, 'allowance');
+            INSERT INTO payroll_entry_components VALUES (1, 3, 1, 10000);
+        """)
+        conn.close()
+        self.db.invalidate_schema_cache()
+        
+        controller = PayrollController(self.db)
+        with patch.object(controller, 'analytics'):
+            success, message = controller.update_entry_component(3, 1, 250)
+        self.assertTrue(success, message)
+        rows = self._fetch("SELECT employee_id, total_net FROM payroll_monthly_summary WHERE year = 2024 AND month = 2")
+        self.assertEqual(rows, [(1, 125000)])
+
+    def test_refresh_attendance_for_one_employee(self):
+        """An attendance change only recomputes that employee's month"""
+        conn = self.db.get_connection()
+        conn.execute("""
+            INSERT INTO attendance_records (employee_id, check_in, check_out, total_hours, status)
+            VALUES (1, '2024-01-04 09:00:00', '2024-01-04 17:00:00', 8, 'present')
+        """)
+        conn.commit()
+        conn.close()
+
+        self.rollups.refresh_attendance(1, '2024-01-04')
+        rows = self._fetch("""
+            SELECT employee_id, days_present, days_late, total_hours
+            FROM attendance_monthly_summary WHERE year = 2024 AND month = 1
+        """)
+        self.assertEqual(rows, [(1, 2, 1, 23.5)])
+
+    def test_reports_read_rollups(self):
+        """Report methods aggregate from the rollup tables"""
+        controller = ReportController(self.db)
+
+        success, report = controller.generate_payroll_report('2024-01-15', '2024-02-10')
+        self.assertTrue(success, report)
+        self.assertEqual(list(report['employee_name']), ['Badr', 'Adam'])
+        self.assertEqual(list(report['total_net']), [1900, 2200])
+        self.assertEqual(list(report['payment_count']), [1, 2])
+
+        success, attendance = controller.generate_attendance_report(1, 2024)
+        self.assertTrue(success, attendance)
+        self.assertEqual(attendance.iloc[0]['days_present'], 1)
+
+if __name__ == '__main__':
+    unittest.main()
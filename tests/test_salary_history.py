@@ -0,0 +1,120 @@
+"""Tests for the cached employee salary history"""
+import os
+import shutil
+import sqlite3
+import tempfile
+import unittest
+from unittest.mock import patch
+from controllers.payroll_controller import PayrollController
+from database.database import Database
+
+class TestSalaryHistory(unittest.TestCase):
+    """Test cases for PayrollController.get_employee_salary_history"""
+
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.db_file = os.path.join(self.temp_dir, 'payroll.db')
+        conn = sqlite3.connect(self.db_file)
+        conn.executescript("""
+            CREATE TABLE payroll_periods (id INTEGER PRIMARY KEY, period_year INTEGER, period_month INTEGER,
+                                          start_date TEXT, end_date TEXT);
+            CREATE TABLE payroll_entries (id INTEGER PRIMARY KEY, payroll_period_id INTEGER, employee_id INTEGER,
+                                          basic_salary INTEGER, total_allowances INTEGER, total_deductions INTEGER,
+                                          total_adjustments INTEGER, working_days INTEGER, net_salary INTEGER,
+                                          payment_method INTEGER, payment_status TEXT, payment_date TEXT,
+                                          payment_reference TEXT, updated_at TEXT);
+            CREATE TABLE salary_components (id INTEGER PRIMARY KEY, name TEXT, name_ar TEXT, type TEXT);
+            CREATE TABLE payroll_entry_components (id INTEGER PRIMARY KEY, payroll_entry_id INTEGER,
+                                                   component_id INTEGER, value INTEGER);
+            INSERT INTO payroll_periods VALUES (1, 2024, 1, '2024-01-01', '2024-01-31'),
+                                               (2, 2024, 2, '2024-02-01', '2024-02-29');
+            INSERT INTO payroll_entries VALUES
+                (1, 1, 7, 100000, 10000, 5000, 0, 22, 105000, NULL, 'paid', '2024-01-31', NULL, NULL),
+                (2, 2, 7, 100000, 0, 0, 0, 20, 100000, NULL, 'pending', NULL, NULL, NULL);
+            INSERT INTO salary_components VALUES (1, 'Housing', 'سكن', 'allowance'), (2, 'Insurance', 'تأمين', 'deduction');
+            INSERT INTO payroll_entry_components VALUES (1, 1, 1, 10000), (2, 1, 2, 5000);
+        """)
+        conn.commit()
+        conn.close()
+
+        with patch.object(Database, 'create_tables'), patch.object(Database, 'validate_schema'):
+            self.db = Database(self.db_file)
+        self.controller = PayrollController(self.db)
+
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir)
+
+    def test_history_groups_components(self):
+        """Entries come newest first with their own components"""
+        success, history = self.controller.get_employee_salary_history(7)
+        self.assertTrue(success, history)
+        self.assertEqual([entry['id'] for entry in history], [2, 1])
+        self.assertEqual(history[0]['components'], [])
+        self.assertEqual([c['name'] for c in history[1]['components']], ['Housing', 'Insurance'])
+        self.assertEqual(history[1]['components'][1]['value'], 50)
+        self.assertEqual(history[1]['net_salary'], 1050)
+
+    def test_filter_served_from_cache(self):
+        """Changing the date filter does not reload the history"""
+        self.controller.get_employee_salary_history(7)
+        with patch.object(self.controller, '_load_salary_history') as load:
+            success, history = self.controller.get_employee_salary_history(7, '2024-02-01', '2024-12-31')
+            load.assert_not_called()
+        self.assertTrue(success)
+        self.assertEqual([entry['id'] for entry in history], [2])
+
+    def test_entry_change_reloads(self):
+        """Updated payroll entries invalidate the cached history"""
+        self.controller.get_employee_salary_history(7)
+        conn = self.db.get_connection()
+        conn.execute("UPDATE payroll_entries SET payment_status = 'paid', payment_date = '2024-02-29' WHERE id = 2")
+        conn.commit()
+        conn.close()
+
+        _, history = self.controller.get_employee_salary_history(7)
+        self.assertEqual(history[0]['payment_status'], 'paid')
+
+    def test_status_change_in_same_second_reloads(self):
+        """A status change that keeps updated_at invalidates the cached history"""
+        conn = self.db.get_connection()
+        conn.execute("UPDATE payroll_entries SET updated_at = '2024-03-01 10:00:00'")
+        conn.commit()
+        self.controller.get_employee_salary_history(7)
+        conn.execute("UPDATE payroll_entries SET payment_status = 'approved' WHERE id = 2")
+        conn.commit()
+        conn.close()
+        
+        _, history = self.controller.get_employee_salary_history(7)
+        self.assertEqual(history[0]['payment_status'], 'approved')
+
+    def test_cache_is_bounded(self):
+        """The least recently viewed employee is evicted first"""
+        self.controller.SALARY_HISTORY_CACHE_SIZE = 2
+        for employee_id in (7, 8, 7, 9):
+            self.controller.get_employee_salary_history(employee_id)
+        self.assertEqual(list(self.controller._salary_history_cache), [7, 9])
+
+    def test_component_change_reloads(self):
+        """Component edits that leave the entry totals alone invalidate the cached history"""
+        self.controller.get_employee_salary_history(7)
+        conn = self.db.get_connection()
+        conn.execute("UPDATE payroll_entry_components SET value = 5000 WHERE id = 1")
+        conn.execute("UPDATE payroll_entry_components SET value = 10000 WHERE id = 2")
+        conn.commit()
+        conn.close()
+        
+        _, history = self.controller.get_employee_salary_history(7)
+        self.assertEqual([c['value'] for c in history[1]['components']], [50, 100])
+
+    def test_callers_get_copies(self):
+        """Changing a returned entry does not change the cached history"""
+        _, history = self.controller.get_employee_salary_history(7)
+        history[1]['net_salary'] = 0
+        history[1]['components'].clear()
+        
+        _, history = self.controller.get_employee_salary_history(7)
+        self.assertEqual(history[1]['net_salary'], 1050)
+        self.assertEqual(len(history[1]['components']), 2)
+
+if __name__ == '__main__':
+    unittest.main()
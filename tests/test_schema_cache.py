@@ -0,0 +1,75 @@
+"""Tests for the Database schema metadata cache"""
+import os
+import shutil
+import sqlite3
+import tempfile
+import unittest
+from unittest.mock import patch
+from database.database import Database
+
+class TestSchemaCache(unittest.TestCase):
+    """Test cases for Database.get_schema and its invalidation"""
+
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.db_file = os.path.join(self.temp_dir, 'employee.db')
+        conn = sqlite3.connect(self.db_file)
+        conn.executescript("""
+            CREATE TABLE departments (id INTEGER PRIMARY KEY, name TEXT UNIQUE);
+            CREATE TABLE employees (id INTEGER PRIMARY KEY, name TEXT,
+                                    department_id INTEGER REFERENCES departments(id));
+            CREATE INDEX idx_employees_name ON employees(name);
+        """)
+        conn.commit()
+        conn.close()
+
+        with patch.object(Database, 'create_tables'), patch.object(Database, 'validate_schema'):
+            self.db = Database(self.db_file)
+
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir)
+
+    def test_metadata_loaded(self):
+        """Columns, indexes and foreign keys are cached per table"""
+        schema = self.db.get_schema()
+        self.assertEqual(schema['employees']['columns'], ['id', 'name', 'department_id'])
+        self.assertEqual(schema['employees']['indexes'], {'idx_employees_name': False})
+        self.assertEqual(schema['employees']['foreign_keys'],
+                         [{'from': 'department_id', 'table': 'departments', 'to': 'id'}])
+        self.assertTrue(any(schema['departments']['indexes'].values()))
+        self.assertEqual(self.db.get_table_columns('missing'), [])
+        self.assertNotIn('employees', self.db.get_missing_tables())
+        self.assertIn('payroll_entries', self.db.get_missing_tables())
+        self.assertNotIn('employee_types', schema)
+
+    def test_cache_reused_without_queries(self):
+        """Repeated lookups do not touch the database"""
+        self.db.get_schema()
+        with patch.object(self.db, '_load_schema') as load:
+            self.assertTrue(self.db.has_table('employees'))
+            self.db.get_table_columns('departments')
+            load.assert_not_called()
+
+    def test_schema_version_change_invalidates(self):
+        """Altering the schema from another connection is noticed"""
+        self.assertNotIn('email', self.db.get_table_columns('employees'))
+
+        conn = sqlite3.connect(self.db_file)
+        conn.execute("ALTER TABLE employees ADD COLUMN email TEXT")
+        conn.commit()
+        conn.close()
+
+        # Opening a connection compares PRAGMA schema_version with the cache
+        self.db.get_connection().close()
+        self.assertIn('email', self.db.get_table_columns('employees'))
+
+    def test_migrations_invalidate(self):
+        """The migration runner drops the cache when it finishes"""
+        from database.migration_runner import run_migrations
+        self.db.get_schema()
+        with patch('database.migration_runner.os.listdir', return_value=[]):
+            run_migrations(self.db)
+        self.assertIsNone(self.db._schema_cache)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,80 @@
+"""Tests for the GUI stall watchdog"""
+import os
+import time
+import unittest
+from PyQt5.QtCore import QCoreApplication
+from utils.stall_watchdog import StallWatchdog, CONTROLLERS_DIR, UI_DIR
+
+CONTROLLER_SOURCE = '''
+import time
+
+class FakeController:
+    def work(self, seconds):
+        time.sleep(seconds)
+'''
+
+FORM_SOURCE = '''
+class FakeForm:
+    def __init__(self, controller):
+        self.controller = controller
+
+    def on_click(self, seconds):
+        self.controller.work(seconds)
+'''
+
+def _load(source, directory, filename):
+    """Run source as if it lived in one of the application's packages"""
+    namespace = {}
+    exec(compile(source, os.path.join(directory, filename), 'exec'), namespace)
+    return namespace
+
+class TestStallWatchdog(unittest.TestCase):
+    """Test cases for StallWatchdog"""
+
+    @classmethod
+    def setUpClass(cls):
+        cls.app = QCoreApplication.instance() or QCoreApplication([])
+
+    def setUp(self):
+        controller = _load(CONTROLLER_SOURCE, CONTROLLERS_DIR, 'fake_controller.py')['FakeController']()
+        self.form = _load(FORM_SOURCE, UI_DIR, 'fake_form.py')['FakeForm'](controller)
+        self.watchdog = StallWatchdog(interval_ms=20, stall_ms=100)
+        self.watchdog.start()
+
+    def tearDown(self):
+        self.watchdog.stop()
+
+    def _run_events(self, seconds):
+        deadline = time.monotonic() + seconds
+        while time.monotonic() < deadline:
+            self.app.processEvents()
+            time.sleep(0.005)
+
+    def test_stall_is_attributed_to_slot_and_controller(self):
+        """A blocking slot is logged with the controller method it was in"""
+        self._run_events(0.1)
+        with self.assertLogs(level='WARNING') as logs:
+            self.form.on_click(0.5)
+            self._run_events(0.1)
+
+        records = self.watchdog.records()
+        self.assertEqual(len(records), 1)
+        self.assertEqual(records[0]['handler'], 'FakeForm.on_click')
+        self.assertEqual(records[0]['controller'], 'FakeController.work')
+        self.assertGreaterEqual(records[0]['duration_ms'], 400)
+        self.assertIn('fake_controller.py', records[0]['stack'])
+        self.assertIn('FakeController.work', logs.output[0])
+
+        summary = self.watchdog.summary()
+        self.assertEqual(summary[0]['count'], 1)
+        self.assertEqual(StallWatchdog.active, self.watchdog)
+
+    def test_short_delays_are_not_stalls(self):
+        """Work shorter than the threshold is not reported"""
+        self._run_events(0.1)
+        self.form.on_click(0.03)
+        self._run_events(0.1)
+        self.assertEqual(self.watchdog.records(), [])
+
+if __name__ == '__main__':
+    unittest.main()
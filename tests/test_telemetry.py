@@ -0,0 +1,120 @@
+"""Tests for application telemetry and the performance monitor ring buffer"""
+import os
+import tempfile
+import unittest
+from unittest.mock import patch
+from database.database import Database
+from utils.telemetry import Histogram, RingBuffer, telemetry
+
+class TestRingBuffer(unittest.TestCase):
+    """Test cases for RingBuffer"""
+
+    def setUp(self):
+        self.buffer = RingBuffer(('time', 'value'), capacity=4)
+        self.temp_dir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        for name in os.listdir(self.temp_dir):
+            os.remove(os.path.join(self.temp_dir, name))
+        os.rmdir(self.temp_dir)
+
+    def test_oldest_samples_are_overwritten(self):
+        """The buffer keeps the newest capacity samples in order"""
+        for i in range(6):
+            self.buffer.append({'time': i, 'value': i * 10})
+        self.assertEqual(len(self.buffer), 4)
+        self.assertEqual(self.buffer.values('time'), [2.0, 3.0, 4.0, 5.0])
+        self.assertEqual(self.buffer.latest(), {'time': 5.0, 'value': 50.0})
+
+    def test_missing_columns_are_zero(self):
+        """Samples without a column store 0"""
+        self.buffer.append({'time': 1})
+        self.assertEqual(self.buffer.rows(), [(1.0, 0.0)])
+
+    def test_binary_export_round_trip(self):
+        """The binary log reads back the same samples"""
+        for i in range(6):
+            self.buffer.append({'time': i, 'value': i / 4})
+        path = os.path.join(self.temp_dir, 'log.bin')
+        self.buffer.export_binary(path)
+        loaded = RingBuffer.load_binary(path)
+        self.assertEqual(loaded.columns, self.buffer.columns)
+        self.assertEqual(loaded.rows(), self.buffer.rows())
+        self.assertEqual(os.path.getsize(path), 8 + 12 + len('time\nvalue') + 4 * 2 * 8)
+
+    def test_csv_export(self):
+        """The CSV log has a header and one line per sample"""
+        self.buffer.append({'time': 1, 'value': 2})
+        path = os.path.join(self.temp_dir, 'log.csv')
+        self.buffer.export_csv(path)
+        with open(path, encoding='utf-8') as f:
+            self.assertEqual(f.read().splitlines(), ['time,value', '1.0,2.0'])
+
+class TestTelemetry(unittest.TestCase):
+    """Test cases for metrics recorded by the application"""
+
+    def setUp(self):
+        telemetry.reset()
+
+    def tearDown(self):
+        telemetry.reset()
+
+    def test_histogram_percentiles(self):
+        """Percentiles are reported as bucket upper bounds"""
+        histogram = Histogram()
+        for value in [0.05] * 90 + [7] * 9 + [9000]:
+            histogram.observe(value)
+        self.assertEqual(histogram.percentile(50), 0.1)
+        self.assertEqual(histogram.percentile(95), 10)
+        self.assertEqual(histogram.percentile(100), 9000)
+
+    def test_database_queries_are_timed(self):
+        """Statements run through Database connections are recorded"""
+        fd, path = tempfile.mkstemp(suffix='.db')
+        os.close(fd)
+        try:
+            with patch.object(Database, 'create_tables'), patch.object(Database, 'validate_schema'):
+                db = Database(path)
+            conn = db.get_connection()
+            conn.execute("CREATE TABLE t (x INTEGER)")
+            conn.executemany("INSERT INTO t VALUES (?)", [(1,), (2,)])
+            conn.cursor().execute("SELECT * FROM t").fetchall()
+            self.assertEqual(telemetry.snapshot()['gauges']['db.open_connections'], 1)
+            conn.close()
+
+            histogram = telemetry.snapshot()['histograms']['db.query_ms']
+            # PRAGMA foreign_keys from get_connection plus the three statements
+            self.assertEqual(histogram['count'], 4)
+            self.assertEqual(telemetry.snapshot()['gauges']['db.open_connections'], 0)
+        finally:
+            os.remove(path)
+
+    def test_cache_hit_rate(self):
+        """Hit rates are computed per cache and overall"""
+        telemetry.cache_hit('schema')
+        telemetry.cache_hit('schema')
+        telemetry.cache_miss('schema')
+        telemetry.cache_miss('reports')
+        self.assertAlmostEqual(telemetry.cache_hit_rate('schema'), 200 / 3)
+        self.assertEqual(telemetry.cache_hit_rate(), 50.0)
+
+    def test_monitor_samples_application_metrics(self):
+        """PerformanceMonitor turns counters into per interval rates"""
+        from utils.monitor_performance import PerformanceMonitor
+        monitor = PerformanceMonitor(capacity=10)
+        with patch('utils.monitor_performance.time.time', side_effect=[100.0, 102.0]):
+            self.assertIsNone(monitor.sample())
+            telemetry.increment('payroll.employees', 50)
+            telemetry.increment('gui.stalls')
+            for _ in range(10):
+                telemetry.observe('db.query_ms', 3)
+            sample = monitor.sample()
+
+        self.assertEqual(sample['payroll_employees_per_s'], 25)
+        self.assertEqual(sample['queries_per_s'], 5)
+        self.assertEqual(sample['query_p95_ms'], 5)
+        self.assertEqual(sample['gui_stalls'], 1)
+        self.assertEqual(len(monitor.buffer), 1)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,60 @@
+"""Tests for the table-driven record validator"""
+import unittest
+import pandas as pd
+from utils.validation import EMPLOYEE_VALIDATOR, FieldRule, RecordValidator, ValidationUtils, check_salary
+
+class TestRecordValidator(unittest.TestCase):
+    """Test cases for RecordValidator and EMPLOYEE_VALIDATOR"""
+
+    def setUp(self):
+        self.records = [
+            {'name': 'Ali', 'hire_date': '٢٠٢٤-١-٥', 'phone': '+966 555 123 456', 'basic_salary': '٥٠٠٠'},
+            {'name': '', 'hire_date': '2024-02-30', 'email': 'broken', 'basic_salary': -1},
+            {'name': 'Sara', 'hire_date': '2024-02-01', 'gender': 'other', 'national_id': '1234 567 890'},
+        ]
+
+    def test_batch_reports_field_errors_by_row(self):
+        """Required fields come first, then format errors, ordered by row"""
+        columns, errors = EMPLOYEE_VALIDATOR.validate_batch(self.records)
+        self.assertEqual(
+            [(error['row'], error['field']) for error in errors],
+            [(1, 'name'), (1, 'email'), (1, 'hire_date'), (1, 'basic_salary'), (2, 'gender')]
+        )
+        self.assertEqual(errors[0]['message'], "الحقول المطلوبة غير مكتملة: الاسم")
+        self.assertEqual(errors[3]['message'], "الراتب الأساسي: لا يمكن أن يكون الراتب بالسالب")
+        
+        self.assertEqual(columns['hire_date'][0], '2024-01-05')
+        self.assertEqual(columns['basic_salary'][0], 5000.0)
+        self.assertEqual(columns['national_id'][2], '1234567890')
+        self.assertEqual(columns['phone'][0], '+966 555 123 456')
+
+    def test_dataframe_rows_use_the_index(self):
+        """A DataFrame is validated by column and reported by index label"""
+        frame = pd.DataFrame(self.records, index=[10, 11, 12]).fillna('')
+        _, errors = EMPLOYEE_VALIDATOR.validate_batch(frame)
+        self.assertEqual(sorted({error['row'] for error in errors}), [11, 12])
+
+    def test_custom_rules(self):
+        """Any table of rules can be validated"""
+        validator = RecordValidator([
+            FieldRule('employee_id', 'رقم الموظف', required=True),
+            FieldRule('amount', 'المبلغ', check_salary, prefix=True),
+        ])
+        self.assertEqual(validator.validate({'employee_id': 1, 'amount': '10'}), [])
+        self.assertEqual(
+            [error['message'] for error in validator.validate({'amount': 'x'})],
+            ["الحقول المطلوبة غير مكتملة: رقم الموظف", "المبلغ: قيمة الراتب غير صحيحة"]
+        )
+
+    def test_form_validation_uses_the_same_rules(self):
+        """validate_employee_data keeps its single-message contract"""
+        self.assertEqual(
+            ValidationUtils.validate_employee_data({'email': 'a@b.co'}),
+            (False, "الحقول المطلوبة غير مكتملة: الاسم ، تاريخ التعيين")
+        )
+        self.assertEqual(ValidationUtils.validate_employee_data(self.records[0]), (True, None))
+        self.assertEqual(ValidationUtils.validate_employee_data(self.records[2]), (False, "قيمة الجنس غير صحيحة"))
+        self.assertEqual(ValidationUtils.convert_arabic_numerals('٢٠٢٤-۰۱'), '2024-01')
+
+if __name__ == '__main__':
+    unittest.main()
@@ -5,6 +5,7 @@ from PyQt5.QtCore import Qt, pyqtSignal
 from PyQt5.QtGui import QIcon, QPixmap
 import os
 import sqlite3
+from utils.company_info import CompanyInfo
 
 class CompanyInfoDialog(QDialog):
     """Dialog for managing company information"""
@@ -268,6 +269,9 @@ class CompanyInfoDialog(QDialog):
             conn.commit()
             conn.close()
             
+            # Make the rest of the application read the new profile
+            CompanyInfo.invalidate(self.db_file)
+            
             # Emit signal to notify that company info has been updated
             self.info_updated.emit()
             
@@ -132,11 +132,10 @@ class Dashboard(QWidget):
         logo_layout.setAlignment(Qt.AlignCenter)
         
         # Get and display logo
-        logo_data, logo_mime = CompanyInfo.get_logo(self.db.db_file)
-        if logo_data:
+        logo_image = CompanyInfo.get_logo_image(self.db.db_file)
+        if logo_image is not None:
             logo_label = QLabel()
-            pixmap = QPixmap()
-            pixmap.loadFromData(logo_data)
+            pixmap = QPixmap.fromImage(logo_image)
             scaled_pixmap = pixmap.scaled(120, 120, Qt.KeepAspectRatio, Qt.SmoothTransformation)
             logo_label.setPixmap(scaled_pixmap)
             logo_label.setAlignment(Qt.AlignCenter)
@@ -651,11 +650,10 @@ class Dashboard(QWidget):
         logo_layout.setAlignment(Qt.AlignCenter)
         
         # Get and display logo
-        logo_data, logo_mime = CompanyInfo.get_logo(db_file)
-        if logo_data:
+        logo_image = CompanyInfo.get_logo_image(db_file)
+        if logo_image is not None:
             logo_label = QLabel()
-            pixmap = QPixmap()
-            pixmap.loadFromData(logo_data)
+            pixmap = QPixmap.fromImage(logo_image)
             scaled_pixmap = pixmap.scaled(120, 120, Qt.KeepAspectRatio, Qt.SmoothTransformation)
             logo_label.setPixmap(scaled_pixmap)
             logo_label.setAlignment(Qt.AlignCenter)
@@ -1,10 +1,11 @@
 from PyQt5.QtWidgets import (QDialog, QVBoxLayout, QHBoxLayout, QPushButton,
                              QLabel, QMessageBox, QFileDialog, QTabWidget, QWidget,
                              QLineEdit, QComboBox, QDateEdit, QDoubleSpinBox,
-                             QTextEdit, QFormLayout, QGroupBox, QFrame)
+                             QTextEdit, QFormLayout, QGroupBox, QFrame, QProgressDialog)
 from PyQt5.QtCore import Qt, pyqtSignal, QDate
 from PyQt5.QtGui import QPixmap
 import os
+from utils.report_jobs import ReportJobQueue
 from utils.validation import ValidationUtils
 
 class EmployeeForm(QDialog):
@@ -18,6 +19,15 @@ class EmployeeForm(QDialog):
         self.current_employee_index = -1
         self.employees = []
         self.filtered_employees = []
+        
+        # Imports of large files run on a worker thread so the form stays usable
+        self.import_jobs = ReportJobQueue(employee_controller.db, max_workers=1, parent=self)
+        self.import_jobs.register('import_employees', self._import_employees_job, progress=True, cache=False)
+        self.import_jobs.job_progress.connect(self._on_import_progress)
+        self.import_jobs.job_finished.connect(self._on_import_finished)
+        self.import_jobs.job_failed.connect(self._on_import_failed)
+        self._import_request = None
+        self.import_progress = None
         self.init_ui()
         self.load_employees()
 
@@ -398,10 +408,15 @@ class EmployeeForm(QDialog):
         self.export_btn.setToolTip("تصدير بيانات الموظفين إلى ملف CSV")
         self.export_btn.clicked.connect(self.export_employees)
         
+        self.import_btn = QPushButton("استيراد")
+        self.import_btn.setToolTip("استيراد الموظفين من ملف CSV أو Excel")
+        self.import_btn.clicked.connect(self.import_employees)
+        
         action_layout.addWidget(self.new_btn)
         action_layout.addWidget(self.save_btn)
         action_layout.addWidget(self.delete_btn)
         action_layout.addWidget(self.export_btn)
+        action_layout.addWidget(self.import_btn)
         
         return nav_layout, action_layout
         
@@ -428,7 +443,87 @@ class EmployeeForm(QDialog):
                     "خطأ في التصدير",
                     f"حدث خطأ أثناء تصدير البيانات:\n{result}"
                 )
+
+    def import_employees(self):
+        """Import employees from a CSV or Excel file"""
+        file_name, _ = QFileDialog.getOpenFileName(
+            self,
+            "استيراد بيانات الموظفين",
+            "",
+            "Employee Files (*.csv *.xlsx)"
+        )
+        if not file_name:
+            return
+        
+        self.import_btn.setEnabled(False)
+        self.import_progress = QProgressDialog("جاري استيراد بيانات الموظفين...", None, 0, 0, self)
+        self.import_progress.setWindowTitle("استيراد بيانات الموظفين")
+        self.import_progress.setWindowModality(Qt.WindowModal)
+        self.import_progress.setMinimumDuration(0)
+        self.import_progress.show()
+        self._import_request = self.import_jobs.submit('import_employees', file_name=file_name)
+
+    def _import_employees_job(self, file_name, job):
+        """Run the import on a worker thread, reporting the rows processed"""
+        return self.employee_controller.import_employees(
+            file_name,
+            progress=lambda rows: job.report_progress(0, f"تمت معالجة {rows} صف")
+        )
+
+    def _on_import_progress(self, request_id, percent, message):
+        if request_id == self._import_request and message:
+            self.import_progress.setLabelText(message)
+
+    def _on_import_finished(self, request_id, outcome):
+        """Show the import result and offer to save the error report"""
+        if request_id != self._import_request:
+            return
+        self._finish_import()
+        
+        success, result = outcome
+        if not success:
+            QMessageBox.warning(
+                self,
+                "خطأ في الاستيراد",
+                f"حدث خطأ أثناء استيراد البيانات:\n{result}"
+            )
+            return
+        
+        self.load_employees()
+        message = (f"تم استيراد {result['imported']} موظف في {result['seconds']:.1f} ثانية\n"
+                   f"عدد الصفوف المرفوضة: {result['failed']}")
+        if not result['errors']:
+            QMessageBox.information(self, "تم الاستيراد بنجاح", message)
+            return
+        
+        reply = QMessageBox.question(
+            self,
+            "تم الاستيراد",
+            f"{message}\n\nهل تريد حفظ تقرير الأخطاء؟",
+            QMessageBox.Yes | QMessageBox.No
+        )
+        if reply == QMessageBox.Yes:
+            report_name, _ = QFileDialog.getSaveFileName(
+                self,
+                "حفظ تقرير الأخطاء",
+                "import_errors.csv",
+                "CSV Files (*.csv)"
+            )
+            if report_name:
+                from utils.employee_import import write_error_report
+                write_error_report(result['errors'], report_name)
                 
+    def _on_import_failed(self, request_id, error):
+        if request_id == self._import_request:
+            self._finish_import()
+            QMessageBox.warning(self, "خطأ في الاستيراد", f"حدث خطأ أثناء استيراد البيانات:\n{error}")
+
+    def _finish_import(self):
+        self._import_request = None
+        self.import_progress.close()
+        self.import_progress = None
+        self.import_btn.setEnabled(True)
+
     def update_navigation_buttons(self):
         """Update the state of navigation buttons based on current position"""
         has_employees = len(self.filtered_employees) > 0
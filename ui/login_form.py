@@ -15,6 +15,7 @@ class LoginForm(QWidget):
     def __init__(self, auth_controller):
         super().__init__()
         self.auth_controller = auth_controller
+        self.login_worker = None
         self.init_ui()
     
     def init_ui(self):
@@ -208,6 +209,10 @@ class LoginForm(QWidget):
     
     def login(self):
         """Handle login button click"""
+        # A credential check is already running (e.g. Enter pressed twice)
+        if self.login_worker is not None:
+            return
+        
         username = self.username_input.text().strip()
         password = self.password_input.text()
         
@@ -225,14 +230,23 @@ class LoginForm(QWidget):
         self.login_button.setEnabled(False)
         self.login_button.setText("جاري تسجيل الدخول...")
         
-        # Attempt login
-        success, result = self.auth_controller.login(username, password)
+        # Check credentials on a worker thread so the form stays responsive
+        self.login_worker = self.auth_controller.login_async(
+            username, password, self.on_login_finished, self
+        )
+
+    def on_login_finished(self, success, result):
+        """Handle the result of the background credential check"""
+        # The worker deletes itself once its thread has finished
+        self.login_worker = None
         
         # Reset login button
         self.login_button.setEnabled(True)
         self.login_button.setText("تسجيل الدخول")
         
         if success:
+            self.auth_controller.start_session(result)
+            
             # Save remember me preference
             # In a real app, you'd store this in settings
             
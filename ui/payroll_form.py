@@ -3,7 +3,7 @@ from PyQt5.QtWidgets import (QWidget, QVBoxLayout, QHBoxLayout, QPushButton,
                              QMessageBox, QCalendarWidget, QDialog, QCheckBox, 
                              QDoubleSpinBox, QFormLayout, QDialogButtonBox, 
                              QTextEdit, QMenu, QLineEdit, QFrame, QGroupBox,
-                             QScrollArea, QTabWidget)
+                             QScrollArea, QTabWidget, QFileDialog, QApplication)
 from PyQt5.QtCore import Qt, QDate
 from PyQt5.QtGui import QIcon
 import qtawesome as qta
@@ -79,8 +79,18 @@ class PayrollForm(QWidget):
         self.process_btn.setIcon(qta.icon('fa5s.money-bill-wave', color='white'))
         self.process_btn.clicked.connect(self.process_payroll)
         
+        self.print_all_btn = QPushButton("طباعة جميع القسائم")
+        self.print_all_btn.setIcon(qta.icon('fa5s.print', color='white'))
+        self.print_all_btn.clicked.connect(self.print_all_payslips)
+        
+        self.export_payslips_btn = QPushButton("تصدير القسائم PDF")
+        self.export_payslips_btn.setIcon(qta.icon('fa5s.file-pdf', color='white'))
+        self.export_payslips_btn.clicked.connect(self.export_all_payslips)
+        
         action_layout.addWidget(self.approve_btn)
         action_layout.addWidget(self.process_btn)
+        action_layout.addWidget(self.print_all_btn)
+        action_layout.addWidget(self.export_payslips_btn)
         payroll_layout.addLayout(action_layout)
         
         payroll_tab.setLayout(payroll_layout)
@@ -452,6 +462,53 @@ class PayrollForm(QWidget):
             except Exception as e:
                 QMessageBox.warning(self, "خطأ", f"فشل طباعة قسيمة الراتب: {str(e)}")
 
+    def print_all_payslips(self):
+        """Print payslips for every employee in the current period"""
+        if not self.current_period_id:
+            return
+        
+        success, payslips = self.payroll_controller.get_period_payslips(self.current_period_id)
+        if not success:
+            QMessageBox.warning(self, "خطأ", f"فشل استرجاع بيانات قسائم الرواتب: {payslips}")
+            return
+        
+        db_file = self.payroll_controller.db.db_file
+        for payslip_data in payslips:
+            payslip_data['db_file'] = db_file
+        
+        from ui.payslip_template import PayslipPrinter
+        PayslipPrinter.print_multiple_payslips(self, payslips)
+
+    def export_all_payslips(self):
+        """Export payslips for the current period as PDF files"""
+        if not self.current_period_id:
+            return
+        
+        output_dir = QFileDialog.getExistingDirectory(self, "اختر مجلد حفظ القسائم")
+        if not output_dir:
+            return
+        
+        success, payslips = self.payroll_controller.get_period_payslips(self.current_period_id)
+        if not success:
+            QMessageBox.warning(self, "خطأ", f"فشل استرجاع بيانات قسائم الرواتب: {payslips}")
+            return
+        
+        from utils.export_utils import ExportUtils
+        QApplication.setOverrideCursor(Qt.WaitCursor)
+        try:
+            success, result = ExportUtils.generate_period_payslips(
+                payslips,
+                output_dir=output_dir,
+                db_file=self.payroll_controller.db.db_file
+            )
+        finally:
+            QApplication.restoreOverrideCursor()
+        
+        if success:
+            QMessageBox.information(self, "نجاح", f"تم تصدير {len(result)} قسيمة راتب بنجاح")
+        else:
+            QMessageBox.warning(self, "خطأ", f"فشل تصدير قسائم الرواتب: {result}")
+
     def view_salary_history(self, employee_data):
         """Show salary history for an employee"""
         from ui.salary_history_dialog import SalaryHistoryDialog
@@ -1,13 +1,17 @@
 from PyQt5.QtWidgets import (QWidget, QVBoxLayout, QHBoxLayout, QPushButton,
                              QLabel, QComboBox, QTableWidget, QTableWidgetItem,
                              QMessageBox, QDialog, QFormLayout, QSpinBox, QHeaderView, QFrame,
-                             )
-from PyQt5.QtCore import Qt
+                             QProgressBar, QFileDialog)
+from PyQt5.QtCore import Qt, QTimer
 from PyQt5.QtGui import QPainter, QTextDocument
 from PyQt5.QtChart import QChart, QChartView
 from PyQt5.QtPrintSupport import QPrinter, QPrintPreviewDialog
 from datetime import datetime
+import pandas as pd
+from controllers.report_controller import ReportController
 from utils.company_info import CompanyInfo
+from utils.export_utils import ExportUtils
+from utils.report_jobs import ReportJobQueue
 
 class ReportWidget(QWidget):
     def __init__(self, title):
@@ -70,12 +74,42 @@ class ChartReport(ReportWidget):
         self.content_layout.addWidget(self.chart_view)
 
 class ReportsForm(QWidget):
+    # How often the analytics snapshot is checked, and the age at which it
+    # is exported again so it is replaced before reports stop using it
+    SNAPSHOT_CHECK_MS = 5 * 60 * 1000
+    SNAPSHOT_REFRESH_AGE = 10 * 60
+
     def __init__(self, employee_controller, payroll_controller, attendance_controller):
         super().__init__()
         self.employee_controller = employee_controller
         self.payroll_controller = payroll_controller
         self.attendance_controller = attendance_controller
         self.db_file = self.employee_controller.db.db_file
+        
+        # Reports are prepared on worker threads so the form stays usable
+        self.report_jobs = ReportJobQueue(self.employee_controller.db, parent=self)
+        self.report_jobs.register('employees', self._employee_report_data)
+        self.report_jobs.register('payroll', self._payroll_report_data, progress=True)
+        self.report_jobs.register('attendance', self._attendance_report_data, progress=True)
+        self.report_jobs.register('export_pdf', self._export_report_pdf, cache=False)
+        self.report_controller = ReportController(self.employee_controller.db)
+        self.report_jobs.register(
+            'analytics_snapshot', self.report_controller.refresh_analytics_snapshot, cache=False
+        )
+        self.report_jobs.job_progress.connect(self._on_report_progress)
+        self.report_jobs.job_finished.connect(self._on_report_finished)
+        self.report_jobs.job_failed.connect(self._on_report_failed)
+        self.report_jobs.job_cancelled.connect(self._on_report_cancelled)
+        self._current_request = None
+        self._export_requests = set()
+        
+        # Payroll and attendance edits invalidate the snapshot, reports use
+        # the database until the next export
+        self.snapshot_timer = QTimer(self)
+        self.snapshot_timer.timeout.connect(self.refresh_analytics_snapshot)
+        self.snapshot_timer.start(self.SNAPSHOT_CHECK_MS)
+        QTimer.singleShot(0, self.refresh_analytics_snapshot)
+        
         self.init_ui()
 
     def init_ui(self):
@@ -144,7 +178,26 @@ class ReportsForm(QWidget):
         self.print_btn.clicked.connect(self.print_report)
         controls_layout.addWidget(self.print_btn)
 
+        # Export button
+        self.export_btn = QPushButton("تصدير PDF")
+        self.export_btn.clicked.connect(self.export_report)
+        controls_layout.addWidget(self.export_btn)
+        
         main_layout.addWidget(self.controls_widget)
+        
+        # Report progress
+        progress_layout = QHBoxLayout()
+        self.status_label = QLabel("")
+        self.progress_bar = QProgressBar()
+        self.progress_bar.setRange(0, 100)
+        self.progress_bar.hide()
+        self.cancel_btn = QPushButton("إلغاء")
+        self.cancel_btn.setEnabled(False)
+        self.cancel_btn.clicked.connect(self.cancel_report)
+        progress_layout.addWidget(self.status_label)
+        progress_layout.addWidget(self.progress_bar)
+        progress_layout.addWidget(self.cancel_btn)
+        main_layout.addLayout(progress_layout)
 
         # Report table
         self.report_table = QTableWidget()
@@ -154,95 +207,99 @@ class ReportsForm(QWidget):
         self.load_employee_report()
 
     def on_report_type_changed(self, index):
-        if index == 0:  # Employee report
-            self.load_employee_report()
-        elif index == 1:  # Payroll report
-            self.load_payroll_report()
-        elif index == 2:  # Attendance report
-            self.load_attendance_report()
+        self.generate_report()
 
     def load_employee_report(self):
+        self._submit_report('employees')
+
+    def load_payroll_report(self):
+        self._submit_report('payroll', year=int(self.year_combo.currentText()),
+                            month=self.month_combo.currentIndex() + 1)
+
+    def load_attendance_report(self):
+        self._submit_report('attendance', year=int(self.year_combo.currentText()),
+                            month=self.month_combo.currentIndex() + 1)
+
+    def _employee_report_data(self):
+        """Build the employee report rows (runs on a report worker thread)"""
         employees = self.employee_controller.get_all_employees()
         
-        self.report_table.setColumnCount(6)
-        self.report_table.setHorizontalHeaderLabels([
+        headers = [
             "الرقم", "الاسم", "القسم", "تاريخ التعيين",
             "الراتب الأساسي", "الحالة"
-        ])
-        
-        self.report_table.setRowCount(len(employees))
-        for i, emp in enumerate(employees):
-            self.report_table.setItem(i, 0, QTableWidgetItem(str(emp['id'])))
-            self.report_table.setItem(i, 1, QTableWidgetItem(emp['name']))
-            self.report_table.setItem(i, 2, QTableWidgetItem(emp.get('department_name', '')))
-            self.report_table.setItem(i, 3, QTableWidgetItem(str(emp['hire_date'])))
-            self.report_table.setItem(i, 4, QTableWidgetItem(f"{float(emp['basic_salary']):,.2f}"))
-            self.report_table.setItem(i, 5, QTableWidgetItem(emp.get('employee_status', 'نشط')))
-        
-        self.report_table.resizeColumnsToContents()
+        ]
+        rows = []
+        for emp in employees:
+            rows.append([
+                str(emp['id']),
+                emp['name'],
+                emp.get('department_name', ''),
+                str(emp['hire_date']),
+                f"{float(emp['basic_salary']):,.2f}",
+                emp.get('employee_status', 'نشط')
+            ])
+        return headers, rows
 
-    def load_payroll_report(self):
-        year = int(self.year_combo.currentText())
-        month = self.month_combo.currentIndex() + 1
-        
-        self.report_table.setColumnCount(9)
-        self.report_table.setHorizontalHeaderLabels([
+    def _payroll_report_data(self, year, month, job):
+        """Build the payroll report rows (runs on a report worker thread)"""
+        headers = [
             "الموظف", "الراتب الأساسي", "أيام الحضور", "أيام الغياب",
             "البدلات", "الخصومات", "خصم الغياب", "صافي الراتب", "الحالة"
-        ])
+        ]
         
         success, period_id = self.payroll_controller.get_period_id(year, month)
         if not success:
-            self.report_table.setRowCount(0)
-            return
+            return headers, []
             
         success, entries = self.payroll_controller.get_payroll_entries(period_id)
-        if success:
-            self.report_table.setRowCount(len(entries))
-            for i, entry in enumerate(entries):
-                # Get attendance data
-                attendance_data = self.attendance_controller.get_attendance_data_for_period(
-                    entry['employee_id'],
-                    period_id
-                )
-                if attendance_data:
-                    present_days = attendance_data.get('present_days', 0)
-                    absent_days = attendance_data.get('absent_days', 0)
-                else:
-                    present_days = 0
-                    absent_days = 0
-                    
-                self.report_table.setItem(i, 0, QTableWidgetItem(entry.get('employee_name', '')))
-                self.report_table.setItem(i, 1, QTableWidgetItem(f"{float(entry.get('basic_salary', 0)):,.2f}"))
-                self.report_table.setItem(i, 2, QTableWidgetItem(str(present_days)))
-                self.report_table.setItem(i, 3, QTableWidgetItem(str(absent_days)))
-                self.report_table.setItem(i, 4, QTableWidgetItem(f"{float(entry.get('total_allowances', 0)):,.2f}"))
-                self.report_table.setItem(i, 5, QTableWidgetItem(f"{float(entry.get('total_deductions', 0)):,.2f}"))
-                self.report_table.setItem(i, 6, QTableWidgetItem(f"{float(entry.get('absence_deduction', 0)):,.2f}"))
-                self.report_table.setItem(i, 7, QTableWidgetItem(f"{float(entry.get('net_salary', 0)):,.2f}"))
-                self.report_table.setItem(i, 8, QTableWidgetItem(entry.get('payment_status', '')))
+        if not success:
+            return headers, []
+        
+        rows = []
+        for i, entry in enumerate(entries):
+            job.report_progress(i * 100 // len(entries), "جاري إعداد تقرير الرواتب...")
             
-            self.report_table.resizeColumnsToContents()
+            # Get attendance data
+            attendance_data = self.attendance_controller.get_attendance_data_for_period(
+                entry['employee_id'],
+                period_id
+            )
+            if attendance_data:
+                present_days = attendance_data.get('present_days', 0)
+                absent_days = attendance_data.get('absent_days', 0)
+            else:
+                present_days = 0
+                absent_days = 0
+            
+            rows.append([
+                entry.get('employee_name', ''),
+                f"{float(entry.get('basic_salary', 0)):,.2f}",
+                str(present_days),
+                str(absent_days),
+                f"{float(entry.get('total_allowances', 0)):,.2f}",
+                f"{float(entry.get('total_deductions', 0)):,.2f}",
+                f"{float(entry.get('absence_deduction', 0)):,.2f}",
+                f"{float(entry.get('net_salary', 0)):,.2f}",
+                entry.get('payment_status', '')
+            ])
+        return headers, rows
 
-    def load_attendance_report(self):
-        year = int(self.year_combo.currentText())
-        month = self.month_combo.currentIndex() + 1
-        
-        self.report_table.setColumnCount(7)
-        self.report_table.setHorizontalHeaderLabels([
+    def _attendance_report_data(self, year, month, job):
+        """Build the attendance report rows (runs on a report worker thread)"""
+        headers = [
             "الموظف", "القسم", "أيام العمل", "أيام الحضور",
             "أيام الغياب", "أيام التأخير", "نسبة الحضور"
-        ])
+        ]
         
         success, period_id = self.payroll_controller.get_period_id(year, month)
         if not success:
-            self.report_table.setRowCount(0)
-            return
+            return headers, []
             
         employees = self.employee_controller.get_all_employees()
-        self.report_table.setRowCount(len(employees))
-        
+        rows = []
         for i, emp in enumerate(employees):
+            job.report_progress(i * 100 // len(employees), "جاري إعداد تقرير الحضور...")
+            
             attendance_data = self.attendance_controller.get_attendance_data_for_period(
                 emp['id'],
                 period_id
@@ -261,16 +318,90 @@ class ReportsForm(QWidget):
                 late_days = 0
                 attendance_rate = 0
                 
-            self.report_table.setItem(i, 0, QTableWidgetItem(emp['name']))
-            self.report_table.setItem(i, 1, QTableWidgetItem(emp.get('department_name', '')))
-            self.report_table.setItem(i, 2, QTableWidgetItem(str(total_days)))
-            self.report_table.setItem(i, 3, QTableWidgetItem(str(present_days)))
-            self.report_table.setItem(i, 4, QTableWidgetItem(str(absent_days)))
-            self.report_table.setItem(i, 5, QTableWidgetItem(str(late_days)))
-            self.report_table.setItem(i, 6, QTableWidgetItem(f"{attendance_rate:.1f}%"))
-            
+            rows.append([
+                emp['name'],
+                emp.get('department_name', ''),
+                str(total_days),
+                str(present_days),
+                str(absent_days),
+                str(late_days),
+                f"{attendance_rate:.1f}%"
+            ])
+        return headers, rows
+
+    @staticmethod
+    def _export_report_pdf(title, headers, rows, output_path):
+        """Write the report as a PDF (runs on a report worker thread)"""
+        success, error = ExportUtils.generate_professional_report(
+            pd.DataFrame(rows, columns=headers), title, output_path
+        )
+        if not success:
+            raise Exception(error)
+        return output_path
+
+    def _submit_report(self, report_type, **params):
+        """Queue a report; the table is filled when the result arrives"""
+        self._current_request = self.report_jobs.submit(report_type, **params)
+        self.progress_bar.setValue(0)
+        self.progress_bar.show()
+        self.status_label.setText("جاري إعداد التقرير...")
+        self.cancel_btn.setEnabled(True)
+
+    def refresh_analytics_snapshot(self):
+        """Export the analytics snapshot in the background when it is due"""
+        if self.report_controller.analytics_snapshot_due(self.SNAPSHOT_REFRESH_AGE):
+            self.report_jobs.submit('analytics_snapshot')
+
+    def cancel_report(self):
+        """Cancel the report that is being prepared"""
+        if self._current_request:
+            self.report_jobs.cancel(self._current_request)
+
+    def _on_report_progress(self, request_id, percent, message):
+        if request_id == self._current_request:
+            self.progress_bar.setValue(percent)
+            if message:
+                self.status_label.setText(message)
+
+    def _on_report_finished(self, request_id, result):
+        if request_id in self._export_requests:
+            self._export_requests.discard(request_id)
+            QMessageBox.information(self, "تصدير", f"تم تصدير التقرير إلى:\n{result}")
+            return
+        if request_id != self._current_request:
+            # A newer report was requested in the meantime
+            return
+        
+        self._finish_request()
+        headers, rows = result
+        self.report_table.setColumnCount(len(headers))
+        self.report_table.setHorizontalHeaderLabels(headers)
+        self.report_table.setRowCount(len(rows))
+        for i, row in enumerate(rows):
+            for j, value in enumerate(row):
+                self.report_table.setItem(i, j, QTableWidgetItem(value))
         self.report_table.resizeColumnsToContents()
 
+    def _on_report_failed(self, request_id, error):
+        if request_id in self._export_requests:
+            self._export_requests.discard(request_id)
+            QMessageBox.warning(self, "خطأ", f"فشل تصدير التقرير: {error}")
+            return
+        if request_id == self._current_request:
+            self._finish_request()
+            QMessageBox.warning(self, "خطأ", f"حدث خطأ أثناء إعداد التقرير: {error}")
+
+    def _on_report_cancelled(self, request_id):
+        if request_id == self._current_request:
+            self._finish_request()
+            self.status_label.setText("تم إلغاء التقرير")
+
+    def _finish_request(self):
+        self._current_request = None
+        self.progress_bar.hide()
+        self.status_label.setText("")
+        self.cancel_btn.setEnabled(False)
+
     def generate_report(self):
         """Generate the selected report"""
         report_type = self.type_combo.currentIndex()
@@ -281,6 +412,31 @@ class ReportsForm(QWidget):
         else:
             self.load_attendance_report()
 
+    def export_report(self):
+        """Export the current report to PDF in the background"""
+        output_path, _ = QFileDialog.getSaveFileName(
+            self, "تصدير التقرير", "", "PDF Files (*.pdf)"
+        )
+        if not output_path:
+            return
+        
+        headers = [
+            self.report_table.horizontalHeaderItem(col).text()
+            for col in range(self.report_table.columnCount())
+        ]
+        rows = []
+        for row in range(self.report_table.rowCount()):
+            rows.append([
+                self.report_table.item(row, col).text() if self.report_table.item(row, col) else ""
+                for col in range(self.report_table.columnCount())
+            ])
+        
+        request_id = self.report_jobs.submit(
+            'export_pdf', title=self.type_combo.currentText(),
+            headers=headers, rows=rows, output_path=output_path
+        )
+        self._export_requests.add(request_id)
+
     def print_report(self):
         """Print the current report"""
         printer = QPrinter(QPrinter.HighResolution)
@@ -0,0 +1,295 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Analytics Snapshot Job
+
+Exports payroll entries, payroll entry components, attendance records,
+employees and departments to Parquet files so heavy reports can run on
+columnar data with pandas/pyarrow instead of querying the live database.
+
+Time based tables are partitioned by year and month (year=YYYY/month=M),
+employees and departments are written as single files.
+
+Usage:
+    python utils/analytics_snapshot.py --db employee.db
+"""
+
+import os
+import sys
+import json
+import shutil
+import argparse
+import logging
+import time
+from datetime import datetime
+
+import pandas as pd
+
+# Add parent directory to path to allow imports
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# Make pyarrow optional, reports fall back to the database when it is missing
+try:
+    import pyarrow as pa
+    import pyarrow.dataset as ds
+    import pyarrow.parquet as pq
+    PYARROW_AVAILABLE = True
+except ImportError:
+    PYARROW_AVAILABLE = False
+
+MANIFEST_FILE = '_manifest.json'
+
+# Written next to the snapshot directory with the time of the last invalidation
+INVALIDATED_SUFFIX = '.invalidated'
+
+
+class AnalyticsSnapshot:
+    """Writes and reads the Parquet analytics snapshot of a database"""
+
+    # Snapshots older than this are not used by reports
+    MAX_AGE_SECONDS = 15 * 60
+
+    def __init__(self, db, snapshot_dir=None):
+        self.db = db
+        self._snapshot_dir = snapshot_dir
+
+    @property
+    def snapshot_dir(self):
+        """Snapshot directory, next to the database file unless given explicitly"""
+        if self._snapshot_dir:
+            return self._snapshot_dir
+        db_path = os.path.abspath(self.db.db_file)
+        name = os.path.splitext(os.path.basename(db_path))[0]
+        return os.path.join(os.path.dirname(db_path), 'analytics', name)
+
+    def get_manifest(self):
+        """Return the manifest of the current snapshot, or None if there is none"""
+        path = os.path.join(self.snapshot_dir, MANIFEST_FILE)
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def is_fresh(self, max_age=None):
+        """Check that a usable snapshot exists and is recent enough"""
+        if not PYARROW_AVAILABLE:
+            return False
+        manifest = self.get_manifest()
+        if not manifest:
+            return False
+        invalidated_at = self._invalidated_at()
+        if invalidated_at is not None and invalidated_at >= manifest.get('started_at', 0):
+            return False
+        max_age = self.MAX_AGE_SECONDS if max_age is None else max_age
+        created_at = datetime.fromisoformat(manifest['created_at'])
+        return (datetime.now() - created_at).total_seconds() <= max_age
+
+    def invalidate(self):
+        """Mark the snapshot as unusable until the next export
+        
+        Also records the time, so an export that was already reading when
+        the data changed is not published or used.
+        """
+        path = os.path.join(self.snapshot_dir, MANIFEST_FILE)
+        if os.path.exists(path):
+            os.remove(path)
+        if os.path.isdir(os.path.dirname(self.snapshot_dir)):
+            with open(self.snapshot_dir + INVALIDATED_SUFFIX, 'w', encoding='utf-8') as f:
+                f.write(repr(time.time()))
+
+    def _invalidated_at(self):
+        """Time of the last invalidation, or None"""
+        try:
+            with open(self.snapshot_dir + INVALIDATED_SUFFIX, 'r', encoding='utf-8') as f:
+                return float(f.read())
+        except (OSError, ValueError):
+            return None
+
+    def export(self):
+        """Export a complete snapshot and swap it in place of the previous one
+        
+        Returns:
+            tuple: (success, manifest or error message)
+        """
+        if not PYARROW_AVAILABLE:
+            return False, "pyarrow is not installed"
+        
+        target = self.snapshot_dir
+        staging = f"{target}.tmp-{os.getpid()}"
+        shutil.rmtree(staging, ignore_errors=True)
+        os.makedirs(staging)
+        started_at = time.time()
+        
+        try:
+            conn = self.db.get_connection()
+            try:
+                row_counts = {}
+                for name, query, partitioned in self._export_queries():
+                    df = pd.read_sql_query(query, conn)
+                    row_counts[name] = len(df)
+                    self._write_table(df, os.path.join(staging, name), partitioned)
+            finally:
+                conn.close()
+            
+            invalidated_at = self._invalidated_at()
+            if invalidated_at is not None and invalidated_at >= started_at:
+                shutil.rmtree(staging, ignore_errors=True)
+                return False, "The data changed during the export"
+            
+            manifest = {
+                'created_at': datetime.now().isoformat(timespec='seconds'),
+                'started_at': started_at,
+                'db_file': os.path.abspath(self.db.db_file),
+                'row_counts': row_counts
+            }
+            with open(os.path.join(staging, MANIFEST_FILE), 'w', encoding='utf-8') as f:
+                json.dump(manifest, f, indent=2)
+            
+            # Swap directories so readers never see a half written snapshot
+            previous = f"{target}.old-{os.getpid()}"
+            if os.path.exists(target):
+                os.replace(target, previous)
+            os.replace(staging, target)
+            shutil.rmtree(previous, ignore_errors=True)
+            
+            return True, manifest
+        except Exception as e:
+            shutil.rmtree(staging, ignore_errors=True)
+            logging.error(f"Error exporting analytics snapshot: {e}")
+            return False, str(e)
+
+    def read(self, name, start=None, end=None, columns=None):
+        """Read a snapshot table as a DataFrame
+        
+        Args:
+            name: Table name in the snapshot
+            start, end: Optional inclusive (year, month) bounds for partitioned tables
+            columns: Optional list of columns to load
+        """
+        path = os.path.join(self.snapshot_dir, name)
+        if os.path.isfile(path + '.parquet'):
+            return pq.read_table(path + '.parquet', columns=columns).to_pandas()
+        
+        if not os.path.isdir(path):
+            return pd.DataFrame(columns=columns or [])
+        
+        dataset = ds.dataset(path, format='parquet', partitioning='hive')
+        expression = None
+        year, month = ds.field('year'), ds.field('month')
+        if start:
+            expression = (year > start[0]) | ((year == start[0]) & (month >= start[1]))
+        if end:
+            upper = (year < end[0]) | ((year == end[0]) & (month <= end[1]))
+            expression = upper if expression is None else expression & upper
+        return dataset.to_table(columns=columns, filter=expression).to_pandas()
+
+    def _export_queries(self):
+        """Build (name, query, partitioned) for every exported table"""
+        queries = []
+        
+        period_columns = self.db.get_table_columns('payroll_periods')
+        if 'period_year' in period_columns and 'period_month' in period_columns:
+            year_expr, month_expr = "pp.period_year", "pp.period_month"
+        else:
+            year_expr = "CAST(strftime('%Y', pp.start_date) AS INTEGER)"
+            month_expr = "CAST(strftime('%m', pp.start_date) AS INTEGER)"
+        
+        if self.db.has_table('payroll_entries') and self.db.has_table('payroll_periods'):
+            queries.append(('payroll_entries', f"""
+                SELECT pe.*, pp.status AS period_status,
+                       {year_expr} AS year, {month_expr} AS month
+                FROM payroll_entries pe
+                JOIN payroll_periods pp ON pe.payroll_period_id = pp.id
+            """, True))
+            
+            component_columns = self.db.get_table_columns('payroll_entry_components')
+            if component_columns:
+                entry_column = 'payroll_entry_id' if 'payroll_entry_id' in component_columns else 'entry_id'
+                queries.append(('payroll_entry_components', f"""
+                    SELECT c.*, {year_expr} AS year, {month_expr} AS month
+                    FROM payroll_entry_components c
+                    JOIN payroll_entries pe ON c.{entry_column} = pe.id
+                    JOIN payroll_periods pp ON pe.payroll_period_id = pp.id
+                """, True))
+        
+        if self.db.has_table('attendance_records'):
+            queries.append(('attendance_records', """
+                SELECT a.*,
+                       CAST(strftime('%Y', a.check_in) AS INTEGER) AS year,
+                       CAST(strftime('%m', a.check_in) AS INTEGER) AS month
+                FROM attendance_records a
+                WHERE a.check_in IS NOT NULL
+            """, True))
+        
+        # Photos and other blobs are of no use for analytics
+        employee_columns = [
+            column for column in self.db.get_table_columns('employees')
+            if column not in ('photo_data', 'photo_mime_type')
+        ]
+        if employee_columns:
+            queries.append(('employees', f"SELECT {', '.join(employee_columns)} FROM employees", False))
+        
+        if self.db.has_table('departments'):
+            queries.append(('departments', "SELECT * FROM departments", False))
+        
+        return queries
+
+    def _write_table(self, df, path, partitioned):
+        """Write a DataFrame as a single Parquet file or a year/month dataset"""
+        table = pa.Table.from_pandas(self._normalize_types(df), preserve_index=False)
+        if not partitioned:
+            pq.write_table(table, path + '.parquet')
+        elif len(df):
+            pq.write_to_dataset(table, path, partition_cols=['year', 'month'])
+
+    @staticmethod
+    def _normalize_types(df):
+        """Make SQLite's loosely typed columns representable in Arrow
+        
+        Numeric columns that were stored partly as text (e.g. Decimal values
+        written as strings) are converted to numbers, anything else that
+        mixes types becomes text.
+        """
+        df = df.copy()
+        for column in df.columns:
+            if df[column].dtype != object:
+                continue
+            values = df[column].dropna()
+            if values.empty:
+                continue
+            try:
+                pa.array(values)
+                continue
+            except (pa.ArrowInvalid, pa.ArrowTypeError):
+                pass
+            numeric = pd.to_numeric(values, errors='coerce')
+            if numeric.notna().all():
+                df[column] = pd.to_numeric(df[column], errors='coerce')
+            else:
+                df[column] = df[column].map(lambda value: None if pd.isna(value) else str(value))
+        return df
+
+
+def main():
+    """Main function"""
+    parser = argparse.ArgumentParser(description='Export the analytics snapshot used by reports')
+    parser.add_argument('--db', default='employee.db', help='Database file')
+    parser.add_argument('--dir', help='Snapshot directory')
+    args = parser.parse_args()
+
+    from database.database import Database
+    snapshot = AnalyticsSnapshot(Database(args.db), args.dir)
+    success, result = snapshot.export()
+    if not success:
+        print(f"Error: {result}")
+        sys.exit(1)
+
+    print(f"Snapshot written to {snapshot.snapshot_dir}")
+    for name, count in result['row_counts'].items():
+        print(f"  {name}: {count} rows")
+
+
+if __name__ == "__main__":
+    main()
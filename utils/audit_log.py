@@ -0,0 +1,169 @@
+"""
+Buffered audit log writer
+
+AuditLogWriter queues audit events in memory and a background thread
+writes them to the audit_log table in batches, so logging an action costs a
+queue put instead of a connection and a commit. Batches are written every
+batch_size events or flush_interval_ms milliseconds, whichever comes first.
+"""
+import logging
+import queue
+import threading
+import time
+from datetime import datetime
+
+
+class _Commit:
+    """Lets a caller wait for the batch holding its event and learn whether it was committed"""
+
+    def __init__(self):
+        self._event = threading.Event()
+        self.committed = False
+
+    def set(self, committed):
+        self.committed = committed
+        self._event.set()
+
+    def is_set(self):
+        return self._event.is_set()
+
+    def wait(self, timeout=None):
+        """Return True if the batch was committed within the timeout"""
+        return self._event.wait(timeout) and self.committed
+
+
+class AuditLogWriter:
+    """Writes audit_log rows in batches on a background thread"""
+
+    def __init__(self, database, batch_size=100, flush_interval_ms=500, sync_critical=True,
+                 critical_timeout=10.0):
+        """
+        Args:
+            database: Database used to open write connections
+            batch_size: Write as soon as this many events are queued
+            flush_interval_ms: Longest time an event waits in the queue
+            sync_critical: Critical events block until their batch is
+                committed with PRAGMA synchronous = FULL (fsync on commit)
+            critical_timeout: Longest time in seconds a critical event waits
+                for the writer thread
+        """
+        self.db = database
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval_ms / 1000.0
+        self.sync_critical = sync_critical
+        self.critical_timeout = critical_timeout
+        self._queue = queue.Queue()
+        self._closed = False
+        self._thread = threading.Thread(target=self._run, name='AuditLogWriter', daemon=True)
+        self._thread.start()
+
+    def log(self, user_id, action, description, ip_address='127.0.0.1', critical=False):
+        """Queue an audit event
+        
+        Returns immediately unless the event is critical and sync_critical is
+        set; then it waits for the commit and returns whether the event was
+        written. A critical event whose batch failed, or that the writer
+        thread can no longer take, is written on the calling thread.
+        """
+        if self._closed:
+            logging.error(f"Audit log writer is closed, dropping event {action}")
+            return False
+        
+        row = (
+            user_id,
+            action,
+            description,
+            datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
+            ip_address
+        )
+        if not (critical and self.sync_critical):
+            self._queue.put(('row', row, None))
+            return True
+        
+        if not self._thread.is_alive():
+            return self._write([row], True)
+        
+        done = _Commit()
+        self._queue.put(('row', row, done))
+        if done.wait(self.critical_timeout):
+            return True
+        if done.is_set():
+            logging.warning(f"Audit log batch failed, writing critical event {action} directly")
+            return self._write([row], True)
+        if not self._thread.is_alive():
+            # Stopped before taking the event, nobody else will write it
+            return self._write([row], True)
+        logging.error(f"Timed out waiting for the audit log writer, event {action} may be lost")
+        return False
+
+    def flush(self, timeout=None):
+        """Write everything queued so far and wait for the commit"""
+        if not self._thread.is_alive():
+            return False
+        done = _Commit()
+        self._queue.put(('flush', None, done))
+        return done.wait(timeout)
+
+    def close(self, timeout=5):
+        """Flush pending events and stop the writer thread"""
+        if self._closed:
+            return
+        self._closed = True
+        self._queue.put(('stop', None, None))
+        self._thread.join(timeout)
+
+    def _run(self):
+        rows, waiters, sync = [], [], False
+        deadline = None
+        stop = False
+        while not stop:
+            timeout = None if deadline is None else max(0.0, deadline - time.monotonic())
+            try:
+                kind, row, done = self._queue.get(timeout=timeout)
+            except queue.Empty:
+                kind, row, done = 'timeout', None, None
+            
+            if kind == 'row':
+                rows.append(row)
+                if deadline is None:
+                    deadline = time.monotonic() + self.flush_interval
+                if done is not None:
+                    waiters.append(done)
+                    sync = True
+            elif kind == 'flush':
+                waiters.append(done)
+            elif kind == 'stop':
+                stop = True
+            
+            # Keep collecting until the batch is full or its time is up,
+            # unless someone is blocked on it
+            if (kind == 'row' and not waiters and len(rows) < self.batch_size
+                    and time.monotonic() < deadline):
+                continue
+            
+            committed = self._write(rows, sync)
+            for waiter in waiters:
+                waiter.set(committed)
+            rows, waiters, sync = [], [], False
+            deadline = None
+
+    def _write(self, rows, sync):
+        """Insert one batch of rows in a single transaction, returning whether it was committed"""
+        if not rows:
+            return True
+        conn = None
+        try:
+            conn = self.db.get_connection()
+            conn.execute(f"PRAGMA synchronous = {'FULL' if sync else 'NORMAL'}")
+            conn.executemany("""
+                INSERT INTO audit_log (user_id, action, description, timestamp, ip_address)
+                VALUES (?, ?, ?, ?, ?)
+            """, rows)
+            conn.commit()
+            return True
+        except Exception as e:
+            logging.error(f"Error writing {len(rows)} audit log entries: {e}")
+            return False
+        finally:
+            if conn is not None:
+                conn.close()
@@ -3,6 +3,7 @@ import shutil
 import zipfile
 import json
 import sqlite3
+import tempfile
 import pandas as pd
 from datetime import datetime
 from PyQt5.QtWidgets import QFileDialog, QMessageBox, QApplication
@@ -13,11 +14,15 @@ class BackupWorker(QThread):
     progress = pyqtSignal(int, str)
     finished = pyqtSignal(bool, str)
     
-    def __init__(self, operation, source_path, target_path, parent=None):
+    # Read size used when streaming the database out of a backup archive
+    COPY_BUFFER_SIZE = 1024 * 1024
+    
+    def __init__(self, operation, source_path, target_path, parent=None, database=None):
         super().__init__(parent)
         self.operation = operation  # 'backup', 'restore', 'export'
         self.source_path = source_path
         self.target_path = target_path
+        self.database = database  # Live Database instance, drained before a restore
     
     def run(self):
         try:
@@ -33,14 +38,39 @@ class BackupWorker(QThread):
             self.finished.emit(False, str(e))
     
     def _create_backup(self):
-        """Create a backup of the database"""
+        """Create a backup of the database
+        
+        The database is copied with the SQLite backup API rather than read
+        from disk, so commits still in the -wal file of a database in WAL
+        mode are included and the copy is consistent.
+        """
         self.progress.emit(10, "جاري إنشاء نسخة احتياطية...")
         
+        target_dir = os.path.dirname(os.path.abspath(self.target_path))
+        fd, snapshot_path = tempfile.mkstemp(suffix='.db', prefix='.backup_', dir=target_dir)
+        os.close(fd)
+        try:
+            source = sqlite3.connect(self.source_path)
+            snapshot = sqlite3.connect(snapshot_path)
+            try:
+                source.backup(snapshot)
+            finally:
+                snapshot.close()
+                source.close()
+            
+            self._write_backup_archive(snapshot_path)
+        finally:
+            os.remove(snapshot_path)
+        
+        self.progress.emit(100, "تم إنشاء النسخة الاحتياطية بنجاح")
+
+    def _write_backup_archive(self, snapshot_path):
+        """Zip a database snapshot under the live file's name with the metadata"""
         # Create a zip file
         with zipfile.ZipFile(self.target_path, 'w', zipfile.ZIP_DEFLATED) as zipf:
             # Add database file
             self.progress.emit(30, "جاري إضافة قاعدة البيانات...")
-            zipf.write(self.source_path, os.path.basename(self.source_path))
+            zipf.write(snapshot_path, os.path.basename(self.source_path))
             
             # Add metadata
             self.progress.emit(60, "جاري إضافة البيانات الوصفية...")
@@ -60,63 +90,80 @@ class BackupWorker(QThread):
             
             # Remove temporary file
             os.remove(temp_meta_path)
-        
-        self.progress.emit(100, "تم إنشاء النسخة الاحتياطية بنجاح")
     
     def _restore_backup(self):
-        """Restore a backup"""
+        """Restore a backup
+        
+        The database member is streamed straight out of the archive into a
+        temp file next to the target, verified there and swapped in with
+        os.replace, so the live file is never left half-written.
+        """
         self.progress.emit(10, "جاري التحقق من النسخة الاحتياطية...")
         
-        # Extract the backup
-        temp_dir = os.path.join(os.path.dirname(self.source_path), 'temp_restore')
-        os.makedirs(temp_dir, exist_ok=True)
+        target_dir = os.path.dirname(os.path.abspath(self.target_path))
+        temp_path = None
         
         try:
             with zipfile.ZipFile(self.source_path, 'r') as zipf:
-                self.progress.emit(30, "جاري استخراج النسخة الاحتياطية...")
-                zipf.extractall(temp_dir)
-            
-            # Verify metadata
-            self.progress.emit(50, "جاري التحقق من البيانات الوصفية...")
-            meta_path = os.path.join(temp_dir, 'metadata.json')
-            if os.path.exists(meta_path):
-                with open(meta_path, 'r', encoding='utf-8') as f:
-                    metadata = json.load(f)
+                names = zipf.namelist()
                 
-                # Check version compatibility
-                if metadata.get('version') != '1.0':
-                    raise ValueError("إصدار النسخة الاحتياطية غير متوافق")
-            
-            # Find database file
-            db_files = [f for f in os.listdir(temp_dir) if f.endswith('.db')]
-            if not db_files:
-                raise FileNotFoundError("لم يتم العثور على ملف قاعدة البيانات في النسخة الاحتياطية")
-            
-            # Copy database file to target
-            self.progress.emit(70, "جاري استعادة قاعدة البيانات...")
-            source_db = os.path.join(temp_dir, db_files[0])
-            
-            # Close any open connections to the target database
-            # This is a dummy connection to ensure the file is closed properly
-            try:
-                conn = sqlite3.connect(self.target_path)
-                conn.close()
-            except:
-                pass
+                # Verify metadata
+                self.progress.emit(20, "جاري التحقق من البيانات الوصفية...")
+                if 'metadata.json' in names:
+                    metadata = json.loads(zipf.read('metadata.json').decode('utf-8'))
+                    
+                    # Check version compatibility
+                    if metadata.get('version') != '1.0':
+                        raise ValueError("إصدار النسخة الاحتياطية غير متوافق")
+                
+                # Find database file
+                db_members = [name for name in names if name.endswith('.db')]
+                if not db_members:
+                    raise FileNotFoundError("لم يتم العثور على ملف قاعدة البيانات في النسخة الاحتياطية")
+                
+                # Stream the database member into a temp file on the target's filesystem
+                self.progress.emit(30, "جاري استخراج النسخة الاحتياطية...")
+                fd, temp_path = tempfile.mkstemp(suffix='.db', prefix='.restore_', dir=target_dir)
+                with zipf.open(db_members[0]) as src, os.fdopen(fd, 'wb') as dst:
+                    shutil.copyfileobj(src, dst, self.COPY_BUFFER_SIZE)
+                    dst.flush()
+                    os.fsync(dst.fileno())
             
-            # Copy the database file
-            shutil.copy2(source_db, self.target_path)
+            # Verify the extracted copy before touching the live database
+            self.progress.emit(60, "جاري التحقق من سلامة قاعدة البيانات...")
+            verified, message = self._verify_database(temp_path)
+            if not verified:
+                raise ValueError(f"النسخة الاحتياطية غير صالحة: {message}")
             
-            # Clean up
-            self.progress.emit(90, "جاري تنظيف الملفات المؤقتة...")
-            shutil.rmtree(temp_dir)
+            # Swap it in after draining open connections
+            self.progress.emit(80, "جاري استعادة قاعدة البيانات...")
+            if self.database is not None:
+                self.database.replace_database_file(temp_path)
+            else:
+                os.replace(temp_path, self.target_path)
+            temp_path = None
             
             self.progress.emit(100, "تمت استعادة النسخة الاحتياطية بنجاح")
-        except Exception as e:
+        finally:
             # Clean up on error
-            if os.path.exists(temp_dir):
-                shutil.rmtree(temp_dir)
-            raise e
+            if temp_path and os.path.exists(temp_path):
+                os.remove(temp_path)
+    
+    def _verify_database(self, db_path):
+        """Run integrity and schema checks on a restored database file"""
+        if self.database is not None:
+            return self.database.verify_database_file(db_path)
+        
+        conn = sqlite3.connect(db_path)
+        try:
+            result = conn.execute("PRAGMA integrity_check").fetchone()
+            if not result or result[0] != 'ok':
+                return False, f"Integrity check failed: {result[0] if result else 'no result'}"
+            return True, "Database verified"
+        except sqlite3.DatabaseError as e:
+            return False, str(e)
+        finally:
+            conn.close()
     
     def _export_data(self):
         """Export data to Excel or CSV"""
@@ -200,9 +247,10 @@ class BackupWorker(QThread):
 class BackupManager(QObject):
     """Manager for backup, restore, and export operations"""
     
-    def __init__(self, db_path, parent=None):
+    def __init__(self, db_path, parent=None, database=None):
         super().__init__(parent)
         self.db_path = db_path
+        self.database = database
         self.worker = None
     
     def create_backup(self, parent_widget=None):
@@ -279,7 +327,7 @@ class BackupManager(QObject):
         progress.setWindowModality(2)  # Application Modal
         
         # Create worker thread
-        self.worker = BackupWorker('restore', backup_path, self.db_path)
+        self.worker = BackupWorker('restore', backup_path, self.db_path, database=self.database)
         self.worker.progress.connect(lambda value, text: progress.setLabelText(f"{text} ({value}%)") or progress.setValue(value))
         self.worker.finished.connect(lambda success, message: self._handle_operation_finished(success, message, progress))
         
@@ -0,0 +1,359 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Benchmark Suite
+
+Builds a deterministic synthetic database with utils/data_generator.py and
+times the hot paths of the application against it without a QApplication:
+payroll generation, employee search and statistics, salary projections,
+exports and backups. Results are written as JSON; given a stored baseline
+the run is compared case by case so regressions show up as numbers.
+
+Usage:
+    python utils/benchmark.py --size small --output benchmark.json
+    python utils/benchmark.py --size small --baseline benchmark.json
+"""
+
+import os
+import sys
+import json
+import shutil
+import sqlite3
+import platform
+import argparse
+import tempfile
+import statistics
+import time
+from datetime import datetime
+
+# Add parent directory to path to allow imports
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.data_generator import SIZES, DEFAULT_SEED, SyntheticDataset, build_database
+from utils.telemetry import telemetry
+
+# Percentage change of the median above which a case counts as a regression
+DEFAULT_THRESHOLD = 10.0
+
+# Payslips rendered by the PDF export case
+PAYSLIP_SAMPLE = 100
+
+# Worker processes used by the parallel payroll generation case
+PAYROLL_WORKERS = 2
+
+
+class BenchmarkError(Exception):
+    """A benchmarked call reported failure instead of raising"""
+
+
+def _check(result):
+    """Turn the (success, message) and empty-dict failures of controllers into exceptions"""
+    if isinstance(result, tuple) and len(result) == 2 and result[0] is False:
+        raise BenchmarkError(result[1])
+    if isinstance(result, dict) and not result:
+        raise BenchmarkError("returned no data")
+    return result
+
+
+class BenchmarkCase:
+    """A timed call; setup runs untimed before every repetition
+
+    A case with a skip reason is not run and is recorded as skipped.
+    """
+
+    def __init__(self, name, run, setup=None, skip=None):
+        self.name = name
+        self.run = run
+        self.setup = setup
+        self.skip = skip
+
+    def measure(self, repeat):
+        if self.skip:
+            return {'status': 'skipped', 'reason': self.skip}
+        
+        runs = []
+        queries = None
+        try:
+            for _ in range(repeat):
+                if self.setup:
+                    self.setup()
+                before = _query_count()
+                started = time.perf_counter()
+                _check(self.run())
+                runs.append(time.perf_counter() - started)
+                queries = _query_count() - before
+        except Exception as e:
+            return {'status': 'error', 'error': f"{type(e).__name__}: {e}"}
+        
+        return {
+            'status': 'ok',
+            'runs': [round(seconds, 6) for seconds in runs],
+            'min': round(min(runs), 6),
+            'median': round(statistics.median(runs), 6),
+            'mean': round(statistics.mean(runs), 6),
+            'max': round(max(runs), 6),
+            'queries': queries
+        }
+
+
+def _query_count():
+    """Statements run through Database connections so far"""
+    histogram = telemetry.snapshot()['histograms'].get('db.query_ms')
+    return histogram['count'] if histogram else 0
+
+
+def _schema_gap(db, requirements):
+    """Return why the database cannot run a code path, or None
+
+    requirements maps each table the code path reads to the columns it
+    needs from it.
+    """
+    missing = []
+    for table, columns in requirements.items():
+        existing = db.get_table_columns(table)
+        if not existing:
+            missing.append(table)
+        else:
+            missing.extend(f"{table}.{column}" for column in columns if column not in existing)
+    return f"schema has no {', '.join(missing)}" if missing else None
+
+
+def build_cases(db, dataset, work_dir):
+    """Return the benchmark cases for a loaded dataset"""
+    from controllers.employee_controller import EmployeeController
+    from controllers.payroll_controller import PayrollController
+    from controllers.salary_controller import SalaryController
+    from database.report_rollups import ReportRollups
+    from repositories.employee_repository import EmployeeRepository
+    from repositories.payroll_repository import PayrollRepository
+    from services.payroll_service import PayrollService
+    from utils.backup_manager import BackupWorker
+    from utils.export_utils import ExportUtils
+
+    periods = dataset.payroll_periods()
+    draft_period = periods[-1]
+    paid_period = periods[-2] if len(periods) > 1 else periods[-1]
+    year = paid_period['period_year']
+
+    employees = EmployeeController(db)
+    payroll = PayrollController(db)
+    salaries = SalaryController(db)
+
+    # Some code paths were written against the payroll engine schema
+    # (database/payroll_schema.py) rather than schema.sql, which the
+    # dataset is built on; they are skipped while the columns are missing
+    period_gap = _schema_gap(db, {'payroll_periods': ['period_year', 'period_month']})
+    service_gap = _schema_gap(db, {'employees': ['employee_type_id', 'status'], 'employee_types': []})
+    projection_gap = _schema_gap(db, {'employee_salary_components': ['is_percentage']})
+
+    def reset_draft_period():
+        conn = db.get_connection()
+        try:
+            columns = db.get_table_columns('payroll_entry_components')
+            if columns:
+                entry_column = 'payroll_entry_id' if 'payroll_entry_id' in columns else 'entry_id'
+                conn.execute(f"""
+                    DELETE FROM payroll_entry_components WHERE {entry_column} IN (
+                        SELECT id FROM payroll_entries WHERE payroll_period_id = ?
+                    )
+                """, (draft_period['id'],))
+            conn.execute("DELETE FROM payroll_entries WHERE payroll_period_id = ?", (draft_period['id'],))
+            conn.execute("UPDATE payroll_periods SET status = 'draft' WHERE id = ?", (draft_period['id'],))
+            conn.commit()
+        finally:
+            conn.close()
+
+    def service_generate_payroll(workers=None):
+        # The repositories work on a raw connection, as in the service tests
+        conn = sqlite3.connect(db.db_file, detect_types=sqlite3.PARSE_DECLTYPES | sqlite3.PARSE_COLNAMES)
+        conn.row_factory = sqlite3.Row
+        try:
+            service = PayrollService(EmployeeRepository(conn), PayrollRepository(conn), ReportRollups(db))
+            return service.generate_payroll(draft_period['id'], workers=workers)
+        finally:
+            conn.close()
+
+    export_rows = []
+    payslips = []
+
+    def load_export_rows():
+        if not export_rows:
+            export_rows.extend(_check(employees.search_employees('', {'is_active': 1}))[1])
+
+    def load_payslips():
+        if not payslips:
+            payslips.extend(_check(payroll.get_period_payslips(paid_period['id']))[1][:PAYSLIP_SAMPLE])
+
+    def export_payslips():
+        output_dir = os.path.join(work_dir, 'payslips')
+        shutil.rmtree(output_dir, ignore_errors=True)
+        return ExportUtils.generate_period_payslips(payslips, output_dir=output_dir, db_file=db.db_file)
+
+    def create_backup():
+        results = []
+        worker = BackupWorker('backup', db.db_file, os.path.join(work_dir, 'backup.zip'))
+        worker.finished.connect(lambda success, message: results.append((success, message)))
+        worker.run()
+        return results[0]
+
+    return [
+        BenchmarkCase('payroll.generate', lambda: payroll.generate_payroll(draft_period['id']), reset_draft_period,
+                      skip=period_gap),
+        BenchmarkCase('payroll.service_generate', service_generate_payroll, reset_draft_period, skip=service_gap),
+        BenchmarkCase('payroll.service_generate_workers', lambda: service_generate_payroll(workers=PAYROLL_WORKERS),
+                      reset_draft_period, skip=service_gap),
+        BenchmarkCase('employees.search_text', lambda: employees.search_employees('Hassan')),
+        BenchmarkCase('employees.search_filtered', lambda: employees.search_employees(
+            '', {'department_id': 1, 'is_active': 1, 'salary_range': (5000, 15000)}
+        )),
+        BenchmarkCase('employees.stats', employees.get_employee_stats),
+        BenchmarkCase('salary.projections', lambda: salaries.calculate_salary_projections(year), skip=projection_gap),
+        BenchmarkCase('export.employees_excel', lambda: ExportUtils.export_to_excel(
+            export_rows, os.path.join(work_dir, 'employees.xlsx')
+        ), load_export_rows),
+        BenchmarkCase('export.payslips_pdf', export_payslips, load_payslips, skip=period_gap),
+        BenchmarkCase('backup.create', create_backup),
+    ]
+
+
+def run_benchmarks(dataset, work_dir, repeat=3, selected=None, db_file=None):
+    """Build the dataset, run the cases and return the results document"""
+    db_file = db_file or os.path.join(work_dir, 'benchmark.db')
+    db, dataset_info = build_database(db_file, dataset)
+
+    results = {}
+    for case in build_cases(db, dataset, work_dir):
+        if selected and not any(case.name.startswith(prefix) for prefix in selected):
+            continue
+        print(f"  {case.name} ...", flush=True)
+        results[case.name] = case.measure(repeat)
+
+    return {
+        'created_at': datetime.now().isoformat(timespec='seconds'),
+        'environment': {
+            'python': platform.python_version(),
+            'sqlite': sqlite3.sqlite_version,
+            'platform': platform.platform(),
+            'processor': platform.processor() or platform.machine()
+        },
+        'dataset': dict(dataset.describe(), **dataset_info),
+        'repeat': repeat,
+        'cases': results
+    }
+
+
+def compare_results(current, baseline, threshold=DEFAULT_THRESHOLD):
+    """Compare the median of every case with a baseline results document
+
+    Returns one row per case with the baseline and current medians, the
+    change in percent and a verdict: regression, improvement, unchanged,
+    new, missing, skipped or error.
+    """
+    rows = []
+    current_cases = current.get('cases', {})
+    baseline_cases = baseline.get('cases', {})
+    for name in sorted(set(current_cases) | set(baseline_cases)):
+        now = current_cases.get(name)
+        before = baseline_cases.get(name)
+        row = {'case': name, 'baseline': None, 'current': None, 'change_pct': None}
+        
+        if now is None:
+            row['verdict'] = 'missing'
+        elif now.get('status') == 'skipped':
+            row['verdict'] = 'skipped'
+        elif now.get('status') != 'ok':
+            row['verdict'] = 'error'
+        elif before is None or before.get('status') != 'ok':
+            row['current'] = now['median']
+            row['verdict'] = 'new'
+        else:
+            row['baseline'] = before['median']
+            row['current'] = now['median']
+            if before['median'] > 0:
+                row['change_pct'] = round((now['median'] - before['median']) * 100.0 / before['median'], 1)
+            else:
+                row['change_pct'] = 0.0
+            if row['change_pct'] > threshold:
+                row['verdict'] = 'regression'
+            elif row['change_pct'] < -threshold:
+                row['verdict'] = 'improvement'
+            else:
+                row['verdict'] = 'unchanged'
+        rows.append(row)
+    return rows
+
+
+def format_comparison(rows):
+    """Render compare_results rows as a text table"""
+    def seconds(value):
+        return '-' if value is None else f"{value:.4f}s"
+
+    lines = [f"{'case':<34} {'baseline':>10} {'current':>10} {'change':>8}  verdict"]
+    for row in rows:
+        change = '-' if row['change_pct'] is None else f"{row['change_pct']:+.1f}%"
+        lines.append(
+            f"{row['case']:<34} {seconds(row['baseline']):>10} {seconds(row['current']):>10} "
+            f"{change:>8}  {row['verdict']}"
+        )
+    return '\n'.join(lines)
+
+
+def main():
+    """Main function"""
+    parser = argparse.ArgumentParser(description='Benchmark payroll, search, export and backup hot paths')
+    parser.add_argument('--size', choices=sorted(SIZES), default='small', help='Dataset preset')
+    parser.add_argument('--employees', type=int, help='Override the number of employees')
+    parser.add_argument('--periods', type=int, help='Override the number of payroll periods')
+    parser.add_argument('--seed', type=int, default=DEFAULT_SEED, help='Random seed of the dataset')
+    parser.add_argument('--repeat', type=int, default=3, help='Timed repetitions per case')
+    parser.add_argument('--cases', nargs='*', help='Only run cases starting with these names')
+    parser.add_argument('--output', help='Write the results to this JSON file')
+    parser.add_argument('--baseline', help='Compare with a results file written by --output')
+    parser.add_argument('--threshold', type=float, default=DEFAULT_THRESHOLD,
+                        help='Slowdown in percent reported as a regression')
+    parser.add_argument('--keep', help='Keep the benchmark database at this path')
+    args = parser.parse_args()
+
+    preset = dict(SIZES[args.size])
+    if args.employees:
+        preset['employees'] = args.employees
+    if args.periods:
+        preset['periods'] = args.periods
+        preset['attendance_periods'] = min(preset['attendance_periods'], args.periods)
+    dataset = SyntheticDataset(seed=args.seed, **preset)
+
+    work_dir = tempfile.mkdtemp(prefix='employee_benchmark_')
+    try:
+        print(f"Benchmarking {dataset.employee_count} employees, {dataset.period_count} periods")
+        results = run_benchmarks(dataset, work_dir, args.repeat, args.cases, args.keep)
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+    results['size'] = args.size
+
+    for name, case in results['cases'].items():
+        if case['status'] == 'ok':
+            print(f"{name:<34} median {case['median']:.4f}s  queries {case['queries']}")
+        elif case['status'] == 'skipped':
+            print(f"{name:<34} SKIPPED {case['reason']}")
+        else:
+            print(f"{name:<34} ERROR {case['error']}")
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(results, f, ensure_ascii=False, indent=2)
+        print(f"Results written to {args.output}")
+
+    if args.baseline:
+        with open(args.baseline, 'r', encoding='utf-8') as f:
+            baseline = json.load(f)
+        if baseline.get('dataset', {}).get('employees') != results['dataset']['employees']:
+            print("Warning: the baseline was recorded on a different dataset size")
+        rows = compare_results(results, baseline, args.threshold)
+        print(format_comparison(rows))
+        if any(row['verdict'] == 'regression' for row in rows):
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
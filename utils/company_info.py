@@ -1,11 +1,63 @@
+import os
 import sqlite3
+import threading
+from PyQt5.QtGui import QImage
+from utils.telemetry import telemetry
 
 class CompanyInfo:
-    """Utility class for retrieving company information"""
+    """Utility class for retrieving company information
+    
+    The company profile is read once per database file and kept in memory
+    for the whole process, together with the decoded logo. Call invalidate()
+    after changing the company_info table.
+    """
+    
+    _cache = {}  # absolute db path -> (file identity, company info, logo image)
+    _lock = threading.Lock()
     
     @staticmethod
     def get_company_info(db_file):
         """Get company information from the database"""
+        entry = CompanyInfo._get_entry(db_file)
+        return dict(entry[1]) if entry[1] else None
+    
+    @staticmethod
+    def invalidate(db_file=None):
+        """Drop the cached profile of one database file, or of all of them"""
+        with CompanyInfo._lock:
+            if db_file is None:
+                CompanyInfo._cache.clear()
+            else:
+                CompanyInfo._cache.pop(os.path.abspath(db_file), None)
+    
+    @staticmethod
+    def _get_entry(db_file):
+        """Return the cached (identity, info, logo image) entry, loading it if needed"""
+        path = os.path.abspath(db_file)
+        try:
+            # A restored backup replaces the file, so its identity changes
+            stat = os.stat(path)
+            identity = (stat.st_dev, stat.st_ino)
+        except OSError:
+            identity = None
+        
+        with CompanyInfo._lock:
+            entry = CompanyInfo._cache.get(path)
+            if entry is not None and entry[0] == identity:
+                telemetry.cache_hit('company_info')
+                return entry
+        
+        telemetry.cache_miss('company_info')
+        company_info = CompanyInfo._load_company_info(db_file)
+        entry = (identity, company_info, None)
+        if company_info is not None:
+            with CompanyInfo._lock:
+                CompanyInfo._cache[path] = entry
+        return entry
+    
+    @staticmethod
+    def _load_company_info(db_file):
+        """Read company information from the database"""
         try:
             conn = sqlite3.connect(db_file)
             cursor = conn.cursor()
@@ -72,3 +124,25 @@ class CompanyInfo:
         if company_info:
             return company_info.get('logo_data'), company_info.get('logo_mime_type')
         return None, None
+    
+    @staticmethod
+    def get_logo_image(db_file):
+        """Get the decoded company logo as a QImage, or None without a logo
+        
+        The logo is decoded once and shared; QImage is safe to use from
+        worker threads, convert it with QPixmap.fromImage on the GUI thread.
+        """
+        entry = CompanyInfo._get_entry(db_file)
+        identity, company_info, image = entry
+        if image is not None or not company_info or not company_info.get('logo_data'):
+            return image
+        
+        image = QImage()
+        if not image.loadFromData(company_info['logo_data']):
+            return None
+        
+        path = os.path.abspath(db_file)
+        with CompanyInfo._lock:
+            if CompanyInfo._cache.get(path) is entry:
+                CompanyInfo._cache[path] = (identity, company_info, image)
+        return image
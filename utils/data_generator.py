@@ -0,0 +1,633 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Synthetic Data Generator
+
+Fills a new database with realistic, reproducible data at production
+scale: departments, positions, employees, salary components, salary
+adjustments, leave requests, daily attendance and payroll history. Rows are
+generated lazily and written with executemany on a connection using the
+bulk PRAGMA profile (Database.BULK_PRAGMAS), so millions of attendance rows
+load in seconds. The same seed always produces the same database.
+
+Usage:
+    python utils/data_generator.py --db synthetic.db --size medium
+    python utils/data_generator.py --db synthetic.db --employees 50000 --periods 36 --seed 7
+"""
+
+import os
+import sys
+import random
+import argparse
+import queue
+import threading
+import time
+from datetime import date, timedelta
+from itertools import chain, islice
+from operator import itemgetter
+
+# Add parent directory to path to allow imports
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from database.payroll_schema import INITIAL_LEAVE_TYPES
+from utils.money import Money
+
+# Dataset presets. Attendance is one row per employee and working day, so
+# the larger presets only keep it for the most recent periods.
+SIZES = {
+    'small': {'employees': 1000, 'periods': 12, 'attendance_periods': 12},
+    'medium': {'employees': 10000, 'periods': 24, 'attendance_periods': 3},
+    'large': {'employees': 100000, 'periods': 60, 'attendance_periods': 1},
+}
+
+DEFAULT_SEED = 42
+FIRST_PERIOD = (2020, 1)
+
+DEPARTMENTS = [
+    ('Sales', 'المبيعات'), ('Finance', 'المالية'), ('Human Resources', 'الموارد البشرية'),
+    ('Engineering', 'الهندسة'), ('Operations', 'العمليات'), ('Marketing', 'التسويق'),
+    ('Support', 'الدعم الفني'), ('Legal', 'الشؤون القانونية'), ('Procurement', 'المشتريات'),
+    ('Logistics', 'الخدمات اللوجستية'),
+]
+
+POSITIONS = [
+    ('Assistant', 'مساعد', 4000), ('Specialist', 'أخصائي', 7000), ('Senior Specialist', 'أخصائي أول', 10000),
+    ('Supervisor', 'مشرف', 13000), ('Manager', 'مدير', 18000), ('Director', 'مدير عام', 26000),
+]
+
+FIRST_NAMES = [
+    ('Ahmed', 'أحمد'), ('Mohammed', 'محمد'), ('Omar', 'عمر'), ('Khalid', 'خالد'), ('Youssef', 'يوسف'),
+    ('Fatima', 'فاطمة'), ('Aisha', 'عائشة'), ('Mariam', 'مريم'), ('Nour', 'نور'), ('Sara', 'سارة'),
+]
+
+LAST_NAMES = [
+    ('Hassan', 'حسن'), ('Ali', 'علي'), ('Ibrahim', 'إبراهيم'), ('Saleh', 'صالح'), ('Mahmoud', 'محمود'),
+    ('Abdullah', 'عبدالله'), ('Nasser', 'ناصر'), ('Fahd', 'فهد'), ('Sultan', 'سلطان'), ('Rashid', 'راشد'),
+]
+
+# name, name_ar, type, is_percentage, value or percentage, share of employees
+SALARY_COMPONENTS = [
+    ('Housing Allowance', 'بدل سكن', 'allowance', 1, 25.0, 1.0),
+    ('Transportation Allowance', 'بدل نقل', 'allowance', 0, 500.0, 1.0),
+    ('Food Allowance', 'بدل طعام', 'allowance', 0, 300.0, 0.6),
+    ('Phone Allowance', 'بدل هاتف', 'allowance', 0, 200.0, 0.2),
+    ('Social Insurance', 'التأمينات الاجتماعية', 'deduction', 1, 9.75, 1.0),
+    ('Loan Installment', 'قسط سلفة', 'deduction', 0, 750.0, 0.15),
+]
+
+# Share of working days with each attendance status, the rest are present
+ABSENT_RATE = 0.03
+LATE_RATE = 0.05
+
+# Share of employees with a raise, a one-time bonus and a pending request
+ADJUSTMENT_RATES = {'increase': 0.12, 'one_time': 0.05, 'pending': 0.03}
+
+# Leave types used for requests (annual, sick, unpaid), weight and length in days
+LEAVE_MIX = [(1, 0.65, 3, 14), (2, 0.25, 1, 5), (3, 0.10, 1, 10)]
+
+# Rows handed to each executemany call
+BATCH_SIZE = 20000
+
+# Clock times as HH:MM:00 for minutes after midnight
+_CLOCK = [f"{minute // 60:02d}:{minute % 60:02d}:00" for minute in range(24 * 60)]
+
+
+ATTENDANCE_COLUMNS = ('employee_id', 'date', 'status', 'check_in', 'check_out', 'working_hours', 'overtime_hours')
+
+
+class TableRows:
+    """Rows given as tuples in the order of columns instead of dicts"""
+
+    def __init__(self, columns, rows):
+        self.columns = tuple(columns)
+        self.rows = rows
+
+    def __iter__(self):
+        return iter(self.rows)
+
+    def dicts(self):
+        return (dict(zip(self.columns, row)) for row in self.rows)
+
+
+def _period_dates(index):
+    """Return (year, month, start, end) of the index-th payroll period"""
+    month_index = FIRST_PERIOD[0] * 12 + FIRST_PERIOD[1] - 1 + index
+    year, month = divmod(month_index, 12)
+    start = date(year, month + 1, 1)
+    end = date(year + (month + 1) // 12, (month + 1) % 12 + 1, 1) - timedelta(days=1)
+    return year, month + 1, start, end
+
+
+class SyntheticDataset:
+    """Deterministic synthetic rows for every table of the application
+
+    Rows are dicts keyed by column name, every row of a table has the same
+    keys. They may carry columns a given schema does not have (period_year on
+    the application schema, leave_type_id on the leaves table); load() only
+    inserts the columns, and the tables, the target database has. Each table
+    gets its own random generator derived from the seed, so the rows of one
+    table do not depend on which other tables were generated first.
+    """
+
+    def __init__(self, employees=1000, periods=12, attendance_periods=None, seed=DEFAULT_SEED):
+        self.employee_count = employees
+        self.period_count = periods
+        self.attendance_periods = periods if attendance_periods is None else min(attendance_periods, periods)
+        self.seed = seed
+        self._employees = None
+
+    @classmethod
+    def from_size(cls, size, seed=DEFAULT_SEED):
+        return cls(seed=seed, **SIZES[size])
+
+    def describe(self):
+        return {
+            'employees': self.employee_count,
+            'periods': self.period_count,
+            'attendance_periods': self.attendance_periods,
+            'seed': self.seed
+        }
+
+    def _random(self, table):
+        return random.Random(f"{self.seed}:{table}")
+
+    def _history(self):
+        """First and last day covered by the payroll periods"""
+        return _period_dates(0)[2], _period_dates(self.period_count - 1)[3]
+
+    def departments(self):
+        return [
+            {'id': i, 'name': name, 'name_ar': name_ar, 'is_active': 1}
+            for i, (name, name_ar) in enumerate(DEPARTMENTS, 1)
+        ]
+
+    def positions(self):
+        rows = []
+        for department_id in range(1, len(DEPARTMENTS) + 1):
+            for name, name_ar, _ in POSITIONS:
+                rows.append({
+                    'id': len(rows) + 1,
+                    'name': name,
+                    'name_ar': name_ar,
+                    'department_id': department_id,
+                    'is_active': 1
+                })
+        return rows
+
+    def employees(self):
+        if self._employees is not None:
+            return self._employees
+        
+        rng = self._random('employees')
+        first_period_start = self._history()[0]
+        rows = []
+        for i in range(1, self.employee_count + 1):
+            department_id = rng.randint(1, len(DEPARTMENTS))
+            level = min(int(rng.expovariate(0.9)), len(POSITIONS) - 1)
+            first, first_ar = rng.choice(FIRST_NAMES)
+            last, last_ar = rng.choice(LAST_NAMES)
+            gender = 'female' if (first, first_ar) in FIRST_NAMES[5:] else 'male'
+            base = POSITIONS[level][2]
+            rows.append({
+                'id': i,
+                'code': f"EMP{i:06d}",
+                'name': f"{first} {last}",
+                'name_ar': f"{first_ar} {last_ar}",
+                'department_id': department_id,
+                'position_id': (department_id - 1) * len(POSITIONS) + level + 1,
+                'basic_salary': round(base * rng.uniform(0.9, 1.3), -1),
+                'hire_date': (first_period_start - timedelta(days=rng.randint(30, 3650))).isoformat(),
+                'birth_date': date(rng.randint(1965, 2000), rng.randint(1, 12), rng.randint(1, 28)).isoformat(),
+                'gender': gender,
+                'marital_status': rng.choice(('single', 'married')),
+                'national_id': str(rng.randint(10 ** 9, 10 ** 10 - 1)),
+                'phone': f"05{rng.randint(0, 10 ** 8 - 1):08d}",
+                'email': f"emp{i:06d}@example.com",
+                'bank_name': rng.choice(('Al Rajhi', 'NCB', 'Riyad Bank')),
+                'bank_account': f"SA{rng.randint(10 ** 19, 10 ** 20 - 1)}",
+                'is_active': 1 if rng.random() < 0.95 else 0
+            })
+        self._employees = rows
+        return rows
+
+    def _active_employees(self):
+        return [employee for employee in self.employees() if employee['is_active']]
+
+    def salary_components(self):
+        return [
+            {
+                'id': i,
+                'name': name,
+                'name_ar': name_ar,
+                'type': kind,
+                'is_percentage': is_percentage,
+                'value': None if is_percentage else amount,
+                'percentage': amount if is_percentage else None,
+                'is_active': 1
+            }
+            for i, (name, name_ar, kind, is_percentage, amount, _) in enumerate(SALARY_COMPONENTS, 1)
+        ]
+
+    def employee_salary_components(self):
+        rng = self._random('employee_salary_components')
+        rows = []
+        for employee in self.employees():
+            for component_id, (_, _, _, is_percentage, amount, share) in enumerate(SALARY_COMPONENTS, 1):
+                if share < 1.0 and rng.random() >= share:
+                    continue
+                rows.append({
+                    'employee_id': employee['id'],
+                    'component_id': component_id,
+                    'value': None if is_percentage else amount,
+                    'percentage': amount if is_percentage else None,
+                    'is_percentage': is_percentage,
+                    'start_date': employee['hire_date'],
+                    'is_active': 1
+                })
+        return rows
+
+    def salary_adjustments(self):
+        """Approved raises and one-time bonuses within the history, plus pending requests"""
+        rng = self._random('salary_adjustments')
+        rows = []
+        for employee in self._active_employees():
+            for kind, rate in ADJUSTMENT_RATES.items():
+                if rng.random() >= rate:
+                    continue
+                _, _, start, end = _period_dates(rng.randrange(self.period_count))
+                if kind == 'increase':
+                    amount = round(employee['basic_salary'] * rng.uniform(0.05, 0.15), -1)
+                    end_date, status, reason = None, 'approved', 'زيادة سنوية'
+                elif kind == 'one_time':
+                    amount = round(rng.uniform(500, 5000), -1)
+                    end_date, status, reason = end.isoformat(), 'approved', 'مكافأة'
+                else:
+                    kind = 'increase'
+                    amount = round(employee['basic_salary'] * 0.1, -1)
+                    end_date, status, reason = None, 'pending', 'طلب زيادة'
+                rows.append({
+                    'employee_id': employee['id'],
+                    'adjustment_type': kind,
+                    'amount': amount,
+                    'reason': reason,
+                    'effective_date': start.isoformat(),
+                    'end_date': end_date,
+                    'status': status
+                })
+        return rows
+
+    def leave_types(self):
+        return [
+            {'id': i, 'name': name, 'name_ar': name_ar, 'annual_days': days, 'paid': paid, 'requires_approval': approval}
+            for i, (name, name_ar, days, paid, approval) in enumerate(INITIAL_LEAVE_TYPES, 1)
+        ]
+
+    def leave_requests(self):
+        """Up to three non-overlapping leave requests per active employee and year
+        
+        Requests that start after the last completed period are still
+        pending; older ones are mostly approved.
+        """
+        rng = self._random('leave_requests')
+        names = {row['id']: row['name'] for row in self.leave_types()}
+        type_ids = [type_id for type_id, _, _, _ in LEAVE_MIX]
+        weights = [weight for _, weight, _, _ in LEAVE_MIX]
+        lengths = {type_id: (shortest, longest) for type_id, _, shortest, longest in LEAVE_MIX}
+        first_day, last_day = self._history()
+        pending_after = _period_dates(self.period_count - 2)[3] if self.period_count > 1 else first_day
+        
+        rows = []
+        for year in range(first_day.year, last_day.year + 1):
+            year_start = max(first_day, date(year, 1, 1))
+            year_days = (min(last_day, date(year, 12, 31)) - year_start).days + 1
+            for employee in self._active_employees():
+                count = rng.choice((0, 1, 1, 2, 2, 3))
+                slot = year_days // max(count, 1)
+                for n in range(count):
+                    type_id = rng.choices(type_ids, weights)[0]
+                    days = rng.randint(*lengths[type_id])
+                    if slot <= days:
+                        continue
+                    start = year_start + timedelta(days=n * slot + rng.randrange(slot - days))
+                    if start > pending_after:
+                        status = 'pending'
+                    else:
+                        status = rng.choices(('approved', 'rejected', 'cancelled'), (0.85, 0.1, 0.05))[0]
+                    rows.append({
+                        'employee_id': employee['id'],
+                        'leave_type_id': type_id,
+                        'leave_type': names[type_id],
+                        'start_date': start.isoformat(),
+                        'end_date': (start + timedelta(days=days - 1)).isoformat(),
+                        'total_days': days,
+                        'reason': names[type_id],
+                        'status': status
+                    })
+        return rows
+
+    def payroll_periods(self):
+        """Monthly periods, all completed except the newest, which is a draft without entries"""
+        rows = []
+        for index in range(self.period_count):
+            year, month, start, end = _period_dates(index)
+            rows.append({
+                'id': index + 1,
+                'period_year': year,
+                'period_month': month,
+                'start_date': start.isoformat(),
+                'end_date': end.isoformat(),
+                'status': 'draft' if index == self.period_count - 1 else 'completed'
+            })
+        return rows
+
+    def payroll_entries(self):
+        """Yield entries for every completed period from the salary components and adjustments
+        
+        Amounts are integer minor units, as payroll_entries stores them.
+        """
+        kinds = {row['id']: row['type'] for row in self.salary_components()}
+        totals = {}
+        for row in self.employee_salary_components():
+            basic = self.employees()[row['employee_id'] - 1]['basic_salary']
+            amount = basic * row['percentage'] / 100 if row['is_percentage'] else row['value']
+            employee_totals = totals.setdefault(row['employee_id'], {'allowance': 0.0, 'deduction': 0.0})
+            employee_totals[kinds[row['component_id']]] += amount
+        adjustments = {}
+        for row in self.salary_adjustments():
+            if row['status'] == 'approved':
+                adjustments.setdefault(row['employee_id'], []).append(row)
+        
+        # Components do not change between periods, so only adjustments are per period
+        base_rows = []
+        for employee in self._active_employees():
+            employee_totals = totals.get(employee['id'], {'allowance': 0.0, 'deduction': 0.0})
+            base_rows.append((
+                employee['id'], Money(employee['basic_salary']).minor,
+                Money(employee_totals['allowance']).minor, Money(employee_totals['deduction']).minor,
+                adjustments.get(employee['id'], ())
+            ))
+        
+        for period in self.payroll_periods():
+            if period['status'] != 'completed':
+                continue
+            start, end = period['start_date'], period['end_date']
+            for employee_id, basic, allowances, deductions, employee_adjustments in base_rows:
+                adjustment = sum(
+                    Money(row['amount']).minor for row in employee_adjustments
+                    if row['effective_date'] <= end and (row['end_date'] is None or row['end_date'] >= start)
+                )
+                yield {
+                    'payroll_period_id': period['id'],
+                    'employee_id': employee_id,
+                    'basic_salary': basic,
+                    'total_allowances': allowances,
+                    'total_deductions': deductions,
+                    'total_adjustments': adjustment,
+                    'gross_salary': basic + allowances + adjustment,
+                    'net_salary': basic + allowances - deductions + adjustment,
+                    'payment_status': 'paid',
+                    'payment_date': end,
+                    'status': 'paid'
+                }
+
+    def _leave_days(self, since):
+        """ISO day -> ids of employees on approved leave that day, from since on"""
+        days = {}
+        for row in self.leave_requests():
+            if row['status'] != 'approved' or row['end_date'] < since.isoformat():
+                continue
+            start = date.fromisoformat(row['start_date'])
+            for n in range(row['total_days']):
+                days.setdefault((start + timedelta(days=n)).isoformat(), set()).add(row['employee_id'])
+        return days
+
+    def attendance(self):
+        """One row per active employee and weekday of the newest periods
+        
+        Days on approved leave are recorded with the status 'leave'. This is
+        by far the largest table, so rows are plain tuples in
+        ATTENDANCE_COLUMNS order and the clock strings and worked hours are
+        looked up instead of formatted per row.
+        """
+        return TableRows(ATTENDANCE_COLUMNS, self._attendance_rows())
+
+    def _attendance_rows(self):
+        random = self._random('attendance').random
+        first_index = self.period_count - self.attendance_periods
+        leave_days = self._leave_days(_period_dates(first_index)[2])
+        active = [employee['id'] for employee in self._active_employees()]
+        late_rate = ABSENT_RATE + LATE_RATE
+        
+        # Check in 08:00 +-10 minutes, late ones 08:15 to 09:00; check out 16:45 to 18:30
+        hours = [
+            [(round((out - start) / 60, 2), round(max(0.0, (out - start) / 60 - 8), 2)) for out in range(1005, 1110)]
+            for start in range(470, 540)
+        ]
+        
+        for index in range(first_index, self.period_count):
+            _, _, start, end = _period_dates(index)
+            for n in range((end - start).days + 1):
+                day = start + timedelta(days=n)
+                if day.weekday() >= 5:
+                    continue
+                iso = day.isoformat()
+                check_ins = [f"{iso} {_CLOCK[minute]}" for minute in range(470, 540)]
+                check_outs = [f"{iso} {_CLOCK[minute]}" for minute in range(1005, 1110)]
+                on_leave = leave_days.get(iso, ())
+                for employee_id in active:
+                    roll = random()
+                    if employee_id in on_leave:
+                        yield (employee_id, iso, 'leave', None, None, 0.0, 0.0)
+                    elif roll < ABSENT_RATE:
+                        yield (employee_id, iso, 'absent', None, None, 0.0, 0.0)
+                    else:
+                        late = roll < late_rate
+                        check_in = 25 + int(random() * 45) if late else int(random() * 20)
+                        check_out = int(random() * 105)
+                        worked, overtime = hours[check_in][check_out]
+                        yield (
+                            employee_id, iso, 'late' if late else 'present',
+                            check_ins[check_in], check_outs[check_out], worked, overtime
+                        )
+
+    def tables(self):
+        """Return (table, rows) pairs in insert order
+        
+        The application schema keeps leave requests in 'leaves', the payroll
+        engine schema in 'leave_requests'; both get the same rows.
+        """
+        return [
+            ('departments', self.departments()),
+            ('positions', self.positions()),
+            ('employees', self.employees()),
+            ('salary_components', self.salary_components()),
+            ('employee_salary_components', self.employee_salary_components()),
+            ('salary_adjustments', self.salary_adjustments()),
+            ('leave_types', self.leave_types()),
+            ('leaves', self.leave_requests()),
+            ('leave_requests', self.leave_requests()),
+            ('payroll_periods', self.payroll_periods()),
+            ('payroll_entries', self.payroll_entries()),
+            ('attendance', self.attendance()),
+        ]
+
+    def load(self, db, progress=None):
+        """Insert the dataset into an empty database, returning row counts per table
+        
+        Tables the database does not have are skipped. progress, if given, is
+        called with (table, row count) after each table.
+        """
+        counts = {}
+        conn = db.get_bulk_connection()
+        try:
+            cursor = conn.cursor()
+            for table, rows in self.tables():
+                columns = db.get_table_columns(table)
+                if not columns:
+                    continue
+                counts[table] = _insert_rows(cursor, table, columns, rows)
+                if progress:
+                    progress(table, counts[table])
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            raise
+        finally:
+            conn.close()
+        return counts
+
+
+def _insert_rows(cursor, table, columns, rows):
+    """Stream rows into a table with executemany, keeping only columns it has
+
+    rows is an iterable of dicts with the same keys, or TableRows.
+    """
+    if isinstance(rows, TableRows):
+        names = [name for name in rows.columns if name in columns]
+        if len(names) == len(rows.columns):
+            values = iter(rows)
+        else:
+            values = map(_getter([rows.columns.index(name) for name in names]), rows)
+    else:
+        rows = iter(rows)
+        first = next(rows, None)
+        if first is None:
+            return 0
+        names = [name for name in first if name in columns]
+        values = map(_getter(names), chain((first,), rows))
+
+    sql = f"INSERT INTO {table} ({', '.join(names)}) VALUES ({', '.join('?' * len(names))})"
+    count = 0
+    for batch in _batches_in_background(values):
+        cursor.executemany(sql, batch)
+        count += len(batch)
+    return count
+
+
+def _batches_in_background(values, batch_size=BATCH_SIZE):
+    """Yield lists of rows produced by a background thread
+
+    sqlite3 releases the GIL while it steps a statement, so the next batch is
+    generated while the current one is being written.
+    """
+    batches = queue.Queue(maxsize=4)
+
+    def produce():
+        try:
+            while True:
+                batch = list(islice(values, batch_size))
+                batches.put(batch)
+                if not batch:
+                    return
+        except Exception as e:
+            batches.put(e)
+
+    thread = threading.Thread(target=produce, name='DataGenerator', daemon=True)
+    thread.start()
+    while True:
+        batch = batches.get()
+        if isinstance(batch, Exception):
+            raise batch
+        if not batch:
+            break
+        yield batch
+    thread.join()
+
+
+def _getter(keys):
+    """Return a function picking keys out of a row as a tuple"""
+    if len(keys) == 1:
+        key = keys[0]
+        return lambda row: (row[key],)
+    return itemgetter(*keys)
+
+
+def build_database(db_file, dataset, progress=None):
+    """Create a database file with the application schema and load the dataset
+
+    Returns the Database and a dict with the row counts, the load time and
+    the time taken to rebuild the report rollups.
+    """
+    from database.database import Database
+    from database.migration_runner import run_migrations
+    from database.report_rollups import ReportRollups
+
+    if os.path.exists(db_file):
+        os.remove(db_file)
+    db = Database(db_file)
+    run_migrations(db)
+    db.invalidate_schema_cache()
+
+    started = time.perf_counter()
+    counts = dataset.load(db, progress)
+    loaded = time.perf_counter()
+
+    # Keep the report rollups in line with the data, as the application would
+    ReportRollups(db).rebuild()
+    return db, {
+        'rows': counts,
+        'build_seconds': round(loaded - started, 3),
+        'rollup_seconds': round(time.perf_counter() - loaded, 3)
+    }
+
+
+def main():
+    """Main function"""
+    parser = argparse.ArgumentParser(description='Generate a synthetic employee database')
+    parser.add_argument('--db', required=True, help='Database file to create')
+    parser.add_argument('--size', choices=sorted(SIZES), default='small', help='Dataset preset')
+    parser.add_argument('--employees', type=int, help='Override the number of employees')
+    parser.add_argument('--periods', type=int, help='Override the number of monthly payroll periods')
+    parser.add_argument('--attendance-periods', type=int, help='Newest periods with daily attendance')
+    parser.add_argument('--seed', type=int, default=DEFAULT_SEED, help='Random seed')
+    parser.add_argument('--force', action='store_true', help='Overwrite an existing database file')
+    args = parser.parse_args()
+
+    if os.path.exists(args.db) and not args.force:
+        print(f"Error: {args.db} already exists, use --force to overwrite it")
+        sys.exit(1)
+
+    preset = dict(SIZES[args.size])
+    if args.employees:
+        preset['employees'] = args.employees
+    if args.periods:
+        preset['periods'] = args.periods
+    if args.attendance_periods is not None:
+        preset['attendance_periods'] = args.attendance_periods
+    dataset = SyntheticDataset(seed=args.seed, **preset)
+
+    started = time.perf_counter()
+
+    def progress(table, count):
+        print(f"  {table}: {count} rows ({time.perf_counter() - started:.1f}s)", flush=True)
+
+    print(f"Generating {dataset.employee_count} employees, {dataset.period_count} periods into {args.db}")
+    _, info = build_database(args.db, dataset, progress)
+    total = sum(info['rows'].values())
+    print(f"{total} rows in {info['build_seconds']:.1f}s ({total / max(info['build_seconds'], 0.001):.0f} rows/s)")
+    print(f"Report rollups rebuilt in {info['rollup_seconds']:.1f}s")
+
+
+if __name__ == "__main__":
+    main()
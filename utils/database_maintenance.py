@@ -89,7 +89,7 @@ def fix_database_schema(db_file):
         
         if 'gross_salary' not in columns:
             print("Adding missing column 'gross_salary' to payroll_entries table")
-            cursor.execute("ALTER TABLE payroll_entries ADD COLUMN gross_salary REAL DEFAULT 0")
+            cursor.execute("ALTER TABLE payroll_entries ADD COLUMN gross_salary INTEGER DEFAULT 0")
             cursor.execute("UPDATE payroll_entries SET gross_salary = basic_salary + total_allowances")
         
         if 'payment_date' not in columns:
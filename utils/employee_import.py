@@ -0,0 +1,382 @@
+"""
+Bulk employee import from CSV and Excel files
+
+Rows are streamed in chunks and each chunk is validated in one pass by the
+same RecordValidator the employee form uses. Department and position names
+are resolved through dictionaries loaded once per import, photos are loaded
+and shrunk in a thread pool, and every chunk is written in one transaction.
+Rejected rows do not stop the import; they are collected in a per-row error
+report instead.
+"""
+import csv
+import io
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, datetime
+import pandas as pd
+from openpyxl import load_workbook
+from PIL import Image
+from database.code_sequence import EmployeeCodeSequence
+from utils.validation import DATE_FORMAT, EMPLOYEE_VALIDATOR, NUMERALS_TABLE, ValidationUtils
+
+CHUNK_SIZE = 5000
+PHOTO_SIZE = (140, 140)  # Size of the photo label in the employee form
+PHOTO_WORKERS = 8
+
+# Accepted headers for every field: the database name, the headers written
+# by EmployeeController.export_employees_to_csv and the employee form labels
+COLUMN_ALIASES = {
+    'name': ('name', 'الاسم'),
+    'name_ar': ('name_ar', 'الاسم بالعربية'),
+    'department': ('department', 'department_name', 'القسم'),
+    'position': ('position', 'position_name', 'المسمى الوظيفي'),
+    'basic_salary': ('basic_salary', 'الراتب الأساسي'),
+    'hire_date': ('hire_date', 'تاريخ التعيين'),
+    'birth_date': ('birth_date', 'تاريخ الميلاد'),
+    'gender': ('gender', 'الجنس'),
+    'marital_status': ('marital_status', 'الحالة الاجتماعية'),
+    'national_id': ('national_id', 'رقم الهوية'),
+    'phone': ('phone', 'رقم الهاتف'),
+    'email': ('email', 'البريد الإلكتروني'),
+    'address': ('address', 'العنوان'),
+    'bank_account': ('bank_account', 'رقم الحساب'),
+    'bank_name': ('bank_name', 'اسم البنك'),
+    'contract_type': ('contract_type', 'نوع العقد'),
+    'salary_type': ('salary_type', 'نوع الراتب'),
+    'working_hours': ('working_hours', 'ساعات العمل'),
+    'is_active': ('is_active', 'حالة الموظف'),
+    'photo': ('photo', 'photo_path', 'الصورة'),
+}
+HEADER_FIELDS = {
+    alias.casefold(): field
+    for field, aliases in COLUMN_ALIASES.items()
+    for alias in aliases
+}
+
+GENDER_VALUES = {'ذكر': 'male', 'أنثى': 'female', 'انثى': 'female'}
+INACTIVE_VALUES = {'0', 'false', 'no', 'لا', 'غير نشط'}
+
+INSERT_EMPLOYEE_SQL = """
+    INSERT INTO employees (
+        code, name, name_ar, department_id, position_id,
+        basic_salary, hire_date, birth_date, gender,
+        marital_status, national_id, phone, email,
+        address, bank_account, bank_name, photo_data,
+        photo_mime_type, is_active,
+        created_at, updated_at
+    ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, CURRENT_TIMESTAMP, CURRENT_TIMESTAMP)
+"""
+
+INSERT_EMPLOYMENT_SQL = """
+    INSERT INTO employment_details (
+        employee_id, department_id, position_id, manager_id,
+        employee_status, hire_date, contract_type,
+        salary_type, working_hours, created_at, updated_at
+    ) VALUES (?, ?, ?, NULL, 'نشط', ?, ?, ?, ?, CURRENT_TIMESTAMP, CURRENT_TIMESTAMP)
+"""
+
+EMPLOYEE_FIELDS = (
+    'name', 'name_ar', 'department_id', 'position_id', 'basic_salary',
+    'hire_date', 'birth_date', 'gender', 'marital_status', 'national_id',
+    'phone', 'email', 'address', 'bank_account', 'bank_name',
+    'photo_data', 'photo_mime_type', 'is_active'
+)
+EMPLOYMENT_FIELDS = ('department_id', 'position_id', 'hire_date', 'contract_type', 'salary_type', 'working_hours')
+
+ERROR_REPORT_FIELDS = ['row', 'field', 'value', 'message']
+
+
+def _cell_text(value):
+    """Spreadsheet cell as the text a CSV export of it would hold"""
+    if value is None:
+        return ''
+    if isinstance(value, (datetime, date)):
+        return value.strftime(DATE_FORMAT)
+    if isinstance(value, float) and value.is_integer():
+        return str(int(value))
+    return str(value)
+
+
+def _read_excel(path, chunk_size):
+    """Stream the first sheet of a workbook as DataFrames of strings"""
+    workbook = load_workbook(path, read_only=True, data_only=True)
+    try:
+        rows = workbook.active.iter_rows(values_only=True)
+        header = [_cell_text(value) for value in next(rows, ())]
+        batch = []
+        for row in rows:
+            batch.append([_cell_text(value) for value in row[:len(header)]])
+            if len(batch) == chunk_size:
+                yield pd.DataFrame(batch, columns=header)
+                batch = []
+        if batch:
+            yield pd.DataFrame(batch, columns=header)
+    finally:
+        workbook.close()
+
+
+def read_chunks(path, chunk_size=CHUNK_SIZE):
+    """Yield the rows of a CSV or Excel file in chunks
+
+    Every chunk is a DataFrame of stripped strings with one column per field
+    of COLUMN_ALIASES, indexed by the row's number in the file (the header
+    is row 1). Unknown columns are dropped and blank rows skipped.
+    """
+    if os.path.splitext(path)[1].lower() in ('.xlsx', '.xlsm'):
+        chunks = _read_excel(path, chunk_size)
+    else:
+        chunks = pd.read_csv(
+            path, dtype=str, keep_default_na=False, skip_blank_lines=False,
+            encoding='utf-8-sig', chunksize=chunk_size
+        )
+
+    first_row = 2
+    for chunk in chunks:
+        chunk.index = pd.RangeIndex(first_row, first_row + len(chunk))
+        first_row += len(chunk)
+        
+        columns = {}
+        for header in chunk.columns:
+            field = HEADER_FIELDS.get(str(header).strip().rstrip(':').casefold())
+            if field and field not in columns:
+                columns[field] = chunk[header].fillna('').astype(str).str.strip()
+        data = pd.DataFrame(
+            {field: columns.get(field, '') for field in COLUMN_ALIASES},
+            index=chunk.index
+        )
+        yield data[data.ne('').any(axis=1)]
+
+
+def load_photo(path):
+    """Read an image and shrink it to the size shown in the employee form
+
+    Returns (JPEG bytes, mime type).
+    """
+    with Image.open(path) as image:
+        # Lets JPEG decoding skip most of the pixels the thumbnail drops
+        image.draft('RGB', PHOTO_SIZE)
+        image = image.convert('RGB')
+        image.thumbnail(PHOTO_SIZE)
+        buffer = io.BytesIO()
+        image.save(buffer, 'JPEG', quality=85)
+    return buffer.getvalue(), 'image/jpeg'
+
+
+def write_error_report(errors, path):
+    """Write the per-row errors of an import to a CSV file"""
+    with open(path, 'w', newline='', encoding='utf-8-sig') as csvfile:
+        writer = csv.DictWriter(csvfile, fieldnames=ERROR_REPORT_FIELDS)
+        writer.writeheader()
+        writer.writerows(errors)
+    return path
+
+
+class EmployeeImporter:
+    """Imports employees from a file in validated, batched transactions"""
+
+    def __init__(self, db, codes=None):
+        self.db = db
+        self.codes = codes or EmployeeCodeSequence(db)
+
+    def import_file(self, path, chunk_size=CHUNK_SIZE, progress=None):
+        """Import every valid row of a CSV or Excel file
+        
+        Returns a dict with the imported and failed row counts, the elapsed
+        seconds and the errors as {row, field, value, message} dicts. A photo
+        that cannot be loaded is reported, but its employee is still imported.
+        progress, if given, is called with the number of rows processed so
+        far after every chunk.
+        """
+        started = time.perf_counter()
+        result = {'imported': 0, 'failed': 0, 'errors': []}
+        processed = 0
+        photo_dir = os.path.dirname(os.path.abspath(path))
+        self._load_reference_maps()
+        
+        with ThreadPoolExecutor(max_workers=PHOTO_WORKERS) as photos:
+            for chunk in read_chunks(path, chunk_size):
+                valid, errors = self.validate_chunk(chunk)
+                failed_rows = {error['row'] for error in errors}
+                errors.extend(self._load_photos(valid, photo_dir, photos))
+                
+                imported, insert_errors = self._insert_chunk(valid)
+                errors.extend(insert_errors)
+                failed_rows.update(error['row'] for error in insert_errors)
+                
+                result['imported'] += imported
+                result['failed'] += len(failed_rows)
+                result['errors'].extend(sorted(errors, key=lambda error: error['row']))
+                
+                processed += len(chunk)
+                if progress:
+                    progress(processed)
+        
+        result['seconds'] = round(time.perf_counter() - started, 3)
+        return result
+
+    def _load_reference_maps(self):
+        """Map department and position names, English and Arabic, to ids"""
+        conn = self.db.get_connection()
+        try:
+            cursor = conn.cursor()
+            self.departments, self.default_department = self._name_map(cursor, 'departments')
+            self.positions, self.default_position = self._name_map(cursor, 'positions')
+        finally:
+            conn.close()
+
+    def _name_map(self, cursor, table):
+        cursor.execute(f"SELECT id, name, name_ar FROM {table} ORDER BY id")
+        names = {}
+        default_id = None
+        for row_id, name, name_ar in cursor.fetchall():
+            default_id = default_id or row_id
+            for value in (name, name_ar):
+                if value:
+                    names.setdefault(value.strip().casefold(), row_id)
+        return names, default_id
+
+    def validate_chunk(self, chunk):
+        """Validate and convert a chunk from read_chunks
+        
+        Returns (DataFrame of the rows that passed, list of errors). The
+        employee fields go through EMPLOYEE_VALIDATOR; the rest are checks
+        only an import needs.
+        """
+        data = chunk.copy()
+        data['gender'] = data['gender'].replace(GENDER_VALUES).str.lower()
+        columns, errors = EMPLOYEE_VALIDATOR.validate_batch(data)
+        rejected = pd.Series(data.index.isin([error['row'] for error in errors]), index=data.index)
+        for field in ('national_id', 'birth_date', 'hire_date'):
+            data[field] = columns[field]
+        data['basic_salary'] = [0.0 if salary == '' else salary for salary in columns['basic_salary']]
+
+        def flag(mask, field, message):
+            nonlocal rejected
+            for row in mask.index[mask]:
+                errors.append({'row': int(row), 'field': field, 'value': chunk.at[row, field], 'message': message})
+            rejected |= mask
+        
+        hours = pd.to_numeric(data['working_hours'].str.translate(NUMERALS_TABLE), errors='coerce')
+        flag((data['working_hours'].ne('') & hours.isna()) | (hours < 0), 'working_hours', "ساعات العمل غير صحيحة")
+        data['working_hours'] = hours.fillna(40.0)
+        
+        data['salary_type'] = data['salary_type'].where(data['salary_type'].ne(''), 'monthly')
+        data['salary_type'] = data['salary_type'].map(ValidationUtils.normalize_salary_type)
+        flag(~data['salary_type'].map(ValidationUtils.validate_salary_type).astype(bool), 'salary_type', "نوع الراتب غير صحيح")
+        
+        data['contract_type'] = data['contract_type'].where(data['contract_type'].ne(''), 'دائم')
+        data['is_active'] = (~data['is_active'].str.casefold().isin(INACTIVE_VALUES)).astype(int)
+        
+        for field, id_field, names, default_id, missing in (
+            ('department', 'department_id', self.departments, self.default_department,
+             "لا يوجد قسم متاح. يرجى إضافة قسم أولاً"),
+            ('position', 'position_id', self.positions, self.default_position,
+             "لا يوجد مسمى وظيفي متاح. يرجى إضافة مسمى وظيفي أولاً"),
+        ):
+            ids = data[field].str.casefold().map(names)
+            present = data[field].ne('')
+            flag(present & ids.isna(), field, f"القيمة غير موجودة: {field}")
+            if default_id is None:
+                flag(~present, field, missing)
+            data[id_field] = ids.where(present, default_id)
+        
+        valid = data[~rejected].copy()
+        for field in ('department_id', 'position_id'):
+            valid[field] = valid[field].astype(int)
+        # Optional text columns are stored as NULL rather than ''
+        for field in ('name_ar', 'gender', 'birth_date', 'marital_status', 'national_id', 'phone',
+                      'email', 'address', 'bank_account', 'bank_name'):
+            valid[field] = valid[field].where(valid[field].ne(''), None)
+        valid['photo_data'] = None
+        valid['photo_mime_type'] = None
+        return valid, errors
+
+    def _load_photos(self, valid, photo_dir, executor):
+        """Fill photo_data for the rows that name a photo; returns the errors"""
+        rows = valid.index[valid['photo'].ne('')]
+        names = valid.loc[rows, 'photo'].tolist()
+
+        def load(name):
+            try:
+                return load_photo(os.path.join(photo_dir, name)), None
+            except Exception as e:
+                return (None, None), e
+        
+        photo_data = valid['photo_data'].tolist()
+        mime_types = valid['photo_mime_type'].tolist()
+        positions = valid.index.get_indexer(rows)
+        errors = []
+        for position, row, name, ((data, mime_type), error) in zip(
+                positions, rows, names, executor.map(load, names)):
+            if error is None:
+                photo_data[position] = data
+                mime_types[position] = mime_type
+            else:
+                errors.append({
+                    'row': int(row), 'field': 'photo', 'value': name,
+                    'message': f"تعذر تحميل الصورة، تم استيراد الموظف بدون صورة: {error}"
+                })
+        valid['photo_data'] = photo_data
+        valid['photo_mime_type'] = mime_types
+        return errors
+
+    def _insert_chunk(self, valid):
+        """Insert a validated chunk in one transaction
+        
+        If the batch fails, its rows are retried one at a time so the error
+        is reported against the row that caused it. Returns (rows imported,
+        errors).
+        """
+        employees = [
+            (row, tuple(values[:len(EMPLOYEE_FIELDS)]), tuple(values[len(EMPLOYEE_FIELDS):]))
+            for row, *values in valid[list(EMPLOYEE_FIELDS + EMPLOYMENT_FIELDS)].itertuples(name=None)
+        ]
+        if not employees:
+            return 0, []
+        
+        conn = self.db.get_connection()
+        try:
+            cursor = conn.cursor()
+            try:
+                self._insert_employees(cursor, employees)
+                return len(employees), []
+            except Exception:
+                pass
+            
+            imported = 0
+            errors = []
+            for employee in employees:
+                try:
+                    self._insert_employees(cursor, [employee])
+                    imported += 1
+                except Exception as e:
+                    errors.append({'row': int(employee[0]), 'field': '', 'value': '', 'message': str(e)})
+            return imported, errors
+        finally:
+            conn.close()
+
+    def _insert_employees(self, cursor, employees):
+        """Insert employees and their employment details in one transaction"""
+        cursor.execute("BEGIN TRANSACTION")
+        try:
+            codes = self.codes.reserve_codes(cursor, len(employees))
+            cursor.execute("SELECT COALESCE(MAX(id), 0) FROM employees")
+            last_id = cursor.fetchone()[0]
+            
+            cursor.executemany(INSERT_EMPLOYEE_SQL, [
+                (code,) + employee for code, (_, employee, _) in zip(codes, employees)
+            ])
+            # The transaction holds the write lock, so every id above last_id
+            # belongs to this batch, in insertion order
+            cursor.execute("SELECT id FROM employees WHERE id > ? ORDER BY id", (last_id,))
+            employee_ids = [row[0] for row in cursor.fetchall()]
+            
+            cursor.executemany(INSERT_EMPLOYMENT_SQL, [
+                (employee_id,) + employment
+                for employee_id, (_, _, employment) in zip(employee_ids, employees)
+            ])
+            cursor.execute("COMMIT")
+        except Exception:
+            cursor.execute("ROLLBACK")
+            raise
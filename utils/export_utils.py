@@ -38,9 +38,10 @@ class ExportUtils:
             # Get company information if db_file is provided
             company_name = None
             commercial_register = None
-            if db_file:
-                company_name = CompanyInfo.get_company_name(db_file)
-                commercial_register = CompanyInfo.get_commercial_register(db_file)
+            company = CompanyInfo.get_company_info(db_file) if db_file else None
+            if company:
+                company_name = company.get('company_name', '')
+                commercial_register = company.get('commercial_register_number', '')
             
             # Company info if available
             if company_name:
@@ -114,6 +115,25 @@ class ExportUtils:
         except Exception as e:
             return False, str(e)
 
+    @staticmethod
+    def generate_period_payslips(payslips, output_dir=None, merged_filename=None, db_file=None):
+        """Generate payslip PDFs for a whole payroll period in parallel
+        
+        Writes one file per employee into output_dir, or a single merged
+        file when merged_filename is given.
+        """
+        try:
+            from utils.payslip_batch import generate_payslip_pdfs
+            company = CompanyInfo.get_company_info(db_file) if db_file else None
+            return generate_payslip_pdfs(
+                payslips,
+                output_dir=output_dir,
+                merged_filename=merged_filename,
+                company=company
+            )
+        except Exception as e:
+            return False, str(e)
+
     @staticmethod
     def generate_department_report(department_data, filename):
         """Generate PDF department report"""
@@ -223,12 +223,13 @@ class IssueFixer:
         
         try:
             # Check if required columns exist
-            cursor.execute("PRAGMA table_info(payroll_entries)")
-            columns = [row[1] for row in cursor.fetchall()]
+            columns = self.db.get_table_columns('payroll_entries')
             
             if 'total_adjustments' not in columns:
                 # Add the missing column
                 cursor.execute("ALTER TABLE payroll_entries ADD COLUMN total_adjustments DECIMAL(10,2) DEFAULT 0")
+                self.db.invalidate_schema_cache()
+                columns.append('total_adjustments')
                 self.log("Added missing column 'total_adjustments' to payroll_entries table")
             
             # Get all payroll entries
@@ -0,0 +1,124 @@
+"""
+Application logging
+
+configure_logging() is called once at startup. Every logger hands its
+records to a single QueueHandler on the root logger, so a log call on a
+payroll or attendance path only formats the message and puts it on a queue;
+a QueueListener thread does the file writes. Files rotate by size instead of
+being truncated on every start, and each module tree has its own level.
+
+Structured fields are passed with extra= and are appended to the line as
+key=value pairs:
+
+    logger.info("Payroll generated", extra={'period_id': 3, 'duration_ms': 812})
+"""
+import atexit
+import logging
+import os
+import queue
+import sys
+from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler
+
+LOG_FORMAT = '%(asctime)s - %(levelname)s - %(name)s - %(message)s'
+STRUCTURED_FIELDS = ('period_id', 'employee_id', 'duration_ms')
+
+MAX_LOG_BYTES = 5 * 1024 * 1024
+LOG_BACKUPS = 3
+
+# Logger name -> level. Anything not listed inherits from its parent, and
+# the root logger ('') sets the default.
+LOG_LEVELS = {
+    '': logging.INFO,
+    'database': logging.INFO,
+    'database.migration_runner': logging.INFO,
+    'migrations': logging.INFO,
+    'repositories': logging.WARNING,
+    'services': logging.INFO,
+    'controllers': logging.WARNING,
+    'utils': logging.INFO,
+}
+
+# Loggers whose records also go to migration.log and the console, as the
+# migration runner has always reported there
+MIGRATION_LOGGERS = ('database.migration_runner', 'migrations')
+
+_listener = None
+_queue_handler = None
+
+
+class StructuredFormatter(logging.Formatter):
+    """Formatter that appends the structured fields a record carries"""
+
+    def format(self, record):
+        message = super().format(record)
+        fields = [
+            f"{name}={getattr(record, name)}"
+            for name in STRUCTURED_FIELDS if hasattr(record, name)
+        ]
+        return f"{message} [{' '.join(fields)}]" if fields else message
+
+
+class _LoggerFilter(logging.Filter):
+    """Passes the records of a set of logger trees"""
+
+    def __init__(self, names):
+        super().__init__()
+        self.names = names
+
+    def filter(self, record):
+        return any(record.name == name or record.name.startswith(name + '.') for name in self.names)
+
+
+def _rotating_handler(path, max_bytes):
+    handler = RotatingFileHandler(
+        path, maxBytes=max_bytes, backupCount=LOG_BACKUPS, encoding='utf-8', delay=True
+    )
+    handler.setFormatter(StructuredFormatter(LOG_FORMAT))
+    return handler
+
+
+def configure_logging(log_dir='.', levels=None, max_bytes=MAX_LOG_BYTES):
+    """Route all logging through a queue to rotating files
+
+    Writes database.log with every record and migration.log with the
+    migration runner's. levels overrides entries of LOG_LEVELS. Calling it
+    again returns the running listener unchanged.
+    """
+    global _listener, _queue_handler
+    if _listener is not None:
+        return _listener
+
+    os.makedirs(log_dir, exist_ok=True)
+    main_handler = _rotating_handler(os.path.join(log_dir, 'database.log'), max_bytes)
+    migration_handler = _rotating_handler(os.path.join(log_dir, 'migration.log'), max_bytes)
+    migration_handler.addFilter(_LoggerFilter(MIGRATION_LOGGERS))
+    console_handler = logging.StreamHandler(sys.stdout)
+    console_handler.setFormatter(StructuredFormatter(LOG_FORMAT))
+    console_handler.addFilter(_LoggerFilter(MIGRATION_LOGGERS))
+
+    for name, level in {**LOG_LEVELS, **(levels or {})}.items():
+        logging.getLogger(name).setLevel(level)
+
+    log_queue = queue.SimpleQueue()
+    _queue_handler = QueueHandler(log_queue)
+    logging.getLogger().addHandler(_queue_handler)
+    _listener = QueueListener(
+        log_queue, main_handler, migration_handler, console_handler, respect_handler_level=True
+    )
+    _listener.start()
+    atexit.register(shutdown_logging)
+    return _listener
+
+
+def shutdown_logging():
+    """Write out the queued records and close the log files"""
+    global _listener, _queue_handler
+    if _listener is None:
+        return
+    atexit.unregister(shutdown_logging)
+    logging.getLogger().removeHandler(_queue_handler)
+    _listener.stop()
+    for handler in _listener.handlers:
+        handler.close()
+    _listener = None
+    _queue_handler = None
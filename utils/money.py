@@ -0,0 +1,213 @@
+"""
+Money amounts in integer minor units
+
+Payroll results are stored as whole minor units (halalas, cents) in INTEGER
+columns, so SUM() and the other aggregates add integers and Python code
+adds ints instead of allocating Decimals. Money is the immutable value type
+used for the arithmetic:
+
+    net = Money('5000') + Money(1250.5) - Money.from_minor(99)
+    net * 0.1           # rounded to the minor unit, half away from zero
+    str(net)            # '6249.51'
+    net.format()        # '6,249.51'
+    net.minor           # 624951, the value stored in the database
+
+MINOR_UNIT_COLUMNS lists the stored columns. Amounts entered by users stay
+in major units; Money(value) converts them.
+"""
+import re
+
+MINOR_UNITS = 100
+DECIMAL_PLACES = 2
+
+# Payroll result columns stored in minor units. Amounts users enter (employee
+# basic salaries, salary components, adjustments) stay in major units.
+MINOR_UNIT_COLUMNS = {
+    'payroll_entries': (
+        'basic_salary', 'total_allowances', 'tax_exempt_allowances',
+        'total_deductions', 'leave_deductions', 'social_insurance',
+        'overtime_pay', 'holiday_premium', 'tax', 'net_salary',
+        'total_adjustments', 'gross_salary'
+    ),
+    'payroll_entry_components': ('value', 'amount'),
+    'payroll_entry_details': ('amount',),
+}
+
+_AMOUNT_RE = re.compile(r'^([+-]?)(\d*)(?:\.(\d*))?$')
+
+
+def _round_half_away(value):
+    """Round a float to the nearest int, halves away from zero"""
+    # Amounts like 1.005 * 100 land a hair below the half; six places is
+    # far below a minor unit and far above float noise
+    value = round(value, 6)
+    return int(value + 0.5) if value >= 0 else -int(0.5 - value)
+
+
+def _parse_minor(text):
+    """Minor units of a decimal string such as '1,234.565' or '-5'"""
+    match = _AMOUNT_RE.match(text.strip().replace(',', ''))
+    if not match or not (match.group(2) or match.group(3)):
+        # Exponents and other float syntax
+        return _round_half_away(float(text) * MINOR_UNITS)
+    sign, whole, fraction = match.groups()
+    fraction = fraction or ''
+    minor = int(whole or 0) * MINOR_UNITS + int(fraction[:DECIMAL_PLACES].ljust(DECIMAL_PLACES, '0'))
+    if fraction[DECIMAL_PLACES:DECIMAL_PLACES + 1] >= '5':
+        minor += 1
+    return -minor if sign == '-' else minor
+
+
+def to_major(minor):
+    """Major-unit float of a value read from a minor-units column, None stays None"""
+    return None if minor is None else minor / MINOR_UNITS
+
+
+def to_major_sql(expression):
+    """SQL expression reading a minor-units column or aggregate as major units"""
+    return f"({expression}) / {MINOR_UNITS}.0"
+
+
+def to_minor_sql(expression):
+    """SQL expression storing a major-units value as integer minor units
+
+    SQLite's ROUND() also rounds halves away from zero; the inner ROUND
+    mirrors _round_half_away.
+    """
+    return f"CAST(ROUND(ROUND(({expression}) * {MINOR_UNITS}, 6)) AS INTEGER)"
+
+
+class Money:
+    """Immutable amount of money held as an int of minor units
+
+    Accepts ints, floats, decimal strings and anything whose str() is a
+    decimal number (Decimal, numpy scalars). Money adds and subtracts
+    Money; multiplying or dividing by a number rounds to the minor unit.
+    """
+
+    __slots__ = ('minor',)
+
+    def __init__(self, amount=0):
+        if isinstance(amount, Money):
+            minor = amount.minor
+        elif isinstance(amount, int):
+            minor = amount * MINOR_UNITS
+        elif isinstance(amount, float):
+            minor = _round_half_away(amount * MINOR_UNITS)
+        else:
+            minor = _parse_minor(str(amount))
+        object.__setattr__(self, 'minor', minor)
+
+    @classmethod
+    def from_minor(cls, minor):
+        """Money of a value read from a minor-units column, None counts as zero"""
+        money = object.__new__(cls)
+        object.__setattr__(money, 'minor', int(minor or 0))
+        return money
+
+    @classmethod
+    def sum(cls, amounts):
+        """Total of an iterable of Money"""
+        return cls.from_minor(sum(amount.minor for amount in amounts))
+
+    def __setattr__(self, name, value):
+        raise AttributeError("Money is immutable")
+
+    def __reduce__(self):
+        return Money.from_minor, (self.minor,)
+
+    def __add__(self, other):
+        if isinstance(other, Money):
+            return Money.from_minor(self.minor + other.minor)
+        return NotImplemented
+
+    def __radd__(self, other):
+        # Lets sum() start from 0
+        if other == 0:
+            return self
+        return NotImplemented
+
+    def __sub__(self, other):
+        if isinstance(other, Money):
+            return Money.from_minor(self.minor - other.minor)
+        return NotImplemented
+
+    def __neg__(self):
+        return Money.from_minor(-self.minor)
+
+    def __abs__(self):
+        return Money.from_minor(abs(self.minor))
+
+    def __mul__(self, factor):
+        if isinstance(factor, int):
+            return Money.from_minor(self.minor * factor)
+        if isinstance(factor, float):
+            return Money.from_minor(_round_half_away(self.minor * factor))
+        return NotImplemented
+
+    __rmul__ = __mul__
+
+    def __truediv__(self, divisor):
+        if isinstance(divisor, Money):
+            return self.minor / divisor.minor
+        if isinstance(divisor, (int, float)):
+            return Money.from_minor(_round_half_away(self.minor / divisor))
+        return NotImplemented
+
+    def _compare_minor(self, other):
+        """Minor units of another amount, None when it can't be compared"""
+        if isinstance(other, Money):
+            return other.minor
+        if isinstance(other, (int, float)):
+            return other * MINOR_UNITS
+        return None
+
+    def __eq__(self, other):
+        minor = self._compare_minor(other)
+        return NotImplemented if minor is None else self.minor == minor
+
+    def __lt__(self, other):
+        minor = self._compare_minor(other)
+        return NotImplemented if minor is None else self.minor < minor
+
+    def __le__(self, other):
+        minor = self._compare_minor(other)
+        return NotImplemented if minor is None else self.minor <= minor
+
+    def __gt__(self, other):
+        minor = self._compare_minor(other)
+        return NotImplemented if minor is None else self.minor > minor
+
+    def __ge__(self, other):
+        minor = self._compare_minor(other)
+        return NotImplemented if minor is None else self.minor >= minor
+
+    def __hash__(self):
+        # Equal to the hash of the same amount as an int or float
+        return hash(self.minor / MINOR_UNITS)
+
+    def __bool__(self):
+        return self.minor != 0
+
+    def __float__(self):
+        return self.minor / MINOR_UNITS
+
+    def __str__(self):
+        whole, fraction = divmod(abs(self.minor), MINOR_UNITS)
+        return f"{'-' if self.minor < 0 else ''}{whole}.{fraction:0{DECIMAL_PLACES}d}"
+
+    def __repr__(self):
+        return f"Money('{self}')"
+
+    def format(self, separator=','):
+        """Exact amount with thousands separators, e.g. '12,500.00'"""
+        whole, fraction = divmod(abs(self.minor), MINOR_UNITS)
+        return f"{'-' if self.minor < 0 else ''}{whole:,}.{fraction:0{DECIMAL_PLACES}d}".replace(',', separator)
+
+    def __format__(self, spec):
+        # The specs the forms use are formatted exactly, others go through float
+        if spec in ('', '.2f'):
+            return str(self)
+        if spec in (',', ',.2f'):
+            return self.format()
+        return format(float(self), spec)
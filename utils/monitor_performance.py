@@ -1,54 +1,93 @@
 #!/usr/bin/env python
 """
 Performance Monitor for Employee Management System
-This script monitors system performance during stress testing.
+This script monitors system and application performance, either during
+stress testing or from inside the running application.
+
+Samples are kept in a fixed-size ring buffer. Besides process CPU, memory
+and disk I/O it samples the application's own telemetry: query latency,
+open database connections, payroll throughput, GUI event loop stalls and
+cache hit rates.
 """
 
 import os
 import sys
 import time
-import psutil
 import threading
-import sqlite3
 from datetime import datetime
 import matplotlib.pyplot as plt
 from matplotlib.animation import FuncAnimation
 from PyQt5.QtWidgets import (QApplication, QMainWindow, QWidget, QVBoxLayout, 
                             QPushButton, QLabel, QHBoxLayout, QTabWidget, 
-                            QMessageBox, QGridLayout)
+                            QMessageBox, QGridLayout, QFileDialog, QTableWidget,
+                            QTableWidgetItem, QPlainTextEdit, QSplitter, QHeaderView)
 from PyQt5.QtCore import QTimer, Qt
 from matplotlib.backends.backend_qt5agg import FigureCanvasQTAgg as FigureCanvas
 
+# Add parent directory to path to allow imports
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.telemetry import telemetry, bucket_percentile, LATENCY_BUCKETS_MS, RingBuffer
+from utils.stall_watchdog import StallWatchdog
+
+# Make psutil optional, only application metrics are sampled without it
+try:
+    import psutil
+    PSUTIL_AVAILABLE = True
+except ImportError:
+    PSUTIL_AVAILABLE = False
+
 class PerformanceMonitor:
     """Monitor system and application performance"""
     
-    def __init__(self, db_file="employee.db"):
+    # (column, label, unit) shown in the HTML report
+    REPORT_METRICS = (
+        ('cpu_percent', 'CPU Usage', '%'),
+        ('memory_mb', 'Memory Usage', ' MB'),
+        ('disk_read_mb_s', 'Disk Read', ' MB/s'),
+        ('disk_write_mb_s', 'Disk Write', ' MB/s'),
+        ('queries_per_s', 'Database Queries', ' queries/s'),
+        ('query_p95_ms', 'Query Latency (p95)', ' ms'),
+        ('open_connections', 'Open Connections', ''),
+        ('payroll_employees_per_s', 'Payroll Throughput', ' employees/s'),
+        ('gui_lag_ms', 'Event Loop Lag', ' ms'),
+        ('gui_stalls', 'GUI Stalls', ''),
+        ('cache_hit_rate', 'Cache Hit Rate', '%')
+    )
+
+    COLUMNS = (
+        'time',               # Seconds since monitoring started
+        'cpu_percent',        # Process CPU usage
+        'memory_mb',          # Process resident memory
+        'disk_read_mb_s',
+        'disk_write_mb_s',
+        'queries_per_s',
+        'query_p95_ms',       # 95th percentile statement latency in the interval
+        'open_connections',
+        'payroll_employees_per_s',
+        'gui_lag_ms',         # Worst event loop lag in the interval
+        'gui_stalls',         # Event loop stalls in the interval
+        'cache_hit_rate'      # Percent, over all application caches
+    )
+
+    def __init__(self, db_file="employee.db", capacity=3600, interval=1.0):
         self.db_file = db_file
+        self.interval = interval
         self.monitoring = False
         self.start_time = None
-        self.cpu_usage = []
-        self.memory_usage = []
-        self.disk_io = []
-        self.db_queries = []
-        self.timestamps = []
-        
-        # Create log file
-        self.log_file = "performance_log.txt"
-        with open(self.log_file, 'w') as f:
-            f.write(f"Performance Monitoring Started at {datetime.now()}\n")
-            f.write("="*80 + "\n\n")
-            f.write("Timestamp,CPU Usage (%),Memory Usage (MB),Disk Read (MB/s),Disk Write (MB/s),DB Queries/s\n")
+        self.buffer = RingBuffer(self.COLUMNS, capacity)
+        self.log_file = "performance_log.csv"
+        self._process = psutil.Process(os.getpid()) if PSUTIL_AVAILABLE else None
+        self._previous = None
     
     def start_monitoring(self):
         """Start monitoring performance"""
         if not self.monitoring:
             self.monitoring = True
             self.start_time = time.time()
-            self.cpu_usage = []
-            self.memory_usage = []
-            self.disk_io = []
-            self.db_queries = []
-            self.timestamps = []
+            self.buffer.clear()
+            self._previous = None
+            self.sample()
             
             # Start monitoring thread
             self.monitor_thread = threading.Thread(target=self._monitor_loop)
@@ -56,92 +95,105 @@ class PerformanceMonitor:
             self.monitor_thread.start()
     
     def stop_monitoring(self):
-        """Stop monitoring performance"""
+        """Stop monitoring performance and write the log file"""
+        was_monitoring = self.monitoring
         self.monitoring = False
         if hasattr(self, 'monitor_thread') and self.monitor_thread.is_alive():
-            self.monitor_thread.join(timeout=1.0)
+            self.monitor_thread.join(timeout=self.interval + 1.0)
+        if was_monitoring and len(self.buffer):
+            self.export(self.log_file)
+
+    def export(self, filename):
+        """Export the samples as CSV, or as packed doubles for a .bin file"""
+        if filename.lower().endswith('.bin'):
+            self.buffer.export_binary(filename)
+        else:
+            self.buffer.export_csv(filename)
+        return filename
     
     def _monitor_loop(self):
         """Main monitoring loop"""
-        prev_disk_io = psutil.disk_io_counters()
-        prev_time = time.time()
-        prev_queries = self._get_db_query_count()
-        
+        next_sample = time.monotonic() + self.interval
         while self.monitoring:
-            # Get current time
-            current_time = time.time()
-            elapsed = current_time - self.start_time
-            
-            # Get CPU usage
-            cpu_percent = psutil.cpu_percent()
-            
-            # Get memory usage
-            memory_info = psutil.Process(os.getpid()).memory_info()
-            memory_mb = memory_info.rss / (1024 * 1024)
-            
-            # Get disk I/O
-            disk_io_current = psutil.disk_io_counters()
-            io_time_diff = current_time - prev_time
-            
-            read_mb_s = (disk_io_current.read_bytes - prev_disk_io.read_bytes) / io_time_diff / (1024 * 1024)
-            write_mb_s = (disk_io_current.write_bytes - prev_disk_io.write_bytes) / io_time_diff / (1024 * 1024)
-            
-            # Get database query count
-            current_queries = self._get_db_query_count()
-            queries_per_second = (current_queries - prev_queries) / io_time_diff
-            
-            # Update previous values
-            prev_disk_io = disk_io_current
-            prev_time = current_time
-            prev_queries = current_queries
-            
-            # Store data
-            self.timestamps.append(elapsed)
-            self.cpu_usage.append(cpu_percent)
-            self.memory_usage.append(memory_mb)
-            self.disk_io.append((read_mb_s, write_mb_s))
-            self.db_queries.append(queries_per_second)
-            
-            # Log data
-            with open(self.log_file, 'a') as f:
-                f.write(f"{datetime.now()},{cpu_percent},{memory_mb},{read_mb_s},{write_mb_s},{queries_per_second}\n")
-            
-            # Sleep for a bit
-            time.sleep(1.0)
+            time.sleep(max(0.0, next_sample - time.monotonic()))
+            next_sample += self.interval
+            if self.monitoring:
+                self.sample()
+
+    def sample(self):
+        """Take one sample and append it to the ring buffer
+        
+        The first sample only records the baseline for interval rates.
+        """
+        now = time.time()
+        metrics = telemetry.snapshot()
+        counters = metrics['counters']
+        histograms = metrics['histograms']
+        current = {
+            'time': now,
+            'disk': psutil.disk_io_counters() if PSUTIL_AVAILABLE else None,
+            'query_buckets': self._buckets(histograms, 'db.query_ms'),
+            'lag_buckets': self._buckets(histograms, 'gui.event_loop_lag_ms'),
+            'payroll_employees': counters.get('payroll.employees', 0),
+            'gui_stalls': counters.get('gui.stalls', 0)
+        }
+        
+        previous, self._previous = self._previous, current
+        if previous is None:
+            return None
+        
+        elapsed = max(now - previous['time'], 1e-6)
+        query_counts = [a - b for a, b in zip(current['query_buckets'], previous['query_buckets'])]
+        lag_counts = [a - b for a, b in zip(current['lag_buckets'], previous['lag_buckets'])]
+        
+        sample = {
+            'time': now - self.start_time if self.start_time else 0.0,
+            'queries_per_s': sum(query_counts) / elapsed,
+            'query_p95_ms': bucket_percentile(LATENCY_BUCKETS_MS, query_counts, 95),
+            'open_connections': metrics['gauges'].get('db.open_connections') or 0,
+            'payroll_employees_per_s': (current['payroll_employees'] - previous['payroll_employees']) / elapsed,
+            'gui_lag_ms': bucket_percentile(LATENCY_BUCKETS_MS, lag_counts, 100),
+            'gui_stalls': current['gui_stalls'] - previous['gui_stalls'],
+            'cache_hit_rate': telemetry.cache_hit_rate()
+        }
+        
+        if PSUTIL_AVAILABLE:
+            sample['cpu_percent'] = self._process.cpu_percent()
+            sample['memory_mb'] = self._process.memory_info().rss / (1024 * 1024)
+            disk, previous_disk = current['disk'], previous['disk']
+            if disk and previous_disk:
+                sample['disk_read_mb_s'] = (disk.read_bytes - previous_disk.read_bytes) / elapsed / (1024 * 1024)
+                sample['disk_write_mb_s'] = (disk.write_bytes - previous_disk.write_bytes) / elapsed / (1024 * 1024)
+        
+        self.buffer.append(sample)
+        return sample
     
-    def _get_db_query_count(self):
-        """Get the number of queries executed in the database"""
-        try:
-            conn = sqlite3.connect(self.db_file)
-            cursor = conn.cursor()
-            
-            # Get statistics from sqlite_stat1 table
-            cursor.execute("SELECT COUNT(*) FROM sqlite_master")
-            result = cursor.fetchone()[0]
-            
-            conn.close()
-            return result
-        except Exception:
-            return 0
+    @staticmethod
+    def _buckets(histograms, name):
+        histogram = histograms.get(name)
+        if histogram is None:
+            return [0] * (len(LATENCY_BUCKETS_MS) + 1)
+        return [count for _, count in histogram['buckets']]
     
     def generate_report(self, output_file="performance_report.html"):
         """Generate a performance report"""
-        if not self.timestamps:
+        if not len(self.buffer):
             return False, "No performance data available"
         
-        # Calculate average values
-        avg_cpu = sum(self.cpu_usage) / len(self.cpu_usage) if self.cpu_usage else 0
-        avg_memory = sum(self.memory_usage) / len(self.memory_usage) if self.memory_usage else 0
-        avg_read = sum(read for read, _ in self.disk_io) / len(self.disk_io) if self.disk_io else 0
-        avg_write = sum(write for _, write in self.disk_io) / len(self.disk_io) if self.disk_io else 0
-        avg_queries = sum(self.db_queries) / len(self.db_queries) if self.db_queries else 0
-        
-        # Calculate peak values
-        peak_cpu = max(self.cpu_usage) if self.cpu_usage else 0
-        peak_memory = max(self.memory_usage) if self.memory_usage else 0
-        peak_read = max(read for read, _ in self.disk_io) if self.disk_io else 0
-        peak_write = max(write for _, write in self.disk_io) if self.disk_io else 0
-        peak_queries = max(self.db_queries) if self.db_queries else 0
+        # Calculate average and peak values
+        stats = {}
+        for column in self.COLUMNS[1:]:
+            values = self.buffer.values(column)
+            stats[column] = (sum(values) / len(values), max(values))
+        
+        summary_rows = "\n".join(
+            f"""                <tr>
+                    <td>{label}</td>
+                    <td>{stats[column][0]:.2f}{unit}</td>
+                    <td>{stats[column][1]:.2f}{unit}</td>
+                </tr>"""
+            for column, label, unit in self.REPORT_METRICS
+        )
         
         # Generate HTML report
         html = f"""
@@ -170,31 +222,7 @@ class PerformanceMonitor:
                     <th>Average</th>
                     <th>Peak</th>
                 </tr>
-                <tr>
-                    <td>CPU Usage</td>
-                    <td>{avg_cpu:.2f}%</td>
-                    <td>{peak_cpu:.2f}%</td>
-                </tr>
-                <tr>
-                    <td>Memory Usage</td>
-                    <td>{avg_memory:.2f} MB</td>
-                    <td>{peak_memory:.2f} MB</td>
-                </tr>
-                <tr>
-                    <td>Disk Read</td>
-                    <td>{avg_read:.2f} MB/s</td>
-                    <td>{peak_read:.2f} MB/s</td>
-                </tr>
-                <tr>
-                    <td>Disk Write</td>
-                    <td>{avg_write:.2f} MB/s</td>
-                    <td>{peak_write:.2f} MB/s</td>
-                </tr>
-                <tr>
-                    <td>Database Queries</td>
-                    <td>{avg_queries:.2f} queries/s</td>
-                    <td>{peak_queries:.2f} queries/s</td>
-                </tr>
+{summary_rows}
             </table>
             
             <h2>Recommendations</h2>
@@ -202,6 +230,12 @@ class PerformanceMonitor:
         """
         
         # Add recommendations based on performance data
+        peak_cpu = stats['cpu_percent'][1]
+        peak_memory = stats['memory_mb'][1]
+        peak_read = stats['disk_read_mb_s'][1]
+        peak_write = stats['disk_write_mb_s'][1]
+        peak_queries = stats['queries_per_s'][1]
+        
         if peak_cpu > 80:
             html += "<li>CPU usage is high. Consider optimizing CPU-intensive operations.</li>"
         
@@ -214,11 +248,17 @@ class PerformanceMonitor:
         if peak_queries > 100:
             html += "<li>Database query rate is high. Consider implementing caching or optimizing queries.</li>"
         
-        html += """
+        if stats['query_p95_ms'][1] > 100:
+            html += "<li>Slow database queries were recorded. Check indexes for the most frequent queries.</li>"
+        
+        if stats['gui_stalls'][1] > 0:
+            html += "<li>The user interface stalled. Move long running work off the GUI thread.</li>"
+        
+        html += f"""
             </ul>
             
             <h2>Raw Data</h2>
-            <p>See the performance_log.txt file for raw performance data.</p>
+            <p>See the {self.log_file} file for raw performance data.</p>
         </body>
         </html>
         """
@@ -230,7 +270,23 @@ class PerformanceMonitor:
         return True, f"Performance report generated: {output_file}"
 
 class PerformanceChart(FigureCanvas):
-    """Performance chart widget"""
+    """Performance chart widget, drawn from the monitor's ring buffer"""
+
+    # chart type -> (title, y label, initial y limit, [(column, style, legend label)])
+    CHARTS = {
+        'cpu': ('CPU Usage', 'CPU Usage (%)', 100, [('cpu_percent', 'b-', None)]),
+        'memory': ('Memory Usage', 'Memory Usage (MB)', 500, [('memory_mb', 'g-', None)]),
+        'disk': ('Disk I/O', 'Disk I/O (MB/s)', 50, [
+            ('disk_read_mb_s', 'r-', 'Read'),
+            ('disk_write_mb_s', 'm-', 'Write')
+        ]),
+        'queries': ('Database Queries', 'Queries/s', 100, [('queries_per_s', 'c-', None)]),
+        'latency': ('Query Latency', 'p95 (ms)', 10, [('query_p95_ms', 'k-', None)]),
+        'connections': ('Open Connections', 'Connections', 10, [('open_connections', 'y-', None)]),
+        'payroll': ('Payroll Throughput', 'Employees/s', 10, [('payroll_employees_per_s', 'g-', None)]),
+        'gui': ('Event Loop Lag', 'Lag (ms)', 100, [('gui_lag_ms', 'r-', None)]),
+        'cache': ('Cache Hit Rate', 'Hit Rate (%)', 100, [('cache_hit_rate', 'b-', None)])
+    }
     
     def __init__(self, monitor, chart_type):
         self.monitor = monitor
@@ -248,98 +304,59 @@ class PerformanceChart(FigureCanvas):
     
     def setup_plot(self):
         """Set up the plot"""
+        title, ylabel, ylim, series = self.CHARTS[self.chart_type]
         self.ax.set_xlabel('Time (s)')
-        
-        if self.chart_type == 'cpu':
-            self.ax.set_ylabel('CPU Usage (%)')
-            self.ax.set_title('CPU Usage')
-            self.line, = self.ax.plot([], [], 'b-')
-            self.ax.set_ylim(0, 100)
-        
-        elif self.chart_type == 'memory':
-            self.ax.set_ylabel('Memory Usage (MB)')
-            self.ax.set_title('Memory Usage')
-            self.line, = self.ax.plot([], [], 'g-')
-            self.ax.set_ylim(0, 500)
-        
-        elif self.chart_type == 'disk':
-            self.ax.set_ylabel('Disk I/O (MB/s)')
-            self.ax.set_title('Disk I/O')
-            self.read_line, = self.ax.plot([], [], 'r-', label='Read')
-            self.write_line, = self.ax.plot([], [], 'm-', label='Write')
+        self.ax.set_ylabel(ylabel)
+        self.ax.set_title(title)
+        
+        self.lines = []
+        for column, style, label in series:
+            line, = self.ax.plot([], [], style, label=label)
+            self.lines.append((column, line))
+        if any(label for _, _, label in series):
             self.ax.legend()
-            self.ax.set_ylim(0, 50)
-        
-        elif self.chart_type == 'queries':
-            self.ax.set_ylabel('Queries/s')
-            self.ax.set_title('Database Queries')
-            self.line, = self.ax.plot([], [], 'c-')
-            self.ax.set_ylim(0, 100)
         
+        self.ax.set_ylim(0, ylim)
         self.ax.set_xlim(0, 60)
         self.ax.grid(True)
         self.fig.tight_layout()
     
     def update_plot(self, frame):
         """Update the plot with new data"""
-        if not self.monitor.timestamps:
+        buffer = self.monitor.buffer
+        if not len(buffer):
             return
         
-        # Update x-axis limit if needed
-        max_time = max(self.monitor.timestamps) if self.monitor.timestamps else 0
-        if max_time > self.ax.get_xlim()[1]:
-            self.ax.set_xlim(0, max_time + 10)
+        timestamps = buffer.values('time')
         
-        if self.chart_type == 'cpu':
-            self.line.set_data(self.monitor.timestamps, self.monitor.cpu_usage)
-            
-            # Update y-axis limit if needed
-            max_cpu = max(self.monitor.cpu_usage) if self.monitor.cpu_usage else 0
-            if max_cpu > self.ax.get_ylim()[1] * 0.8:
-                self.ax.set_ylim(0, max_cpu * 1.2)
+        # Follow the window of samples still held in the buffer
+        start, end = timestamps[0], timestamps[-1]
+        if end > self.ax.get_xlim()[1] or start > self.ax.get_xlim()[0]:
+            self.ax.set_xlim(start, max(end + 10, start + 60))
         
-        elif self.chart_type == 'memory':
-            self.line.set_data(self.monitor.timestamps, self.monitor.memory_usage)
-            
-            # Update y-axis limit if needed
-            max_memory = max(self.monitor.memory_usage) if self.monitor.memory_usage else 0
-            if max_memory > self.ax.get_ylim()[1] * 0.8:
-                self.ax.set_ylim(0, max_memory * 1.2)
-        
-        elif self.chart_type == 'disk':
-            read_values = [read for read, _ in self.monitor.disk_io]
-            write_values = [write for _, write in self.monitor.disk_io]
-            
-            self.read_line.set_data(self.monitor.timestamps, read_values)
-            self.write_line.set_data(self.monitor.timestamps, write_values)
-            
-            # Update y-axis limit if needed
-            max_io = max(max(read_values) if read_values else 0, 
-                        max(write_values) if write_values else 0)
-            if max_io > self.ax.get_ylim()[1] * 0.8:
-                self.ax.set_ylim(0, max_io * 1.2)
-        
-        elif self.chart_type == 'queries':
-            self.line.set_data(self.monitor.timestamps, self.monitor.db_queries)
-            
-            # Update y-axis limit if needed
-            max_queries = max(self.monitor.db_queries) if self.monitor.db_queries else 0
-            if max_queries > self.ax.get_ylim()[1] * 0.8:
-                self.ax.set_ylim(0, max_queries * 1.2)
+        max_value = 0
+        for column, line in self.lines:
+            values = buffer.values(column)
+            line.set_data(timestamps, values)
+            max_value = max(max_value, max(values))
+        
+        # Update y-axis limit if needed
+        if max_value > self.ax.get_ylim()[1] * 0.8:
+            self.ax.set_ylim(0, max_value * 1.2)
         
         self.fig.canvas.draw_idle()
 
 class PerformanceMonitorUI(QMainWindow):
     """UI for performance monitor"""
     
-    def __init__(self):
-        super().__init__()
+    def __init__(self, db_file="employee.db", parent=None):
+        super().__init__(parent)
         
         self.setWindowTitle("Employee System Performance Monitor")
         self.setGeometry(100, 100, 1000, 600)
         
         # Create performance monitor
-        self.monitor = PerformanceMonitor()
+        self.monitor = PerformanceMonitor(db_file)
         
         self.init_ui()
     
@@ -357,31 +374,29 @@ class PerformanceMonitorUI(QMainWindow):
         # Description
         description_label = QLabel(
             "This tool monitors system and application performance during stress testing. "
-            "It tracks CPU usage, memory usage, disk I/O, and database query rate."
+            "It tracks CPU usage, memory usage, disk I/O and database query rate, and "
+            "when opened from the application also query latency, open connections, "
+            "payroll throughput, GUI stalls and cache hit rates."
         )
         description_label.setWordWrap(True)
         main_layout.addWidget(description_label)
         
-        # Charts
-        charts_layout = QGridLayout()
-        
-        # CPU usage chart
-        self.cpu_chart = PerformanceChart(self.monitor, 'cpu')
-        charts_layout.addWidget(self.cpu_chart, 0, 0)
-        
-        # Memory usage chart
-        self.memory_chart = PerformanceChart(self.monitor, 'memory')
-        charts_layout.addWidget(self.memory_chart, 0, 1)
-        
-        # Disk I/O chart
-        self.disk_chart = PerformanceChart(self.monitor, 'disk')
-        charts_layout.addWidget(self.disk_chart, 1, 0)
-        
-        # Database queries chart
-        self.queries_chart = PerformanceChart(self.monitor, 'queries')
-        charts_layout.addWidget(self.queries_chart, 1, 1)
-        
-        main_layout.addLayout(charts_layout)
+        # Charts, one tab for the system and one for the application
+        tabs = QTabWidget()
+        self.charts = {}
+        for title, chart_types in (
+            ("System", ['cpu', 'memory', 'disk', 'queries']),
+            ("Application", ['latency', 'connections', 'payroll', 'gui', 'cache'])
+        ):
+            tab = QWidget()
+            charts_layout = QGridLayout(tab)
+            for index, chart_type in enumerate(chart_types):
+                self.charts[chart_type] = PerformanceChart(self.monitor, chart_type)
+                charts_layout.addWidget(self.charts[chart_type], index // 2, index % 2)
+            tabs.addTab(tab, title)
+        
+        tabs.addTab(self.create_stalls_tab(), "GUI Stalls")
+        main_layout.addWidget(tabs)
         
         # Control buttons
         button_layout = QHBoxLayout()
@@ -397,12 +412,17 @@ class PerformanceMonitorUI(QMainWindow):
         self.report_button.clicked.connect(self.generate_report)
         self.report_button.setEnabled(False)
         
+        self.export_button = QPushButton("Export Data")
+        self.export_button.clicked.connect(self.export_data)
+        self.export_button.setEnabled(False)
+        
         exit_button = QPushButton("Exit")
         exit_button.clicked.connect(self.close)
         
         button_layout.addWidget(self.start_button)
         button_layout.addWidget(self.stop_button)
         button_layout.addWidget(self.report_button)
+        button_layout.addWidget(self.export_button)
         button_layout.addWidget(exit_button)
         
         main_layout.addLayout(button_layout)
@@ -410,6 +430,78 @@ class PerformanceMonitorUI(QMainWindow):
         # Set main layout
         main_widget.setLayout(main_layout)
         self.setCentralWidget(main_widget)
+
+    def create_stalls_tab(self):
+        """Create the tab summarizing stalls caught by the GUI watchdog"""
+        tab = QWidget()
+        layout = QVBoxLayout(tab)
+        
+        self.stalls_label = QLabel()
+        layout.addWidget(self.stalls_label)
+        
+        splitter = QSplitter(Qt.Vertical)
+        self.stalls_table = QTableWidget(0, 5)
+        self.stalls_table.setHorizontalHeaderLabels(
+            ["Slot", "Controller Method", "Stalls", "Total (ms)", "Max (ms)"]
+        )
+        self.stalls_table.horizontalHeader().setSectionResizeMode(QHeaderView.Stretch)
+        self.stalls_table.setEditTriggers(QTableWidget.NoEditTriggers)
+        self.stalls_table.setSelectionBehavior(QTableWidget.SelectRows)
+        self.stalls_table.itemSelectionChanged.connect(self.show_stall_stack)
+        splitter.addWidget(self.stalls_table)
+        
+        self.stall_stack = QPlainTextEdit()
+        self.stall_stack.setReadOnly(True)
+        splitter.addWidget(self.stall_stack)
+        layout.addWidget(splitter)
+        
+        self.stalls_timer = QTimer(self)
+        self.stalls_timer.timeout.connect(self.refresh_stalls)
+        self.stalls_timer.start(2000)
+        self.refresh_stalls()
+        return tab
+
+    def refresh_stalls(self):
+        """Reload the stall summary from the running watchdog"""
+        watchdog = StallWatchdog.active
+        if watchdog is None:
+            self.stalls_label.setText("The stall watchdog only runs inside the application.")
+            return
+        
+        summary = watchdog.summary()
+        self.stalls_label.setText(
+            f"Stalls longer than {watchdog.stall_ms} ms, grouped by slot and controller method"
+        )
+        self.stalls_table.setRowCount(len(summary))
+        for row, stall in enumerate(summary):
+            values = [
+                stall['handler'] or '<unknown slot>',
+                stall['controller'] or '<no controller>',
+                str(stall['count']),
+                f"{stall['total_ms']:.0f}",
+                f"{stall['max_ms']:.0f}"
+            ]
+            for column, value in enumerate(values):
+                self.stalls_table.setItem(row, column, QTableWidgetItem(value))
+
+    def show_stall_stack(self):
+        """Show the stack of the latest stall for the selected row"""
+        watchdog = StallWatchdog.active
+        rows = self.stalls_table.selectionModel().selectedRows()
+        if watchdog is None or not rows:
+            return
+        
+        handler = self.stalls_table.item(rows[0].row(), 0).text()
+        controller = self.stalls_table.item(rows[0].row(), 1).text()
+        for record in reversed(watchdog.records()):
+            if ((record['handler'] or '<unknown slot>') == handler and
+                    (record['controller'] or '<no controller>') == controller):
+                self.stall_stack.setPlainText(
+                    f"{record['duration_ms']:.0f} ms at {datetime.fromtimestamp(record['started'])}\n\n"
+                    f"{record['stack']}"
+                )
+                return
+        self.stall_stack.setPlainText("")
     
     def start_monitoring(self):
         """Start performance monitoring"""
@@ -417,6 +509,7 @@ class PerformanceMonitorUI(QMainWindow):
         self.start_button.setEnabled(False)
         self.stop_button.setEnabled(True)
         self.report_button.setEnabled(False)
+        self.export_button.setEnabled(False)
     
     def stop_monitoring(self):
         """Stop performance monitoring"""
@@ -424,6 +517,7 @@ class PerformanceMonitorUI(QMainWindow):
         self.start_button.setEnabled(True)
         self.stop_button.setEnabled(False)
         self.report_button.setEnabled(True)
+        self.export_button.setEnabled(True)
     
     def generate_report(self):
         """Generate performance report"""
@@ -433,6 +527,21 @@ class PerformanceMonitorUI(QMainWindow):
             QMessageBox.information(self, "Report Generated", message)
         else:
             QMessageBox.warning(self, "Report Generation Failed", message)
+
+    def export_data(self):
+        """Export the collected samples to a CSV or binary log"""
+        filename, _ = QFileDialog.getSaveFileName(
+            self, "Export Performance Data", self.monitor.log_file,
+            "CSV Files (*.csv);;Binary Log (*.bin)"
+        )
+        if not filename:
+            return
+        
+        try:
+            self.monitor.export(filename)
+            QMessageBox.information(self, "Export Complete", f"Performance data exported to {filename}")
+        except Exception as e:
+            QMessageBox.warning(self, "Export Failed", str(e))
     
     def closeEvent(self, event):
         """Handle window close event"""
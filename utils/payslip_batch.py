@@ -0,0 +1,454 @@
+"""
+Bulk payslip rendering for a whole payroll period
+
+The payslip HTML is a precompiled jinja2 template shared by the print
+preview and the bulk pipeline. PDFs are built with reportlab in a process
+pool, either one file per employee or a single merged file.
+"""
+import os
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+from xml.sax.saxutils import escape
+import jinja2
+from markupsafe import Markup
+from reportlab.lib import colors
+from reportlab.lib.pagesizes import letter
+from reportlab.lib.styles import getSampleStyleSheet
+from reportlab.platypus import SimpleDocTemplate, Table, TableStyle, Paragraph, PageBreak
+
+MONTH_NAMES_AR = [
+    "يناير", "فبراير", "مارس", "إبريل", "مايو", "يونيو",
+    "يوليو", "أغسطس", "سبتمبر", "أكتوبر", "نوفمبر", "ديسمبر"
+]
+
+PAYMENT_STATUS_AR = {
+    'pending': 'معلق',
+    'paid': 'مدفوع',
+    'failed': 'فشل'
+}
+
+PAYSLIP_STYLE = """
+    body {
+        font-family: Arial, sans-serif;
+        margin: 0;
+        padding: 20px;
+        direction: rtl;
+    }
+    .payslip {
+        border: 1px solid #000;
+        padding: 20px;
+        max-width: 800px;
+        margin: 0 auto;
+    }
+    .header {
+        text-align: center;
+        margin-bottom: 20px;
+        border-bottom: 2px solid #000;
+        padding-bottom: 10px;
+    }
+    .company-name {
+        font-size: 20px;
+        font-weight: bold;
+        margin-bottom: 5px;
+        color: #2c3e50;
+    }
+    .company-info {
+        font-size: 12px;
+        color: #7f8c8d;
+        margin-bottom: 10px;
+    }
+    .payslip-title {
+        font-size: 18px;
+        margin: 10px 0;
+    }
+    .period {
+        font-size: 16px;
+        margin-bottom: 10px;
+    }
+    .employee-info {
+        display: flex;
+        justify-content: space-between;
+        margin-bottom: 20px;
+    }
+    .info-group {
+        width: 48%;
+    }
+    .info-row {
+        display: flex;
+        margin-bottom: 5px;
+    }
+    .info-label {
+        font-weight: bold;
+        width: 40%;
+    }
+    .info-value {
+        width: 60%;
+    }
+    .salary-details {
+        width: 100%;
+        border-collapse: collapse;
+        margin-bottom: 20px;
+    }
+    .salary-details th, .salary-details td {
+        border: 1px solid #000;
+        padding: 8px;
+        text-align: right;
+    }
+    .salary-details th {
+        background-color: #f2f2f2;
+    }
+    .summary {
+        display: flex;
+        justify-content: flex-end;
+        margin-top: 20px;
+    }
+    .total-box {
+        border: 2px solid #000;
+        padding: 10px;
+        width: 200px;
+        text-align: center;
+    }
+    .total-label {
+        font-weight: bold;
+        margin-bottom: 5px;
+    }
+    .total-value {
+        font-size: 18px;
+        font-weight: bold;
+    }
+    .footer {
+        margin-top: 30px;
+        text-align: center;
+        font-size: 12px;
+        color: #666;
+    }
+"""
+
+PAYSLIP_BODY = """
+<div class="payslip">
+    <div class="header">
+        <div class="company-name">{{ company_name }}</div>
+        {% if commercial_register %}<div class="company-info">السجل التجاري: {{ commercial_register }}</div>{% endif %}
+        {% if social_insurance %}<div class="company-info">رقم التأمينات الاجتماعية: {{ social_insurance }}</div>{% endif %}
+        {% if tax_number %}<div class="company-info">الرقم الضريبي: {{ tax_number }}</div>{% endif %}
+        <div class="payslip-title">قسيمة الراتب</div>
+        <div class="period">الفترة: {{ month_name }} {{ period_year }}</div>
+    </div>
+
+    <div class="employee-info">
+        <div class="info-group">
+            <div class="info-row">
+                <div class="info-label">اسم الموظف:</div>
+                <div class="info-value">{{ employee_name }}</div>
+            </div>
+            <div class="info-row">
+                <div class="info-label">الرقم الوظيفي:</div>
+                <div class="info-value">{{ employee_id }}</div>
+            </div>
+            <div class="info-row">
+                <div class="info-label">القسم:</div>
+                <div class="info-value">{{ department }}</div>
+            </div>
+            <div class="info-row">
+                <div class="info-label">المسمى الوظيفي:</div>
+                <div class="info-value">{{ position }}</div>
+            </div>
+        </div>
+
+        <div class="info-group">
+            <div class="info-row">
+                <div class="info-label">تاريخ البدء:</div>
+                <div class="info-value">{{ start_date }}</div>
+            </div>
+            <div class="info-row">
+                <div class="info-label">تاريخ الانتهاء:</div>
+                <div class="info-value">{{ end_date }}</div>
+            </div>
+            <div class="info-row">
+                <div class="info-label">تاريخ الدفع:</div>
+                <div class="info-value">{{ payment_date }}</div>
+            </div>
+        </div>
+    </div>
+
+    <table class="salary-details">
+        <tr>
+            <th>البند</th>
+            <th>المبلغ</th>
+        </tr>
+        <tr>
+            <td>الراتب الأساسي</td>
+            <td>{{ basic_salary|money }}</td>
+        </tr>
+        {% for component in allowances %}
+        <tr>
+            <td>{{ component.name_ar }}</td>
+            <td>{{ component.amount|money }}</td>
+        </tr>
+        {% endfor %}
+        {% for component in deductions %}
+        <tr>
+            <td>{{ component.name_ar }}</td>
+            <td>({{ component.amount|money }})</td>
+        </tr>
+        {% endfor %}
+    </table>
+
+    <div class="summary">
+        <div class="total-box">
+            <div class="total-label">صافي الراتب</div>
+            <div class="total-value">{{ net_salary|money }}</div>
+        </div>
+    </div>
+
+    <div class="footer">
+        <p>هذه القسيمة تم إنشاؤها بواسطة نظام إدارة الموظفين</p>
+        <p>تاريخ الطباعة: {{ print_date }}</p>
+    </div>
+</div>
+"""
+
+PAYSLIP_DOCUMENT = """<!DOCTYPE html>
+<html dir="rtl">
+<head>
+    <meta charset="UTF-8">
+    <style>{{ style }}</style>
+</head>
+<body>
+{% for body in bodies %}
+{{ body }}
+{% if not loop.last %}<div style='page-break-after: always;'></div>{% endif %}
+{% endfor %}
+</body>
+</html>
+"""
+
+def _money(value):
+    """Format an amount the way payslips show it"""
+    try:
+        return f"{float(value or 0):,.2f}"
+    except (TypeError, ValueError):
+        return "0.00"
+
+# Compiled once per process and reused for every payslip
+_environment = jinja2.Environment(autoescape=True, trim_blocks=True, lstrip_blocks=True)
+_environment.filters['money'] = _money
+PAYSLIP_TEMPLATE = _environment.from_string(PAYSLIP_BODY)
+DOCUMENT_TEMPLATE = _environment.from_string(PAYSLIP_DOCUMENT)
+
+
+def _format_date(value):
+    """Convert a stored YYYY-MM-DD date to the payslip display format"""
+    if not value:
+        return ''
+    try:
+        return datetime.strptime(str(value)[:10], '%Y-%m-%d').strftime('%Y/%m/%d')
+    except (ValueError, TypeError):
+        return ''
+
+
+def _to_float(value):
+    try:
+        return float(value or 0)
+    except (TypeError, ValueError):
+        return 0.0
+
+
+def build_payslip_context(payslip_data, company=None):
+    """
+    Build the template context for one payslip
+
+    Args:
+        payslip_data: Dictionary as returned by PayrollController.get_employee_payslip
+        company: Optional company_info row (dict), loaded once per batch
+
+    Returns:
+        dict: Values used by the payslip template and the PDF builder
+    """
+    company = company or {}
+
+    period_month = payslip_data.get('period_month', 1)
+    try:
+        period_month = int(period_month)
+        if period_month < 1 or period_month > 12:
+            period_month = 1
+    except (ValueError, TypeError):
+        period_month = 1
+
+    components = payslip_data.get('components', [])
+    allowances = [c for c in components if c.get('type') == 'allowance']
+    deductions = [c for c in components if c.get('type') == 'deduction']
+
+    basic_salary = _to_float(payslip_data.get('basic_salary', 0))
+    allowances_total = sum(_to_float(c.get('amount', 0)) for c in allowances)
+    deductions_total = sum(_to_float(c.get('amount', 0)) for c in deductions)
+
+    payment_status = payslip_data.get('payment_status', '')
+
+    return {
+        'company_name': company.get('company_name') or "شركة",
+        'commercial_register': company.get('commercial_register_number') or '',
+        'social_insurance': company.get('social_insurance_number') or '',
+        'tax_number': company.get('tax_number') or '',
+        'month_name': MONTH_NAMES_AR[period_month - 1],
+        'period_year': payslip_data.get('period_year', ''),
+        'period_month': period_month,
+        'employee_name': payslip_data.get('employee_name_ar', payslip_data.get('employee_name', 'موظف')),
+        'employee_id': payslip_data.get('employee_id', ''),
+        'department': payslip_data.get('department_name') or '',
+        'position': payslip_data.get('position_title') or '',
+        'start_date': _format_date(payslip_data.get('start_date', '')),
+        'end_date': _format_date(payslip_data.get('end_date', '')),
+        'payment_date': _format_date(payslip_data.get('payment_date', '')),
+        'payment_method': payslip_data.get('payment_method_name') or '',
+        'payment_status': PAYMENT_STATUS_AR.get(payment_status, payment_status),
+        'basic_salary': basic_salary,
+        'allowances': allowances,
+        'deductions': deductions,
+        # Net salary is recomputed from the listed components so the
+        # printed total always matches the printed lines
+        'net_salary': basic_salary + allowances_total - deductions_total,
+        'print_date': datetime.now().strftime('%Y/%m/%d')
+    }
+
+
+def render_payslip_body(payslip_data, company=None):
+    """Render the HTML body of one payslip (without the page wrapper)"""
+    return PAYSLIP_TEMPLATE.render(build_payslip_context(payslip_data, company))
+
+
+def render_payslip_document(bodies):
+    """Wrap rendered payslip bodies in a single HTML page with one stylesheet"""
+    return DOCUMENT_TEMPLATE.render(style=Markup(PAYSLIP_STYLE), bodies=[Markup(b) for b in bodies])
+
+
+def _payslip_flowables(context, styles):
+    """Build the reportlab flowables for one payslip context"""
+    table_style = TableStyle([
+        ('BACKGROUND', (0, 0), (-1, 0), colors.grey),
+        ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
+        ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
+        ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
+        ('FONTSIZE', (0, 0), (-1, 0), 12),
+        ('BOTTOMPADDING', (0, 0), (-1, 0), 10),
+        ('BACKGROUND', (0, 1), (-1, -1), colors.beige),
+        ('TEXTCOLOR', (0, 1), (-1, -1), colors.black),
+        ('FONTNAME', (0, 1), (-1, -1), 'Helvetica'),
+        ('FONTSIZE', (0, 1), (-1, -1), 10),
+        ('GRID', (0, 0), (-1, -1), 1, colors.black)
+    ])
+
+    elements = [Paragraph(escape(str(context['company_name'])), styles['Title'])]
+    if context['commercial_register']:
+        elements.append(Paragraph(f"رقم السجل التجاري: {escape(str(context['commercial_register']))}", styles['Normal']))
+    elements.append(Paragraph(
+        f"Payslip - {escape(str(context['employee_name']))} - {context['period_month']:02d}/{context['period_year']}",
+        styles['Heading2']
+    ))
+
+    employee_details = [
+        ["Employee Details", ""],
+        ["Name", context['employee_name']],
+        ["ID", str(context['employee_id'])],
+        ["Department", context['department']],
+        ["Position", context['position']]
+    ]
+
+    salary_details = [["Salary Details", "Amount"], ["Base Salary", _money(context['basic_salary'])]]
+    for component in context['allowances']:
+        salary_details.append([component.get('name') or component.get('name_ar', ''),
+                               _money(component.get('amount'))])
+    for component in context['deductions']:
+        salary_details.append([component.get('name') or component.get('name_ar', ''),
+                               f"({_money(component.get('amount'))})"])
+    salary_details.append(["Net Salary", _money(context['net_salary'])])
+
+    payment_details = [
+        ["Payment Details", ""],
+        ["Payment Date", context['payment_date']],
+        ["Payment Mode", context['payment_method']],
+        ["Status", context['payment_status']]
+    ]
+
+    for details in (employee_details, salary_details, payment_details):
+        table = Table(details)
+        table.setStyle(table_style)
+        elements.append(table)
+        elements.append(Paragraph("<br/>", styles['Normal']))
+
+    return elements
+
+
+def _build_pdf(job):
+    """Process pool worker: build one PDF file from a list of payslip contexts"""
+    filename, contexts = job
+    try:
+        styles = getSampleStyleSheet()
+        elements = []
+        for i, context in enumerate(contexts):
+            if i:
+                elements.append(PageBreak())
+            elements.extend(_payslip_flowables(context, styles))
+
+        SimpleDocTemplate(filename, pagesize=letter).build(elements)
+        return filename, None
+    except Exception as e:
+        return filename, str(e)
+
+
+def payslip_filename(payslip_data):
+    """Default file name for a single employee's payslip PDF"""
+    return "payslip_{}_{:02d}_{}.pdf".format(
+        payslip_data.get('period_year', ''),
+        int(payslip_data.get('period_month') or 0),
+        payslip_data.get('employee_id', payslip_data.get('id', ''))
+    )
+
+
+def generate_payslip_pdfs(payslips, output_dir=None, merged_filename=None,
+                          company=None, max_workers=None):
+    """
+    Generate PDFs for many payslips in a process pool
+
+    Args:
+        payslips: List of payslip dictionaries (see PayrollController.get_period_payslips)
+        output_dir: Directory for one PDF per employee
+        merged_filename: Path of a single PDF containing every payslip instead
+        company: Optional company_info row (dict), loaded once by the caller
+        max_workers: Process pool size (defaults to the CPU count)
+
+    Returns:
+        tuple: (success, list of generated files or error message)
+    """
+    if not payslips:
+        return False, "لا توجد بيانات للطباعة"
+    if not output_dir and not merged_filename:
+        return False, "No output location given"
+
+    contexts = [build_payslip_context(p, company) for p in payslips]
+
+    if merged_filename:
+        # reportlab cannot merge finished files, so the merged document is
+        # laid out in a single pass; per-employee files use the whole pool
+        filename, error = _build_pdf((merged_filename, contexts))
+        return (False, error) if error else (True, [filename])
+
+    os.makedirs(output_dir, exist_ok=True)
+    jobs = [
+        (os.path.join(output_dir, payslip_filename(p)), [context])
+        for p, context in zip(payslips, contexts)
+    ]
+
+    generated = []
+    errors = []
+    with ProcessPoolExecutor(max_workers=max_workers) as executor:
+        chunksize = max(1, len(jobs) // ((max_workers or os.cpu_count() or 1) * 4))
+        for filename, error in executor.map(_build_pdf, jobs, chunksize=chunksize):
+            if error:
+                errors.append(f"{os.path.basename(filename)}: {error}")
+            else:
+                generated.append(filename)
+
+    if errors:
+        return False, "\n".join(errors)
+    return True, generated
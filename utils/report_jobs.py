@@ -0,0 +1,217 @@
+"""
+Background report jobs
+
+ReportJobQueue runs report functions on a bounded thread pool so the GUI
+stays responsive while reports are generated. Identical requests that are
+already queued or running share one job, and finished results are cached
+per (report type, parameters, data version) until the database changes.
+"""
+import itertools
+import logging
+import traceback
+from collections import OrderedDict
+
+from PyQt5.QtCore import QObject, QRunnable, QThreadPool, QTimer, pyqtSignal
+
+from utils.telemetry import telemetry
+
+
+class ReportJobCancelled(Exception):
+    """Raised inside a report function to stop a cancelled job early"""
+
+
+class ReportJob:
+    """A queued or running report request
+
+    Report functions registered with progress=True receive the job as their
+    'job' keyword argument and can call report_progress() and check
+    is_cancelled() between steps.
+    """
+
+    def __init__(self, job_id, report_type, params, key, cache_key, queue):
+        self.job_id = job_id
+        self.report_type = report_type
+        self.params = params
+        self.key = key
+        self.cache_key = cache_key
+        self.requesters = {job_id}   # Request ids sharing this job
+        self.cancelled = False
+        self._queue = queue
+
+    def is_cancelled(self):
+        return self.cancelled
+
+    def report_progress(self, percent, message=""):
+        """Emit progress for this job; raises ReportJobCancelled once cancelled"""
+        if self.cancelled:
+            raise ReportJobCancelled()
+        self._queue._job_progress.emit(self.job_id, int(percent), message)
+
+
+class _ReportRunnable(QRunnable):
+    """Runs one report job on a pool thread"""
+
+    def __init__(self, queue, job, func, pass_job):
+        super().__init__()
+        self.queue = queue
+        self.job = job
+        self.func = func
+        self.pass_job = pass_job
+
+    def run(self):
+        if self.job.cancelled:
+            self.queue._job_done.emit(self.job.job_id, None, None)
+            return
+        
+        self.queue._job_progress.emit(self.job.job_id, 0, "")
+        try:
+            kwargs = dict(self.job.params)
+            if self.pass_job:
+                kwargs['job'] = self.job
+            result = self.func(**kwargs)
+            self.queue._job_done.emit(self.job.job_id, result, None)
+        except ReportJobCancelled:
+            self.queue._job_done.emit(self.job.job_id, None, None)
+        except Exception as e:
+            logging.error(f"Report job {self.job.report_type} failed: {traceback.format_exc()}")
+            self.queue._job_done.emit(self.job.job_id, None, str(e))
+
+
+class ReportJobQueue(QObject):
+    """Queue of report requests served by a bounded worker pool"""
+    job_progress = pyqtSignal(str, int, str)   # request_id, percent, message
+    job_finished = pyqtSignal(str, object)     # request_id, result
+    job_failed = pyqtSignal(str, str)          # request_id, error message
+    job_cancelled = pyqtSignal(str)            # request_id
+
+    # Worker threads report back through these, so bookkeeping always
+    # happens on the thread that owns the queue
+    _job_progress = pyqtSignal(str, int, str)
+    _job_done = pyqtSignal(str, object, object)
+
+    def __init__(self, database, max_workers=2, cache_size=32, parent=None):
+        super().__init__(parent)
+        self.db = database
+        self.cache_size = cache_size
+        self._pool = QThreadPool(self)
+        self._pool.setMaxThreadCount(max_workers)
+        self._reports = {}
+        self._jobs = {}              # job_id -> ReportJob, queued or running
+        self._in_flight = {}         # request key -> ReportJob
+        self._requests = {}          # request_id -> ReportJob serving it
+        self._results = OrderedDict()
+        self._ids = itertools.count(1)
+        
+        self._job_progress.connect(self._on_job_progress)
+        self._job_done.connect(self._on_job_done)
+
+    def register(self, report_type, func, progress=False, cache=True):
+        """Register a report function
+        
+        Args:
+            report_type: Name used when submitting the report
+            func: Callable taking the report parameters as keyword arguments
+            progress: Pass the ReportJob as 'job' so the function can report progress
+            cache: Keep results until the database changes (disable for exports)
+        """
+        self._reports[report_type] = (func, progress, cache)
+
+    def submit(self, report_type, **params):
+        """Queue a report and return a request id
+        
+        Signals for the returned id are always emitted after submit returns,
+        including for results served from the cache.
+        """
+        func, pass_job, cache = self._reports[report_type]
+        key = (report_type, self._freeze(params))
+        request_id = f"{report_type}-{next(self._ids)}"
+        
+        cache_key = None
+        if cache:
+            cache_key = key + (self.db.get_data_version(),)
+            if cache_key in self._results:
+                telemetry.cache_hit('reports')
+                self._results.move_to_end(cache_key)
+                result = self._results[cache_key]
+                QTimer.singleShot(0, lambda: self.job_finished.emit(request_id, result))
+                return request_id
+            telemetry.cache_miss('reports')
+        
+        # An identical request is already queued or running, share its result
+        job = self._in_flight.get(key)
+        if job is not None and not job.cancelled:
+            job.requesters.add(request_id)
+            self._requests[request_id] = job
+            return request_id
+        
+        job = ReportJob(request_id, report_type, params, key, cache_key, self)
+        self._jobs[request_id] = job
+        self._in_flight[key] = job
+        self._requests[request_id] = job
+        self._pool.start(_ReportRunnable(self, job, func, pass_job))
+        return request_id
+
+    def cancel(self, request_id):
+        """Cancel a request; the job itself stops once no request is waiting for it"""
+        job = self._requests.pop(request_id, None)
+        if job is None:
+            return False
+        
+        job.requesters.discard(request_id)
+        if not job.requesters:
+            job.cancelled = True
+            if self._in_flight.get(job.key) is job:
+                del self._in_flight[job.key]
+        self.job_cancelled.emit(request_id)
+        return True
+
+    def pending_requests(self):
+        """Return the ids of requests that are still waiting for a result"""
+        return list(self._requests)
+
+    def clear_cache(self):
+        self._results.clear()
+
+    def wait_for_done(self, msecs=-1):
+        """Block until all running jobs are done (for shutdown and tests)"""
+        return self._pool.waitForDone(msecs)
+
+    def _on_job_progress(self, job_id, percent, message):
+        job = self._jobs.get(job_id)
+        if job is None:
+            return
+        for request_id in list(job.requesters):
+            self.job_progress.emit(request_id, percent, message)
+
+    def _on_job_done(self, job_id, result, error):
+        job = self._jobs.pop(job_id, None)
+        if job is None:
+            return
+        if self._in_flight.get(job.key) is job:
+            del self._in_flight[job.key]
+        if job.cancelled:
+            return
+        
+        requesters = list(job.requesters)
+        for request_id in requesters:
+            self._requests.pop(request_id, None)
+        
+        if error is not None:
+            for request_id in requesters:
+                self.job_failed.emit(request_id, error)
+            return
+        
+        # Keyed on the data version seen at submit time, so a result computed
+        # while the data changed is never served for the newer version
+        if job.cache_key is not None:
+            self._results[job.cache_key] = result
+            while len(self._results) > self.cache_size:
+                self._results.popitem(last=False)
+        
+        for request_id in requesters:
+            self.job_finished.emit(request_id, result)
+
+    @staticmethod
+    def _freeze(params):
+        """Turn report parameters into a hashable key"""
+        return tuple(sorted((name, repr(value)) for name, value in params.items()))
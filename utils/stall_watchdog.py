@@ -0,0 +1,167 @@
+"""
+GUI stall watchdog
+
+StallWatchdog extends the event loop probe with a background thread that
+watches the GUI heartbeat. When the heartbeat is late by more than the stall
+threshold, the thread samples the GUI thread's Python stack with
+sys._current_frames() until the event loop runs again. Each stall is logged
+with the slot that was running and the controller method it was blocked in,
+and a per-location summary is kept for the performance monitor.
+"""
+import logging
+import os
+import sys
+import threading
+import time
+import traceback
+from collections import Counter, deque
+
+from utils.telemetry import EventLoopProbe
+
+APP_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+CONTROLLERS_DIR = os.path.join(APP_DIR, 'controllers') + os.sep
+UI_DIR = os.path.join(APP_DIR, 'ui') + os.sep
+
+
+def _qualified_name(frame):
+    """Return Class.method for a frame, or the bare function name"""
+    code = frame.f_code
+    qualname = getattr(code, 'co_qualname', None)
+    if qualname:
+        return qualname
+    instance = frame.f_locals.get('self')
+    if instance is not None:
+        return f"{type(instance).__name__}.{code.co_name}"
+    return code.co_name
+
+
+def locate_frame(frame):
+    """Find the slot and controller method a GUI thread frame is running
+
+    Returns (handler, controller): the outermost frame in ui/ is taken as the
+    slot the event loop called, the innermost frame in controllers/ as the
+    controller method doing the work. Either may be None.
+    """
+    handler = controller = None
+    while frame is not None:
+        filename = os.path.abspath(frame.f_code.co_filename)
+        if controller is None and filename.startswith(CONTROLLERS_DIR):
+            controller = _qualified_name(frame)
+        if filename.startswith(UI_DIR):
+            handler = _qualified_name(frame)
+        frame = frame.f_back
+    return handler, controller
+
+
+class StallWatchdog(EventLoopProbe):
+    """Logs where the GUI thread was when the event loop stalled"""
+
+    # The running watchdog, shown by the performance monitor
+    active = None
+
+    def __init__(self, interval_ms=50, stall_ms=200, max_records=100, parent=None):
+        """Must be created on the GUI thread"""
+        super().__init__(interval_ms, stall_ms, parent)
+        self.max_records = max_records
+        self._gui_thread_id = threading.get_ident()
+        self._lock = threading.Lock()
+        self._last_beat = time.monotonic()
+        self._current = None        # Stall that is still going on
+        self._records = deque(maxlen=max_records)
+        self._summary = {}          # (handler, controller) -> count, total and max ms
+        self._stop = threading.Event()
+        self._thread = None
+
+    def start(self):
+        super().start()
+        with self._lock:
+            self._last_beat = time.monotonic()
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._watch, name='StallWatchdog', daemon=True)
+        self._thread.start()
+        StallWatchdog.active = self
+
+    def stop(self):
+        super().stop()
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(1.0)
+        if StallWatchdog.active is self:
+            StallWatchdog.active = None
+
+    def records(self):
+        """Return the most recent stalls, newest last"""
+        with self._lock:
+            return list(self._records)
+
+    def summary(self):
+        """Return stalls grouped by slot and controller method, worst first"""
+        with self._lock:
+            rows = [
+                dict(handler=handler, controller=controller, **stats)
+                for (handler, controller), stats in self._summary.items()
+            ]
+        return sorted(rows, key=lambda row: row['total_ms'], reverse=True)
+
+    def _tick(self):
+        super()._tick()
+        now = time.monotonic()
+        with self._lock:
+            started_at = self._last_beat
+            self._last_beat = now
+            stall, self._current = self._current, None
+        if stall is not None:
+            self._finish(stall, (now - started_at) * 1000)
+
+    def _watch(self):
+        """Sample the GUI thread's stack while its heartbeat is late"""
+        period = self.interval_ms / 2000.0
+        while not self._stop.wait(period):
+            with self._lock:
+                late_ms = (time.monotonic() - self._last_beat) * 1000
+                stalled = late_ms >= self.stall_ms + self.interval_ms
+                beat = self._last_beat
+            if stalled:
+                self._sample(beat)
+
+    def _sample(self, beat):
+        frame = sys._current_frames().get(self._gui_thread_id)
+        if frame is None:
+            return
+        location = locate_frame(frame)
+        with self._lock:
+            # The event loop may have come back while the stack was read
+            if self._last_beat != beat:
+                return
+            if self._current is None:
+                self._current = {
+                    'started': time.time() - (time.monotonic() - beat),
+                    'stack': ''.join(traceback.format_stack(frame)),
+                    'samples': Counter()
+                }
+            self._current['samples'][location] += 1
+
+    def _finish(self, stall, duration_ms):
+        """Record and log a stall once the event loop has run again"""
+        (handler, controller), _ = stall['samples'].most_common(1)[0]
+        record = {
+            'started': stall['started'],
+            'duration_ms': duration_ms,
+            'handler': handler,
+            'controller': controller,
+            'stack': stall['stack']
+        }
+        with self._lock:
+            self._records.append(record)
+            stats = self._summary.setdefault(
+                (handler, controller), {'count': 0, 'total_ms': 0.0, 'max_ms': 0.0}
+            )
+            stats['count'] += 1
+            stats['total_ms'] += duration_ms
+            stats['max_ms'] = max(stats['max_ms'], duration_ms)
+        
+        logging.warning(
+            f"GUI thread stalled for {duration_ms:.0f} ms in "
+            f"{handler or '<unknown slot>'} -> {controller or '<no controller>'}\n"
+            f"{stall['stack']}"
+        )
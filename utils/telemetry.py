@@ -0,0 +1,297 @@
+"""
+Application telemetry
+
+A small process-wide registry of counters, latency histograms and gauges
+that the application updates as it runs (query latency, cache hits, payroll
+throughput, event loop stalls) and that PerformanceMonitor samples. Updates
+are a dictionary lookup and an integer increment, so they can stay enabled
+in production.
+"""
+import csv
+import struct
+import sys
+import threading
+import time
+from array import array
+from bisect import bisect_left
+
+from PyQt5.QtCore import QObject, QTimer
+
+# Upper bounds in milliseconds of the latency histogram buckets, the last
+# bucket counts everything slower
+LATENCY_BUCKETS_MS = (0.1, 0.25, 0.5, 1, 2.5, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000)
+
+
+def bucket_percentile(bounds, counts, percent, overflow=None):
+    """Estimate a percentile from bucket counts as the upper bound of its bucket
+
+    Values in the overflow bucket are reported as overflow (or the last bound).
+    """
+    total = sum(counts)
+    if not total:
+        return 0.0
+    rank = total * percent / 100.0
+    seen = 0
+    for index, bucket_count in enumerate(counts):
+        seen += bucket_count
+        if seen >= rank:
+            break
+    if index < len(bounds):
+        return bounds[index]
+    return overflow if overflow is not None else bounds[-1]
+
+
+class Histogram:
+    """Fixed-bucket histogram of latencies in milliseconds"""
+
+    def __init__(self, bounds=LATENCY_BUCKETS_MS):
+        self.bounds = bounds
+        self.counts = array('q', [0] * (len(bounds) + 1))
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def observe(self, value):
+        self.counts[bisect_left(self.bounds, value)] += 1
+        self.count += 1
+        self.total += value
+        if value > self.max:
+            self.max = value
+
+    def percentile(self, percent):
+        """Estimate a percentile as the upper bound of the bucket holding it"""
+        return bucket_percentile(self.bounds, self.counts, percent, self.max)
+
+    def snapshot(self):
+        return {
+            'count': self.count,
+            'mean': self.total / self.count if self.count else 0.0,
+            'p50': self.percentile(50),
+            'p95': self.percentile(95),
+            'p99': self.percentile(99),
+            'max': self.max,
+            'buckets': list(zip(self.bounds + (float('inf'),), self.counts))
+        }
+
+
+class Telemetry:
+    """Registry of counters, histograms and gauges"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._counters = {}
+        self._histograms = {}
+        self._gauges = {}
+
+    def increment(self, name, amount=1):
+        with self._lock:
+            self._counters[name] = self._counters.get(name, 0) + amount
+
+    def observe(self, name, value):
+        """Record a latency in milliseconds"""
+        with self._lock:
+            histogram = self._histograms.get(name)
+            if histogram is None:
+                histogram = self._histograms[name] = Histogram()
+            histogram.observe(value)
+
+    def cache_hit(self, name):
+        self.increment(f'cache.{name}.hits')
+
+    def cache_miss(self, name):
+        self.increment(f'cache.{name}.misses')
+
+    def register_gauge(self, name, func):
+        """Register a callable sampled on every snapshot"""
+        with self._lock:
+            self._gauges[name] = func
+
+    def timer(self, name):
+        """Context manager recording the duration of a block in a histogram"""
+        return _Timer(self, name)
+
+    def counter(self, name):
+        with self._lock:
+            return self._counters.get(name, 0)
+
+    def cache_hit_rate(self, name=None):
+        """Hit rate in percent for one cache, or for all caches together"""
+        hits = misses = 0
+        with self._lock:
+            for key, value in self._counters.items():
+                if not key.startswith('cache.'):
+                    continue
+                if name is not None and key.split('.')[1] != name:
+                    continue
+                if key.endswith('.hits'):
+                    hits += value
+                elif key.endswith('.misses'):
+                    misses += value
+        total = hits + misses
+        return hits * 100.0 / total if total else 0.0
+
+    def snapshot(self):
+        """Return a copy of every metric"""
+        with self._lock:
+            counters = dict(self._counters)
+            histograms = {name: histogram.snapshot() for name, histogram in self._histograms.items()}
+            gauges = dict(self._gauges)
+        
+        gauge_values = {}
+        for name, func in gauges.items():
+            try:
+                gauge_values[name] = func()
+            except Exception:
+                gauge_values[name] = None
+        return {'counters': counters, 'histograms': histograms, 'gauges': gauge_values}
+
+    def reset(self):
+        with self._lock:
+            self._counters.clear()
+            self._histograms.clear()
+
+
+class RingBuffer:
+    """Fixed-size, array-backed buffer of samples with named float columns
+
+    Appending overwrites the oldest sample once the buffer is full, so
+    memory use does not grow however long monitoring runs.
+    """
+
+    # The binary export starts with this, then column count, row count and
+    # the length of the newline separated column names
+    BINARY_MAGIC = b'EMPPERF1'
+
+    def __init__(self, columns, capacity=3600):
+        self.columns = tuple(columns)
+        self.capacity = capacity
+        self._data = {column: array('d', bytes(8 * capacity)) for column in self.columns}
+        self._next = 0
+        self._size = 0
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return self._size
+
+    def append(self, sample):
+        """Add a sample given as a dict of column -> value (missing columns are 0)"""
+        with self._lock:
+            for column in self.columns:
+                self._data[column][self._next] = float(sample.get(column) or 0.0)
+            self._next = (self._next + 1) % self.capacity
+            self._size = min(self._size + 1, self.capacity)
+
+    def clear(self):
+        with self._lock:
+            self._next = 0
+            self._size = 0
+
+    def values(self, column):
+        """Return the values of a column, oldest first"""
+        with self._lock:
+            return self._ordered(self._data[column])
+
+    def latest(self):
+        """Return the newest sample as a dict, or None when empty"""
+        with self._lock:
+            if not self._size:
+                return None
+            index = (self._next - 1) % self.capacity
+            return {column: self._data[column][index] for column in self.columns}
+
+    def rows(self):
+        """Return all samples as tuples in column order, oldest first"""
+        with self._lock:
+            return list(zip(*(self._ordered(self._data[column]) for column in self.columns)))
+
+    def _ordered(self, data):
+        if self._size < self.capacity:
+            return data[:self._size].tolist()
+        return data[self._next:].tolist() + data[:self._next].tolist()
+
+    def export_csv(self, path):
+        with open(path, 'w', newline='', encoding='utf-8') as f:
+            writer = csv.writer(f)
+            writer.writerow(self.columns)
+            writer.writerows(self.rows())
+
+    def export_binary(self, path):
+        """Write the samples as little-endian doubles, one row after another"""
+        rows = self.rows()
+        names = '\n'.join(self.columns).encode('utf-8')
+        values = array('d', [value for row in rows for value in row])
+        if sys.byteorder == 'big':
+            values.byteswap()
+        with open(path, 'wb') as f:
+            f.write(self.BINARY_MAGIC)
+            f.write(struct.pack('<III', len(self.columns), len(rows), len(names)))
+            f.write(names)
+            f.write(values.tobytes())
+
+    @classmethod
+    def load_binary(cls, path):
+        """Read a buffer written by export_binary"""
+        with open(path, 'rb') as f:
+            if f.read(len(cls.BINARY_MAGIC)) != cls.BINARY_MAGIC:
+                raise ValueError(f"{path} is not a performance log")
+            column_count, row_count, names_length = struct.unpack('<III', f.read(12))
+            columns = f.read(names_length).decode('utf-8').split('\n')
+            values = array('d')
+            values.frombytes(f.read(8 * column_count * row_count))
+        if sys.byteorder == 'big':
+            values.byteswap()
+        
+        buffer = cls(columns, capacity=max(row_count, 1))
+        for start in range(0, len(values), column_count):
+            buffer.append(dict(zip(columns, values[start:start + column_count])))
+        return buffer
+
+
+class EventLoopProbe(QObject):
+    """Measures how late the GUI event loop runs a periodic timer
+
+    Lateness is recorded in the 'gui.event_loop_lag_ms' histogram; every tick
+    that is later than stall_ms also counts as a stall in 'gui.stalls'.
+    """
+
+    def __init__(self, interval_ms=50, stall_ms=200, parent=None):
+        super().__init__(parent)
+        self.interval_ms = interval_ms
+        self.stall_ms = stall_ms
+        self._last = None
+        self._timer = QTimer(self)
+        self._timer.setInterval(interval_ms)
+        self._timer.timeout.connect(self._tick)
+
+    def start(self):
+        self._last = time.perf_counter()
+        self._timer.start()
+
+    def stop(self):
+        self._timer.stop()
+
+    def _tick(self):
+        now = time.perf_counter()
+        lag = max(0.0, (now - self._last) * 1000 - self.interval_ms)
+        self._last = now
+        telemetry.observe('gui.event_loop_lag_ms', lag)
+        if lag >= self.stall_ms:
+            telemetry.increment('gui.stalls')
+
+
+class _Timer:
+    def __init__(self, telemetry, name):
+        self.telemetry = telemetry
+        self.name = name
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.telemetry.observe(self.name, (time.perf_counter() - self.start) * 1000)
+        return False
+
+
+# Shared by the whole process
+telemetry = Telemetry()
@@ -1,22 +1,216 @@
 import re
-from datetime import datetime
+from dataclasses import dataclass
+from datetime import date
+from typing import Callable, Optional
 from PyQt5.QtCore import QDate
 
+# Rules shared by the per-record checks below and the bulk employee import
+ARABIC_NUMERALS = {
+    '٠': '0', '١': '1', '٢': '2', '٣': '3', '٤': '4',
+    '٥': '5', '٦': '6', '٧': '7', '٨': '8', '٩': '9',
+    '۰': '0', '۱': '1', '۲': '2', '۳': '3', '۴': '4',
+    '۵': '5', '۶': '6', '۷': '7', '۸': '8', '۹': '9'
+}
+EMAIL_PATTERN = r'^[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}$'
+PHONE_SEPARATORS = r'[ \-+]'
+PHONE_PATTERN = r'^\d{8,15}$'
+NATIONAL_ID_PATTERN = r'^\d{10,14}$'
+DATE_FORMAT = '%Y-%m-%d'
+VALID_GENDERS = {'male', 'female'}  # Match database constraints
+SALARY_TYPE_MAP = {
+    # Arabic
+    'شهري': 'monthly',
+    'أسبوعي': 'weekly',
+    'يومي': 'daily',
+    'بالساعة': 'hourly',
+    'بالمشروع': 'project',
+    'بالعمولة': 'commission',
+    # English
+    'Monthly': 'monthly',
+    'Weekly': 'weekly',
+    'Daily': 'daily',
+    'Hourly': 'hourly',
+    'Project-based': 'project',
+    'Commission-based': 'commission'
+}
+
+# Compiled once at import; the checks below never build a regex per call
+NUMERALS_TABLE = str.maketrans(ARABIC_NUMERALS)
+EMAIL_RE = re.compile(EMAIL_PATTERN)
+PHONE_SEPARATORS_RE = re.compile(PHONE_SEPARATORS)
+PHONE_RE = re.compile(PHONE_PATTERN)
+NATIONAL_ID_RE = re.compile(NATIONAL_ID_PATTERN)
+# What strptime accepts for DATE_FORMAT, without its per-call parsing cost
+DATE_RE = re.compile(r'^(\d{4})-(\d{1,2})-(\d{1,2})$')
+PASSPORT_RE = re.compile(r'^[A-Z0-9]{6,9}$')
+
+MISSING_FIELDS_MESSAGE = "الحقول المطلوبة غير مكتملة: {}"
+DATE_ERROR = "صيغة التاريخ غير صحيحة (استخدم YYYY-MM-DD)"
+
+
+def _is_empty(value):
+    # value != value is only true for NaN, which pandas uses for missing cells
+    return value is None or value == '' or value != value
+
+
+def _to_digits(value):
+    return value.translate(NUMERALS_TABLE) if isinstance(value, str) else value
+
+
+# Field checks: each takes a non-empty value and returns (converted value,
+# error message or None)
+def check_email(value):
+    return value, None if EMAIL_RE.match(value) else "صيغة البريد الإلكتروني غير صحيحة"
+
+
+def check_phone(value):
+    digits = PHONE_SEPARATORS_RE.sub('', _to_digits(value))
+    return value, None if PHONE_RE.match(digits) else "صيغة رقم الهاتف غير صحيحة"
+
+
+def check_national_id(value):
+    national_id = _to_digits(value).replace(' ', '')
+    return national_id, None if NATIONAL_ID_RE.match(national_id) else "صيغة رقم الهوية غير صحيحة"
+
+
+def check_gender(value):
+    return value, None if value in VALID_GENDERS else "قيمة الجنس غير صحيحة"
+
+
+def check_date(value):
+    match = DATE_RE.match(_to_digits(value)) if isinstance(value, str) else None
+    if match:
+        try:
+            return date(*map(int, match.groups())).isoformat(), None
+        except ValueError:
+            pass
+    return value, DATE_ERROR
+
+
+def check_salary(value):
+    try:
+        salary = float(_to_digits(value))
+    except (TypeError, ValueError):
+        return value, "قيمة الراتب غير صحيحة"
+    if salary < 0:
+        return value, "لا يمكن أن يكون الراتب بالسالب"
+    return salary, None
+
+
+def check_bank_account(value):
+    return value, None if value.strip() else "رقم الحساب البنكي غير صحيح"
+
+
+@dataclass(frozen=True)
+class FieldRule:
+    """One row of a validation table"""
+    field: str
+    label: str
+    check: Optional[Callable] = None
+    required: bool = False
+    prefix: bool = False  # Prefix check errors with the label
+
+
+class RecordValidator:
+    """Validates records against a table of FieldRules
+
+    A batch is checked column by column, each rule running over its field's
+    values for every record in one loop. Required fields are checked before
+    any format check, and empty optional fields are skipped.
+    """
+
+    def __init__(self, rules):
+        self.rules = tuple(rules)
+        # The table compiled into the two loops validation actually runs
+        self._required = [
+            (rule.field, MISSING_FIELDS_MESSAGE.format(rule.label))
+            for rule in self.rules if rule.required
+        ]
+        self._checks = [
+            (rule.field, rule.check, f"{rule.label}: " if rule.prefix else '')
+            for rule in self.rules if rule.check
+        ]
+
+    def missing_labels(self, record):
+        """Labels of the required fields a record leaves empty"""
+        return [rule.label for rule in self.rules if rule.required and _is_empty(record.get(rule.field))]
+
+    def validate(self, record, row=0):
+        """Validate a single dict; returns its errors"""
+        errors = []
+        for field, message in self._required:
+            value = record.get(field)
+            if _is_empty(value):
+                errors.append({'row': row, 'field': field, 'value': value, 'message': message})
+        for field, check, prefix in self._checks:
+            value = record.get(field)
+            if not _is_empty(value):
+                error = check(value)[1]
+                if error:
+                    errors.append({'row': row, 'field': field, 'value': value, 'message': prefix + error})
+        return errors
+
+    def validate_batch(self, records):
+        """Validate a list of dicts or a pandas DataFrame
+        
+        Returns (columns, errors). columns maps every checked field to its
+        values as converted by the check (dates as YYYY-MM-DD, salaries as
+        float). errors are {row, field, value, message} dicts, row being the
+        list position or DataFrame index label, ordered by row.
+        """
+        if hasattr(records, 'columns'):
+            rows = list(records.index)
+            present = set(records.columns)
+            column = lambda field: records[field].tolist() if field in present else [None] * len(rows)
+        else:
+            rows = list(range(len(records)))
+            column = lambda field: [record.get(field) for record in records]
+        
+        found = []
+        for field, message in self._required:
+            for position, value in enumerate(column(field)):
+                if _is_empty(value):
+                    found.append((position, field, value, message))
+        
+        columns = {}
+        for field, check, prefix in self._checks:
+            converted = []
+            for position, value in enumerate(column(field)):
+                if _is_empty(value):
+                    converted.append(value)
+                    continue
+                result, error = check(value)
+                converted.append(result)
+                if error:
+                    found.append((position, field, value, prefix + error))
+            columns[field] = converted
+        
+        found.sort(key=lambda error: error[0])
+        errors = [
+            {'row': rows[position], 'field': field, 'value': value, 'message': message}
+            for position, field, value, message in found
+        ]
+        return columns, errors
+
+
+EMPLOYEE_RULES = (
+    FieldRule('name', 'الاسم', required=True),
+    FieldRule('email', 'البريد الإلكتروني', check_email),
+    FieldRule('phone', 'رقم الهاتف', check_phone),
+    FieldRule('national_id', 'رقم الهوية', check_national_id),
+    FieldRule('gender', 'الجنس', check_gender),
+    FieldRule('birth_date', 'تاريخ الميلاد', check_date, prefix=True),
+    FieldRule('hire_date', 'تاريخ التعيين', check_date, required=True, prefix=True),
+    FieldRule('basic_salary', 'الراتب الأساسي', check_salary, prefix=True),
+    FieldRule('bank_account', 'رقم الحساب', check_bank_account),
+)
+EMPLOYEE_VALIDATOR = RecordValidator(EMPLOYEE_RULES)
+
 class ValidationUtils:
     @staticmethod
     def convert_arabic_numerals(text):
         """Convert Arabic/Persian numerals to standard numerals"""
-        arabic_numerals = {
-            '٠': '0', '١': '1', '٢': '2', '٣': '3', '٤': '4',
-            '٥': '5', '٦': '6', '٧': '7', '٨': '8', '٩': '9',
-            '۰': '0', '۱': '1', '۲': '2', '۳': '3', '۴': '4',
-            '۵': '5', '۶': '6', '۷': '7', '۸': '8', '۹': '9'
-        }
-        if not isinstance(text, str):
-            return text
-        for arabic, standard in arabic_numerals.items():
-            text = text.replace(arabic, standard)
-        return text
+        return _to_digits(text)
 
     @staticmethod
     def parse_date(date_str):
@@ -34,31 +228,21 @@ class ValidationUtils:
         if not email:
             return False
         # Basic email validation
-        return bool(re.match(r'^[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}$', email))
+        return bool(EMAIL_RE.match(email))
 
     @staticmethod
     def validate_phone(phone):
         """Validate phone number format."""
         if not phone:
             return False
-        # Convert Arabic numerals if present
-        phone = ValidationUtils.convert_arabic_numerals(phone)
-        # Remove spaces, dashes, and plus sign
-        phone = re.sub(r'[ \-+]', '', phone)
-        # Check if the remaining string is all digits and has appropriate length
-        return bool(re.match(r'^\d{8,15}$', phone))
+        return check_phone(phone)[1] is None
 
     @staticmethod
     def validate_national_id(national_id):
         """Validate national ID format."""
         if not national_id:
             return True  # Optional field
-        # Convert Arabic numerals if present
-        national_id = ValidationUtils.convert_arabic_numerals(national_id)
-        # Remove any spaces
-        national_id = national_id.replace(' ', '')
-        # National ID should be 10-14 digits
-        return bool(re.match(r'^\d{10,14}$', national_id))
+        return check_national_id(national_id)[1] is None
 
     @staticmethod
     def validate_passport(passport):
@@ -68,7 +252,7 @@ class ValidationUtils:
         # Convert to uppercase and remove spaces
         passport = passport.upper().replace(' ', '')
         # Passport number should be 6-9 characters, letters and numbers
-        return bool(re.match(r'^[A-Z0-9]{6,9}$', passport))
+        return bool(PASSPORT_RE.match(passport))
 
     @staticmethod
     def validate_bank_account(account):
@@ -88,101 +272,31 @@ class ValidationUtils:
     @staticmethod
     def normalize_salary_type(salary_type):
         """Convert display salary type to database format."""
-        type_map = {
-            # Arabic
-            'شهري': 'monthly',
-            'أسبوعي': 'weekly',
-            'يومي': 'daily',
-            'بالساعة': 'hourly',
-            'بالمشروع': 'project',
-            'بالعمولة': 'commission',
-            # English
-            'Monthly': 'monthly',
-            'Weekly': 'weekly',
-            'Daily': 'daily',
-            'Hourly': 'hourly',
-            'Project-based': 'project',
-            'Commission-based': 'commission'
-        }
-        return type_map.get(salary_type, salary_type.lower())
+        return SALARY_TYPE_MAP.get(salary_type, salary_type.lower())
 
     @staticmethod
     def validate_salary(salary):
         """Validate salary value"""
-        try:
-            if isinstance(salary, str):
-                salary = ValidationUtils.convert_arabic_numerals(salary)
-            salary = float(salary)
-            if salary < 0:
-                return False, "لا يمكن أن يكون الراتب بالسالب"
-            return True, None
-        except ValueError:
-            return False, "قيمة الراتب غير صحيحة"
+        _, error = check_salary(salary)
+        return error is None, error
 
     @staticmethod
     def validate_date(date_str):
         """Validate date format (YYYY-MM-DD)"""
-        try:
-            # Convert Arabic numerals to standard numerals
-            date_str = ValidationUtils.convert_arabic_numerals(date_str)
-            datetime.strptime(date_str, '%Y-%m-%d')
-            return True, None
-        except ValueError:
-            return False, "صيغة التاريخ غير صحيحة (استخدم YYYY-MM-DD)"
+        _, error = check_date(date_str)
+        return error is None, error
 
     @staticmethod
     def validate_employee_data(data):
         """Validate employee data"""
         # Only name and hire_date are strictly required
-        required_fields = {
-            'name': 'الاسم',
-            'hire_date': 'تاريخ التعيين'
-        }
-        
-        # Check required fields
-        missing_fields = [required_fields[field] for field in required_fields if not data.get(field)]
+        missing_fields = EMPLOYEE_VALIDATOR.missing_labels(data)
         if missing_fields:
-            return False, f"الحقول المطلوبة غير مكتملة: {' ، '.join(missing_fields)}"
-        
-        # Validate email if provided
-        if data.get('email') and not ValidationUtils.validate_email(data['email']):
-            return False, "صيغة البريد الإلكتروني غير صحيحة"
-        
-        # Validate phone if provided
-        if data.get('phone') and not ValidationUtils.validate_phone(data['phone']):
-            return False, "صيغة رقم الهاتف غير صحيحة"
-        
-        # Validate national ID if provided
-        if data.get('national_id') and not ValidationUtils.validate_national_id(data['national_id']):
-            return False, "صيغة رقم الهوية غير صحيحة"
-        
-        # Validate gender if provided
-        if data.get('gender'):
-            valid_genders = {'male', 'female'}  # Match database constraints
-            if data['gender'] not in valid_genders:
-                return False, "قيمة الجنس غير صحيحة"
-        
-        # Validate dates if provided
-        if data.get('birth_date'):
-            success, error = ValidationUtils.validate_date(data['birth_date'])
-            if not success:
-                return False, f"تاريخ الميلاد: {error}"
-        
-        if data.get('hire_date'):
-            success, error = ValidationUtils.validate_date(data['hire_date'])
-            if not success:
-                return False, f"تاريخ التعيين: {error}"
-        
-        # Validate salary if provided
-        if data.get('basic_salary') is not None:
-            success, error = ValidationUtils.validate_salary(data['basic_salary'])
-            if not success:
-                return False, f"الراتب الأساسي: {error}"
-        
-        # Validate bank account if provided
-        if data.get('bank_account') and not ValidationUtils.validate_bank_account(data['bank_account']):
-            return False, "رقم الحساب البنكي غير صحيح"
+            return False, MISSING_FIELDS_MESSAGE.format(' ، '.join(missing_fields))
         
+        errors = EMPLOYEE_VALIDATOR.validate(data)
+        if errors:
+            return False, errors[0]['message']
         return True, None
 
     @staticmethod